@@ -13,9 +13,9 @@ import sys
 # Add parent directory to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
+# Heavy dependencies (torch, pandas, reportlab) are imported on first use
 from src.agents.orchestrator import BatteryMonitoringOrchestrator
-from src.data.real_data_loader import BatteryDataPipeline
-from src.utils.report_generator import create_battery_report
+from src.utils import Config
 
 # Initialize Flask app
 app = Flask(__name__)
@@ -23,6 +23,7 @@ CORS(app)
 
 # Global variables
 orchestrator = None
+inference_pool = None  # InferenceWorkerPool when started with --workers N
 data_pipeline = None
 latest_assessment = None
 assessment_history = []
@@ -45,11 +46,15 @@ def init_sbg():
     print("Initializing SBG System...")
     
     try:
-        # Initialize orchestrator
-        orchestrator = BatteryMonitoringOrchestrator()
+        # Initialize orchestrator; agents are built in the background so the
+        # server accepts requests immediately (first use waits for its agent)
+        orchestrator = BatteryMonitoringOrchestrator(Config().config)
+        threading.Thread(target=orchestrator.build_agents, daemon=True).start()
         
         # Initialize data pipeline - path to challengePES/data
         # Current dir is SBG_System, need to go up one level to challengePES
+        from src.data.real_data_loader import BatteryDataPipeline
+
         data_dir = os.path.join(os.path.dirname(__file__), '..', 'data')
         data_pipeline = BatteryDataPipeline(data_dir)
         
@@ -127,82 +132,64 @@ def analyze_battery():
         
         print(f"\nRunning comprehensive battery analysis...")
         data = data_pipeline.prepare_data_for_agents(limit_files=limit)
+        if not data['battery_ids']:
+            return jsonify({'status': 'error', 'message': 'No battery data available'}), 500
         
-        assessments = []
+        # All batteries in one pass per agent (in the workers when started with --workers)
+        batch = _fleet_batch(data)
+        if inference_pool:
+            fleet = inference_pool.assess_fleet(batch)
+        else:
+            fleet = orchestrator.assess_fleet(batch)
         
-        # Analyze each battery
-        for i, battery_id in enumerate(data['battery_ids']):
-            print(f"\nAnalyzing {battery_id}...")
+        # Same per-agent tiers and overall mean as the agents' analyze()
+        assessments = []
+        for i, result in enumerate(fleet):
+            thermal = result['thermal_analysis']
+            acoustic = result['acoustic_analysis']
+            rul = result['rul_prediction']
+            anomaly = result['anomaly_detection']
+            rul_level, rul_score = orchestrator.rul_agent.risk_tier(rul['rul_cycles'])
+            anomaly_level, anomaly_score = orchestrator.anomaly_agent.risk_tier(anomaly['anomaly_score'])
             
             assessment = {
-                'battery_id': battery_id,
-                'timestamp': datetime.now().isoformat(),
-                'agents': {}
-            }
-            
-            # Thermal agent
-            if i < len(data['thermal']):
-                thermal_data = data['thermal'][i]
-                thermal_risk = orchestrator.thermal_agent.analyze(
-                    thermal_data['image'],
-                    thermal_data['temperature']
-                )
-                assessment['agents']['thermal'] = {
-                    'risk_level': str(thermal_risk.get('risk_level', 'UNKNOWN')),
-                    'risk_score': float(thermal_risk.get('risk_score', 0)),
-                    'temperature': thermal_data['temperature'],
-                    'anomalies': thermal_risk.get('anomalies', [])
-                }
-            
-            # Acoustic agent
-            if i < len(data['acoustic']):
-                acoustic_data = data['acoustic'][i]
-                acoustic_risk = orchestrator.acoustic_agent.analyze(
-                    acoustic_data['spectrogram'],
-                    acoustic_data['fault_indicators']
-                )
-                assessment['agents']['acoustic'] = {
-                    'risk_level': str(acoustic_risk.get('risk_level', 'UNKNOWN')),
-                    'risk_score': float(acoustic_risk.get('risk_score', 0)),
-                    'fault_indicators': acoustic_data['fault_indicators'],
-                    'anomalies': acoustic_risk.get('anomalies', [])
-                }
-            
-            # RUL agent
-            if i < len(data['rul']):
-                rul_data = data['rul'][i]
-                rul_risk = orchestrator.rul_agent.analyze(
-                    rul_data['state'],
-                    rul_data['capacity_fade']
-                )
-                assessment['agents']['rul'] = {
-                    'risk_level': str(rul_risk.get('risk_level', 'UNKNOWN')),
-                    'risk_score': float(rul_risk.get('risk_score', 0)),
-                    'capacity_fade': rul_data['capacity_fade'],
-                    'predicted_rul_cycles': int(rul_risk.get('rul_cycles', 0))
-                }
-            
-            # Anomaly agent
-            if i < len(data['anomaly']):
-                anomaly_data = data['anomaly'][i]
-                anomaly_risk = orchestrator.anomaly_agent.analyze(
-                    anomaly_data['features']
-                )
-                assessment['agents']['anomaly'] = {
-                    'risk_level': str(anomaly_risk.get('risk_level', 'UNKNOWN')),
-                    'risk_score': float(anomaly_risk.get('risk_score', 0)),
-                    'anomalies_detected': anomaly_risk.get('anomalies_detected', 0),
-                    'reconstruction_error': float(anomaly_risk.get('reconstruction_error', 0))
+                'battery_id': result['battery_id'],
+                'timestamp': result['timestamp'].isoformat(),
+                'agents': {
+                    'thermal': {
+                        'risk_level': str(thermal.get('risk_level', 'UNKNOWN')),
+                        'risk_score': float(thermal.get('risk_score', 0)),
+                        'temperature': data['thermal'][i]['temperature'],
+                        'anomalies': thermal.get('anomalies', [])
+                    },
+                    'acoustic': {
+                        'risk_level': str(acoustic.get('risk_level', 'UNKNOWN')),
+                        'risk_score': float(acoustic.get('risk_score', 0)),
+                        'fault_indicators': data['acoustic'][i]['fault_indicators'],
+                        'anomalies': acoustic.get('anomalies', [])
+                    },
+                    'rul': {
+                        'risk_level': rul_level,
+                        'risk_score': rul_score,
+                        'capacity_fade': data['rul'][i]['capacity_fade'],
+                        'predicted_rul_cycles': int(rul.get('rul_cycles', 0))
+                    },
+                    'anomaly': {
+                        'risk_level': anomaly_level,
+                        'risk_score': anomaly_score,
+                        'anomalies_detected': 1 if anomaly['is_anomalous'] else 0,
+                        'reconstruction_error': float(anomaly['anomaly_score'])
+                    }
                 }
+            }
             
             # Overall assessment
             risk_scores = [
                 assessment['agents'][agent].get('risk_score', 0)
                 for agent in ['thermal', 'acoustic', 'rul', 'anomaly']
-                if agent in assessment['agents']
             ]
             
-            overall_risk = np.mean(risk_scores) if risk_scores else 0.5
+            overall_risk = np.mean(risk_scores)
             
             if overall_risk >= 0.7:
                 overall_level = 'CRITICAL'
@@ -243,6 +230,24 @@ def analyze_battery():
         }), 500
 
 
+def _fleet_batch(data):
+    """assess_fleet batch from the data pipeline's per-battery agent inputs"""
+    return {
+        'thermal_images': [item['image'] for item in data['thermal']],
+        'temperatures': [item['temperature'] for item in data['thermal']],
+        'acoustic_features': [item['spectrogram'] for item in data['acoustic']],
+        'fault_indicators': [item['fault_indicators'] for item in data['acoustic']],
+        'rul_sequences': [
+            orchestrator.rul_agent.state_sequence(item['state'], item['capacity_fade'])
+            for item in data['rul']
+        ],
+        'sensor_data': np.stack([
+            orchestrator.anomaly_agent.fit_features(item['features']) for item in data['anomaly']
+        ]),
+        'battery_ids': data['battery_ids']
+    }
+
+
 @app.route('/api/assessment/latest', methods=['GET'])
 def get_latest_assessment():
     """Get the latest assessment"""
@@ -300,6 +305,7 @@ def get_models_info():
                 'description': 'Anomaly detection'
             }
         },
+        'inference_stats': orchestrator.get_inference_stats(),
         'agents': {
             'thermal_agent': 'Analyzes thermal patterns',
             'acoustic_agent': 'Detects acoustic anomalies',
@@ -357,6 +363,8 @@ def generate_report():
         }
         
         # Generate PDF
+        from src.utils.report_generator import create_battery_report
+
         pdf_buffer = create_battery_report(assessments, summary)
         
         # Return PDF file
@@ -452,9 +460,8 @@ def _continuous_monitoring():
     """Background thread for continuous data monitoring"""
     global monitoring_active, system_metrics, latest_assessment, assessment_history
     
-    data_batch = []
-    batch_size = 2
     data_ingestion_count = 0
+    readings = None
     
     while monitoring_active:
         try:
@@ -462,73 +469,74 @@ def _continuous_monitoring():
                 time.sleep(1)
                 continue
             
-            # Simulate real-time data ingestion
-            data = data_pipeline.prepare_data_for_agents(limit_files=1)
+            # Simulate real-time data ingestion: each chunk of new readings
+            # updates the batteries' streaming features incrementally
+            if readings is None:
+                readings = data_pipeline.stream_test_readings(limit_files=1)
+            chunk = next(readings, None)
+            if chunk is None:
+                readings = None
+                time.sleep(1)
+                continue
+            data = data_pipeline.ingest_readings(chunk)
             
-            if data and data['battery_ids']:
-                battery_id = data['battery_ids'][0]
-                
-                # Simulate ingesting data points from each agent
-                thermal_points = len(data.get('thermal', []))
-                acoustic_points = len(data.get('acoustic', []))
-                rul_points = len(data.get('rul', []))
-                anomaly_points = len(data.get('anomaly', []))
-                
-                data_points = thermal_points + acoustic_points + rul_points + anomaly_points
-                data_ingestion_count += data_points
-                system_metrics['data_points_ingested'] += data_points
-                
+            data_points = len(chunk)
+            data_ingestion_count += data_points
+            system_metrics['data_points_ingested'] += data_points
+            
+            # Calculate data rate (points per second)
+            if system_metrics['start_time']:
+                elapsed = (datetime.now() - system_metrics['start_time']).total_seconds()
+                if elapsed > 0:
+                    system_metrics['data_rate'] = round(system_metrics['data_points_ingested'] / elapsed, 2)
+            
+            # Run quick analysis on the batteries that reported
+            assessments = []
+            agents = inference_pool.remote() if inference_pool else orchestrator
+            for i, battery_id in enumerate(data['battery_ids']):
                 # Update current batteries
                 if battery_id not in system_metrics['current_batteries']:
                     system_metrics['current_batteries'].append(battery_id)
                 
-                # Calculate data rate (points per second)
-                if system_metrics['start_time']:
-                    elapsed = (datetime.now() - system_metrics['start_time']).total_seconds()
-                    if elapsed > 0:
-                        system_metrics['data_rate'] = round(system_metrics['data_points_ingested'] / elapsed, 2)
-                
-                data_batch.append(battery_id)
+                assessment = {
+                    'battery_id': battery_id,
+                    'timestamp': datetime.now().isoformat(),
+                    'agents': {},
+                    'ingestion_batch': data_ingestion_count
+                }
                 
-                # When batch is ready, run analysis
-                if len(data_batch) >= batch_size:
-                    # Analyze batch
-                    assessments = []
-                    for i, bat_id in enumerate(data_batch):
-                        assessment = {
-                            'battery_id': bat_id,
-                            'timestamp': datetime.now().isoformat(),
-                            'agents': {},
-                            'ingestion_batch': data_ingestion_count
+                try:
+                    if orchestrator:
+                        thermal_data = data['thermal'][i]
+                        thermal_risk = agents.thermal_agent.analyze(
+                            thermal_data['image'],
+                            thermal_data['temperature']
+                        )
+                        assessment['agents']['thermal'] = {
+                            'risk_score': float(thermal_risk.get('risk_score', 0)),
+                            'temperature': thermal_data['temperature']
                         }
                         
-                        # Run quick analysis on ingested data
-                        try:
-                            if orchestrator and i < len(data['thermal']):
-                                thermal_data = data['thermal'][i] if i < len(data['thermal']) else None
-                                if thermal_data:
-                                    thermal_risk = orchestrator.thermal_agent.analyze(
-                                        thermal_data['image'],
-                                        thermal_data['temperature']
-                                    )
-                                    assessment['agents']['thermal'] = {
-                                        'risk_score': float(thermal_risk.get('risk_score', 0)),
-                                        'temperature': thermal_data['temperature']
-                                    }
-                        except:
-                            pass
-                        
-                        assessments.append(assessment)
-                    
-                    latest_assessment = assessments[0] if assessments else None
-                    assessment_history.extend(assessments)
-                    system_metrics['analyses_completed'] += len(assessments)
-                    system_metrics['last_update'] = datetime.now().isoformat()
-                    
-                    data_batch = []
+                        anomaly_risk = agents.anomaly_agent.analyze(
+                            data['anomaly'][i]['features'], battery_id=battery_id
+                        )
+                        assessment['agents']['anomaly'] = {
+                            'risk_score': float(anomaly_risk.get('risk_score', 0)),
+                            'reconstruction_error': float(anomaly_risk.get('reconstruction_error', 0))
+                        }
+                except:
+                    pass
                 
-                # Simulate real-time data arrival
-                time.sleep(0.5)
+                assessments.append(assessment)
+            
+            if assessments:
+                latest_assessment = assessments[0]
+                assessment_history.extend(assessments)
+                system_metrics['analyses_completed'] += len(assessments)
+                system_metrics['last_update'] = datetime.now().isoformat()
+            
+            # Simulate real-time data arrival
+            time.sleep(0.5)
         
         except Exception as e:
             print(f"Error in continuous monitoring: {e}")
@@ -536,8 +544,30 @@ def _continuous_monitoring():
 
 
 if __name__ == '__main__':
+    if '--import-report' in sys.argv:
+        # Where server startup time goes (python -X importtime, aggregated)
+        from src.utils.import_profile import profile_imports, format_import_report
+
+        print(format_import_report(profile_imports('app')))
+        sys.exit(0)
+
     # Initialize SBG
     if init_sbg():
+        workers_config = orchestrator.config.get('workers', {})
+        num_workers = workers_config.get('num_workers', 0)
+        if '--workers' in sys.argv:
+            num_workers = int(sys.argv[sys.argv.index('--workers') + 1])
+        if num_workers:
+            # Serve model inference from worker processes sharing mmapped weights
+            from src.agents.worker_pool import InferenceWorkerPool
+
+            inference_pool = InferenceWorkerPool.from_orchestrator(
+                orchestrator,
+                num_workers=num_workers,
+                threads_per_worker=workers_config.get('threads_per_worker', 1),
+                cpu_affinity='auto' if workers_config.get('pin_cores') else None,
+            )
+
         print("\n" + "="*70)
         print("🔋 SMART BATTERY GUARDIAN - API SERVER STARTING")
         print("="*70)
@@ -563,7 +593,8 @@ if __name__ == '__main__':
         print("="*70 + "\n")
         
         # Run Flask app
-        app.run(debug=True, host='0.0.0.0', port=5000)
+        # The reloader would start a second copy of the worker pool
+        app.run(debug=True, host='0.0.0.0', port=5000, use_reloader=inference_pool is None)
     else:
         print("Failed to initialize SBG system!")
         sys.exit(1)
@@ -0,0 +1,629 @@
+"""
+Smart Battery Guardian - Model Benchmarks
+
+Usage:
+    python benchmark.py quantization [--samples N] [--iterations N]
+    python benchmark.py onnx [--samples N] [--iterations N] [--output-dir DIR]
+    python benchmark.py zoo [--samples N] [--iterations N] [--train-steps N]
+    python benchmark.py precision [--samples N] [--iterations N] [--train-steps N]
+    python benchmark.py dataloader [--samples N] [--workers 0 2 4] [--batch-size N]
+    python benchmark.py workers [--workers 1 2 4] [--requests N]
+    python benchmark.py threads [--objective latency|throughput] [--iterations N]
+    python benchmark.py env [--envs 1 64 1024 4096] [--steps N]
+"""
+
+import argparse
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import torch
+
+from src.data import SyntheticBatteryDataGenerator
+from src.models import (
+    ThermalCNN,
+    AcousticClassifier,
+    RULLSTM,
+    AnomalyAutoencoder,
+)
+from src.models.rl_controller import DQNNetwork
+from src.models.mixed_precision import autocast, bf16_supported, grad_scaler, scaled_step
+from src.models.quantization import quantize_model, compare_models, model_size_bytes
+from src.models.onnx_export import export_model, check_parity
+from src.models.model_zoo import MODEL_ZOO, VARIANT_ORDER, build_model
+from src.utils.benchmark import measure_latency, format_report
+
+
+def build_benchmark_inputs(num_samples=64):
+    """Synthetic model-ready inputs for every model, keyed by model name"""
+    generator = SyntheticBatteryDataGenerator(seed=0)
+
+    half = num_samples // 2
+    thermal = np.concatenate([
+        generator.generate_normal_thermal_data(num_samples=half),
+        generator.generate_anomalous_thermal_data(num_samples=num_samples - half),
+    ])
+    thermal = np.transpose(thermal, (0, 3, 1, 2))
+    thermal = thermal / thermal.max(axis=(1, 2, 3), keepdims=True)
+
+    acoustic = np.concatenate([
+        generator.generate_acoustic_features(num_samples=half),
+        generator.generate_faulty_acoustic_features(num_samples=num_samples - half),
+    ])
+    rul, _ = generator.generate_rul_sequence_data(num_sequences=num_samples)
+
+    return {
+        "thermal": torch.tensor(thermal, dtype=torch.float32),
+        "acoustic": torch.tensor(acoustic, dtype=torch.float32),
+        "rul": torch.tensor(rul, dtype=torch.float32),
+        "anomaly": torch.rand(num_samples, 10),
+        "control": torch.rand(num_samples, 8),
+    }
+
+
+def build_float_models():
+    """Float reference models in eval mode, keyed by model name"""
+    models = {
+        "thermal": (ThermalCNN(), "static", "classification"),
+        "acoustic": (AcousticClassifier(), "static", "classification"),
+        "rul": (RULLSTM(), "dynamic", "regression"),
+        "anomaly": (AnomalyAutoencoder(), "dynamic", "regression"),
+        "control": (DQNNetwork(), "dynamic", "regression"),
+    }
+    for model, _, _ in models.values():
+        model.eval()
+    return models
+
+
+def run_quantization_benchmark(num_samples=64, iterations=50):
+    """
+    Compare float and int8 models on accuracy delta, latency and throughput
+
+    The first half of the inputs calibrates static quantization; metrics are
+    computed on the second half.
+    """
+    torch.manual_seed(0)
+    inputs = build_benchmark_inputs(num_samples)
+    rows = []
+
+    for name, (model, mode, task) in build_float_models().items():
+        data = inputs[name]
+        calibration, evaluation = data[: len(data) // 2], data[len(data) // 2 :]
+        quantized = quantize_model(model, mode, calibration)
+
+        delta = compare_models(model, quantized, evaluation, task=task)
+        single = evaluation[:1]
+
+        for label, candidate in (("float32", model), (f"int8-{mode}", quantized)):
+            with torch.no_grad():
+                latency = measure_latency(candidate, single, iterations=iterations)
+                batch = measure_latency(
+                    candidate, evaluation, batch_size=len(evaluation), iterations=iterations
+                )
+            rows.append({
+                "model": name,
+                "variant": label,
+                "size_kb": model_size_bytes(candidate) / 1024.0,
+                "p50_ms": latency["p50_ms"],
+                "p95_ms": latency["p95_ms"],
+                "throughput": batch["throughput"],
+                "agreement": delta.get("agreement") if candidate is quantized else None,
+                "mean_abs_delta": delta["mean_abs_delta"] if candidate is quantized else None,
+            })
+
+    return rows
+
+
+def run_onnx_benchmark(num_samples=64, iterations=50, output_dir=None):
+    """Compare PyTorch and ONNX Runtime on parity, latency and throughput"""
+    from src.models.onnx_backend import OnnxModel
+
+    torch.manual_seed(0)
+    inputs = build_benchmark_inputs(num_samples)
+    output_dir = output_dir or tempfile.mkdtemp(prefix="sbg_onnx_")
+    rows = []
+
+    for name, (model, _, _) in build_float_models().items():
+        data = inputs[name]
+        onnx_model = OnnxModel(export_model(model, f"{output_dir}/{name}.onnx"))
+        parity = check_parity(model, onnx_model, data)
+        numpy_data = data.numpy()
+
+        for label, candidate, batch_input in (
+            ("torch", model, data),
+            ("onnxruntime", onnx_model, numpy_data),
+        ):
+            with torch.no_grad():
+                latency = measure_latency(candidate, batch_input[:1], iterations=iterations)
+                batch = measure_latency(
+                    candidate, batch_input, batch_size=len(batch_input), iterations=iterations
+                )
+            rows.append({
+                "model": name,
+                "backend": label,
+                "p50_ms": latency["p50_ms"],
+                "p95_ms": latency["p95_ms"],
+                "throughput": batch["throughput"],
+                "max_abs_diff": parity["max_abs_diff"] if candidate is onnx_model else None,
+            })
+
+    return rows
+
+
+def build_zoo_datasets(num_samples=256):
+    """
+    Labelled synthetic (train, test) splits per modality for the model zoo
+
+    Thermal maps are reduced to a single channel. RUL targets are the
+    per-cycle capacity fade of each sequence and AttMoE targets the next
+    normalized capacity. Anomaly labels mark shifted samples (the
+    autoencoder trains on normal rows only).
+    """
+    generator = SyntheticBatteryDataGenerator(seed=0)
+    rng = np.random.default_rng(0)
+    half = num_samples // 2
+
+    thermal = np.concatenate([
+        generator.generate_normal_thermal_data(num_samples=half),
+        generator.generate_anomalous_thermal_data(num_samples=num_samples - half),
+    ]).mean(axis=3, keepdims=True)
+    thermal = np.transpose(thermal, (0, 3, 1, 2))
+    thermal = thermal / thermal.max(axis=(1, 2, 3), keepdims=True)
+
+    acoustic = np.concatenate([
+        generator.generate_acoustic_features(num_samples=half),
+        generator.generate_faulty_acoustic_features(num_samples=num_samples - half),
+    ])
+    labels = np.concatenate([np.zeros(half), np.ones(num_samples - half)])
+
+    rul, _ = generator.generate_rul_sequence_data(num_sequences=num_samples)
+    fade = (rul[:, 0, 0] - rul[:, -1, 0]) / rul.shape[1]
+    capacity = rul[:, :, 0] / 100.0
+    rul = (rul - rul.mean(axis=(0, 1))) / (rul.std(axis=(0, 1)) + 1e-8)
+
+    anomaly = rng.normal(0, 1, (num_samples, 10))
+    anomaly[half:] += rng.choice([-3.0, 3.0], size=(num_samples - half, 10))
+
+    datasets = {
+        "thermal": (thermal, labels, "classification"),
+        "acoustic": (acoustic, labels, "classification"),
+        "rul": (rul, fade, "regression"),
+        "attmoe": (capacity[:, np.newaxis, :-1], capacity[:, -1], "regression"),
+        "anomaly": (anomaly, labels, "anomaly"),
+    }
+
+    # Interleave both classes before splitting 75/25
+    order = rng.permutation(num_samples)
+    split = int(num_samples * 0.75)
+    splits = {}
+    for name, (x, y, task) in datasets.items():
+        x = torch.tensor(x[order], dtype=torch.float32)
+        y = torch.tensor(y[order], dtype=torch.float32)
+        splits[name] = ((x[:split], y[:split]), (x[split:], y[split:]), task)
+    return splits
+
+
+def train_zoo_model(model, x, y, task, steps=100, batch_size=32, lr=0.001, precision="float32"):
+    """Short training run used to compare variant capacity"""
+    if task == "anomaly":
+        x = x[y == 0]
+    optimizer = torch.optim.Adam(model.parameters(), lr=lr)
+    scaler = grad_scaler(precision)
+    model.train()
+
+    for step in range(steps):
+        index = torch.randint(0, len(x), (batch_size,))
+        batch = x[index]
+        optimizer.zero_grad()
+        with autocast(precision):
+            outputs = model(batch)
+            if task == "classification":
+                loss = torch.nn.functional.cross_entropy(outputs, y[index].long())
+            elif task == "regression":
+                loss = torch.nn.functional.mse_loss(outputs[:, 0], y[index])
+            else:
+                loss = torch.nn.functional.mse_loss(outputs, batch)
+        scaled_step(optimizer, scaler, loss)
+
+    return model.eval()
+
+
+def evaluate_zoo_model(model, train, test, task):
+    """Accuracy for classifiers/anomaly detection, MAE for regression"""
+    (x_train, y_train), (x_test, y_test) = train, test
+    with torch.no_grad():
+        if task == "classification":
+            predictions, _ = model.predict(x_test)
+            return "accuracy", float((predictions == y_test.long()).float().mean())
+        if task == "regression":
+            return "mae", float((model(x_test)[:, 0] - y_test).abs().mean())
+        normal_scores = model.get_anomaly_score(x_train[y_train == 0]).float()
+        threshold = torch.quantile(normal_scores, 0.95)
+        flagged = model.get_anomaly_score(x_test).float() > threshold
+        return "accuracy", float((flagged == y_test.bool()).float().mean())
+
+
+def run_zoo_benchmark(num_samples=256, iterations=50, train_steps=100):
+    """Latency, throughput, size and accuracy of every model zoo variant"""
+    torch.manual_seed(0)
+    splits = build_zoo_datasets(num_samples)
+    rows = []
+
+    for name in MODEL_ZOO:
+        train, test, task = splits[name]
+        overrides = {}
+        if name in ("rul", "anomaly"):
+            overrides["input_size"] = train[0].shape[-1]
+        elif name == "attmoe":
+            overrides["feature_size"] = train[0].shape[-1]
+
+        for variant in VARIANT_ORDER:
+            torch.manual_seed(0)
+            model = build_model(name, variant, **overrides)
+            train_zoo_model(model, *train, task, steps=train_steps)
+            metric, score = evaluate_zoo_model(model, train, test, task)
+
+            x_test = test[0]
+            with torch.no_grad():
+                latency = measure_latency(model, x_test[:1], iterations=iterations)
+                batch = measure_latency(
+                    model, x_test, batch_size=len(x_test), iterations=iterations
+                )
+            rows.append({
+                "model": name,
+                "variant": variant,
+                "params": sum(p.numel() for p in model.parameters()),
+                "size_kb": model_size_bytes(model) / 1024.0,
+                "p50_ms": latency["p50_ms"],
+                "p95_ms": latency["p95_ms"],
+                "throughput": batch["throughput"],
+                "metric": metric,
+                "score": score,
+            })
+
+    return rows
+
+
+def run_precision_benchmark(
+    num_samples=256, iterations=50, train_steps=100, precisions=("float32", "bfloat16")
+):
+    """
+    Training time, inference speed and held-out score of the base variants
+    under each autocast precision, relative to the first precision
+    """
+    splits = build_zoo_datasets(num_samples)
+    rows = []
+
+    for name in ("thermal", "acoustic", "rul", "anomaly"):
+        train, test, task = splits[name]
+        overrides = {"input_size": train[0].shape[-1]} if name in ("rul", "anomaly") else {}
+        baseline = None
+
+        for precision in precisions:
+            torch.manual_seed(0)
+            model = build_model(name, "base", **overrides)
+            start = time.perf_counter()
+            train_zoo_model(model, *train, task, steps=train_steps, precision=precision)
+            train_seconds = time.perf_counter() - start
+
+            x_test = test[0]
+            with torch.no_grad(), autocast(precision):
+                metric, score = evaluate_zoo_model(model, train, test, task)
+                latency = measure_latency(model, x_test[:1], iterations=iterations)
+                batch = measure_latency(
+                    model, x_test, batch_size=len(x_test), iterations=iterations
+                )
+
+            row = {
+                "model": name,
+                "precision": precision,
+                "train_s": train_seconds,
+                "p50_ms": latency["p50_ms"],
+                "throughput": batch["throughput"],
+                "metric": metric,
+                "score": score,
+            }
+            baseline = baseline or row
+            row["train_speedup"] = baseline["train_s"] / train_seconds
+            row["infer_speedup"] = row["throughput"] / baseline["throughput"]
+            row["score_delta"] = score - baseline["score"]
+            rows.append(row)
+
+    return rows
+
+
+def run_dataloader_benchmark(num_samples=1024, worker_counts=(0, 2, 4), batch_size=32):
+    """
+    One ThermalCNN training epoch per loader configuration, split into
+    time waiting for batches and time computing
+    """
+    from src.data.data_loader import BatteryDataLoader, Compose, GaussianNoise, RandomFlip
+    from src.models.trainer import Trainer
+
+    generator = SyntheticBatteryDataGenerator(seed=0)
+    half = num_samples // 2
+    images = np.concatenate([
+        generator.generate_normal_thermal_data(num_samples=half),
+        generator.generate_anomalous_thermal_data(num_samples=num_samples - half),
+    ])
+    images = np.transpose(images, (0, 3, 1, 2))
+    labels = np.repeat([0, 1], [half, num_samples - half])
+    augment = Compose(GaussianNoise(0.01), RandomFlip(dim=-1))
+
+    def loss_fn(model, batch):
+        x, y = batch
+        return torch.nn.functional.cross_entropy(model(x), y.long())
+
+    rows = []
+    for count in worker_counts:
+        loader = BatteryDataLoader.create_dataloader(
+            images, labels, batch_size=batch_size, num_workers=count,
+            persistent_workers=True, augment=augment,
+        )
+        torch.manual_seed(0)
+        model = build_model("thermal", "tiny", input_channels=images.shape[1])
+        record = Trainer(model, loss_fn, epochs=1).fit(loader)[-1]
+        rows.append({
+            "workers": count,
+            "samples_per_sec": record["samples_per_sec"],
+            "data_s": record["data_s"],
+            "compute_s": record["compute_s"],
+            "data_wait": record["data_wait_fraction"],
+        })
+    return rows
+
+
+def build_assessment_requests(num_requests=64):
+    """Argument tuples for BatteryMonitoringOrchestrator.comprehensive_assessment"""
+    generator = SyntheticBatteryDataGenerator(seed=0)
+    thermal = generator.generate_normal_thermal_data(num_samples=num_requests)
+    acoustic = generator.generate_acoustic_features(num_samples=num_requests)
+    rul, _ = generator.generate_rul_sequence_data(num_sequences=num_requests)
+    sensors = np.random.default_rng(0).random((num_requests, 10), dtype=np.float32)
+    return list(zip(thermal, acoustic, rul, sensors))
+
+
+def run_worker_benchmark(worker_counts=(1, 2, 4), num_requests=64):
+    """
+    Assessment throughput of N Flask-style threads sharing one interpreter
+    versus an InferenceWorkerPool with N processes
+    """
+    from src.agents.orchestrator import BatteryMonitoringOrchestrator
+    from src.agents.worker_pool import InferenceWorkerPool
+
+    torch.manual_seed(0)
+    orchestrator = BatteryMonitoringOrchestrator()
+    orchestrator.build_agents()
+    requests = build_assessment_requests(num_requests)
+    orchestrator.comprehensive_assessment(*requests[0])  # warm-up
+    rows = []
+
+    for count in worker_counts:
+        with ThreadPoolExecutor(count) as executor:
+            start = time.perf_counter()
+            list(executor.map(lambda args: orchestrator.comprehensive_assessment(*args), requests))
+            elapsed = time.perf_counter() - start
+        rows.append({"mode": "threads", "workers": count, "throughput": num_requests / elapsed})
+
+        with InferenceWorkerPool.from_orchestrator(orchestrator, num_workers=count) as pool:
+            pool.map("comprehensive_assessment", requests[:count])  # warm-up
+            start = time.perf_counter()
+            pool.map("comprehensive_assessment", requests)
+            elapsed = time.perf_counter() - start
+        rows.append({"mode": "processes", "workers": count, "throughput": num_requests / elapsed})
+
+    return rows
+
+
+def run_thread_benchmark(objective="latency", iterations=20):
+    """Per-agent intra-op thread autotuning measurements on this host"""
+    from src.agents.orchestrator import BatteryMonitoringOrchestrator
+
+    torch.manual_seed(0)
+    orchestrator = BatteryMonitoringOrchestrator()
+    results = orchestrator.autotune_threads(objective, iterations=iterations)
+    return [
+        {
+            "agent": name,
+            "threads": row["threads"],
+            "p50_ms": row["p50_ms"],
+            "throughput": row["throughput"],
+            "chosen": "*" if row["threads"] == chosen else "",
+        }
+        for name, (chosen, measurements) in results.items()
+        for row in measurements
+    ]
+
+
+def run_env_benchmark(env_counts=(1, 64, 1024, 4096), num_steps=50):
+    """
+    Transitions/s of the vectorized battery environment alone (random
+    actions) and with the DQN acting and learning once per step
+    """
+    from src.models.battery_env import NUM_ACTIONS, VectorBatteryEnv
+    from src.models.rl_controller import RLChargeController
+
+    rows = []
+    for count in env_counts:
+        env = VectorBatteryEnv(num_envs=count, seed=0)
+        rng = np.random.default_rng(0)
+        start = time.perf_counter()
+        for _ in range(num_steps):
+            env.step(rng.integers(0, NUM_ACTIONS, count))
+        env_rate = count * num_steps / (time.perf_counter() - start)
+
+        torch.manual_seed(0)
+        controller = RLChargeController(buffer_size=max(10000, 4 * count * num_steps))
+        stats = controller.train_on_env(VectorBatteryEnv(num_envs=count, seed=0), num_steps)
+        rows.append({
+            "envs": count,
+            "env_rate": env_rate,
+            "train_rate": stats["transitions_per_sec"],
+            "updates": stats["updates"],
+            "mean_reward": stats["mean_reward"],
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SBG model benchmarks")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    quant = subparsers.add_parser("quantization", help="float32 vs int8 comparison")
+    quant.add_argument("--samples", type=int, default=64)
+    quant.add_argument("--iterations", type=int, default=50)
+
+    onnx = subparsers.add_parser("onnx", help="PyTorch vs ONNX Runtime comparison")
+    onnx.add_argument("--samples", type=int, default=64)
+    onnx.add_argument("--iterations", type=int, default=50)
+    onnx.add_argument("--output-dir", default=None)
+
+    zoo = subparsers.add_parser("zoo", help="tiny/base/large variant comparison")
+    zoo.add_argument("--samples", type=int, default=256)
+    zoo.add_argument("--iterations", type=int, default=50)
+    zoo.add_argument("--train-steps", type=int, default=100)
+
+    precision = subparsers.add_parser("precision", help="float32 vs bfloat16 autocast")
+    precision.add_argument("--samples", type=int, default=256)
+    precision.add_argument("--iterations", type=int, default=50)
+    precision.add_argument("--train-steps", type=int, default=100)
+
+    dataloader = subparsers.add_parser("dataloader", help="loader workers vs data-wait time")
+    dataloader.add_argument("--samples", type=int, default=1024)
+    dataloader.add_argument("--workers", type=int, nargs="+", default=[0, 2, 4])
+    dataloader.add_argument("--batch-size", type=int, default=32)
+
+    workers = subparsers.add_parser("workers", help="thread vs worker-process throughput")
+    workers.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    workers.add_argument("--requests", type=int, default=64)
+
+    threads = subparsers.add_parser("threads", help="per-agent intra-op thread autotuning")
+    threads.add_argument("--objective", default="latency", choices=["latency", "throughput"])
+    threads.add_argument("--iterations", type=int, default=20)
+
+    env = subparsers.add_parser("env", help="vectorized battery environment throughput")
+    env.add_argument("--envs", type=int, nargs="+", default=[1, 64, 1024, 4096])
+    env.add_argument("--steps", type=int, default=50)
+
+    args = parser.parse_args()
+
+    if args.command == "quantization":
+        rows = run_quantization_benchmark(args.samples, args.iterations)
+        print(format_report(
+            "Quantization report (CPU, batch-1 latency, batched throughput)",
+            rows,
+            [
+                ("model", "Model"),
+                ("variant", "Variant"),
+                ("size_kb", "Size KB"),
+                ("p50_ms", "p50 ms"),
+                ("p95_ms", "p95 ms"),
+                ("throughput", "Samples/s"),
+                ("agreement", "Top-1 agree"),
+                ("mean_abs_delta", "Mean |delta|"),
+            ],
+        ))
+    elif args.command == "onnx":
+        rows = run_onnx_benchmark(args.samples, args.iterations, args.output_dir)
+        print(format_report(
+            "ONNX Runtime report (CPU, batch-1 latency, batched throughput)",
+            rows,
+            [
+                ("model", "Model"),
+                ("backend", "Backend"),
+                ("p50_ms", "p50 ms"),
+                ("p95_ms", "p95 ms"),
+                ("throughput", "Samples/s"),
+                ("max_abs_diff", "Max |diff|"),
+            ],
+        ))
+    elif args.command == "zoo":
+        rows = run_zoo_benchmark(args.samples, args.iterations, args.train_steps)
+        print(format_report(
+            "Model zoo report (CPU, batch-1 latency, batched throughput, held-out score)",
+            rows,
+            [
+                ("model", "Model"),
+                ("variant", "Variant"),
+                ("params", "Params"),
+                ("size_kb", "Size KB"),
+                ("p50_ms", "p50 ms"),
+                ("p95_ms", "p95 ms"),
+                ("throughput", "Samples/s"),
+                ("metric", "Metric"),
+                ("score", "Score"),
+            ],
+        ))
+    elif args.command == "precision":
+        rows = run_precision_benchmark(args.samples, args.iterations, args.train_steps)
+        native = "native" if bf16_supported() else "emulated (no AVX512-BF16/AMX)"
+        print(format_report(
+            f"Mixed precision report (CPU autocast, bfloat16 {native})",
+            rows,
+            [
+                ("model", "Model"),
+                ("precision", "Precision"),
+                ("train_s", "Train s"),
+                ("train_speedup", "Train speedup"),
+                ("p50_ms", "p50 ms"),
+                ("throughput", "Samples/s"),
+                ("infer_speedup", "Infer speedup"),
+                ("metric", "Metric"),
+                ("score", "Score"),
+                ("score_delta", "Score delta"),
+            ],
+        ))
+    elif args.command == "dataloader":
+        rows = run_dataloader_benchmark(args.samples, args.workers, args.batch_size)
+        print(format_report(
+            "Data loader report (one ThermalCNN training epoch)",
+            rows,
+            [
+                ("workers", "Workers"),
+                ("samples_per_sec", "Samples/s"),
+                ("data_s", "Data wait s"),
+                ("compute_s", "Compute s"),
+                ("data_wait", "Data wait share"),
+            ],
+        ))
+    elif args.command == "workers":
+        rows = run_worker_benchmark(args.workers, args.requests)
+        print(format_report(
+            "Worker pool report (comprehensive_assessment requests/s)",
+            rows,
+            [
+                ("mode", "Mode"),
+                ("workers", "Workers"),
+                ("throughput", "Requests/s"),
+            ],
+        ))
+    elif args.command == "threads":
+        rows = run_thread_benchmark(args.objective, args.iterations)
+        print(format_report(
+            f"Thread autotuning report (objective: {args.objective})",
+            rows,
+            [
+                ("agent", "Agent"),
+                ("threads", "Threads"),
+                ("p50_ms", "p50 ms"),
+                ("throughput", "Samples/s"),
+                ("chosen", "Chosen"),
+            ],
+        ))
+    elif args.command == "env":
+        rows = run_env_benchmark(args.envs, args.steps)
+        print(format_report(
+            "Battery environment report (transitions/s, one DQN update per step)",
+            rows,
+            [
+                ("envs", "Cells"),
+                ("env_rate", "Env only"),
+                ("train_rate", "With DQN"),
+                ("updates", "Updates"),
+                ("mean_reward", "Mean reward"),
+            ],
+        ))
+
+
+if __name__ == "__main__":
+    main()
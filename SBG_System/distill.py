@@ -0,0 +1,196 @@
+"""
+Smart Battery Guardian - Knowledge Distillation
+
+Trains compact student models from the thermal, acoustic and RUL teachers of
+a saved orchestrator checkpoint. Students learn the teachers' outputs on
+synthetic data (plus CALCE data when available), so no relabelling is needed.
+The output directory is a complete checkpoint: load it with
+BatteryMonitoringOrchestrator.load_checkpoint() and each agent rebuilds the
+student architecture automatically.
+
+Usage:
+    python distill.py TEACHER_DIR OUTPUT_DIR [--variant tiny] [--data-dir DIR]
+                      [--samples N] [--epochs N] [--temperature T]
+"""
+
+import argparse
+import os
+import shutil
+import numpy as np
+import torch
+
+from src.agents.orchestrator import BatteryMonitoringOrchestrator
+from src.data import SyntheticBatteryDataGenerator
+from src.models.distillation import distill, compare_teacher_student
+from src.models.model_zoo import build_model, save_checkpoint
+from src.utils import Config
+from src.utils.benchmark import measure_latency, format_report
+
+# Constructor arguments that define a variant's size (not inherited by students)
+ARCHITECTURE_KEYS = (
+    "channels", "fc_size", "dense_sizes", "hidden_size", "num_layers",
+    "hidden_dim", "num_experts", "top_k",
+)
+
+DISTILLED = {
+    "thermal": ("thermal_agent", "classification"),
+    "acoustic": ("acoustic_agent", "classification"),
+    "rul": ("rul_agent", "regression"),
+}
+
+# Checkpoint files copied unchanged so the output directory loads as a whole
+COPIED_FILES = ("anomaly_agent.pt", "rl_controller.pt")
+
+
+def build_transfer_sets(orchestrator, num_samples=512, data_dir=None, limit_files=3):
+    """
+    Model-ready transfer inputs per modality, prepared by the agents themselves
+
+    Returns:
+        Dictionary modality -> list of arrays (one per input shape)
+    """
+    generator = SyntheticBatteryDataGenerator(seed=0)
+    half = num_samples // 2
+    thermal_agent = orchestrator.thermal_agent
+    acoustic_agent = orchestrator.acoustic_agent
+    rul_agent = orchestrator.rul_agent
+
+    thermal = np.concatenate([
+        generator.generate_normal_thermal_data(num_samples=half),
+        generator.generate_anomalous_thermal_data(num_samples=num_samples - half),
+    ])
+    acoustic = np.concatenate([
+        generator.generate_acoustic_features(num_samples=half),
+        generator.generate_faulty_acoustic_features(num_samples=num_samples - half),
+    ])
+    rul, _ = generator.generate_rul_sequence_data(num_sequences=num_samples)
+
+    transfer = {
+        "thermal": [np.stack([thermal_agent._prepare_image(image) for image in thermal])],
+        "acoustic": [np.stack([acoustic_agent._prepare_features(f) for f in acoustic])],
+        "rul": [np.stack([rul_agent._model_input(sequence) for sequence in rul])],
+    }
+
+    zip_path = os.path.join(data_dir, "calce-dataset.zip") if data_dir else None
+    if zip_path and os.path.exists(zip_path):
+        from src.data.real_data_loader import BatteryDataPipeline
+
+        data = BatteryDataPipeline(data_dir).prepare_data_for_agents(limit_files=limit_files)
+        if data["battery_ids"]:
+            transfer["thermal"].append(np.stack([
+                thermal_agent._prepare_image(item["image"]) for item in data["thermal"]
+            ]))
+            transfer["acoustic"].append(np.stack([
+                acoustic_agent._prepare_features(item["spectrogram"]) for item in data["acoustic"]
+            ]))
+            transfer["rul"].append(np.stack([
+                rul_agent._model_input(rul_agent.state_sequence(item["state"], item["capacity_fade"]))
+                for item in data["rul"]
+            ]))
+    elif data_dir:
+        print(f"No CALCE data at {zip_path}; using synthetic data only")
+
+    return transfer
+
+
+def distill_checkpoint(
+    teacher_dir,
+    output_dir,
+    variant="tiny",
+    data_dir=None,
+    num_samples=512,
+    epochs=20,
+    temperature=4.0,
+    iterations=50,
+):
+    """
+    Distill every supported agent model of a checkpoint into a student variant
+
+    Returns:
+        Report rows (one per distilled model)
+    """
+    torch.manual_seed(0)
+    orchestrator = BatteryMonitoringOrchestrator(Config().config)
+    orchestrator.load_checkpoint(teacher_dir)
+    transfer = build_transfer_sets(orchestrator, num_samples, data_dir)
+
+    os.makedirs(output_dir, exist_ok=True)
+    rows = []
+
+    for name, (agent_name, task) in DISTILLED.items():
+        teacher = getattr(orchestrator, agent_name).model
+        modality = teacher.architecture["modality"]  # "rul" or "attmoe" for RUL
+        overrides = {
+            key: value
+            for key, value in teacher.architecture["overrides"].items()
+            if key not in ARCHITECTURE_KEYS
+        }
+        student = build_model(modality, variant, **overrides)
+
+        history = distill(teacher, student, transfer[name], task, epochs=epochs,
+                          temperature=temperature)
+        fidelity = compare_teacher_student(teacher, student, transfer[name], task)
+        save_checkpoint(student, os.path.join(output_dir, f"{agent_name}.pt"))
+
+        single = torch.as_tensor(transfer[name][0][:1])
+        with torch.no_grad():
+            teacher_latency = measure_latency(teacher, single, iterations=iterations)
+            student_latency = measure_latency(student, single, iterations=iterations)
+
+        rows.append({
+            "model": modality,
+            "teacher": teacher.architecture["variant"],
+            "student": variant,
+            "teacher_params": sum(p.numel() for p in teacher.parameters()),
+            "student_params": sum(p.numel() for p in student.parameters()),
+            "speedup": teacher_latency["p50_ms"] / student_latency["p50_ms"],
+            "final_loss": history[-1],
+            "agreement": fidelity.get("agreement"),
+            "mean_abs_delta": fidelity["mean_abs_delta"],
+        })
+
+    for filename in COPIED_FILES:
+        shutil.copy(os.path.join(teacher_dir, filename), os.path.join(output_dir, filename))
+
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SBG knowledge distillation")
+    parser.add_argument("teacher_dir", help="checkpoint saved by the orchestrator")
+    parser.add_argument("output_dir", help="where the student checkpoint is written")
+    parser.add_argument("--variant", default="tiny", choices=["tiny", "base", "large"])
+    parser.add_argument("--data-dir", default=None, help="directory with calce-dataset.zip")
+    parser.add_argument("--samples", type=int, default=512)
+    parser.add_argument("--epochs", type=int, default=20)
+    parser.add_argument("--temperature", type=float, default=4.0)
+    args = parser.parse_args()
+
+    rows = distill_checkpoint(
+        args.teacher_dir,
+        args.output_dir,
+        variant=args.variant,
+        data_dir=args.data_dir,
+        num_samples=args.samples,
+        epochs=args.epochs,
+        temperature=args.temperature,
+    )
+    print(format_report(
+        f"Distillation report ({args.output_dir})",
+        rows,
+        [
+            ("model", "Model"),
+            ("teacher", "Teacher"),
+            ("student", "Student"),
+            ("teacher_params", "Teacher params"),
+            ("student_params", "Student params"),
+            ("speedup", "p50 speedup"),
+            ("final_loss", "Final loss"),
+            ("agreement", "Top-1 agree"),
+            ("mean_abs_delta", "Mean |delta|"),
+        ],
+    ))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,17 @@
 """CrewAI Agents for Smart Battery Guardian"""
 
-from .thermal_agent import ThermalAnomalyAgent
-from .acoustic_agent import AcousticFaultAgent
-from .rul_agent import RULPredictionAgent
-from .anomaly_agent import AnomalyDetectionAgent
-from .orchestrator import BatteryMonitoringOrchestrator
+import importlib
+
+# Agent classes are imported on first attribute access so that importing the
+# package (or the orchestrator) does not pull in torch and model code.
+_LAZY_IMPORTS = {
+    "ThermalAnomalyAgent": ".thermal_agent",
+    "AcousticFaultAgent": ".acoustic_agent",
+    "RULPredictionAgent": ".rul_agent",
+    "AnomalyDetectionAgent": ".anomaly_agent",
+    "BatteryMonitoringOrchestrator": ".orchestrator",
+    "InferenceWorkerPool": ".worker_pool",
+}
 
 __all__ = [
     "ThermalAnomalyAgent",
@@ -12,4 +19,13 @@ __all__ = [
     "RULPredictionAgent",
     "AnomalyDetectionAgent",
     "BatteryMonitoringOrchestrator",
+    "InferenceWorkerPool",
 ]
+
+
+def __getattr__(name):
+    if name not in _LAZY_IMPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY_IMPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
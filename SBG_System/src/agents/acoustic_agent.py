@@ -3,7 +3,10 @@
 from typing import Dict, Any
 import torch
 import numpy as np
-from src.models import AcousticClassifier
+from src.models.mixed_precision import check_precision
+from src.models.model_runner import ModelRunner
+from src.models.trainer import Trainer, training_options
+from src.models.model_zoo import build_model, resolve_variant, save_checkpoint, load_checkpoint
 from src.utils import setup_logger
 
 logger = setup_logger("AcousticAgent")
@@ -12,18 +15,52 @@ logger = setup_logger("AcousticAgent")
 class AcousticFaultAgent:
     """Agent for detecting acoustic faults in battery systems"""
 
-    def __init__(self, config=None):
+    def __init__(self, config=None, model=None):
         self.config = config or {}
-        self.model = AcousticClassifier(
-            input_shape=(13, 173),
-            num_classes=2,
-            dropout_rate=self.config.get("dropout_rate", 0.3),
-        )
+        if model is not None:
+            # Already built (e.g. mapped from a checkpoint bundle)
+            self.model = model
+            self.variant = model.architecture["variant"]
+        else:
+            self.variant = resolve_variant("acoustic", self.config)
+            self.model = build_model(
+                "acoustic",
+                self.variant,
+                input_shape=(13, 173),
+                num_classes=2,
+                dropout_rate=self.config.get("dropout_rate", 0.3),
+            )
         self.threshold = self.config.get("threshold", 0.65)
-        self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        quantization = self.config.get("quantization", "none")
+        backend = self.config.get("backend", "torch")
+        use_cuda = quantization == "none" and backend == "torch"
+        self.device = torch.device(
+            "cuda" if torch.cuda.is_available() and use_cuda else "cpu"
+        )
         self.model.to(self.device)
 
-        logger.info(f"AcousticFaultAgent initialized on {self.device}")
+        # Mixed precision for train() and inference (float32 | bfloat16 | float16)
+        self.precision = check_precision(self.config.get("precision", "float32"))
+
+        # Shared inference hot path (eval mode, quantization/ONNX, timing)
+        self.runner = ModelRunner(
+            self.model,
+            task="classification",
+            device=self.device,
+            quantization=quantization,
+            backend=backend,
+            onnx_path=self.config.get("onnx_path", "models/onnx/acoustic_classifier.onnx"),
+            calibration_path=self.config.get("calibration_path", "models/calibration/acoustic.npy"),
+            intra_op_threads=self.config.get("intra_op_threads", 0),
+            inter_op_threads=self.config.get("inter_op_threads", 0),
+            cpu_affinity=self.config.get("cpu_affinity"),
+            precision=self.precision,
+            max_batch_size=self.config.get("max_batch_size", 1),
+            max_batch_latency_ms=self.config.get("max_batch_latency_ms", 5.0),
+        )
+        logger.info(f"Inference path: {self.runner.build(export=False)}")
+
+        logger.info(f"AcousticFaultAgent initialized on {self.device} ({self.variant} variant)")
 
     def analyze(self, mfcc_features: np.ndarray, fault_indicators: Dict = None) -> Dict[str, Any]:
         """
@@ -36,42 +73,24 @@ class AcousticFaultAgent:
         Returns:
             Dictionary with analysis results
         """
-        # Reshape input to match model expectations (13, 173)
-        if mfcc_features.shape != (13, 173):
-            # Resize using simple padding/truncation strategy
-            h, w = mfcc_features.shape[:2] if mfcc_features.ndim >= 2 else (1, len(mfcc_features.flatten()))
-            
-            # Flatten and reshape
-            data = mfcc_features.flatten()
-            target_size = 13 * 173
-            
-            if len(data) < target_size:
-                # Pad with last value
-                data = np.pad(data, (0, target_size - len(data)), mode='edge')
-            else:
-                # Truncate
-                data = data[:target_size]
-            
-            mfcc_features = data.reshape(13, 173)
-        
-        # Convert to tensor - shape should be (batch=1, channels=1, height=13, width=173) -> (1, 13, 173) for Conv1d
-        # Conv1d expects (batch, channels, length), so we treat it as (1, 13, 173)
-        features_tensor = (
-            torch.tensor(mfcc_features, dtype=torch.float32)
-            .unsqueeze(0)  # Add batch dimension: (1, 13, 173)
-            .to(self.device)
-        )
+        features_batch = self._prepare_features(mfcc_features)[np.newaxis]
 
         # Get predictions
-        predictions, probs = self.model.predict(features_tensor)
+        predictions, probs = self.runner.run(features_batch)
+        result = self._build_result(probs[0], fault_indicators)
 
-        is_faulty = probs[0, 1].item() > self.threshold
-        fault_score = probs[0, 1].item()
+        logger.info(f"Acoustic analysis: faulty={result['is_faulty']}, score={result['fault_score']:.3f}")
+        return result
+
+    def _build_result(self, probs: np.ndarray, fault_indicators: Dict = None) -> Dict[str, Any]:
+        """Assemble the analysis dictionary from one sample's class probabilities"""
+        fault_score = probs[1].item()
+        is_faulty = fault_score > self.threshold
 
         result = {
             "is_faulty": is_faulty,
             "fault_score": fault_score,
-            "confidence": max(probs[0].cpu().numpy()),
+            "confidence": float(probs.max()),
             "fault_type": self._identify_fault_type(fault_score),
             "severity": self._calculate_severity(fault_score),
             "action": self._get_action(fault_score),
@@ -83,9 +102,27 @@ class AcousticFaultAgent:
         if fault_indicators:
             result['anomalies'] = self._check_fault_indicators(fault_indicators)
 
-        logger.info(f"Acoustic analysis: faulty={is_faulty}, score={fault_score:.3f}")
         return result
     
+    def _prepare_features(self, mfcc_features: np.ndarray) -> np.ndarray:
+        """Pad or truncate features of flexible shape to the model's (13, 173)"""
+        if mfcc_features.shape != (13, 173):
+            # Flatten and reshape
+            data = mfcc_features.flatten()
+            target_size = 13 * 173
+
+            if len(data) < target_size:
+                # Pad with last value
+                data = np.pad(data, (0, target_size - len(data)), mode='edge')
+            else:
+                # Truncate
+                data = data[:target_size]
+
+            mfcc_features = data.reshape(13, 173)
+
+        # Conv1d expects (batch, channels, length), so features are (13, 173)
+        return np.asarray(mfcc_features, dtype=np.float32)
+
     def _check_fault_indicators(self, indicators: Dict) -> list:
         """Check specific fault indicators"""
         anomalies = []
@@ -108,15 +145,18 @@ class AcousticFaultAgent:
         else:
             return "CRITICAL"
 
-    def batch_analyze(self, mfcc_batch: np.ndarray) -> Dict[str, Any]:
-        """Analyze batch of acoustic features"""
-        results = []
-        fault_scores = []
+    def batch_analyze(self, mfcc_batch: np.ndarray, fault_indicators=None) -> Dict[str, Any]:
+        """Analyze batch of acoustic features in one forward pass"""
+        features_batch = np.stack([self._prepare_features(mfcc) for mfcc in mfcc_batch])
+        predictions, probs = self.runner.run(features_batch)
 
-        for mfcc in mfcc_batch:
-            result = self.analyze(mfcc)
-            results.append(result)
-            fault_scores.append(result["fault_score"])
+        if fault_indicators is None:
+            fault_indicators = [None] * len(features_batch)
+        results = [self._build_result(p, f) for p, f in zip(probs, fault_indicators)]
+        fault_scores = [r["fault_score"] for r in results]
+        logger.info(
+            f"Acoustic batch analysis: {sum(r['is_faulty'] for r in results)}/{len(results)} faulty"
+        )
 
         return {
             "num_samples": len(mfcc_batch),
@@ -159,35 +199,60 @@ class AcousticFaultAgent:
         else:
             return "URGENT: Immediate maintenance required"
 
-    def train(self, train_loader, val_loader, epochs=50, lr=0.001):
-        """Train the acoustic fault model"""
-        optimizer = torch.optim.Adam(self.model.parameters(), lr=lr)
+    def train(self, train_loader, val_loader=None, epochs=None, lr=None, **options):
+        """
+        Train the acoustic fault model
+
+        Settings not passed here (epochs, learning rate, early stopping
+        patience, LR schedule, ...) come from the `training` config section;
+        see src/models/trainer.py.
+
+        Returns:
+            Per-epoch training history
+        """
         criterion = torch.nn.CrossEntropyLoss()
-        self.model.train()
 
-        for epoch in range(epochs):
-            total_loss = 0.0
-            for features, labels in train_loader:
-                features = features.to(self.device)
-                labels = labels.to(self.device)
+        def loss_fn(model, batch):
+            features, labels = batch
+            return criterion(model(features), labels.long())  # BatteryDataset stores float targets
+
+        trainer = Trainer(
+            self.model,
+            loss_fn,
+            device=self.device,
+            precision=self.precision,
+            **training_options(self.config.get("training", {}), epochs=epochs, lr=lr, **options),
+        )
+        history = trainer.fit(train_loader, val_loader)
+
+        self.runner.build()
+        return history
 
-                optimizer.zero_grad()
-                outputs = self.model(features)
-                loss = criterion(outputs, labels)
-                loss.backward()
-                optimizer.step()
+    def quantize(self, calibration_data):
+        """
+        Calibrate and apply static int8 quantization
 
-                total_loss += loss.item()
+        The inputs are saved to calibration_path and reused whenever the
+        model is rebuilt (train, load) or the agent is constructed again.
 
-            avg_loss = total_loss / len(train_loader)
-            logger.info(f"Epoch [{epoch+1}/{epochs}], Loss: {avg_loss:.4f}")
+        Args:
+            calibration_data: model-ready input batch(es)
+        """
+        logger.info(f"Inference path: {self.runner.calibrate(calibration_data)}")
 
     def save(self, filepath: str):
         """Save model checkpoint"""
-        torch.save(self.model.state_dict(), filepath)
+        save_checkpoint(self.model, filepath)
         logger.info(f"Model saved to {filepath}")
 
     def load(self, filepath: str):
         """Load model checkpoint"""
-        self.model.load_state_dict(torch.load(filepath, map_location=self.device))
+        self.set_model(load_checkpoint(filepath, self.model, map_location=self.device))
         logger.info(f"Model loaded from {filepath}")
+
+    def set_model(self, model):
+        """Serve a different (already loaded) model"""
+        self.model = model
+        self.variant = self.model.architecture["variant"]
+        self.runner.model = self.model
+        self.runner.build()
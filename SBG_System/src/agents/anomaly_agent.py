@@ -1,9 +1,16 @@
 """Anomaly Detection Agent using CrewAI"""
 
+import threading
 from typing import Dict, Any
 import torch
 import numpy as np
-from src.models import AnomalyAutoencoder
+from src.models.mixed_precision import check_precision
+from src.models.model_runner import ModelRunner
+from src.models.trainer import Trainer, training_options
+from src.models.model_zoo import build_model, resolve_variant, save_checkpoint, load_checkpoint
+from src.models.rolling_stats import RollingWindow
+from src.models.anomaly_state import BatteryAnomalyState
+from src.models.quantile_sketch import KLLSketch
 from src.utils import setup_logger
 
 logger = setup_logger("AnomalyAgent")
@@ -12,56 +19,110 @@ logger = setup_logger("AnomalyAgent")
 class AnomalyDetectionAgent:
     """Agent for real-time anomaly detection using autoencoders"""
 
-    def __init__(self, config=None):
+    def __init__(self, config=None, model=None):
         self.config = config or {}
-        self.model = AnomalyAutoencoder(
-            input_size=self.config.get("input_size", 10),
-            hidden_size=self.config.get("hidden_size", 5),
-            num_layers=self.config.get("num_layers", 2),
-        )
+        if model is not None:
+            # Already built (e.g. mapped from a checkpoint bundle)
+            self.model = model
+            self.variant = model.architecture["variant"]
+        else:
+            input_size = self.config.get("input_size", 10)
+            self.variant = resolve_variant("anomaly", self.config, input_size=input_size)
+
+            # Explicit hidden_size/num_layers still override the variant
+            overrides = {
+                key: self.config[key] for key in ("hidden_size", "num_layers") if key in self.config
+            }
+            self.model = build_model("anomaly", self.variant, input_size=input_size, **overrides)
         self.threshold = self.config.get("threshold", 0.75)
-        self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        quantization = self.config.get("quantization", "none")
+        backend = self.config.get("backend", "torch")
+        use_cuda = quantization == "none" and backend == "torch"
+        self.device = torch.device(
+            "cuda" if torch.cuda.is_available() and use_cuda else "cpu"
+        )
         self.model.to(self.device)
 
-        # Anomaly score history for adaptive threshold
-        self.score_history = []
-        self.max_history = 1000
-
-        logger.info(f"AnomalyDetectionAgent initialized on {self.device}")
+        # Mixed precision for train() and inference (float32 | bfloat16 | float16)
+        self.precision = check_precision(self.config.get("precision", "float32"))
+
+        # Shared inference hot path (eval mode, quantization/ONNX, timing)
+        self.runner = ModelRunner(
+            self.model,
+            task="anomaly",
+            device=self.device,
+            quantization=quantization,
+            backend=backend,
+            onnx_path=self.config.get("onnx_path", "models/onnx/anomaly_autoencoder.onnx"),
+            intra_op_threads=self.config.get("intra_op_threads", 0),
+            inter_op_threads=self.config.get("inter_op_threads", 0),
+            cpu_affinity=self.config.get("cpu_affinity"),
+            precision=self.precision,
+            max_batch_size=self.config.get("max_batch_size", 1),
+            max_batch_latency_ms=self.config.get("max_batch_latency_ms", 5.0),
+        )
+        logger.info(f"Inference path: {self.runner.build(export=False)}")
+
+        # Anomaly score history: the last threshold_window scores set the
+        # adaptive threshold, the last max_history the z-score (O(1) per score)
+        self.threshold_window = 100
+        self._recent_scores = RollingWindow(self.threshold_window)
+        self._all_scores = RollingWindow(1000)
+
+        # Threshold mode: "gaussian" (mean + 2*std of recent scores) or
+        # "quantile" (the 1 - contamination percentile, so about
+        # `contamination` of scores are flagged)
+        self.threshold_mode = self.config.get("threshold_mode", "gaussian")
+        if self.threshold_mode not in ("gaussian", "quantile"):
+            raise ValueError(f"Unknown anomaly threshold_mode: {self.threshold_mode}")
+        self.quantile = 1.0 - self.config.get("contamination", 0.1)
+
+        # Every score, shared or per battery; mergeable across worker processes
+        self.fleet_sketch = KLLSketch(
+            self.config.get("sketch_k", 200), seed=self.config.get("sketch_seed")
+        )
 
-    def analyze(self, features: np.ndarray) -> Dict[str, Any]:
+        # Per-battery baselines (built on first use; fixed-size arrays)
+        self._battery_states = None
+
+        # Guards the score history, fleet sketch and battery baselines:
+        # requests from several threads update them
+        self._state_lock = threading.RLock()
+
+        logger.info(f"AnomalyDetectionAgent initialized on {self.device} ({self.variant} variant)")
+
+    @property
+    def battery_states(self) -> BatteryAnomalyState:
+        """Per-battery score histories, adaptive thresholds and z-scores"""
+        with self._state_lock:
+            if self._battery_states is None:
+                self._battery_states = BatteryAnomalyState(
+                    max_batteries=self.config.get("max_batteries", 100000),
+                    history_size=self.config.get("battery_history", 128),
+                    threshold_window=self.threshold_window,
+                    threshold=self.threshold,
+                    quantile=self.quantile if self.threshold_mode == "quantile" else None,
+                )
+            return self._battery_states
+
+    def analyze(self, features: np.ndarray, battery_id=None) -> Dict[str, Any]:
         """
         Analyze features for anomalies
         
         Args:
             features: Feature vector (20-dimensional)
+            battery_id: judge the score against this battery's own baseline
+                        (None uses the shared history)
             
         Returns:
             Dictionary with anomaly analysis
         """
-        # Ensure features are 10-dimensional for the model
-        if len(features) > 10:
-            features = features[:10]
-        elif len(features) < 10:
-            features = np.pad(features, (0, 10 - len(features)), mode='edge')
-        
         # Detect anomalies
-        result = self.detect(features)
+        result = self.detect(self.fit_features(features), battery_id=battery_id)
         
         # Add risk level
         score = result['anomaly_score']
-        if score < 0.3:
-            risk_level = 'LOW'
-            risk_score = 0.1
-        elif score < 0.5:
-            risk_level = 'MEDIUM'
-            risk_score = 0.4
-        elif score < 0.7:
-            risk_level = 'HIGH'
-            risk_score = 0.7
-        else:
-            risk_level = 'CRITICAL'
-            risk_score = 0.9
+        risk_level, risk_score = self.risk_tier(score)
         
         return {
             'anomalies_detected': 1 if result['is_anomalous'] else 0,
@@ -71,33 +132,70 @@ class AnomalyDetectionAgent:
             'anomaly_type': result['anomaly_level']
         }
 
-    def detect(self, sensor_data: np.ndarray) -> Dict[str, Any]:
+    @staticmethod
+    def risk_tier(score: float):
+        """(risk_level, risk_score) tier of an anomaly score (see analyze)"""
+        if score < 0.3:
+            return 'LOW', 0.1
+        if score < 0.5:
+            return 'MEDIUM', 0.4
+        if score < 0.7:
+            return 'HIGH', 0.7
+        return 'CRITICAL', 0.9
+
+    def fit_features(self, features: np.ndarray) -> np.ndarray:
+        """Truncate or edge-pad a feature vector to the model's input size"""
+        input_size = self.model.input_size
+        if len(features) > input_size:
+            return features[:input_size]
+        if len(features) < input_size:
+            return np.pad(features, (0, input_size - len(features)), mode='edge')
+        return features
+
+    def detect(self, sensor_data: np.ndarray, battery_id=None) -> Dict[str, Any]:
         """
         Detect anomalies in sensor readings
 
         Args:
             sensor_data: Array of shape (num_features,)
+            battery_id: judge the score against this battery's own baseline
+                        (None uses the shared history)
 
         Returns:
             Dictionary with anomaly detection results
         """
-        # Convert to tensor
-        data_tensor = (
-            torch.tensor(sensor_data, dtype=torch.float32).unsqueeze(0).to(self.device)
-        )
-
-        # Get anomaly score
-        anomaly_score = self.model.get_anomaly_score(data_tensor)
-        score = anomaly_score.item()
-
-        # Update history
-        self.score_history.append(score)
-        if len(self.score_history) > self.max_history:
-            self.score_history.pop(0)
-
-        # Adaptive threshold
-        adaptive_threshold = self._calculate_adaptive_threshold()
-
+        # Add batch dimension
+        data_batch = np.asarray(sensor_data, dtype=np.float32)[np.newaxis]
+        return self.record(self.score(data_batch)[0], battery_id=battery_id)
+
+    def score(self, sensor_batch: np.ndarray) -> np.ndarray:
+        """Anomaly scores of a batch of sensor readings (no state is updated)"""
+        return self.runner.run(np.asarray(sensor_batch, dtype=np.float32)).reshape(-1)
+
+    def record(self, score: float, battery_id=None) -> Dict[str, Any]:
+        """Fold one score from score() into the history and judge it (see detect)"""
+        score = float(score)
+        with self._state_lock:
+            self.fleet_sketch.update(score)
+
+            if battery_id is None:
+                # Update history
+                self._recent_scores.append(score)
+                self._all_scores.append(score)
+
+                # Adaptive threshold
+                adaptive_threshold = self._calculate_adaptive_threshold()
+                z_score = self._calculate_zscore(score)
+            else:
+                thresholds, z_scores = self.battery_states.update_batch(
+                    [battery_id], [score], default_threshold=self._default_battery_threshold()
+                )
+                adaptive_threshold, z_score = float(thresholds[0]), float(z_scores[0])
+
+        return self._result(score, adaptive_threshold, z_score)
+
+    def _result(self, score: float, adaptive_threshold: float, z_score: float) -> Dict[str, Any]:
+        """Detection result for one score"""
         is_anomalous = score > adaptive_threshold
         anomaly_level = self._calculate_anomaly_level(score, adaptive_threshold)
 
@@ -106,7 +204,7 @@ class AnomalyDetectionAgent:
             "anomaly_score": score,
             "adaptive_threshold": adaptive_threshold,
             "anomaly_level": anomaly_level,
-            "z_score": self._calculate_zscore(score),
+            "z_score": z_score,
             "action": self._get_action(anomaly_level),
         }
 
@@ -119,18 +217,43 @@ class AnomalyDetectionAgent:
 
         return result
 
-    def batch_detect(self, sensor_batch: np.ndarray) -> Dict[str, Any]:
-        """Detect anomalies in batch of sensor data"""
-        results = []
-        anomaly_scores = []
+    def batch_detect(self, sensor_batch: np.ndarray, battery_ids=None) -> Dict[str, Any]:
+        """
+        Detect anomalies in batch of sensor data
 
-        for data in sensor_batch:
-            result = self.detect(data)
-            results.append(result)
-            anomaly_scores.append(result["anomaly_score"])
+        All rows are scored in one forward pass. Without battery_ids the
+        shared history takes the scores in row order, as with detect(); with
+        battery_ids (one per row; ids may repeat) each battery's baseline is
+        updated in row order.
+        """
+        return self.record_batch(self.score(sensor_batch), battery_ids=battery_ids)
+
+    def record_batch(self, scores: np.ndarray, battery_ids=None) -> Dict[str, Any]:
+        """Fold a batch of scores from score() into the history (see batch_detect)"""
+        scores = np.asarray(scores).reshape(-1)
+        with self._state_lock:
+            if battery_ids is None:
+                results = []
+                for score in scores.tolist():
+                    self.fleet_sketch.update(score)
+                    self._recent_scores.append(score)
+                    self._all_scores.append(score)
+                    results.append(self._result(
+                        score, self._calculate_adaptive_threshold(), self._calculate_zscore(score)
+                    ))
+            else:
+                self.fleet_sketch.update_many(scores)
+                thresholds, z_scores = self.battery_states.update_batch(
+                    battery_ids, scores, default_threshold=self._default_battery_threshold()
+                )
+                results = [
+                    self._result(float(score), float(threshold), float(z_score))
+                    for score, threshold, z_score in zip(scores, thresholds, z_scores)
+                ]
+        anomaly_scores = [r["anomaly_score"] for r in results]
 
         return {
-            "num_samples": len(sensor_batch),
+            "num_samples": len(scores),
             "num_anomalies": sum(r["is_anomalous"] for r in results),
             "mean_anomaly_score": np.mean(anomaly_scores),
             "max_anomaly_score": np.max(anomaly_scores),
@@ -138,13 +261,58 @@ class AnomalyDetectionAgent:
             "results": results,
         }
 
+    @property
+    def score_history(self):
+        """Recent anomaly scores, oldest first (at most max_history)"""
+        with self._state_lock:
+            return self._all_scores.values().tolist()
+
+    @score_history.setter
+    def score_history(self, scores):
+        with self._state_lock:
+            scores = list(scores)[-self.max_history:]
+            self._all_scores.clear()
+            self._all_scores.extend(scores)
+            self._recent_scores.clear()
+            self._recent_scores.extend(scores[-self.threshold_window:])
+
+    @property
+    def max_history(self):
+        """Number of scores kept for the z-score"""
+        return self._all_scores.size
+
+    @max_history.setter
+    def max_history(self, size):
+        with self._state_lock:
+            scores = self.score_history
+            self._all_scores = RollingWindow(size)
+            self.score_history = scores
+
+    def fleet_threshold(self) -> float:
+        """The (1 - contamination) percentile of all scores seen (fixed threshold until warm)"""
+        if len(self.fleet_sketch) < self.threshold_window:
+            return self.threshold
+        return self.fleet_sketch.quantile(self.quantile)
+
+    def sketch_state(self) -> Dict[str, Any]:
+        """Picklable fleet score sketch, for merging with other workers' sketches"""
+        with self._state_lock:
+            return self.fleet_sketch.state_dict()
+
+    def _default_battery_threshold(self) -> float:
+        """Threshold for batteries with too few scores of their own"""
+        return self.fleet_threshold() if self.threshold_mode == "quantile" else self.threshold
+
     def _calculate_adaptive_threshold(self) -> float:
         """Calculate adaptive threshold based on history"""
-        if len(self.score_history) < 100:
+        if self.threshold_mode == "quantile":
+            return self.fleet_threshold()
+
+        if len(self._all_scores) < self.threshold_window:
             return self.threshold
 
-        mean_score = np.mean(self.score_history[-100:])
-        std_score = np.std(self.score_history[-100:])
+        mean_score = self._recent_scores.mean
+        std_score = self._recent_scores.std
 
         # Adaptive threshold: mean + 2*std
         adaptive = mean_score + 2 * std_score
@@ -166,11 +334,11 @@ class AnomalyDetectionAgent:
 
     def _calculate_zscore(self, score: float) -> float:
         """Calculate z-score of anomaly score"""
-        if len(self.score_history) < 2:
+        if len(self._all_scores) < 2:
             return 0.0
 
-        mean = np.mean(self.score_history)
-        std = np.std(self.score_history)
+        mean = self._all_scores.mean
+        std = self._all_scores.std
 
         if std == 0:
             return 0.0
@@ -187,37 +355,48 @@ class AnomalyDetectionAgent:
         }
         return actions.get(anomaly_level, "Unknown")
 
-    def train(self, train_loader, epochs=50, lr=0.001):
-        """Train the anomaly detection model"""
-        optimizer = torch.optim.Adam(self.model.parameters(), lr=lr)
-        criterion = torch.nn.MSELoss()
-        self.model.train()
+    def train(self, train_loader, epochs=None, lr=None, val_loader=None, **options):
+        """
+        Train the anomaly detection model
 
-        for epoch in range(epochs):
-            total_loss = 0.0
-            for data in train_loader:
-                if isinstance(data, (list, tuple)):
-                    data = data[0]
+        Settings not passed here (epochs, learning rate, early stopping
+        patience, LR schedule, ...) come from the `training` config section;
+        see src/models/trainer.py.
 
-                data = data.to(self.device)
+        Returns:
+            Per-epoch training history
+        """
+        criterion = torch.nn.MSELoss()
 
-                optimizer.zero_grad()
-                reconstructed = self.model(data)
-                loss = criterion(reconstructed, data)
-                loss.backward()
-                optimizer.step()
+        def loss_fn(model, batch):
+            data = batch[0] if isinstance(batch, (list, tuple)) else batch
+            return criterion(model(data), data)
 
-                total_loss += loss.item()
+        trainer = Trainer(
+            self.model,
+            loss_fn,
+            device=self.device,
+            precision=self.precision,
+            **training_options(self.config.get("training", {}), epochs=epochs, lr=lr, **options),
+        )
+        history = trainer.fit(train_loader, val_loader)
 
-            avg_loss = total_loss / len(train_loader)
-            logger.info(f"Epoch [{epoch+1}/{epochs}], Loss: {avg_loss:.4f}")
+        self.runner.build()
+        return history
 
     def save(self, filepath: str):
         """Save model checkpoint"""
-        torch.save(self.model.state_dict(), filepath)
+        save_checkpoint(self.model, filepath)
         logger.info(f"Model saved to {filepath}")
 
     def load(self, filepath: str):
         """Load model checkpoint"""
-        self.model.load_state_dict(torch.load(filepath, map_location=self.device))
+        self.set_model(load_checkpoint(filepath, self.model, map_location=self.device))
         logger.info(f"Model loaded from {filepath}")
+
+    def set_model(self, model):
+        """Serve a different (already loaded) model"""
+        self.model = model
+        self.variant = self.model.architecture["variant"]
+        self.runner.model = self.model
+        self.runner.build()
@@ -1,20 +1,82 @@
 """Battery Monitoring Orchestrator using CrewAI patterns"""
 
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from functools import partial
 from typing import Dict, Any, List
 import numpy as np
 from datetime import datetime
-from src.agents import (
-    ThermalAnomalyAgent,
-    AcousticFaultAgent,
-    RULPredictionAgent,
-    AnomalyDetectionAgent,
-)
-from src.models import RLChargeController
 from src.utils import setup_logger
 
 logger = setup_logger("Orchestrator")
 
 
+class lazy_agent:
+    """
+    Build an orchestrator attribute on first access, then cache it.
+
+    Agent modules (and torch) are only imported by the builder, so creating
+    an orchestrator is cheap; concurrent first accesses build once. Builders
+    take optional already-loaded models, which load_bundle passes to build
+    agents around mapped weights.
+    """
+
+    def __init__(self, build):
+        self.build = build
+        self.name = build.__name__
+        self.__doc__ = build.__doc__
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        with obj._build_lock:
+            if self.name not in obj.__dict__:
+                obj._set_process_threads()
+                obj.__dict__[self.name] = self.build(obj)
+        return obj.__dict__[self.name]
+
+
+AGENT_NAMES = ("thermal_agent", "acoustic_agent", "rul_agent", "anomaly_agent", "rl_controller")
+
+STATS_KEYS = {
+    "thermal_agent": "thermal",
+    "acoustic_agent": "acoustic",
+    "rul_agent": "rul",
+    "anomaly_agent": "anomaly",
+    "rl_controller": "control",
+}
+
+
+# Weights of the per-agent risk scores in the overall risk
+RISK_WEIGHTS = {
+    "thermal": 0.3,
+    "acoustic": 0.25,
+    "rul": 0.25,
+    "anomaly": 0.2,
+}
+
+# (cut point, label) pairs: a risk gets the label of the first cut it is
+# below (at or below for CONTROL_RATIONALES); None ends the list
+HEALTH_LEVELS = ((0.3, "EXCELLENT"), (0.5, "GOOD"), (0.7, "FAIR"), (0.85, "POOR"), (None, "CRITICAL"))
+RISK_LEVELS = ((0.3, "LOW"), (0.5, "MODERATE"), (0.7, "HIGH"), (None, "CRITICAL"))
+CONTROL_RATIONALES = (
+    (0.4, "Low risk detected. Optimal charge rate applied."),
+    (0.6, "MEDIUM RISK: Slight charge rate adjustment."),
+    (0.8, "HIGH RISK: Moderately reducing charge rate for safety."),
+    (None, "CRITICAL: Reducing charge rate to prevent thermal runaway and stress."),
+)
+
+# Agent attributes stored in checkpoint bundles next to the weights
+BUNDLE_SETTINGS = {
+    "thermal_agent": ("threshold",),
+    "acoustic_agent": ("threshold",),
+    "rul_agent": ("rated_capacity", "eol_ratio"),
+    "anomaly_agent": ("threshold", "max_history"),
+    "rl_controller": ("epsilon",),
+}
+
+
 class BatteryMonitoringOrchestrator:
     """
     Main orchestrator for Smart Battery Guardian system.
@@ -24,23 +86,9 @@ class BatteryMonitoringOrchestrator:
     def __init__(self, config=None):
         self.config = config or {}
 
-        # Initialize all agents
-        logger.info("Initializing all monitoring agents...")
-        self.thermal_agent = ThermalAnomalyAgent(
-            self.config.get("thermal", {})
-        )
-        self.acoustic_agent = AcousticFaultAgent(
-            self.config.get("acoustic", {})
-        )
-        self.rul_agent = RULPredictionAgent(self.config.get("rul", {}))
-        self.anomaly_agent = AnomalyDetectionAgent(
-            self.config.get("anomaly", {})
-        )
-        self.rl_controller = RLChargeController(
-            state_size=8,
-            action_size=5,
-            **self.config.get("control", {}),
-        )
+        # Agents are built on first use (see lazy_agent)
+        self._build_lock = threading.RLock()
+        self._executor = None  # agent threads for comprehensive_assessment
 
         # Monitoring state
         self.last_assessment = None
@@ -49,12 +97,167 @@ class BatteryMonitoringOrchestrator:
 
         logger.info("Orchestrator initialized successfully")
 
+    @lazy_agent
+    def thermal_agent(self, model=None):
+        """Thermal anomaly agent"""
+        from src.agents.thermal_agent import ThermalAnomalyAgent
+
+        return ThermalAnomalyAgent(self._agent_config("thermal"), model=model)
+
+    @lazy_agent
+    def acoustic_agent(self, model=None):
+        """Acoustic fault agent"""
+        from src.agents.acoustic_agent import AcousticFaultAgent
+
+        return AcousticFaultAgent(self._agent_config("acoustic"), model=model)
+
+    @lazy_agent
+    def rul_agent(self, model=None):
+        """RUL prediction agent"""
+        from src.agents.rul_agent import RULPredictionAgent
+
+        return RULPredictionAgent(self._agent_config("rul"), model=model)
+
+    @lazy_agent
+    def anomaly_agent(self, model=None):
+        """Anomaly detection agent"""
+        from src.agents.anomaly_agent import AnomalyDetectionAgent
+
+        return AnomalyDetectionAgent(self._agent_config("anomaly"), model=model)
+
+    @lazy_agent
+    def rl_controller(self, q_network=None, target_network=None):
+        """RL charge controller"""
+        from src.models.rl_controller import RLChargeController
+
+        control_config = self._agent_config("control")
+        return RLChargeController(
+            state_size=8,
+            action_size=5,
+            learning_rate=control_config.get("learning_rate", 0.001),
+            gamma=control_config.get("gamma", 0.99),
+            quantization=control_config.get("quantization", "none"),
+            buffer_size=control_config.get("buffer_size", 10000),
+            batch_size=control_config.get("batch_size", 64),
+            target_update_interval=control_config.get("target_update_interval", 100),
+            prioritized_replay=control_config.get("prioritized_replay", False),
+            double_dqn=control_config.get("double_dqn", True),
+            intra_op_threads=control_config.get("intra_op_threads", 0),
+            cpu_affinity=control_config.get("cpu_affinity"),
+            precision=control_config.get("precision", "float32"),
+            q_network=q_network,
+            target_network=target_network,
+        )
+
+    def build_agents(self):
+        """
+        Build every agent now (e.g. to warm up a server before traffic)
+
+        With inference.autotune set to "latency" or "throughput", each agent's
+        intra-op thread count is then tuned on this host.
+        """
+        for name in AGENT_NAMES:
+            getattr(self, name)
+        logger.info("All monitoring agents initialized")
+
+        objective = self.config.get("inference", {}).get("autotune", "none")
+        if objective != "none":
+            self.autotune_threads(objective)
+
+    def autotune_threads(self, objective="latency", candidates=None, iterations=20):
+        """
+        Pick each agent's intra-op thread count by benchmarking on this host
+
+        Agents with an explicit intra_op_threads in their config section and
+        ONNX Runtime backends are left as configured.
+
+        Args:
+            objective: "latency" or "throughput"
+            candidates: thread counts to try (default: powers of two up to the cores)
+            iterations: timed calls per candidate
+
+        Returns:
+            Dictionary agent name -> (chosen threads, measurement rows)
+        """
+        import torch
+        from src.models.model_zoo import sample_input
+        from src.models.thread_tuner import autotune_runner
+
+        results = {}
+        for name in AGENT_NAMES:
+            agent = getattr(self, name)
+            if "intra_op_threads" in self.config.get(STATS_KEYS[name], {}):
+                continue
+            if name == "rl_controller":
+                runner = agent.policy_runner
+                sample = torch.rand(1, agent.state_size)
+            else:
+                runner = agent.runner
+                if runner.backend != "torch":
+                    continue
+                if runner.quantization == "static" and runner.calibration_data is None:
+                    continue  # nothing to serve until calibrated
+                architecture = agent.model.architecture
+                overrides = {}
+                if architecture["modality"] == "thermal":
+                    height, width, _ = self.config.get("thermal", {}).get(
+                        "input_shape", [8, 8, 1]
+                    )
+                    overrides["thermal_size"] = (height, width)
+                sample = sample_input(architecture["modality"], agent.model, **overrides)
+
+            threads, rows = autotune_runner(
+                runner, sample.numpy(), objective, candidates, iterations=iterations
+            )
+            results[name] = (threads, rows)
+            logger.info(f"{name}: {threads} intra-op thread(s) ({objective})")
+        return results
+
+    def _rebuild_agent(self, name: str, *models):
+        """Replace an agent with one built around already-loaded models"""
+        with self._build_lock:
+            self._set_process_threads()
+            previous = self.__dict__.get(name)
+            agent = type(self).__dict__[name].build(self, *models)
+            self.__dict__[name] = agent
+        if previous is not None:
+            (previous.policy_runner if name == "rl_controller" else previous.runner).close()
+        return agent
+
+    def _set_process_threads(self):
+        """Apply the process-wide torch inter-op thread count before the first agent runs"""
+        from src.models.model_runner import set_torch_threads
+
+        set_torch_threads(inter_op_threads=self.config.get("inference", {}).get("inter_op_threads", 0))
+
+    def built_agents(self) -> List[str]:
+        """Names of the agents constructed so far"""
+        return [name for name in AGENT_NAMES if name in self.__dict__]
+
+    def _agent_config(self, name: str) -> Dict[str, Any]:
+        """Agent config section layered over the shared inference settings"""
+        return {
+            **self.config.get("inference", {}),
+            "training": self.config.get("training", {}),
+            **self.config.get(name, {}),
+        }
+
+    def get_inference_stats(self) -> Dict[str, Dict[str, float]]:
+        """Per-model inference latency statistics (agents built so far)"""
+        stats = {}
+        for name in self.built_agents():
+            agent = getattr(self, name)
+            runner = agent.policy_runner if name == "rl_controller" else agent.runner
+            stats[STATS_KEYS[name]] = runner.stats()
+        return stats
+
     def comprehensive_assessment(
         self,
         thermal_image: np.ndarray,
         acoustic_features: np.ndarray,
         rul_sequence: np.ndarray,
         sensor_data: np.ndarray,
+        battery_id=None,
     ) -> Dict[str, Any]:
         """
         Perform comprehensive battery health assessment using all agents
@@ -64,6 +267,8 @@ class BatteryMonitoringOrchestrator:
             acoustic_features: MFCC features from acoustic sensors
             rul_sequence: Historical cycle data sequence
             sensor_data: Current sensor readings
+            battery_id: battery being assessed; anomalies are then judged
+                        against its own score baseline
 
         Returns:
             Comprehensive assessment report
@@ -73,10 +278,22 @@ class BatteryMonitoringOrchestrator:
         logger.info("Starting comprehensive battery assessment...")
 
         # Parallel agent analysis
-        thermal_result = self.thermal_agent.analyze(thermal_image)
-        acoustic_result = self.acoustic_agent.analyze(acoustic_features)
-        rul_result = self.rul_agent.predict(rul_sequence)
-        anomaly_result = self.anomaly_agent.detect(sensor_data)
+        sensor_batch = np.asarray(sensor_data, dtype=np.float32)[np.newaxis]
+        results, agent_status = self._run_agents(
+            {
+                "thermal": partial(self.thermal_agent.analyze, thermal_image),
+                "acoustic": partial(self.acoustic_agent.analyze, acoustic_features),
+                "rul": partial(self.rul_agent.predict, rul_sequence),
+                "anomaly": partial(self.anomaly_agent.score, sensor_batch),
+            },
+            commits={
+                "anomaly": lambda scores: self.anomaly_agent.record(scores[0], battery_id=battery_id),
+            },
+        )
+        thermal_result = results["thermal"]
+        acoustic_result = results["acoustic"]
+        rul_result = results["rul"]
+        anomaly_result = results["anomaly"]
 
         # Update risk scores
         self.risk_scores["thermal"] = thermal_result["anomaly_score"]
@@ -116,8 +333,17 @@ class BatteryMonitoringOrchestrator:
             "alerts": self._generate_alerts(
                 thermal_result, acoustic_result, rul_result, anomaly_result, overall_risk
             ),
+            "agent_status": agent_status,
             "summary": self._generate_summary(overall_risk),
         }
+        for name, status in agent_status.items():
+            if status != "ok":
+                assessment["alerts"].append({
+                    "level": "WARNING",
+                    "source": "System",
+                    "message": f"{name.capitalize()} analysis unavailable ({status}); "
+                               f"using the last known risk score",
+                })
 
         # Store in history
         self.last_assessment = assessment
@@ -127,35 +353,323 @@ class BatteryMonitoringOrchestrator:
 
         return assessment
 
-    def _calculate_overall_risk(self) -> float:
-        """Calculate weighted overall risk score"""
-        weights = {
-            "thermal": 0.3,
-            "acoustic": 0.25,
-            "rul": 0.25,
-            "anomaly": 0.2,
+    def assess_fleet(self, batch: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Assess many batteries with one forward pass per agent
+
+        The four agents run concurrently over the whole batch (with the
+        timeouts and error isolation of comprehensive_assessment), then risk
+        aggregation, RL charge actions and alerts are computed as array
+        operations. Unlike comprehensive_assessment this does not touch
+        risk_scores or the assessment history.
+
+        Args:
+            batch: stacked inputs for N batteries:
+                thermal_images: N thermal images
+                acoustic_features: N MFCC feature arrays
+                rul_sequences: array of shape (N, sequence_length, num_features)
+                sensor_data: array of shape (N, num_features)
+                battery_ids: optional N identifiers; anomalies are then
+                             judged against each battery's own baseline
+                temperatures: optional N temperature readings
+                fault_indicators: optional N acoustic fault indicator dicts
+
+        Returns:
+            One assessment per battery, with the keys of
+            comprehensive_assessment plus "battery_id"
+        """
+        timestamp = datetime.now()
+        battery_ids = batch.get("battery_ids")
+        num_batteries = len(batch["sensor_data"])
+
+        logger.info(f"Starting fleet assessment of {num_batteries} batteries...")
+
+        results, agent_status = self._run_agents(
+            {
+                "thermal": partial(
+                    self.thermal_agent.batch_analyze, batch["thermal_images"], batch.get("temperatures")
+                ),
+                "acoustic": partial(
+                    self.acoustic_agent.batch_analyze, batch["acoustic_features"], batch.get("fault_indicators")
+                ),
+                "rul": partial(self.rul_agent.batch_predict, batch["rul_sequences"]),
+                "anomaly": partial(self.anomaly_agent.score, batch["sensor_data"]),
+            },
+            commits={
+                "anomaly": partial(self.anomaly_agent.record_batch, battery_ids=battery_ids),
+            },
+        )
+        # Per-battery results (a failed agent's fallback stands in for every
+        # battery, one copy each so callers can annotate them independently)
+        result_keys = {"thermal": "results", "acoustic": "results", "rul": "predictions", "anomaly": "results"}
+        for name, key in result_keys.items():
+            if agent_status[name] == "ok":
+                results[name] = results[name][key]
+            else:
+                results[name] = [self._fallback_result(name) for _ in range(num_batteries)]
+        thermal, acoustic, rul, anomaly = (
+            results[name] for name in ("thermal", "acoustic", "rul", "anomaly")
+        )
+
+        def column(agent_results, key):
+            return np.array([r[key] for r in agent_results], dtype=np.float64)
+
+        thermal_score = column(thermal, "anomaly_score")
+        acoustic_score = column(acoustic, "fault_score")
+        predicted_rul = column(rul, "predicted_rul")
+        anomaly_score = column(anomaly, "anomaly_score")
+
+        # Risk aggregation
+        risk = {
+            "thermal": thermal_score,
+            "acoustic": acoustic_score,
+            "rul": 1.0 - predicted_rul / 500.0,
+            "anomaly": anomaly_score,
+        }
+        overall_risk = np.minimum(1.0, sum(risk[key] * RISK_WEIGHTS[key] for key in RISK_WEIGHTS))
+        health = self._levels(overall_risk, HEALTH_LEVELS)
+
+        # Control: one policy forward pass over the (N, 8) state matrix
+        states = np.stack([
+            thermal_score,
+            acoustic_score,
+            predicted_rul / 500.0,
+            anomaly_score,
+            column(anomaly, "z_score"),
+            predicted_rul / 100.0,
+            column(thermal, "confidence"),
+            column(acoustic, "confidence"),
+        ], axis=1)
+        actions = self.rl_controller.get_actions(states, training=False)
+        charge_rates = self.rl_controller.action_to_charge_rate(actions)
+        rationales = self._levels(overall_risk, CONTROL_RATIONALES, right=True)
+
+        # Alerts: one mask per rule
+        alerts = [[] for _ in range(num_batteries)]
+        thermal_alert = np.array([r["is_anomalous"] for r in thermal], dtype=bool)
+        for i in np.flatnonzero(thermal_alert):
+            alerts[i].append({
+                "level": "CRITICAL" if thermal_score[i] > 0.85 else "WARNING",
+                "source": "Thermal",
+                "message": f"Thermal anomaly detected: {thermal[i]['recommendation']}",
+            })
+        acoustic_alert = np.array([r["is_faulty"] for r in acoustic], dtype=bool)
+        for i in np.flatnonzero(acoustic_alert):
+            alerts[i].append({
+                "level": "CRITICAL" if acoustic_score[i] > 0.85 else "WARNING",
+                "source": "Acoustic",
+                "message": f"Acoustic fault detected: {acoustic[i]['action']}",
+            })
+        for i in np.flatnonzero(predicted_rul < 50):
+            alerts[i].append({
+                "level": "CRITICAL",
+                "source": "RUL",
+                "message": f"Low RUL detected: {rul[i]['maintenance_recommendation']}",
+            })
+        anomaly_alert = np.isin([r["anomaly_level"] for r in anomaly], ["MODERATE", "SEVERE"])
+        for i in np.flatnonzero(anomaly_alert):
+            alerts[i].append({
+                "level": "WARNING",
+                "source": "Anomaly Detection",
+                "message": f"Anomaly level {anomaly[i]['anomaly_level']}: {anomaly[i]['action']}",
+            })
+        for i in np.flatnonzero(overall_risk > 0.8):
+            alerts[i].append({
+                "level": "CRITICAL",
+                "source": "System",
+                "message": "CRITICAL RISK: Immediate intervention required!",
+            })
+        for name, status in agent_status.items():
+            if status != "ok":
+                for battery_alerts in alerts:
+                    battery_alerts.append({
+                        "level": "WARNING",
+                        "source": "System",
+                        "message": f"{name.capitalize()} analysis unavailable ({status}); "
+                                   f"using the last known risk score",
+                    })
+
+        assessments = []
+        for i in range(num_batteries):
+            assessments.append({
+                "battery_id": battery_ids[i] if battery_ids is not None else i,
+                "timestamp": timestamp,
+                "overall_health": health[i],
+                "overall_risk_score": float(overall_risk[i]),
+                "risk_scores": {key: float(value[i]) for key, value in risk.items()},
+                "thermal_analysis": thermal[i],
+                "acoustic_analysis": acoustic[i],
+                "rul_prediction": rul[i],
+                "anomaly_detection": anomaly[i],
+                "control_recommendation": {
+                    "charge_rate": float(charge_rates[i]),
+                    "action": int(actions[i]),
+                    "rationale": rationales[i],
+                },
+                "alerts": alerts[i],
+                "agent_status": dict(agent_status),
+                "summary": self._generate_summary(float(overall_risk[i]), alerts[i]),
+            })
+
+        logger.info(
+            f"Fleet assessment complete: {int((overall_risk > 0.8).sum())}/{num_batteries} "
+            f"batteries at critical risk"
+        )
+        return assessments
+
+    @staticmethod
+    def _levels(values, levels, right: bool = False) -> List[str]:
+        """Label of the first cut point each value is below (at or below with right)"""
+        cuts = [cut for cut, _ in levels if cut is not None]
+        labels = [label for _, label in levels]
+        return [labels[i] for i in np.digitize(values, cuts, right=right)]
+
+    def _run_agents(self, tasks, commits=None):
+        """
+        Run agent analyses concurrently with per-agent timeouts
+
+        Torch releases the GIL during forward passes, so the agents overlap
+        and the assessment takes about as long as the slowest one. An agent
+        that raises or misses its timeout (inference.agent_timeout_s, which
+        an agent section may override) gets a fallback result carrying its
+        last known risk score; the others are unaffected. A timed-out
+        analysis keeps running in its thread and its result is discarded;
+        if it is still running, the thread pool is replaced so hung analyses
+        cannot fill it. Agents with state (the anomaly agent) only compute in
+        the pool: their commit step updates the state in the calling thread
+        once the result arrives in time, so a late analysis never changes it.
+        With inference.concurrent_agents off the agents run one after
+        another, still isolated from each other's errors.
+
+        Args:
+            tasks: agent name ("thermal", "acoustic", "rul", "anomaly") ->
+                   zero-argument callable
+            commits: agent name -> callable turning its task's return value
+                     into the result (run only for tasks that finished in time)
+
+        Returns:
+            (results, status): name -> result, name -> "ok" | "timeout" | "error"
+        """
+        commits = commits or {}
+        results, status = {}, {}
+        if not self.config.get("inference", {}).get("concurrent_agents", True):
+            for name, task in tasks.items():
+                try:
+                    value = task()
+                    results[name] = commits[name](value) if name in commits else value
+                    status[name] = "ok"
+                except Exception as e:
+                    logger.error(f"{name} analysis failed: {e!r}")
+                    results[name], status[name] = self._fallback_result(name), "error"
+            return results, status
+
+        executor = self._agent_executor()
+        start = time.perf_counter()
+        futures = {name: executor.submit(task) for name, task in tasks.items()}
+        hung = False
+        for name, future in futures.items():
+            timeout = self._agent_config(name).get("agent_timeout_s")
+            remaining = None if timeout is None else max(timeout - (time.perf_counter() - start), 0.0)
+            try:
+                value = future.result(remaining)
+                results[name] = commits[name](value) if name in commits else value
+                status[name] = "ok"
+            except FutureTimeoutError:
+                hung |= not future.cancel()  # cancel only stops analyses not yet started
+                logger.error(f"{name} analysis timed out after {timeout}s")
+                results[name], status[name] = self._fallback_result(name), "timeout"
+            except Exception as e:
+                logger.error(f"{name} analysis failed: {e!r}")
+                results[name], status[name] = self._fallback_result(name), "error"
+        if hung:
+            self._replace_executor(executor)
+        return results, status
+
+    def _agent_executor(self) -> ThreadPoolExecutor:
+        """Thread pool for agent analyses (created on first use)"""
+        with self._build_lock:
+            if self._executor is None:
+                # Headroom beyond the four agents: an analysis still running
+                # past its timeout must not delay the next assessment
+                self._executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="sbg-agent")
+        return self._executor
+
+    def _replace_executor(self, executor: ThreadPoolExecutor):
+        """Retire a thread pool with hung analyses; the next assessment gets a fresh one"""
+        with self._build_lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False)
+        logger.warning("Agent analyses are still running past their timeout; replaced the agent thread pool")
+
+    def _fallback_result(self, name: str) -> Dict[str, Any]:
+        """Neutral result for an agent that failed, keeping its last known risk score"""
+        risk = self.risk_scores[name]
+        if name == "thermal":
+            return {
+                "is_anomalous": False,
+                "anomaly_score": risk,
+                "confidence": 0.0,
+                "risk_level": self._risk_to_level(risk),
+                "risk_score": risk,
+                "recommendation": "Thermal analysis unavailable",
+                "temperature": None,
+                "anomalies": [],
+            }
+        if name == "acoustic":
+            return {
+                "is_faulty": False,
+                "fault_score": risk,
+                "confidence": 0.0,
+                "fault_type": "UNKNOWN",
+                "severity": "UNKNOWN",
+                "action": "Acoustic analysis unavailable",
+                "risk_level": self._risk_to_level(risk),
+                "anomalies": [],
+            }
+        if name == "rul":
+            predicted_rul = (1.0 - risk) * 500.0  # inverts the RUL risk score
+            return {
+                "predicted_rul": predicted_rul,
+                "rul_cycles": int(predicted_rul),
+                "confidence": 0.0,
+                "health_status": "UNKNOWN",
+                "maintenance_recommendation": "RUL prediction unavailable",
+            }
+        return {
+            "is_anomalous": False,
+            "anomaly_score": risk,
+            "adaptive_threshold": None,
+            "anomaly_level": "NORMAL",
+            "z_score": 0.0,
+            "action": "Anomaly detection unavailable",
         }
 
+    def close(self, wait: bool = False):
+        """
+        Stop the agent threads (optionally waiting for analyses still running)
+        and the micro-batching threads of the built agents' model runners
+        """
+        with self._build_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait)
+                self._executor = None
+            for name in self.built_agents():
+                agent = getattr(self, name)
+                runner = agent.policy_runner if name == "rl_controller" else agent.runner
+                runner.close()
+
+    def _calculate_overall_risk(self) -> float:
+        """Calculate weighted overall risk score"""
         overall_risk = sum(
-            self.risk_scores[key] * weights[key] for key in weights
+            self.risk_scores[key] * RISK_WEIGHTS[key] for key in RISK_WEIGHTS
         )
 
         return min(1.0, overall_risk)
 
     def _calculate_overall_health(self) -> str:
         """Calculate overall health status"""
-        risk = self._calculate_overall_risk()
-
-        if risk < 0.3:
-            return "EXCELLENT"
-        elif risk < 0.5:
-            return "GOOD"
-        elif risk < 0.7:
-            return "FAIR"
-        elif risk < 0.85:
-            return "POOR"
-        else:
-            return "CRITICAL"
+        return self._levels([self._calculate_overall_risk()], HEALTH_LEVELS)[0]
 
     def _build_state_vector(self, thermal_res, acoustic_res, rul_res, anomaly_res):
         """Build state vector for RL controller"""
@@ -173,17 +687,7 @@ class BatteryMonitoringOrchestrator:
 
     def _get_control_rationale(self, charge_rate: float, overall_risk: float) -> str:
         """Explain the control decision"""
-        if overall_risk > 0.8:
-            return (
-                "CRITICAL: Reducing charge rate to prevent thermal runaway "
-                "and stress."
-            )
-        elif overall_risk > 0.6:
-            return "HIGH RISK: Moderately reducing charge rate for safety."
-        elif overall_risk > 0.4:
-            return "MEDIUM RISK: Slight charge rate adjustment."
-        else:
-            return "Low risk detected. Optimal charge rate applied."
+        return self._levels([overall_risk], CONTROL_RATIONALES, right=True)[0]
 
     def _generate_alerts(
         self, thermal_res, acoustic_res, rul_res, anomaly_res, overall_risk
@@ -228,30 +732,24 @@ class BatteryMonitoringOrchestrator:
 
         return alerts
 
-    def _generate_summary(self, overall_risk: float) -> str:
-        """Generate human-readable summary"""
+    def _generate_summary(self, overall_risk: float, alerts: List[Dict[str, str]] = None) -> str:
+        """Generate human-readable summary (alerts default to the last assessment's)"""
         risk_level = self._risk_to_level(overall_risk)
 
         summary = f"Battery Health Assessment - Risk Level: {risk_level}\n"
         summary += f"Overall Risk Score: {overall_risk:.1%}\n"
 
-        if self.last_assessment:
-            num_alerts = len(self.last_assessment.get("alerts", []))
-            summary += f"Active Alerts: {num_alerts}\n"
+        if alerts is None and self.last_assessment:
+            alerts = self.last_assessment.get("alerts", [])
+        if alerts is not None:
+            summary += f"Active Alerts: {len(alerts)}\n"
 
         return summary
 
     @staticmethod
     def _risk_to_level(risk: float) -> str:
         """Convert risk score to level"""
-        if risk < 0.3:
-            return "LOW"
-        elif risk < 0.5:
-            return "MODERATE"
-        elif risk < 0.7:
-            return "HIGH"
-        else:
-            return "CRITICAL"
+        return BatteryMonitoringOrchestrator._levels([risk], RISK_LEVELS)[0]
 
     def get_assessment_history(self, num_last=10) -> List[Dict[str, Any]]:
         """Get recent assessment history"""
@@ -272,9 +770,12 @@ class BatteryMonitoringOrchestrator:
         logger.info(f"Checkpoint saved to {filepath}")
 
     def load_checkpoint(self, filepath: str):
-        """Load all agent models"""
+        """Load all agent models (from a directory or a bundle file)"""
         import os
 
+        if os.path.isfile(filepath):
+            return self.load_bundle(filepath)
+
         self.thermal_agent.load(os.path.join(filepath, "thermal_agent.pt"))
         self.acoustic_agent.load(os.path.join(filepath, "acoustic_agent.pt"))
         self.rul_agent.load(os.path.join(filepath, "rul_agent.pt"))
@@ -282,3 +783,117 @@ class BatteryMonitoringOrchestrator:
         self.rl_controller.load(os.path.join(filepath, "rl_controller.pt"))
 
         logger.info(f"Checkpoint loaded from {filepath}")
+
+    def save_bundle(self, filepath: str):
+        """
+        Save all agent weights, thresholds and anomaly score statistics (score
+        history, fleet quantile sketch, per-battery baselines) to one
+        versioned, memory-mappable file (see src/models/checkpoint_bundle.py)
+        """
+        import torch
+        from src.models.checkpoint_bundle import save_bundle
+
+        tensors, contents = {}, {}
+        for name in AGENT_NAMES:
+            agent = getattr(self, name)
+            model = agent.q_network if name == "rl_controller" else agent.model
+            for key, tensor in model.state_dict().items():
+                tensors[f"model.{name}.{key}"] = tensor
+            contents[name] = {
+                "architecture": getattr(model, "architecture", None),
+                "settings": {key: getattr(agent, key) for key in BUNDLE_SETTINGS[name]},
+            }
+
+        anomaly_agent = self.anomaly_agent
+        tensors["state.anomaly_agent.score_history"] = torch.tensor(
+            anomaly_agent.score_history, dtype=torch.float64
+        )
+        sketch = anomaly_agent.sketch_state()
+        tensors["state.anomaly_agent.fleet_sketch"] = torch.from_numpy(sketch.pop("items"))
+        contents["anomaly_agent"]["fleet_sketch"] = sketch
+        if anomaly_agent._battery_states is not None:
+            snapshot = anomaly_agent.battery_states.state_dict()
+            contents["anomaly_agent"]["battery_states"] = {
+                key: snapshot.pop(key)
+                for key in ("battery_ids", "history_size", "threshold_window")
+            }
+            for key, tensor in snapshot.items():
+                tensors[f"state.anomaly_agent.battery_states.{key}"] = tensor
+
+        save_bundle(filepath, tensors, contents)
+        logger.info(f"Checkpoint bundle saved to {filepath}")
+
+    def load_bundle(self, filepath: str, mmap: bool = True):
+        """
+        Load a bundle written by save_bundle
+
+        Agents are constructed around the bundle's weights: models are built
+        on the meta device from the recorded architecture and their tensors
+        assigned from the file, so no random initialization happens. With
+        mmap the weights are used in place from the mapped file (the RL
+        target network gets its own copy-on-write mapping), and processes
+        loading the same bundle share the weight pages.
+        """
+        import torch
+        from src.models.checkpoint_bundle import load_bundle, split_prefix
+        from src.models.model_zoo import build_model
+        from src.models.quantile_sketch import KLLSketch
+        from src.models.rl_controller import DQNNetwork
+
+        tensors, contents = load_bundle(filepath, mmap=mmap)
+
+        for name in AGENT_NAMES:
+            if name not in contents:
+                continue
+            state = split_prefix(tensors, f"model.{name}")
+
+            if name == "rl_controller":
+                # Online and target networks must not share storage: learning
+                # updates the online weights in place
+                if mmap:
+                    target_state = split_prefix(load_bundle(filepath)[0], f"model.{name}")
+                else:
+                    target_state = {key: tensor.clone() for key, tensor in state.items()}
+                hidden_size, state_size = state["fc.0.weight"].shape
+                action_size = state["fc.6.weight"].shape[0]
+                networks = []
+                for network_state in (state, target_state):
+                    with torch.device("meta"):
+                        network = DQNNetwork(state_size, action_size, hidden_size)
+                    network.load_state_dict(network_state, assign=True)
+                    networks.append(network)
+                agent = self._rebuild_agent(name, *networks)
+            else:
+                architecture = contents[name]["architecture"]
+                with torch.device("meta"):
+                    model = build_model(
+                        architecture["modality"],
+                        architecture["variant"],
+                        **architecture["overrides"],
+                    )
+                model.load_state_dict(state, assign=True)
+                agent = self._rebuild_agent(name, model)
+                if agent.runner.backend == "onnx":
+                    agent.runner.build()  # export the bundle's weights
+
+            for key, value in contents[name]["settings"].items():
+                setattr(agent, key, value)
+
+        if "anomaly_agent" in contents:
+            anomaly_agent = self.anomaly_agent
+            history = tensors.get("state.anomaly_agent.score_history")
+            if history is not None:
+                anomaly_agent.score_history = history.tolist()
+            sketch = contents["anomaly_agent"].get("fleet_sketch")
+            if sketch is not None:
+                anomaly_agent.fleet_sketch = KLLSketch.from_state_dict(
+                    {**sketch, "items": tensors["state.anomaly_agent.fleet_sketch"].numpy()}
+                )
+            battery_states = contents["anomaly_agent"].get("battery_states")
+            if battery_states is not None:
+                arrays = split_prefix(tensors, "state.anomaly_agent.battery_states")
+                anomaly_agent.battery_states.load_state_dict(
+                    {**battery_states, **{key: t.numpy() for key, t in arrays.items()}}
+                )
+
+        logger.info(f"Checkpoint bundle loaded from {filepath}")
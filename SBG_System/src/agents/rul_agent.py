@@ -3,7 +3,12 @@
 from typing import Dict, Any
 import torch
 import numpy as np
-from src.models import RULLSTM
+from src.models.mixed_precision import check_precision
+from src.models.model_runner import ModelRunner
+from src.models.trainer import Trainer, training_options
+from src.models.model_zoo import build_model, resolve_variant, save_checkpoint, load_checkpoint
+from src.models.rul_stream import StreamingRULPredictor
+from src.models.attmoe import capacity_windows, forecast_rul
 from src.utils import setup_logger
 
 logger = setup_logger("RULAgent")
@@ -12,20 +17,82 @@ logger = setup_logger("RULAgent")
 class RULPredictionAgent:
     """Agent for predicting Remaining Useful Life of batteries"""
 
-    def __init__(self, config=None):
+    def __init__(self, config=None, model=None):
         self.config = config or {}
-        self.model = RULLSTM(
-            input_size=self.config.get("num_features", 5),
-            hidden_size=self.config.get("hidden_units", 64),
-            num_layers=self.config.get("num_layers", 2),
-            output_size=1,
-            dropout=self.config.get("dropout", 0.2),
+        num_features = self.config.get("num_features", 5)
+
+        # RUL backend: "lstm" (RULLSTM) or "attmoe" (capacity forecaster)
+        self.model_type = self.config.get("model_type", "lstm")
+        if model is not None:
+            # Already built (e.g. mapped from a checkpoint bundle)
+            self.model = model
+            self.variant = model.architecture["variant"]
+            self.model_type = "attmoe" if model.architecture["modality"] == "attmoe" else "lstm"
+        elif self.model_type == "attmoe":
+            window_size = self.config.get("window_size", 64)
+            self.variant = resolve_variant("attmoe", self.config, feature_size=window_size)
+            self.model = build_model(
+                "attmoe",
+                self.variant,
+                feature_size=window_size,
+                dropout_att=self.config.get("dropout", 0.0),
+            )
+        else:
+            self.variant = resolve_variant("rul", self.config, input_size=num_features)
+
+            # Explicit hidden_units/num_layers still override the variant
+            overrides = {}
+            if "hidden_units" in self.config:
+                overrides["hidden_size"] = self.config["hidden_units"]
+            if "num_layers" in self.config:
+                overrides["num_layers"] = self.config["num_layers"]
+            self.model = build_model(
+                "rul",
+                self.variant,
+                input_size=num_features,
+                output_size=1,
+                dropout=self.config.get("dropout", 0.2),
+                **overrides,
+            )
+
+        # AttMoE forecasts capacity until end of life
+        self.rated_capacity = self.config.get("rated_capacity", 1.1)
+        self.eol_ratio = self.config.get("eol_ratio", 0.7)
+        self.capacity_feature = self.config.get("capacity_feature")  # None: no capacity column
+        self.max_forecast_cycles = self.config.get("max_forecast_cycles", 1000)
+
+        quantization = self.config.get("quantization", "none")
+        backend = self.config.get("backend", "torch")
+        use_cuda = quantization == "none" and backend == "torch"
+        self.device = torch.device(
+            "cuda" if torch.cuda.is_available() and use_cuda else "cpu"
         )
-        self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
         self.model.to(self.device)
-        self.model.eval()
 
-        logger.info(f"RULPredictionAgent initialized on {self.device}")
+        # Mixed precision for train() and inference (float32 | bfloat16 | float16)
+        self.precision = check_precision(self.config.get("precision", "float32"))
+
+        # Shared inference hot path (eval mode, quantization/ONNX, timing)
+        self.runner = ModelRunner(
+            self.model,
+            task="regression",
+            device=self.device,
+            quantization=quantization,
+            backend=backend,
+            onnx_path=self.config.get("onnx_path", "models/onnx/rul_lstm.onnx"),
+            intra_op_threads=self.config.get("intra_op_threads", 0),
+            inter_op_threads=self.config.get("inter_op_threads", 0),
+            cpu_affinity=self.config.get("cpu_affinity"),
+            precision=self.precision,
+            max_batch_size=self.config.get("max_batch_size", 1),
+            max_batch_latency_ms=self.config.get("max_batch_latency_ms", 5.0),
+        )
+        logger.info(f"Inference path: {self.runner.build(export=False)}")
+
+        # Per-battery LSTM state for one-cycle-at-a-time monitoring
+        self.stream = self._make_stream()
+
+        logger.info(f"RULPredictionAgent initialized on {self.device} ({self.variant} variant)")
 
     def analyze(self, state_dict: Dict, capacity_fade: float) -> Dict[str, Any]:
         """
@@ -33,40 +100,19 @@ class RULPredictionAgent:
         
         Args:
             state_dict: Dict with voltage, current, soc, temperature, etc.
-            capacity_fade: Normalized capacity (0-1)
+            capacity_fade: Normalized capacity (0-1); the attmoe backend
+                           forecasts from it (a per-cycle series, oldest
+                           first, gives it the capacity trend)
             
         Returns:
             Dictionary with RUL analysis
         """
-        # Build feature sequence from state dict
-        features = [
-            state_dict.get('voltage', 3.7),
-            state_dict.get('current', 0.0),
-            state_dict.get('soc', 0.5),
-            state_dict.get('temperature', 25.0),
-            state_dict.get('impedance', 0.1)
-        ]
-        
-        # Create a simple sequence (just use this one state repeated)
-        sequence = np.array([features] * 5).astype(np.float32)  # 5-step sequence
-        
         # Predict RUL
-        result = self.predict(sequence)
+        result = self.predict(self.state_sequence(state_dict, capacity_fade))
         
         # Add risk level based on RUL
         rul_cycles = result['rul_cycles']
-        if rul_cycles > 400:
-            risk_level = 'LOW'
-            risk_score = 0.2
-        elif rul_cycles > 200:
-            risk_level = 'MEDIUM'
-            risk_score = 0.5
-        elif rul_cycles > 50:
-            risk_level = 'HIGH'
-            risk_score = 0.7
-        else:
-            risk_level = 'CRITICAL'
-            risk_score = 0.95
+        risk_level, risk_score = self.risk_tier(rul_cycles)
         
         return {
             'predicted_rul_cycles': rul_cycles,
@@ -77,27 +123,134 @@ class RULPredictionAgent:
             'maintenance_recommendation': result['maintenance_recommendation']
         }
 
+    @staticmethod
+    def risk_tier(rul_cycles: int):
+        """(risk_level, risk_score) tier of a remaining-cycles prediction (see analyze)"""
+        if rul_cycles > 400:
+            return 'LOW', 0.2
+        if rul_cycles > 200:
+            return 'MEDIUM', 0.5
+        if rul_cycles > 50:
+            return 'HIGH', 0.7
+        return 'CRITICAL', 0.95
+
+    def state_sequence(self, state_dict: Dict, capacity_fade: float = None) -> np.ndarray:
+        """
+        Sequence for predict() / batch_predict() from a state dictionary
+
+        The attmoe backend gets the capacity history in Ah from capacity_fade
+        (see analyze); other backends a short sequence of the state features.
+        """
+        if self.model_type == "attmoe":
+            if capacity_fade is None:
+                raise ValueError("The attmoe RUL backend needs capacity_fade to forecast from")
+            capacity_history = np.atleast_1d(np.asarray(capacity_fade, dtype=np.float32))
+            return capacity_history * self.rated_capacity
+
+        features = [
+            state_dict.get('voltage', 3.7),
+            state_dict.get('current', 0.0),
+            state_dict.get('soc', 0.5),
+            state_dict.get('temperature', 25.0),
+            state_dict.get('impedance', 0.1)
+        ]
+
+        # Create a simple sequence (just use this one state repeated)
+        return np.array([features] * 5).astype(np.float32)  # 5-step sequence
+
     def predict(self, sequence: np.ndarray) -> Dict[str, Any]:
         """
         Predict RUL from battery cycle sequence
 
         Args:
-            sequence: Array of shape (sequence_length, num_features)
+            sequence: Array of shape (sequence_length, num_features); for the
+                      attmoe backend a capacity history in Ah (1-D) or cycle
+                      features with a capacity_feature column
 
         Returns:
             Dictionary with RUL prediction and confidence
         """
-        # Convert to tensor
-        sequence_tensor = (
-            torch.tensor(sequence, dtype=torch.float32).unsqueeze(0).to(self.device)
+        if self.model_type == "attmoe":
+            rul_value = float(self._forecast_rul([sequence])[0])
+        else:
+            # Add batch dimension
+            sequence_batch = np.asarray(sequence, dtype=np.float32)[np.newaxis]
+
+            rul_pred = self.runner.run(sequence_batch)
+
+            rul_value = max(0, rul_pred.item())
+
+        result = self._build_prediction(rul_value)
+
+        logger.info(f"RUL prediction: {rul_value:.2f} cycles")
+        return result
+
+    def _capacity_history(self, sequence: np.ndarray) -> np.ndarray:
+        """Capacity column of a cycle sequence (1-D input is used as-is)"""
+        sequence = np.asarray(sequence, dtype=np.float32)
+        if sequence.ndim == 1:
+            return sequence
+        if self.capacity_feature is None:
+            raise ValueError(
+                "The attmoe RUL backend forecasts from capacity: pass a 1-D capacity history "
+                "or set capacity_feature to the capacity column of the cycle sequences"
+            )
+        return sequence[..., self.capacity_feature]
+
+    def _model_input(self, sequence: np.ndarray) -> np.ndarray:
+        """Model-ready input for one cycle sequence (without batch axis)"""
+        if self.model_type == "attmoe":
+            return capacity_windows(
+                [self._capacity_history(sequence)], self.model.feature_size, self.rated_capacity
+            )
+        return np.asarray(sequence, dtype=np.float32)
+
+    def _forecast_rul(self, sequences) -> np.ndarray:
+        """Remaining cycles of each sequence by AttMoE capacity forecasting"""
+        windows = capacity_windows(
+            [self._capacity_history(s) for s in sequences],
+            self.model.feature_size,
+            self.rated_capacity,
+        )
+        return forecast_rul(
+            self.runner.run, windows, self.eol_ratio, max_cycles=self.max_forecast_cycles
+        )
+
+    def _make_stream(self):
+        """Streaming predictor for LSTM models (None for other backends)"""
+        if self.model_type != "lstm":
+            return None
+        return StreamingRULPredictor(
+            self.model,
+            max_batteries=self.config.get("stream_max_batteries", 100000),
         )
 
-        with torch.no_grad():
-            rul_pred = self.model.predict(sequence_tensor)
+    def update_stream(self, battery_id: str, cycle_features: np.ndarray) -> Dict[str, Any]:
+        """
+        Predict RUL incrementally from the newest cycle of one battery
+
+        Only one LSTM step is run; the battery's hidden state and attention
+        accumulators carry the history since its stream started.
+
+        Args:
+            battery_id: battery identifier
+            cycle_features: Array of shape (num_features,)
+
+        Returns:
+            Dictionary with RUL prediction and confidence
+        """
+        if self.stream is None:
+            raise ValueError("Streaming RUL updates require the lstm RUL model")
+        rul_value = max(0, self.stream.update(battery_id, cycle_features))
+        result = self._build_prediction(rul_value)
+        result["stream_cycles"] = self.stream.num_cycles(battery_id)
 
-        rul_value = max(0, rul_pred.item())
+        logger.debug(f"Streaming RUL for {battery_id}: {rul_value:.2f} cycles")
+        return result
 
-        result = {
+    def _build_prediction(self, rul_value: float) -> Dict[str, Any]:
+        """Assemble the prediction dictionary for a RUL value"""
+        return {
             "predicted_rul": rul_value,
             "rul_cycles": int(rul_value),
             "confidence": self._estimate_confidence(rul_value),
@@ -107,18 +260,25 @@ class RULPredictionAgent:
             ),
         }
 
-        logger.info(f"RUL prediction: {rul_value:.2f} cycles")
-        return result
-
     def batch_predict(self, sequences: np.ndarray) -> Dict[str, Any]:
         """Predict RUL for batch of sequences"""
         predictions = []
         rul_values = []
 
-        for seq in sequences:
-            result = self.predict(seq)
-            predictions.append(result)
-            rul_values.append(result["predicted_rul"])
+        if self.model_type == "attmoe":
+            # One batched forecast for all sequences
+            rul_values = [float(v) for v in self._forecast_rul(sequences)]
+            predictions = [self._build_prediction(v) for v in rul_values]
+        elif len({np.shape(seq) for seq in sequences}) == 1:
+            # Equal-length sequences: one forward pass
+            rul_pred = self.runner.run(np.asarray(sequences, dtype=np.float32))
+            rul_values = [max(0, float(v)) for v in np.asarray(rul_pred).reshape(-1)]
+            predictions = [self._build_prediction(v) for v in rul_values]
+        else:
+            for seq in sequences:
+                result = self.predict(seq)
+                predictions.append(result)
+                rul_values.append(result["predicted_rul"])
 
         return {
             "num_sequences": len(sequences),
@@ -167,35 +327,70 @@ class RULPredictionAgent:
         else:
             return "CRITICAL: Battery replacement imminent!"
 
-    def train(self, train_loader, val_loader, epochs=50, lr=0.001):
-        """Train the RUL prediction model"""
-        optimizer = torch.optim.Adam(self.model.parameters(), lr=lr)
+    def train(self, train_loader, val_loader=None, epochs=None, lr=None, **options):
+        """
+        Train the RUL prediction model
+
+        Settings not passed here (epochs, learning rate, early stopping
+        patience, LR schedule, ...) come from the `training` config section;
+        see src/models/trainer.py.
+
+        With the attmoe backend batches are (capacity histories, next-cycle
+        capacity in Ah): histories are 1-D rows (e.g. build_sequences
+        windows) or cycle sequences with a capacity_feature column, and are
+        turned into normalized windows like at inference time.
+
+        Returns:
+            Per-epoch training history
+        """
         criterion = torch.nn.MSELoss()
-        self.model.train()
 
-        for epoch in range(epochs):
-            total_loss = 0.0
-            for sequences, targets in train_loader:
-                sequences = sequences.to(self.device)
-                targets = targets.to(self.device).unsqueeze(1)
+        def loss_fn(model, batch):
+            sequences, targets = batch
+            if self.model_type != "attmoe":
+                return criterion(model(sequences), targets.unsqueeze(1))
 
-                optimizer.zero_grad()
-                outputs = self.model(sequences)
-                loss = criterion(outputs, targets)
-                loss.backward()
-                optimizer.step()
+            histories = sequences.float().cpu().numpy()
+            windows = capacity_windows(
+                [self._capacity_history(h) for h in histories],
+                model.feature_size,
+                self.rated_capacity,
+            )
+            windows = torch.from_numpy(windows)[:, None, :].to(targets.device)
+            loss = criterion(model(windows), targets.reshape(-1, 1) / self.rated_capacity)
+            if model.training:
+                loss = loss + self.config.get("aux_loss_coef", 0.01) * model.aux_loss
+            return loss
 
-                total_loss += loss.item()
+        trainer = Trainer(
+            self.model,
+            loss_fn,
+            device=self.device,
+            precision=self.precision,
+            **training_options(self.config.get("training", {}), epochs=epochs, lr=lr, **options),
+        )
+        history = trainer.fit(train_loader, val_loader)
 
-            avg_loss = total_loss / len(train_loader)
-            logger.info(f"Epoch [{epoch+1}/{epochs}], Loss: {avg_loss:.4f}")
+        self.runner.build()
+        if self.stream is not None:
+            self.stream.clear()
+        return history
 
     def save(self, filepath: str):
         """Save model checkpoint"""
-        torch.save(self.model.state_dict(), filepath)
+        save_checkpoint(self.model, filepath)
         logger.info(f"Model saved to {filepath}")
 
     def load(self, filepath: str):
         """Load model checkpoint"""
-        self.model.load_state_dict(torch.load(filepath, map_location=self.device))
+        self.set_model(load_checkpoint(filepath, self.model, map_location=self.device))
         logger.info(f"Model loaded from {filepath}")
+
+    def set_model(self, model):
+        """Serve a different (already loaded) model"""
+        self.model = model
+        self.variant = self.model.architecture["variant"]
+        self.model_type = "attmoe" if self.model.architecture["modality"] == "attmoe" else "lstm"
+        self.runner.model = self.model
+        self.runner.build()
+        self.stream = self._make_stream()  # states were computed with the old weights
@@ -3,7 +3,10 @@
 from typing import Dict, Any
 import torch
 import numpy as np
-from src.models import ThermalCNN
+from src.models.mixed_precision import check_precision
+from src.models.model_runner import ModelRunner
+from src.models.trainer import Trainer, training_options
+from src.models.model_zoo import build_model, resolve_variant, save_checkpoint, load_checkpoint
 from src.utils import setup_logger
 
 logger = setup_logger("ThermalAgent")
@@ -12,65 +15,92 @@ logger = setup_logger("ThermalAgent")
 class ThermalAnomalyAgent:
     """Agent for detecting thermal anomalies in battery systems"""
 
-    def __init__(self, config=None):
+    def __init__(self, config=None, model=None):
         self.config = config or {}
-        self.model = ThermalCNN(
-            input_channels=3,
-            num_classes=2,
-            dropout_rate=self.config.get("dropout_rate", 0.3),
-        )
+
+        if model is not None:
+            # Already built (e.g. mapped from a checkpoint bundle)
+            self.model = model
+            self.variant = model.architecture["variant"]
+        else:
+            # Model variant: tiny/base/large, or "auto" to fit latency_budget_ms
+            input_height, input_width, input_channels = self.config.get("input_shape", [8, 8, 1])
+            self.variant = resolve_variant(
+                "thermal",
+                self.config,
+                input_channels=input_channels,
+                thermal_size=(input_height, input_width),
+            )
+            self.model = build_model(
+                "thermal",
+                self.variant,
+                input_channels=input_channels,
+                num_classes=self.config.get("num_classes", 2),
+                dropout_rate=self.config.get("dropout_rate", 0.3),
+            )
         self.threshold = self.config.get("threshold", 0.7)
-        self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        quantization = self.config.get("quantization", "none")
+        backend = self.config.get("backend", "torch")
+        use_cuda = quantization == "none" and backend == "torch"
+        self.device = torch.device(
+            "cuda" if torch.cuda.is_available() and use_cuda else "cpu"
+        )
         self.model.to(self.device)
 
-        logger.info(f"ThermalAnomalyAgent initialized on {self.device}")
+        # Mixed precision for train() and inference (float32 | bfloat16 | float16)
+        self.precision = check_precision(self.config.get("precision", "float32"))
+
+        # Shared inference hot path (eval mode, quantization/ONNX, timing)
+        self.runner = ModelRunner(
+            self.model,
+            task="classification",
+            device=self.device,
+            quantization=quantization,
+            backend=backend,
+            onnx_path=self.config.get("onnx_path", "models/onnx/thermal_cnn.onnx"),
+            calibration_path=self.config.get("calibration_path", "models/calibration/thermal.npy"),
+            intra_op_threads=self.config.get("intra_op_threads", 0),
+            inter_op_threads=self.config.get("inter_op_threads", 0),
+            cpu_affinity=self.config.get("cpu_affinity"),
+            precision=self.precision,
+            max_batch_size=self.config.get("max_batch_size", 1),
+            max_batch_latency_ms=self.config.get("max_batch_latency_ms", 5.0),
+        )
+        logger.info(f"Inference path: {self.runner.build(export=False)}")
+
+        logger.info(f"ThermalAnomalyAgent initialized on {self.device} ({self.variant} variant)")
 
     def analyze(self, thermal_image: np.ndarray, temperature: float = None) -> Dict[str, Any]:
         """
         Analyze thermal image for anomalies
 
         Args:
-            thermal_image: Array of flexible shape (will be converted to 3xHxW)
+            thermal_image: Array of flexible shape (will be converted to CxHxW)
             temperature: Scalar temperature reading
 
         Returns:
             Dictionary with analysis results
         """
-        # Handle flexible input shapes
-        if thermal_image.ndim == 2:
-            # If 2D, convert to 3-channel
-            thermal_image = np.stack([thermal_image, thermal_image, thermal_image], axis=0)
-        elif thermal_image.ndim == 3 and thermal_image.shape[0] != 3:
-            # If shape is (H, W, C), permute to (C, H, W)
-            if thermal_image.shape[2] in [1, 3]:
-                thermal_image = np.transpose(thermal_image, (2, 0, 1))
-                # If single channel, replicate to 3 channels
-                if thermal_image.shape[0] == 1:
-                    thermal_image = np.repeat(thermal_image, 3, axis=0)
-        elif thermal_image.ndim == 3 and thermal_image.shape[0] == 3:
-            pass  # Already (C, H, W)
-        else:
-            # Flatten and reshape to (3, 32, 32)
-            thermal_image = thermal_image.flatten()[:3072].reshape(3, 32, 32)
-        
-        # Normalize image
-        image_normalized = thermal_image / (thermal_image.max() + 1e-6) if thermal_image.max() > 1 else thermal_image
-        image_tensor = (
-            torch.tensor(image_normalized, dtype=torch.float32)
-            .unsqueeze(0)
-            .to(self.device)
-        )
+        image_batch = self._prepare_image(thermal_image)[np.newaxis]
 
         # Get predictions
-        predictions, probs = self.model.predict(image_tensor)
+        predictions, probs = self.runner.run(image_batch)
+        result = self._build_result(probs[0], temperature)
 
-        is_anomalous = probs[0, 1].item() > self.threshold
-        anomaly_score = probs[0, 1].item()
+        logger.info(
+            f"Thermal analysis: anomaly={result['is_anomalous']}, score={result['anomaly_score']:.3f}"
+        )
+        return result
+
+    def _build_result(self, probs: np.ndarray, temperature: float = None) -> Dict[str, Any]:
+        """Assemble the analysis dictionary from one image's class probabilities"""
+        anomaly_score = probs[1].item()
+        is_anomalous = anomaly_score > self.threshold
 
         result = {
             "is_anomalous": is_anomalous,
             "anomaly_score": anomaly_score,
-            "confidence": max(probs[0].cpu().numpy()),
+            "confidence": float(probs.max()),
             "risk_level": self._calculate_risk_level(anomaly_score),
             "risk_score": anomaly_score,
             "recommendation": self._get_recommendation(anomaly_score),
@@ -84,20 +114,45 @@ class ThermalAnomalyAgent:
         if temperature and temperature < 0:
             result['anomalies'].append(f'Low temperature: {temperature:.1f}°C')
 
-        logger.info(
-            f"Thermal analysis: anomaly={is_anomalous}, score={anomaly_score:.3f}"
-        )
         return result
 
-    def batch_analyze(self, thermal_images: np.ndarray) -> Dict[str, Any]:
-        """Analyze batch of thermal images"""
-        results = []
-        anomaly_scores = []
+    def _prepare_image(self, thermal_image: np.ndarray) -> np.ndarray:
+        """Convert a thermal image of flexible shape to the model's normalized (C, H, W)"""
+        channels = self.model.input_channels
+
+        if thermal_image.ndim == 2:
+            image = thermal_image[np.newaxis]
+        elif thermal_image.ndim == 3 and thermal_image.shape[0] in (1, 3):
+            image = thermal_image  # Already (C, H, W)
+        elif thermal_image.ndim == 3 and thermal_image.shape[2] in (1, 3):
+            image = np.transpose(thermal_image, (2, 0, 1))  # (H, W, C) -> (C, H, W)
+        else:
+            # Flatten and reshape to (C, 32, 32)
+            image = thermal_image.flatten()[: channels * 1024].reshape(channels, 32, 32)
 
-        for image in thermal_images:
-            result = self.analyze(image)
-            results.append(result)
-            anomaly_scores.append(result["anomaly_score"])
+        # Single-channel models average pseudo-colour channels; RGB models replicate
+        if image.shape[0] != channels:
+            if channels == 1:
+                image = image.mean(axis=0, keepdims=True)
+            else:
+                image = np.repeat(image[:1], channels, axis=0)
+
+        # Normalize image
+        image = image / (image.max() + 1e-6) if image.max() > 1 else image
+        return np.asarray(image, dtype=np.float32)
+
+    def batch_analyze(self, thermal_images: np.ndarray, temperatures=None) -> Dict[str, Any]:
+        """Analyze batch of thermal images in one forward pass"""
+        image_batch = np.stack([self._prepare_image(image) for image in thermal_images])
+        predictions, probs = self.runner.run(image_batch)
+
+        if temperatures is None:
+            temperatures = [None] * len(image_batch)
+        results = [self._build_result(p, t) for p, t in zip(probs, temperatures)]
+        anomaly_scores = [r["anomaly_score"] for r in results]
+        logger.info(
+            f"Thermal batch analysis: {sum(r['is_anomalous'] for r in results)}/{len(results)} anomalous"
+        )
 
         return {
             "num_images": len(thermal_images),
@@ -125,35 +180,60 @@ class ThermalAnomalyAgent:
         else:
             return "CRITICAL: Immediate inspection required. Consider emergency shutdown."
 
-    def train(self, train_loader, val_loader, epochs=50, lr=0.001):
-        """Train the thermal anomaly model"""
-        optimizer = torch.optim.Adam(self.model.parameters(), lr=lr)
+    def train(self, train_loader, val_loader=None, epochs=None, lr=None, **options):
+        """
+        Train the thermal anomaly model
+
+        Settings not passed here (epochs, learning rate, early stopping
+        patience, LR schedule, ...) come from the `training` config section;
+        see src/models/trainer.py.
+
+        Returns:
+            Per-epoch training history
+        """
         criterion = torch.nn.CrossEntropyLoss()
-        self.model.train()
 
-        for epoch in range(epochs):
-            total_loss = 0.0
-            for images, labels in train_loader:
-                images = images.to(self.device)
-                labels = labels.to(self.device)
+        def loss_fn(model, batch):
+            images, labels = batch
+            return criterion(model(images), labels.long())  # BatteryDataset stores float targets
 
-                optimizer.zero_grad()
-                outputs = self.model(images)
-                loss = criterion(outputs, labels)
-                loss.backward()
-                optimizer.step()
+        trainer = Trainer(
+            self.model,
+            loss_fn,
+            device=self.device,
+            precision=self.precision,
+            **training_options(self.config.get("training", {}), epochs=epochs, lr=lr, **options),
+        )
+        history = trainer.fit(train_loader, val_loader)
 
-                total_loss += loss.item()
+        self.runner.build()
+        return history
+
+    def quantize(self, calibration_data):
+        """
+        Calibrate and apply static int8 quantization
 
-            avg_loss = total_loss / len(train_loader)
-            logger.info(f"Epoch [{epoch+1}/{epochs}], Loss: {avg_loss:.4f}")
+        The inputs are saved to calibration_path and reused whenever the
+        model is rebuilt (train, load) or the agent is constructed again.
+
+        Args:
+            calibration_data: model-ready input batch(es)
+        """
+        logger.info(f"Inference path: {self.runner.calibrate(calibration_data)}")
 
     def save(self, filepath: str):
         """Save model checkpoint"""
-        torch.save(self.model.state_dict(), filepath)
+        save_checkpoint(self.model, filepath)
         logger.info(f"Model saved to {filepath}")
 
     def load(self, filepath: str):
         """Load model checkpoint"""
-        self.model.load_state_dict(torch.load(filepath, map_location=self.device))
+        self.set_model(load_checkpoint(filepath, self.model, map_location=self.device))
         logger.info(f"Model loaded from {filepath}")
+
+    def set_model(self, model):
+        """Serve a different (already loaded) model"""
+        self.model = model
+        self.variant = self.model.architecture["variant"]
+        self.runner.model = self.model
+        self.runner.build()
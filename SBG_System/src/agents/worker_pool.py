@@ -0,0 +1,470 @@
+"""Multi-process inference worker pool sharing memory-mapped model weights"""
+
+import itertools
+import os
+import pickle
+import queue
+import shutil
+import tempfile
+import threading
+import zlib
+import multiprocessing as mp
+from concurrent.futures import Future
+from typing import Any, Dict, List
+import numpy as np
+
+from src.utils import setup_logger
+
+logger = setup_logger("WorkerPool")
+
+_READY = "__ready__"
+
+
+def worker_core_sets(num_workers, threads_per_worker):
+    """
+    Split the cores this process may use into one set per worker
+
+    Each worker gets threads_per_worker consecutive cores; with more workers
+    than cores the assignment wraps around.
+    """
+    cores = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else []
+    if not cores:
+        return [None] * num_workers
+    return [
+        [cores[(worker_id * threads_per_worker + i) % len(cores)] for i in range(threads_per_worker)]
+        for worker_id in range(num_workers)
+    ]
+
+
+def _worker_main(worker_id, bundle_path, config, requests, results, cores=None, engine="torch"):
+    """
+    Worker process: load the bundle once, then serve requests until None
+
+    Requests are (request_id, method, args, kwargs) where method is a dotted
+    path on the orchestrator ("comprehensive_assessment",
+    "thermal_agent.analyze", ...), or with engine="onnx" on the exported
+    models ("rul_lstm.predict", ...). Replies are (request_id, ok, pickled
+    result or exception); pickling here rather than in the queue's feeder
+    thread means an unpicklable result is reported instead of lost.
+    """
+    if cores:
+        # Pin before torch starts its thread pools so they inherit the cores
+        os.sched_setaffinity(0, cores)
+
+    try:
+        if engine == "onnx":
+            # ONNX Runtime sessions only: torch is never imported in this process
+            from src.models.onnx_backend import load_orchestrator_models
+
+            orchestrator = load_orchestrator_models(
+                bundle_path,
+                intra_op_threads=config["inference"]["intra_op_threads"],
+                inter_op_threads=1,
+            )
+        else:
+            from src.agents.orchestrator import BatteryMonitoringOrchestrator
+
+            orchestrator = BatteryMonitoringOrchestrator(config)
+            orchestrator.load_bundle(bundle_path, mmap=True)
+    except Exception as e:
+        results.put((_READY, worker_id, pickle.dumps(RuntimeError(f"worker {worker_id}: {e}"))))
+        return
+    results.put((_READY, worker_id, None))
+
+    while True:
+        item = requests.get()
+        if item is None:
+            break
+        request_id, method, args, kwargs = item
+        try:
+            target = orchestrator
+            for part in method.split("."):
+                target = getattr(target, part)
+            results.put((request_id, True, pickle.dumps(target(*args, **kwargs))))
+        except Exception as e:
+            try:
+                payload = pickle.dumps(e)
+            except Exception:
+                payload = pickle.dumps(RuntimeError(repr(e)))
+            results.put((request_id, False, payload))
+
+
+def _take_rows(batch, rows):
+    """Rows of every per-battery entry of an assess_fleet batch"""
+    return {
+        key: None if value is None
+        else value[rows] if isinstance(value, np.ndarray)
+        else [value[row] for row in rows]
+        for key, value in batch.items()
+    }
+
+
+class RemoteOrchestrator:
+    """
+    Attribute proxy over an InferenceWorkerPool
+
+    pool.remote().thermal_agent.analyze(image) runs
+    orchestrator.thermal_agent.analyze(image) in a worker and returns its
+    result, so call sites written against an orchestrator work unchanged.
+    """
+
+    def __init__(self, pool, path=""):
+        self._pool = pool
+        self._path = path
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return RemoteOrchestrator(self._pool, f"{self._path}.{name}" if self._path else name)
+
+    def __call__(self, *args, **kwargs):
+        return self._pool.call(self._path, *args, **kwargs)
+
+
+class InferenceWorkerPool:
+    """
+    Pool of inference worker processes.
+
+    Every worker builds an orchestrator from the same checkpoint bundle with
+    mmap=True, so model weights live once in the OS page cache no matter how
+    many workers run. Each worker uses `threads_per_worker` torch threads and
+    serves requests from its own queue; the main process routes each request
+    to the worker with the fewest outstanding requests, so CPU-bound
+    preprocessing and model glue run in parallel instead of behind one GIL.
+
+    Per-agent state that changes at inference time (e.g. the anomaly score
+    history) is per worker. Requests with a battery_id keyword argument are
+    routed by a stable hash of it, so each battery's baseline lives in one
+    worker; fleet_anomaly_sketch() merges the workers' anomaly score sketches.
+
+    With engine="onnx" the workers instead open the models exported by
+    export_orchestrator as ONNX Runtime sessions and serve raw model calls
+    ("thermal_cnn.predict", "anomaly_autoencoder.get_anomaly_score", ...)
+    without importing torch, keeping each worker's memory to the runtime
+    and the mapped model files.
+    """
+
+    def __init__(
+        self,
+        bundle_path: str,
+        config: Dict[str, Any] = None,
+        num_workers: int = None,
+        threads_per_worker: int = 1,
+        cpu_affinity=None,
+        start_timeout: float = 120.0,
+        engine: str = "torch",
+    ):
+        """
+        Args:
+            bundle_path: checkpoint bundle written by
+                         BatteryMonitoringOrchestrator.save_bundle (or, with
+                         engine="onnx", the directory written by export_orchestrator)
+            config: orchestrator config for the workers
+            num_workers: worker processes (defaults to the CPU count)
+            threads_per_worker: torch intra-op threads per worker
+            cpu_affinity: None (no pinning), "auto" (threads_per_worker
+                          dedicated cores per worker) or one core list per
+                          worker (Linux only)
+            start_timeout: seconds to wait for every worker to load the bundle
+            engine: "torch" (orchestrators) or "onnx" (ONNX Runtime model sessions)
+        """
+        if engine not in ("torch", "onnx"):
+            raise ValueError(f"Unknown worker engine '{engine}'. Expected 'torch' or 'onnx'")
+        self.bundle_path = bundle_path
+        self.engine = engine
+        self.num_workers = num_workers or os.cpu_count() or 1
+        self.threads_per_worker = threads_per_worker
+
+        config = dict(config or {})
+        config["inference"] = {
+            **config.get("inference", {}),
+            "intra_op_threads": threads_per_worker,
+            "inter_op_threads": 1,
+        }
+
+        if cpu_affinity == "auto":
+            cpu_affinity = worker_core_sets(self.num_workers, threads_per_worker)
+        self.cpu_affinity = cpu_affinity or [None] * self.num_workers
+
+        # spawn: workers must not inherit torch's thread pools from a fork
+        context = mp.get_context("spawn")
+        self._results = context.Queue()
+        self._requests = [context.Queue() for _ in range(self.num_workers)]
+        self._processes = [
+            context.Process(
+                target=_worker_main,
+                args=(
+                    worker_id,
+                    bundle_path,
+                    config,
+                    self._requests[worker_id],
+                    self._results,
+                    self.cpu_affinity[worker_id],
+                    engine,
+                ),
+                daemon=True,
+                name=f"sbg-inference-{worker_id}",
+            )
+            for worker_id in range(self.num_workers)
+        ]
+
+        self._lock = threading.Lock()
+        self._ids = itertools.count()
+        self._pending = {}  # request_id -> (worker_id, future)
+        self._outstanding = [0] * self.num_workers
+        self._ready = [threading.Event() for _ in range(self.num_workers)]
+        self._startup_errors = []
+        self._closed = False
+        self._stopped = False
+        self._temp_dir = None
+
+        for process in self._processes:
+            process.start()
+        self._listener = threading.Thread(target=self._listen, daemon=True)
+        self._listener.start()
+
+        try:
+            self._wait_ready(start_timeout)
+        except Exception:
+            self.close()
+            raise
+        logger.info(
+            f"{self.num_workers} {engine} inference workers ready "
+            f"({threads_per_worker} thread(s) each, weights mapped from {bundle_path})"
+        )
+
+    @classmethod
+    def from_orchestrator(cls, orchestrator, engine="torch", **kwargs) -> "InferenceWorkerPool":
+        """Start a pool serving the current weights of an orchestrator"""
+        temp_dir = tempfile.mkdtemp(prefix="sbg-workers-")
+        try:
+            if engine == "onnx":
+                from src.models.onnx_export import export_orchestrator
+
+                bundle_path = os.path.join(temp_dir, "onnx")
+                export_orchestrator(orchestrator, bundle_path)
+            else:
+                bundle_path = os.path.join(temp_dir, "orchestrator.safetensors")
+                orchestrator.save_bundle(bundle_path)
+            pool = cls(bundle_path, config=orchestrator.config, engine=engine, **kwargs)
+        except Exception:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            raise
+        pool._temp_dir = temp_dir
+        return pool
+
+    def _wait_ready(self, timeout):
+        """Block until every worker has loaded the bundle"""
+        for worker_id, event in enumerate(self._ready):
+            if not event.wait(timeout):
+                raise TimeoutError(f"Inference worker {worker_id} did not start in {timeout}s")
+            if self._startup_errors:
+                raise self._startup_errors[0]
+            if not self._processes[worker_id].is_alive():
+                raise RuntimeError(f"Inference worker {worker_id} exited during startup")
+
+    def _listen(self):
+        """Resolve futures from worker replies; fail requests of dead workers"""
+        while True:
+            try:
+                request_id, ok, payload = self._results.get(timeout=0.5)
+            except queue.Empty:
+                if self._stopped:
+                    return
+                self._fail_dead_workers()
+                continue
+            except (EOFError, OSError):
+                return
+
+            if request_id == _READY:
+                if payload is not None:
+                    self._startup_errors.append(pickle.loads(payload))
+                self._ready[ok].set()
+                continue
+
+            with self._lock:
+                worker_id, future = self._pending.pop(request_id, (None, None))
+                if future is None:
+                    continue  # already failed by _fail_dead_workers
+                self._outstanding[worker_id] -= 1
+            result = pickle.loads(payload)
+            if ok:
+                future.set_result(result)
+            else:
+                future.set_exception(result)
+
+    def _fail_dead_workers(self):
+        """Fail the outstanding requests of workers that exited"""
+        dead = {
+            worker_id
+            for worker_id, process in enumerate(self._processes)
+            if not process.is_alive()
+        }
+        if not dead:
+            return
+        with self._lock:
+            lost = [
+                (request_id, worker_id, future)
+                for request_id, (worker_id, future) in self._pending.items()
+                if worker_id in dead
+            ]
+            for request_id, worker_id, _ in lost:
+                del self._pending[request_id]
+                self._outstanding[worker_id] -= 1
+        for _, worker_id, future in lost:
+            future.set_exception(RuntimeError(f"Inference worker {worker_id} exited"))
+        for worker_id in dead:
+            self._ready[worker_id].set()  # unblock _wait_ready
+
+    def submit(self, method: str, *args, **kwargs) -> Future:
+        """
+        Run an orchestrator method in a worker
+
+        Args:
+            method: dotted path on the orchestrator, e.g. "thermal_agent.analyze"
+            *args, **kwargs: picklable call arguments; pass battery_id as a
+                             keyword so per-battery state stays in one worker
+
+        Returns:
+            Future resolving to the method's return value
+        """
+        return self._submit(None, method, args, kwargs)
+
+    def _battery_worker(self, battery_id, alive):
+        """Worker that owns a battery's state (stable across calls and processes)"""
+        worker_id = zlib.crc32(str(battery_id).encode("utf-8")) % self.num_workers
+        if worker_id in alive:
+            return worker_id
+        return alive[worker_id % len(alive)]
+
+    def _submit(self, worker_id, method, args, kwargs) -> Future:
+        """
+        Queue a request on a worker (None: the battery_id's worker, otherwise
+        the one with the fewest outstanding requests)
+        """
+        if any(part.startswith("_") for part in method.split(".")):
+            raise ValueError(f"Cannot call private method {method!r} in a worker")
+
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Inference worker pool is closed")
+            alive = [
+                index
+                for index, process in enumerate(self._processes)
+                if process.is_alive()
+            ]
+            if not alive:
+                raise RuntimeError("No inference workers are running")
+            if worker_id is None and kwargs.get("battery_id") is not None:
+                worker_id = self._battery_worker(kwargs["battery_id"], alive)
+            elif worker_id is None:
+                worker_id = min(alive, key=self._outstanding.__getitem__)
+            elif worker_id not in alive:
+                raise RuntimeError(f"Inference worker {worker_id} is not running")
+            request_id = next(self._ids)
+            self._pending[request_id] = (worker_id, future)
+            self._outstanding[worker_id] += 1
+        self._requests[worker_id].put((request_id, method, args, kwargs))
+        return future
+
+    def broadcast(self, method: str, *args, timeout: float = None, **kwargs) -> List[Any]:
+        """Run an orchestrator method once in every running worker"""
+        alive = [
+            worker_id
+            for worker_id, process in enumerate(self._processes)
+            if process.is_alive()
+        ]
+        futures = [self._submit(worker_id, method, args, kwargs) for worker_id in alive]
+        return [future.result(timeout) for future in futures]
+
+    def fleet_anomaly_sketch(self, timeout: float = None):
+        """
+        Anomaly score quantile sketch over every worker's scores
+
+        Each worker keeps its own sketch; merging them gives fleet-wide
+        percentiles (e.g. pool.fleet_anomaly_sketch().quantile(0.9))
+        without collecting raw scores.
+        """
+        from src.models.quantile_sketch import KLLSketch
+
+        states = self.broadcast("anomaly_agent.sketch_state", timeout=timeout)
+        sketch = KLLSketch.from_state_dict(states[0])
+        for state in states[1:]:
+            sketch.merge(KLLSketch.from_state_dict(state))
+        return sketch
+
+    def assess_fleet(self, batch: Dict[str, Any], timeout: float = None) -> List[Dict[str, Any]]:
+        """
+        Orchestrator.assess_fleet across the workers
+
+        With battery_ids each worker assesses the batteries whose state it
+        owns (see submit); without them the whole batch runs in one worker.
+        Assessments come back in batch order.
+        """
+        battery_ids = batch.get("battery_ids")
+        if battery_ids is None:
+            return self.call("assess_fleet", batch, timeout=timeout)
+
+        alive = [
+            worker_id
+            for worker_id, process in enumerate(self._processes)
+            if process.is_alive()
+        ]
+        if not alive:
+            raise RuntimeError("No inference workers are running")
+        rows_by_worker = {}
+        for row, battery_id in enumerate(battery_ids):
+            rows_by_worker.setdefault(self._battery_worker(battery_id, alive), []).append(row)
+
+        futures = {
+            worker_id: self._submit(worker_id, "assess_fleet", (_take_rows(batch, rows),), {})
+            for worker_id, rows in rows_by_worker.items()
+        }
+        assessments = [None] * len(battery_ids)
+        for worker_id, rows in rows_by_worker.items():
+            for row, assessment in zip(rows, futures[worker_id].result(timeout)):
+                assessments[row] = assessment
+        return assessments
+
+    def call(self, method: str, *args, timeout: float = None, **kwargs):
+        """Run an orchestrator method in a worker and wait for the result"""
+        return self.submit(method, *args, **kwargs).result(timeout)
+
+    def map(self, method: str, arg_tuples, timeout: float = None) -> List[Any]:
+        """Run a method once per argument tuple across the workers, in order"""
+        futures = [self.submit(method, *args) for args in arg_tuples]
+        return [future.result(timeout) for future in futures]
+
+    def remote(self) -> RemoteOrchestrator:
+        """Orchestrator-shaped proxy whose method calls run in the workers"""
+        return RemoteOrchestrator(self)
+
+    def close(self, timeout: float = 10.0):
+        """Stop the workers (after their queued requests) and clean up"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+
+        for requests, process in zip(self._requests, self._processes):
+            if process.is_alive():
+                requests.put(None)
+        for process in self._processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+        self._stopped = True
+        self._listener.join()
+        self._fail_dead_workers()
+
+        if self._temp_dir:
+            shutil.rmtree(self._temp_dir, ignore_errors=True)
+        logger.info("Inference workers stopped")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
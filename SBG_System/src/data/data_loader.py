@@ -4,6 +4,7 @@ import numpy as np
 import pandas as pd
 import torch
 from torch.utils.data import Dataset, DataLoader
+from torch.utils.data.distributed import DistributedSampler
 
 
 class BatteryDataset(Dataset):
@@ -26,6 +27,118 @@ class BatteryDataset(Dataset):
             return x, self.y[idx]
         return x
 
+    def __getitems__(self, indices):
+        """
+        Fetch a whole batch with one indexing operation
+
+        The DataLoader calls this instead of __getitem__ per sample;
+        per-sample transforms still run sample by sample.
+        """
+        if self.transform:
+            return [self[idx] for idx in indices]
+        index = torch.as_tensor(indices)
+        if self.y is not None:
+            return StackedBatch((self.X[index], self.y[index]))
+        return StackedBatch((self.X[index],))
+
+
+class StackedBatch(tuple):
+    """Samples already stacked along the batch dimension (see __getitems__)"""
+
+
+def _as_batch_tensor(values):
+    """Stack samples into a contiguous tensor: float32 for floats, int64 for integers"""
+    if isinstance(values, torch.Tensor):
+        tensor = values
+    elif isinstance(values[0], torch.Tensor):
+        tensor = torch.stack(values)
+    else:
+        tensor = torch.as_tensor(np.stack(values))
+    if tensor.is_floating_point():
+        tensor = tensor.to(torch.float32)
+    elif tensor.dtype != torch.bool:
+        tensor = tensor.to(torch.int64)
+    return tensor.contiguous()
+
+
+class BatchCollator:
+    """
+    Collate samples into contiguous float32 batches, then augment the batch.
+
+    Augmentations are vectorized over the whole input batch and, with
+    num_workers > 0, run inside the loader's worker processes.
+    """
+
+    def __init__(self, augment=None):
+        """
+        Args:
+            augment: callable mapping an input batch tensor to an augmented one
+        """
+        self.augment = augment
+
+    def __call__(self, samples):
+        if isinstance(samples, StackedBatch):
+            fields = list(samples)
+        elif isinstance(samples[0], (tuple, list)):
+            fields = [list(field) for field in zip(*samples)]
+        else:
+            fields = [samples]
+
+        batch = [_as_batch_tensor(field) for field in fields]
+        if self.augment is not None:
+            batch[0] = self.augment(batch[0]).contiguous()
+        return tuple(batch) if len(batch) > 1 else batch[0]
+
+
+class GaussianNoise:
+    """Add N(0, std^2) noise to every value of a batch"""
+
+    def __init__(self, std=0.01):
+        self.std = std
+
+    def __call__(self, batch):
+        return batch + torch.randn_like(batch) * self.std
+
+
+class RandomScale:
+    """Scale each sample by a factor drawn uniformly from [low, high]"""
+
+    def __init__(self, low=0.95, high=1.05):
+        self.low = low
+        self.high = high
+
+    def __call__(self, batch):
+        shape = (len(batch),) + (1,) * (batch.dim() - 1)
+        factors = torch.empty(shape, dtype=batch.dtype).uniform_(self.low, self.high)
+        return batch * factors
+
+
+class RandomFlip:
+    """Flip a random half of the samples along one dimension (e.g. image width)"""
+
+    def __init__(self, dim=-1, p=0.5):
+        self.dim = dim
+        self.p = p
+
+    def __call__(self, batch):
+        flip = torch.rand(len(batch)) < self.p
+        if flip.any():
+            batch = batch.clone()
+            batch[flip] = batch[flip].flip(self.dim)
+        return batch
+
+
+class Compose:
+    """Apply batch augmentations in order"""
+
+    def __init__(self, *augmentations):
+        self.augmentations = augmentations
+
+    def __call__(self, batch):
+        for augment in self.augmentations:
+            batch = augment(batch)
+        return batch
+
 
 class BatteryDataLoader:
     """Utilities for loading battery data"""
@@ -61,7 +174,61 @@ class BatteryDataLoader:
         return X_normalized, mean, std
 
     @staticmethod
-    def create_dataloader(X, y=None, batch_size=32, shuffle=True):
-        """Create PyTorch DataLoader"""
+    def create_dataloader(
+        X,
+        y=None,
+        batch_size=32,
+        shuffle=True,
+        num_workers=0,
+        prefetch_factor=2,
+        persistent_workers=False,
+        pin_memory=False,
+        augment=None,
+        drop_last=False,
+        distributed=False,
+    ):
+        """
+        Create PyTorch DataLoader
+
+        Args:
+            X: inputs
+            y: targets (optional)
+            batch_size: samples per batch
+            shuffle: reshuffle every epoch
+            num_workers: loader worker processes (0 = load in the calling process)
+            prefetch_factor: batches each worker keeps ready ahead of training
+            persistent_workers: keep workers alive between epochs
+            pin_memory: page-locked batches for faster host-to-GPU copies
+            augment: batch augmentation applied to the inputs (e.g. GaussianNoise)
+            drop_last: drop the final incomplete batch
+            distributed: give each torch.distributed rank its own shard
+                         (DistributedSampler; every rank gets the same
+                         number of batches)
+
+        Returns:
+            DataLoader yielding contiguous float32 input batches
+        """
         dataset = BatteryDataset(X, y)
-        return DataLoader(dataset, batch_size=batch_size, shuffle=shuffle)
+        workers = num_workers > 0
+        sampler = None
+        if distributed:
+            sampler = DistributedSampler(dataset, shuffle=shuffle, drop_last=drop_last)
+            shuffle = False  # the sampler shuffles (call set_epoch per epoch)
+        return DataLoader(
+            dataset,
+            batch_size=batch_size,
+            shuffle=shuffle,
+            sampler=sampler,
+            num_workers=num_workers,
+            prefetch_factor=prefetch_factor if workers else None,
+            persistent_workers=persistent_workers and workers,
+            pin_memory=pin_memory and torch.cuda.is_available(),
+            collate_fn=BatchCollator(augment),
+            drop_last=drop_last,
+        )
+
+    @staticmethod
+    def loader_options(config):
+        """create_dataloader keyword arguments from the `data` config section"""
+        keys = ("batch_size", "num_workers", "prefetch_factor", "persistent_workers", "pin_memory")
+        return {key: config[key] for key in keys if key in config}
@@ -0,0 +1,259 @@
+"""Incremental per-battery feature extraction for streaming telemetry"""
+
+import math
+import time
+from collections import OrderedDict
+import numpy as np
+
+from src.models.quantile_sketch import KLLSketch
+
+# Columns BatteryDataPreprocessor.extract_anomaly_features reads, in feature order
+ANOMALY_COLUMNS = ("V", "I", "T", "Internal_Resistance_Ohm_")
+
+# extract_rul_features: (state key, column, statistic, default when the column is missing)
+RUL_STATE = (
+    ("voltage", "V", "mean", 3.7),
+    ("current", "I", "mean", 0.0),
+    ("soc", "SOC", "mean", 0.5),
+    ("temperature", "T", "mean", 25.0),
+    ("charge_capacity", "ChargeCapacityAh", "max", 2.0),
+    ("discharge_capacity", "Discharge_CapacityAh", "max", 2.0),
+    ("impedance", "Internal_Resistance_Ohm_", "mean", 0.1),
+    ("cycle_count", "Cycle_Index", "max", 1),
+)
+
+TRACKED_COLUMNS = tuple(dict.fromkeys(ANOMALY_COLUMNS + tuple(c for _, c, _, _ in RUL_STATE)))
+
+NUM_ANOMALY_FEATURES = 20
+NOMINAL_CAPACITY_AH = 2.0
+
+
+class RunningMoments:
+    """Count, mean, population std, min and max of a stream (Welford; batches merge with Chan's formula)"""
+
+    __slots__ = ("count", "mean", "m2", "min", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def update(self, value):
+        """Add one value"""
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def update_many(self, values):
+        """Add an array of values"""
+        count = len(values)
+        if count == 0:
+            return
+        mean = float(values.mean())
+        m2 = float(((values - mean) ** 2).sum())
+        total = self.count + count
+        delta = mean - self.mean
+        self.m2 += m2 + delta * delta * self.count * count / total
+        self.mean += delta * count / total
+        self.count = total
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+    @property
+    def std(self):
+        """Population standard deviation (like np.std)"""
+        return math.sqrt(max(self.m2, 0.0) / self.count) if self.count else 0.0
+
+
+class BatteryFeatureAccumulator:
+    """
+    Running state behind one battery's anomaly and RUL feature vectors.
+
+    Each V/I/T/R (and SOC, capacity, cycle index) reading updates Welford
+    moments and min/max in O(1); voltage percentiles and current-spike
+    counts come from KLL sketches of the voltage and of |dI| between
+    consecutive readings. anomaly_features() and rul_features() return what
+    BatteryDataPreprocessor.extract_anomaly_features / extract_rul_features
+    return for all readings so far: means, stds, minima and maxima match to
+    float precision, the 5-95 percentile range and the spike share are
+    approximate (rank error ~1.7/sketch_k). Missing (NaN) readings are
+    skipped, like pandas does.
+    """
+
+    def __init__(self, sketch_k=64, seed=None):
+        """
+        Args:
+            sketch_k: KLL accuracy parameter for the percentile and spike features
+            seed: seed for the sketches' compaction offsets (None = nondeterministic)
+        """
+        self.moments = {}  # column -> RunningMoments, for columns seen so far
+        self.voltage_sketch = KLLSketch(sketch_k, seed=seed)
+        self.current_step_sketch = KLLSketch(sketch_k, seed=seed)  # |I[t] - I[t-1]|
+        self.last_current = None
+
+    def __len__(self):
+        """Readings folded in (per most-reported column)"""
+        return max((m.count for m in self.moments.values()), default=0)
+
+    def update(self, sample):
+        """
+        Add one reading
+
+        Args:
+            sample: mapping of column name to value (dict, pandas Series, ...)
+        """
+        for column in TRACKED_COLUMNS:
+            value = sample.get(column)
+            if value is None:
+                continue
+            value = float(value)
+            if value != value:  # NaN
+                continue
+            moments = self.moments.get(column)
+            if moments is None:
+                moments = self.moments[column] = RunningMoments()
+            moments.update(value)
+            if column == "V":
+                self.voltage_sketch.update(value)
+            elif column == "I":
+                if self.last_current is not None:
+                    self.current_step_sketch.update(abs(value - self.last_current))
+                self.last_current = value
+
+    def update_frame(self, df):
+        """Add every row of a DataFrame of new readings (vectorized)"""
+        for column in TRACKED_COLUMNS:
+            if column not in df.columns:
+                continue
+            values = df[column].to_numpy(dtype=np.float64)
+            values = values[~np.isnan(values)]
+            if len(values) == 0:
+                continue
+            self.moments.setdefault(column, RunningMoments()).update_many(values)
+            if column == "V":
+                self.voltage_sketch.update_many(values)
+            elif column == "I":
+                previous = [] if self.last_current is None else [self.last_current]
+                self.current_step_sketch.update_many(np.abs(np.diff(np.concatenate([previous, values]))))
+                self.last_current = float(values[-1])
+
+    def anomaly_features(self):
+        """Feature vector of extract_anomaly_features (float32, length 20)"""
+        features = []
+
+        voltage = self.moments.get("V")
+        if voltage is not None:
+            p5, p95 = self.voltage_sketch.quantile([0.05, 0.95])
+            features.extend([voltage.mean, voltage.std, voltage.max, voltage.min, p95 - p5])
+
+        current = self.moments.get("I")
+        if current is not None:
+            steps = self.current_step_sketch
+            spikes = len(steps) * (1.0 - steps.rank(current.std * 3)) if len(steps) else 0.0
+            features.extend([current.mean, current.std, current.max, current.min, spikes / current.count])
+
+        temperature = self.moments.get("T")
+        if temperature is not None:
+            features.extend([temperature.mean, temperature.std, temperature.max, temperature.min])
+
+        resistance = self.moments.get("Internal_Resistance_Ohm_")
+        if resistance is not None:
+            features.extend([resistance.mean, resistance.std])
+
+        features.extend([0.0] * (NUM_ANOMALY_FEATURES - len(features)))
+        return np.array(features[:NUM_ANOMALY_FEATURES]).astype(np.float32)
+
+    def rul_features(self, capacity_fade_threshold=0.8):
+        """(state_features, capacity_fade) of extract_rul_features"""
+        state_features = {}
+        for key, column, statistic, default in RUL_STATE:
+            moments = self.moments.get(column)
+            state_features[key] = getattr(moments, statistic) if moments is not None else default
+        capacity_fade = state_features["discharge_capacity"] / (NOMINAL_CAPACITY_AH + 1e-6)
+        return state_features, capacity_fade
+
+
+class StreamingFeatureExtractor:
+    """
+    Per-battery feature accumulators for live monitoring.
+
+    Ingesting a reading costs O(1) regardless of how much history a
+    battery has, and feature vectors are available at any time. Batteries
+    are evicted least-recently-used beyond max_batteries, like
+    StreamingRULPredictor states.
+    """
+
+    def __init__(self, max_batteries=100000, sketch_k=64, seed=None):
+        """
+        Args:
+            max_batteries: accumulators kept before least-recently-used eviction
+            sketch_k: KLL accuracy parameter of each accumulator
+            seed: sketch seed of each accumulator (None = nondeterministic)
+        """
+        self.max_batteries = max_batteries
+        self.sketch_k = sketch_k
+        self.seed = seed
+        self.accumulators = OrderedDict()
+        self.last_seen = {}
+
+    def __len__(self):
+        return len(self.accumulators)
+
+    def __contains__(self, battery_id):
+        return battery_id in self.accumulators
+
+    def accumulator(self, battery_id):
+        """A battery's accumulator (created on first use)"""
+        accumulator = self.accumulators.get(battery_id)
+        if accumulator is None:
+            accumulator = BatteryFeatureAccumulator(self.sketch_k, self.seed)
+            self.accumulators[battery_id] = accumulator
+        self.accumulators.move_to_end(battery_id)
+        self.last_seen[battery_id] = time.time()
+        while len(self.accumulators) > self.max_batteries:
+            self.evict(next(iter(self.accumulators)))
+        return accumulator
+
+    def update(self, battery_id, sample):
+        """Add one reading (mapping of column name to value) for a battery"""
+        self.accumulator(battery_id).update(sample)
+
+    def update_frame(self, battery_id, df):
+        """Add a DataFrame of new readings for a battery"""
+        self.accumulator(battery_id).update_frame(df)
+
+    def anomaly_features(self, battery_id):
+        """extract_anomaly_features over a battery's readings so far"""
+        return self.accumulator(battery_id).anomaly_features()
+
+    def rul_features(self, battery_id, capacity_fade_threshold=0.8):
+        """extract_rul_features over a battery's readings so far"""
+        return self.accumulator(battery_id).rul_features(capacity_fade_threshold)
+
+    def evict(self, battery_id):
+        """Drop a battery's accumulator"""
+        self.accumulators.pop(battery_id, None)
+        self.last_seen.pop(battery_id, None)
+
+    def evict_idle(self, max_idle_seconds):
+        """
+        Drop batteries that have not reported within max_idle_seconds
+
+        Returns:
+            Number of evicted batteries
+        """
+        cutoff = time.time() - max_idle_seconds
+        idle = [b for b, seen in self.last_seen.items() if seen < cutoff]
+        for battery_id in idle:
+            self.evict(battery_id)
+        return len(idle)
+
+    def clear(self):
+        """Drop all accumulators"""
+        self.accumulators.clear()
+        self.last_seen.clear()
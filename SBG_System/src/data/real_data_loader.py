@@ -7,6 +7,8 @@ import os
 from pathlib import Path
 import warnings
 
+from .feature_accumulator import StreamingFeatureExtractor
+
 warnings.filterwarnings('ignore')
 
 
@@ -101,11 +103,7 @@ class BatteryDataPreprocessor:
         if len(v_data) >= 64:
             thermal_map = v_data[:64].reshape(8, 8)
         else:
-            thermal_map = np.pad(
-                v_data.reshape(-1, 1),
-                ((0, 64 - len(v_data)), (0, 7)),
-                mode='edge'
-            )[:64].reshape(8, 8)
+            thermal_map = np.pad(v_data, (0, 64 - len(v_data)), mode='edge').reshape(8, 8)
         
         # Normalize to 0-100 range (representing temperature)
         thermal_map = 20 + (thermal_map - thermal_map.min()) / (thermal_map.max() - thermal_map.min() + 1e-6) * 60
@@ -254,6 +252,7 @@ class BatteryDataPipeline:
         zip_path = os.path.join(data_path, 'calce-dataset.zip')
         self.loader = CALCEDataLoader(zip_path)
         self.preprocessor = BatteryDataPreprocessor()
+        self.streaming = StreamingFeatureExtractor()
     
     def prepare_data_for_agents(self, limit_files=3):
         """
@@ -334,6 +333,65 @@ class BatteryDataPipeline:
         
         return data
     
+    def stream_test_readings(self, limit_files=1, chunk_size=500):
+        """
+        Replay test data as live telemetry, chunk_size rows at a time
+
+        The replay repeats until the caller stops iterating; each pass starts
+        the batteries' streaming features over.
+        """
+        df_test = self.loader.load_all_test_data(limit=limit_files)
+        if df_test.empty:
+            print("Warning: No test data loaded!")
+            return
+        while True:
+            for start in range(0, len(df_test), chunk_size):
+                yield df_test.iloc[start:start + chunk_size]
+            self.streaming.clear()
+    
+    def ingest_readings(self, df):
+        """
+        Fold newly arrived readings into each battery's streaming features
+        
+        Every reading is processed once (see StreamingFeatureExtractor), so
+        the cost does not grow with a battery's history. RUL and anomaly
+        features cover all readings so far; thermal maps describe the new
+        readings.
+        
+        Args:
+            df: new readings with a battery_id column
+        
+        Returns:
+            dict: Data dictionary like prepare_data_for_agents, for the
+                  batteries in df (no acoustic entries)
+        """
+        data = self._empty_data_dict()
+        for battery_id, df_battery in df.groupby('battery_id', sort=False):
+            self.streaming.update_frame(battery_id, df_battery)
+            
+            thermal_map, temperature = self.preprocessor.extract_thermal_features(df_battery)
+            data['thermal'].append({
+                'image': thermal_map,
+                'temperature': temperature,
+                'battery_id': battery_id
+            })
+            
+            state_features, capacity_fade = self.streaming.rul_features(battery_id)
+            data['rul'].append({
+                'state': state_features,
+                'capacity_fade': capacity_fade,
+                'battery_id': battery_id
+            })
+            
+            data['anomaly'].append({
+                'features': self.streaming.anomaly_features(battery_id),
+                'battery_id': battery_id
+            })
+            
+            data['battery_ids'].append(battery_id)
+        
+        return data
+    
     @staticmethod
     def _empty_data_dict():
         """Return empty data dictionary structure"""
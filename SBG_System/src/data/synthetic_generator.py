@@ -165,6 +165,26 @@ class SyntheticBatteryDataGenerator:
 
         return np.array(X), np.array(y)
 
+    def generate_capacity_curves(self, num_batteries=4, num_cycles=600, rated_capacity=1.1):
+        """
+        Per-cycle discharge capacity (Ah) of cells fading to end of life
+
+        Fade accelerates with age (like the CALCE CS2 cells) and each cell
+        gets its own rate and measurement noise.
+
+        Returns:
+            Dictionary battery name -> capacity array of shape (num_cycles,)
+        """
+        cycles = np.arange(num_cycles)
+        curves = {}
+        for i in range(num_batteries):
+            linear = np.random.uniform(2e-4, 4e-4)
+            knee = np.random.uniform(0.6, 0.9) * num_cycles
+            fade = linear * cycles + 0.3 / (1 + np.exp(-(cycles - knee) / (0.08 * num_cycles)))
+            noise = np.random.normal(0, 0.005, num_cycles)
+            curves[f"SYN_{i + 1:02d}"] = (rated_capacity * (1 - fade) + noise).astype(np.float32)
+        return curves
+
     def generate_multimodal_battery_data(self, duration_hours=24):
         """Generate comprehensive multimodal battery monitoring data"""
         data = {
@@ -1,10 +1,15 @@
 """AI Models for Smart Battery Guardian"""
 
-from .thermal_cnn import ThermalCNN
-from .acoustic_classifier import AcousticClassifier
-from .rul_lstm import RULLSTM
-from .anomaly_autoencoder import AnomalyAutoencoder
-from .rl_controller import RLChargeController
+import importlib
+
+# Models are imported on first attribute access (torch is only loaded then)
+_LAZY_IMPORTS = {
+    "ThermalCNN": ".thermal_cnn",
+    "AcousticClassifier": ".acoustic_classifier",
+    "RULLSTM": ".rul_lstm",
+    "AnomalyAutoencoder": ".anomaly_autoencoder",
+    "RLChargeController": ".rl_controller",
+}
 
 __all__ = [
     "ThermalCNN",
@@ -13,3 +18,11 @@ __all__ = [
     "AnomalyAutoencoder",
     "RLChargeController",
 ]
+
+
+def __getattr__(name):
+    if name not in _LAZY_IMPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY_IMPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
@@ -4,57 +4,67 @@ import torch
 import torch.nn as nn
 import torch.nn.functional as F
 import numpy as np
-import librosa
+from torch.ao.quantization import QuantStub, DeQuantStub
 
 
 class AcousticClassifier(nn.Module):
     """Neural network for acoustic fault detection using spectrograms"""
 
-    def __init__(self, input_shape=(13, 173), num_classes=2, dropout_rate=0.3):
+    def __init__(
+        self,
+        input_shape=(13, 173),
+        num_classes=2,
+        dropout_rate=0.3,
+        channels=(32, 64, 128),
+        dense_sizes=(256, 128),
+    ):
         """
         Args:
             input_shape: (n_mfcc, time_steps)
             num_classes: binary classification (normal/fault)
             dropout_rate: dropout probability
+            channels: output channels of each Conv1d block (one 2x pooling per block)
+            dense_sizes: hidden units of the dense head
         """
         super(AcousticClassifier, self).__init__()
 
         self.input_shape = input_shape
         self.num_classes = num_classes
 
+        # Identity in float mode; mark int8 boundaries for static quantization
+        self.quant = QuantStub()
+        self.dequant = DeQuantStub()
+
         # Reshape to (batch, channels, length) for Conv1D
         # Input: (n_mfcc, time_steps) -> treat n_mfcc as channels
-        self.conv_layers = nn.Sequential(
-            nn.Conv1d(13, 32, kernel_size=3, stride=1, padding=1),  # Changed from 1 to 13 input channels
-            nn.BatchNorm1d(32),
-            nn.ReLU(inplace=True),
-            nn.MaxPool1d(kernel_size=2, stride=2),
-            nn.Dropout(dropout_rate),
-            nn.Conv1d(32, 64, kernel_size=3, stride=1, padding=1),
-            nn.BatchNorm1d(64),
-            nn.ReLU(inplace=True),
-            nn.MaxPool1d(kernel_size=2, stride=2),
-            nn.Dropout(dropout_rate),
-            nn.Conv1d(64, 128, kernel_size=3, stride=1, padding=1),
-            nn.BatchNorm1d(128),
-            nn.ReLU(inplace=True),
-            nn.MaxPool1d(kernel_size=2, stride=2),
-            nn.Dropout(dropout_rate),
-        )
+        conv_layers = []
+        in_channels = input_shape[0]
+        for out_channels in channels:
+            conv_layers.extend([
+                nn.Conv1d(in_channels, out_channels, kernel_size=3, stride=1, padding=1),
+                nn.BatchNorm1d(out_channels),
+                nn.ReLU(inplace=True),
+                nn.MaxPool1d(kernel_size=2, stride=2),
+                nn.Dropout(dropout_rate),
+            ])
+            in_channels = out_channels
+        self.conv_layers = nn.Sequential(*conv_layers)
 
         # Calculate the flattened size after conv layers
         self.flat_size = self._get_flat_size()
 
         # Dense layers
-        self.dense = nn.Sequential(
-            nn.Linear(self.flat_size, 256),
-            nn.ReLU(inplace=True),
-            nn.Dropout(dropout_rate),
-            nn.Linear(256, 128),
-            nn.ReLU(inplace=True),
-            nn.Dropout(dropout_rate),
-            nn.Linear(128, num_classes),
-        )
+        dense_layers = []
+        in_features = self.flat_size
+        for hidden_size in dense_sizes:
+            dense_layers.extend([
+                nn.Linear(in_features, hidden_size),
+                nn.ReLU(inplace=True),
+                nn.Dropout(dropout_rate),
+            ])
+            in_features = hidden_size
+        dense_layers.append(nn.Linear(in_features, num_classes))
+        self.dense = nn.Sequential(*dense_layers)
 
     def _get_flat_size(self):
         """Calculate flattened size after conv layers"""
@@ -69,13 +79,17 @@ class AcousticClassifier(nn.Module):
         """Forward pass"""
         # x shape: (batch_size, n_mfcc, time_steps)
         # Conv1d expects (batch, channels, length), so x is already in correct format
+        x = self.quant(x)
         x = self.conv_layers(x)
-        x = x.view(x.size(0), -1)  # Flatten
+        x = x.reshape(x.size(0), -1)  # Flatten (quantized convs are not contiguous)
         x = self.dense(x)
+        x = self.dequant(x)
         return x
 
     def extract_mfcc(self, audio, sr=44100, n_mfcc=13):
         """Extract MFCC features from audio"""
+        import librosa  # heavy optional dependency, only needed for raw audio
+
         mfcc = librosa.feature.mfcc(y=audio, sr=sr, n_mfcc=n_mfcc)
         return torch.tensor(mfcc, dtype=torch.float32)
 
@@ -0,0 +1,308 @@
+"""Per-battery anomaly score baselines in fixed-size arrays"""
+
+import time
+from collections import OrderedDict
+import numpy as np
+import torch
+
+from .rolling_stats import ZERO_STD_RTOL
+
+
+class BatteryAnomalyState:
+    """
+    Adaptive thresholds and z-scores for many batteries at a fixed memory cost.
+
+    Every battery gets a slot in struct-of-arrays storage: a row of the
+    (max_batteries, history_size) score history plus running moments for
+    its last threshold_window scores (adaptive threshold) and its whole
+    history (z-score). The moments follow RollingWindow's windowed Welford
+    updates, vectorized across the batteries of a batch, and are refreshed
+    from the history row every history_size updates. Results match an
+    AnomalyDetectionAgent fed only that battery's scores.
+
+    With `quantile` set, the adaptive threshold is instead that quantile of
+    the battery's last threshold_window scores (e.g. 0.9 flags the top 10%),
+    computed for the whole batch with one np.quantile over history rows.
+
+    Memory is allocated once: max_batteries * (history_size * 8 + ~60)
+    bytes. When all slots are taken the least recently updated battery is
+    evicted and its slot reused.
+    """
+
+    def __init__(self, max_batteries=100000, history_size=256, threshold_window=100, threshold=0.75,
+                 quantile=None):
+        """
+        Args:
+            max_batteries: batteries tracked before least-recently-used eviction
+            history_size: scores kept per battery for the z-score
+            threshold_window: recent scores that set the adaptive threshold
+                              (and scores needed before it replaces `threshold`)
+            threshold: fixed threshold while a battery's history is short
+            quantile: percentile threshold in (0, 1) instead of mean + 2*std
+        """
+        if history_size < threshold_window:
+            raise ValueError("history_size must be at least threshold_window")
+        if threshold_window < 1:
+            raise ValueError("threshold_window must be at least 1")
+        self.max_batteries = max_batteries
+        self.history_size = history_size
+        self.threshold_window = threshold_window
+        self.threshold = threshold
+        self.quantile = quantile
+
+        self.history = np.zeros((max_batteries, history_size), dtype=np.float64)
+        self.count = np.zeros(max_batteries, dtype=np.int32)
+        self.position = np.zeros(max_batteries, dtype=np.int32)
+        self.replaced = np.zeros(max_batteries, dtype=np.int32)
+        self.mean_all = np.zeros(max_batteries, dtype=np.float64)
+        self.m2_all = np.zeros(max_batteries, dtype=np.float64)
+        self.mean_recent = np.zeros(max_batteries, dtype=np.float64)
+        self.m2_recent = np.zeros(max_batteries, dtype=np.float64)
+        self.last_seen = np.zeros(max_batteries, dtype=np.float64)
+
+        self.slots = OrderedDict()  # battery_id -> slot, least recently used first
+        self._free = list(range(max_batteries - 1, -1, -1))
+
+    def __len__(self):
+        return len(self.slots)
+
+    def __contains__(self, battery_id):
+        return battery_id in self.slots
+
+    def _slot(self, battery_id):
+        """Slot of a battery, assigning (and evicting if needed) for new ones"""
+        slot = self.slots.get(battery_id)
+        if slot is not None:
+            self.slots.move_to_end(battery_id)
+            return slot
+        if not self._free:
+            self.evict(next(iter(self.slots)))
+        slot = self._free.pop()
+        self.slots[battery_id] = slot
+        return slot
+
+    def update(self, battery_id, score):
+        """
+        Add one score for one battery
+
+        Returns:
+            (adaptive_threshold, z_score) after the update
+        """
+        thresholds, z_scores = self.update_batch([battery_id], [score])
+        return float(thresholds[0]), float(z_scores[0])
+
+    def update_batch(self, battery_ids, scores, default_threshold=None):
+        """
+        Add one score per entry; ids may repeat (applied in order)
+
+        Args:
+            battery_ids: sequence of battery identifiers
+            scores: anomaly scores, one per id
+            default_threshold: threshold for batteries with fewer than
+                               threshold_window scores (defaults to `threshold`)
+
+        Returns:
+            (adaptive_thresholds, z_scores) arrays, one value per entry, each
+            computed right after that entry's score was added
+        """
+        scores = np.asarray(scores, dtype=np.float64).reshape(-1)
+        if len(scores) != len(battery_ids):
+            raise ValueError("battery_ids and scores must have the same length")
+        if len(set(battery_ids)) > self.max_batteries:
+            raise ValueError("More distinct batteries in one batch than max_batteries")
+
+        slots = np.empty(len(scores), dtype=np.int64)
+        rounds = np.empty(len(scores), dtype=np.int64)
+        seen = {}
+        for i, battery_id in enumerate(battery_ids):
+            slots[i] = self._slot(battery_id)
+            rounds[i] = seen.get(battery_id, 0)
+            seen[battery_id] = rounds[i] + 1
+        self.last_seen[slots] = time.time()
+
+        thresholds = np.empty(len(scores), dtype=np.float64)
+        z_scores = np.empty(len(scores), dtype=np.float64)
+        # Each round holds at most one score per battery, so it vectorizes
+        default = self.threshold if default_threshold is None else default_threshold
+        for r in range(int(rounds.max(initial=-1)) + 1):
+            entries = np.flatnonzero(rounds == r)
+            thresholds[entries], z_scores[entries] = self._append(
+                slots[entries], scores[entries], default
+            )
+        return thresholds, z_scores
+
+    def _append(self, slots, values, default_threshold):
+        """Add one score to each of the given distinct slots"""
+        size, window = self.history_size, self.threshold_window
+        count = self.count[slots]
+        position = self.position[slots]
+
+        # Whole history (z-score)
+        full = count >= size
+        old = self.history[slots, position]
+        n = np.where(full, size, count + 1)
+        mean = self.mean_all[slots]
+        delta = np.where(full, values - old, values - mean)
+        new_mean = mean + delta / n
+        self.m2_all[slots] += np.where(
+            full,
+            delta * (values - new_mean + old - mean),
+            delta * (values - new_mean),
+        )
+        self.mean_all[slots] = new_mean
+
+        # Last threshold_window scores (adaptive threshold)
+        full_recent = count >= window
+        old = self.history[slots, (position - window) % size]
+        n_recent = np.where(full_recent, window, count + 1)
+        mean = self.mean_recent[slots]
+        delta = np.where(full_recent, values - old, values - mean)
+        new_mean = mean + delta / n_recent
+        self.m2_recent[slots] += np.where(
+            full_recent,
+            delta * (values - new_mean + old - mean),
+            delta * (values - new_mean),
+        )
+        self.mean_recent[slots] = new_mean
+
+        self.history[slots, position] = values
+        self.position[slots] = (position + 1) % size
+        self.count[slots] = n
+        replaced = self.replaced[slots] + full_recent
+        self.replaced[slots] = replaced
+        stale = replaced >= size
+        if stale.any():
+            self._refresh(slots[stale])
+
+        thresholds = np.full(len(slots), default_threshold, dtype=np.float64)
+        warm = n >= window
+        if self.quantile is not None:
+            if warm.any():
+                thresholds[warm] = np.quantile(self._recent(slots[warm]), self.quantile, axis=1)
+        else:
+            mean_recent = self.mean_recent[slots]
+            std_recent = np.sqrt(np.maximum(self.m2_recent[slots], 0.0) / n_recent)
+            thresholds = np.where(warm, np.minimum(mean_recent + 2 * std_recent, 1.0), thresholds)
+
+        std_all = np.sqrt(np.maximum(self.m2_all[slots], 0.0) / n)
+        valid = (n >= 2) & (std_all > ZERO_STD_RTOL * np.abs(self.mean_all[slots]))
+        z_scores = np.where(
+            valid, (values - self.mean_all[slots]) / np.where(valid, std_all, 1.0), 0.0
+        )
+        return thresholds, z_scores
+
+    def _refresh(self, slots):
+        """Recompute the running moments of the given slots from their history rows"""
+        size = self.history_size
+        rows = self.history[slots]
+        count = self.count[slots]
+
+        mask = np.arange(size) < count[:, None]
+        mean = (rows * mask).sum(axis=1) / count
+        self.mean_all[slots] = mean
+        self.m2_all[slots] = (((rows - mean[:, None]) * mask) ** 2).sum(axis=1)
+
+        recent = self._recent(slots)
+        mean = recent.mean(axis=1)
+        self.mean_recent[slots] = mean
+        self.m2_recent[slots] = ((recent - mean[:, None]) ** 2).sum(axis=1)
+        self.replaced[slots] = 0
+
+    def _recent(self, slots):
+        """Last threshold_window scores of each slot, shape (len(slots), threshold_window)"""
+        index = (self.position[slots][:, None] - 1 - np.arange(self.threshold_window)) % self.history_size
+        return self.history[slots[:, None], index]
+
+    def scores(self, battery_id):
+        """A battery's kept scores, oldest first"""
+        slot = self.slots.get(battery_id)
+        if slot is None:
+            return np.zeros(0, dtype=np.float64)
+        count, position = self.count[slot], self.position[slot]
+        if count < self.history_size:
+            return self.history[slot, :count].copy()
+        return np.roll(self.history[slot], -position)
+
+    def num_scores(self, battery_id):
+        """Number of scores kept for a battery"""
+        slot = self.slots.get(battery_id)
+        return int(self.count[slot]) if slot is not None else 0
+
+    def evict(self, battery_id):
+        """Drop a battery's state and free its slot"""
+        slot = self.slots.pop(battery_id, None)
+        if slot is None:
+            return
+        self.count[slot] = 0
+        self.position[slot] = 0
+        self.replaced[slot] = 0
+        self.mean_all[slot] = self.m2_all[slot] = 0.0
+        self.mean_recent[slot] = self.m2_recent[slot] = 0.0
+        self._free.append(slot)
+
+    def evict_idle(self, max_idle_seconds):
+        """
+        Drop batteries that have not reported within max_idle_seconds
+
+        Returns:
+            Number of evicted batteries
+        """
+        if not self.slots:
+            return 0
+        cutoff = time.time() - max_idle_seconds
+        battery_ids = list(self.slots.keys())
+        slots = np.fromiter(self.slots.values(), dtype=np.int64, count=len(battery_ids))
+        idle = np.flatnonzero(self.last_seen[slots] < cutoff)
+        for i in idle:
+            self.evict(battery_ids[i])
+        return len(idle)
+
+    def clear(self):
+        """Drop all battery states"""
+        for battery_id in list(self.slots):
+            self.evict(battery_id)
+        self._free = list(range(self.max_batteries - 1, -1, -1))
+
+    def state_dict(self):
+        """Serializable snapshot of all battery states (least recently used first)"""
+        slots = np.fromiter(self.slots.values(), dtype=np.int64, count=len(self.slots))
+        arrays = {
+            name: torch.from_numpy(getattr(self, name)[slots].copy())
+            for name in ("history", "count", "position", "replaced", "mean_all",
+                         "m2_all", "mean_recent", "m2_recent", "last_seen")
+        }
+        return {
+            "battery_ids": list(self.slots.keys()),
+            "history_size": self.history_size,
+            "threshold_window": self.threshold_window,
+            **arrays,
+        }
+
+    def load_state_dict(self, snapshot):
+        """
+        Restore battery states from state_dict()
+
+        The snapshot must use the same history_size and threshold_window;
+        when it holds more batteries than max_batteries the most recently
+        used ones are kept.
+        """
+        if (snapshot["history_size"], snapshot["threshold_window"]) != (
+            self.history_size, self.threshold_window
+        ):
+            raise ValueError("Snapshot history_size/threshold_window do not match")
+        self.clear()
+        battery_ids = list(snapshot["battery_ids"])
+        keep = slice(max(len(battery_ids) - self.max_batteries, 0), None)
+        battery_ids = battery_ids[keep]
+        slots = np.array([self._slot(battery_id) for battery_id in battery_ids], dtype=np.int64)
+        for name in ("history", "count", "position", "replaced", "mean_all",
+                     "m2_all", "mean_recent", "m2_recent", "last_seen"):
+            getattr(self, name)[slots] = np.asarray(snapshot[name])[keep]
+
+    def save(self, filepath):
+        """Persist battery states"""
+        torch.save(self.state_dict(), filepath)
+
+    def load(self, filepath):
+        """Load persisted battery states"""
+        self.load_state_dict(torch.load(filepath))
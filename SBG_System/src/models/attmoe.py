@@ -0,0 +1,311 @@
+"""Attention Mixture-of-Experts (AttMoE) model for capacity-based RUL prediction"""
+
+import math
+import numpy as np
+import torch
+import torch.nn as nn
+import torch.nn.functional as F
+
+
+class Attention(nn.Module):
+    """Multi-head self-attention over projected capacity windows"""
+
+    def __init__(self, feature_size, hidden_dim, nhead=4, dropout=0.0):
+        super(Attention, self).__init__()
+        self.query = nn.Linear(feature_size, hidden_dim)
+        self.key = nn.Linear(feature_size, hidden_dim)
+        self.value = nn.Linear(feature_size, hidden_dim)
+        self.attn = nn.MultiheadAttention(
+            embed_dim=hidden_dim, num_heads=nhead, dropout=dropout, batch_first=True
+        )
+
+    def forward(self, x):
+        """Forward pass"""
+        query, key, value = self.query(x), self.key(x), self.value(x)
+        out, _ = self.attn(query, key, value, need_weights=False)
+        return out
+
+
+class SparseMoE(nn.Module):
+    """
+    Top-k gated mixture of linear experts.
+
+    Token/expert assignments are sorted by expert so each active expert runs
+    one matmul over all of its tokens; compute grows with top_k, not with the
+    number of experts.
+    """
+
+    def __init__(self, dim, num_experts=16, top_k=2):
+        """
+        Args:
+            dim: token dimension (experts map dim -> dim)
+            num_experts: number of experts
+            top_k: experts evaluated per token
+        """
+        super(SparseMoE, self).__init__()
+        self.dim = dim
+        self.num_experts = num_experts
+        self.top_k = min(top_k, num_experts)
+
+        self.gate = nn.Linear(dim, num_experts, bias=False)
+        self.weight = nn.Parameter(torch.empty(num_experts, dim, dim))
+        self.bias = nn.Parameter(torch.empty(num_experts, dim))
+
+        # Same initialization as an nn.Linear per expert
+        bound = 1 / math.sqrt(dim)
+        nn.init.uniform_(self.weight, -bound, bound)
+        nn.init.uniform_(self.bias, -bound, bound)
+
+    def forward(self, x):
+        """
+        Route every token through its top-k experts
+
+        Args:
+            x: tensor of shape (..., dim)
+
+        Returns:
+            (output of the same shape, load-balancing auxiliary loss)
+        """
+        tokens = x.reshape(-1, self.dim)
+        logits = self.gate(tokens)
+        top_logits, top_experts = logits.topk(self.top_k, dim=-1)
+        top_weights = F.softmax(top_logits, dim=-1)
+
+        # Group the (token, expert) assignments by expert
+        flat_experts = top_experts.reshape(-1)
+        order = flat_experts.argsort()
+        token_index = order // self.top_k
+        counts = torch.bincount(flat_experts, minlength=self.num_experts).tolist()
+        grouped = tokens[token_index].split(counts)
+
+        outputs = [
+            torch.addmm(self.bias[expert], group, self.weight[expert])
+            for expert, group in enumerate(grouped)
+            if len(group)
+        ]
+        weighted = torch.cat(outputs) * top_weights.reshape(-1)[order].unsqueeze(1)
+        out = torch.zeros_like(tokens).index_add_(0, token_index, weighted)
+
+        # Switch-style balance loss: fraction routed x mean gate probability
+        importance = F.softmax(logits, dim=-1).mean(dim=0)
+        load = torch.bincount(top_experts[:, 0], minlength=self.num_experts).to(tokens.dtype)
+        aux_loss = self.num_experts * (importance * load / len(tokens)).sum()
+
+        return out.reshape(x.shape), aux_loss
+
+
+class AttMoE(nn.Module):
+    """
+    Attention + sparse mixture of experts capacity forecaster.
+
+    Input is a window of past normalized capacities shaped
+    (batch, 1, feature_size); output is the next normalized capacity.
+    """
+
+    def __init__(
+        self,
+        feature_size=64,
+        hidden_dim=256,
+        nhead=4,
+        dropout_att=0.0,
+        num_experts=16,
+        top_k=2,
+    ):
+        """
+        Args:
+            feature_size: capacity window length
+            hidden_dim: attention/expert width
+            nhead: attention heads
+            dropout_att: attention dropout
+            num_experts: number of experts
+            top_k: experts evaluated per token
+        """
+        super(AttMoE, self).__init__()
+        self.feature_size = feature_size
+        self.hidden_dim = hidden_dim
+
+        self.cell = Attention(feature_size, hidden_dim, nhead=nhead, dropout=dropout_att)
+        self.moe = SparseMoE(hidden_dim, num_experts=num_experts, top_k=top_k)
+        self.linear = nn.Linear(hidden_dim, 1)
+
+        # Load-balancing loss of the last training forward pass
+        self.aux_loss = None
+
+    def forward(self, x):
+        """Forward pass"""
+        out = self.cell(x)
+        out, aux_loss = self.moe(out)
+        if self.training:
+            self.aux_loss = aux_loss
+        return self.linear(out[:, -1])
+
+    def predict(self, x):
+        """Get next-capacity predictions"""
+        with torch.no_grad():
+            output = self.forward(x)
+        return output
+
+    def save(self, filepath):
+        """Save model weights"""
+        torch.save(self.state_dict(), filepath)
+
+    def load(self, filepath):
+        """Load model weights"""
+        self.load_state_dict(torch.load(filepath))
+
+
+def build_sequences(capacities, window_size):
+    """
+    Sliding windows over a capacity series
+
+    Returns:
+        (windows of shape (n, window_size), next capacity of shape (n,))
+    """
+    capacities = np.asarray(capacities, dtype=np.float32)
+    count = len(capacities) - window_size
+    if count <= 0:
+        return np.empty((0, window_size), np.float32), np.empty(0, np.float32)
+    windows = np.lib.stride_tricks.sliding_window_view(capacities, window_size)[:count]
+    return windows.copy(), capacities[window_size:]
+
+
+def capacity_windows(histories, window_size, rated_capacity):
+    """
+    Latest normalized window of each capacity history
+
+    Histories shorter than the window are left-padded with their first value.
+    """
+    windows = np.empty((len(histories), window_size), dtype=np.float32)
+    for i, history in enumerate(histories):
+        history = np.asarray(history, dtype=np.float32)[-window_size:]
+        windows[i] = np.pad(history, (window_size - len(history), 0), mode="edge")
+    return windows / rated_capacity
+
+
+def forecast_rul(step, windows, eol_capacity, max_cycles=1000):
+    """
+    Cycles until the forecast capacity reaches end of life, batched
+
+    Each step predicts the next capacity of every unfinished battery and
+    slides it into that battery's window; batteries leave the batch once
+    they cross eol_capacity.
+
+    Args:
+        step: callable mapping (n, 1, window) float32 windows to (n, 1) capacities
+        windows: normalized capacity windows of shape (batch, window)
+        eol_capacity: end-of-life capacity in the same normalized units
+        max_cycles: forecast horizon (returned when EOL is never reached)
+
+    Returns:
+        numpy array of remaining cycles per battery
+    """
+    windows = np.array(windows, dtype=np.float32)
+    remaining = np.full(len(windows), max_cycles, dtype=np.int64)
+    active = np.arange(len(windows))
+
+    for cycle in range(1, max_cycles + 1):
+        next_capacity = np.asarray(step(windows[active][:, np.newaxis, :])).reshape(-1)
+        windows[active, :-1] = windows[active, 1:]
+        windows[active, -1] = next_capacity
+
+        done = next_capacity <= eol_capacity
+        remaining[active[done]] = cycle
+        active = active[~done]
+        if len(active) == 0:
+            break
+
+    return remaining
+
+
+def train_attmoe(
+    model,
+    capacity_series,
+    rated_capacity=1.1,
+    epochs=500,
+    lr=5e-4,
+    weight_decay=0.0,
+    aux_loss_coef=0.01,
+    device=None,
+):
+    """
+    Full-batch training on next-capacity targets (as in AttMoE-CALCE.ipynb)
+
+    Args:
+        model: AttMoE
+        capacity_series: list of per-battery capacity arrays (Ah)
+        rated_capacity: normalization constant (Ah)
+        epochs: optimization steps over the full window set
+        lr: Adam learning rate
+        weight_decay: Adam weight decay
+        aux_loss_coef: weight of the expert load-balancing loss
+        device: torch device (defaults to CPU)
+
+    Returns:
+        List of training losses
+    """
+    windows, targets = zip(*(build_sequences(s, model.feature_size) for s in capacity_series))
+    return train_attmoe_windows(
+        model,
+        np.concatenate(windows)[:, np.newaxis, :] / rated_capacity,
+        np.concatenate(targets)[:, np.newaxis] / rated_capacity,
+        epochs=epochs,
+        lr=lr,
+        weight_decay=weight_decay,
+        aux_loss_coef=aux_loss_coef,
+        device=device,
+    )
+
+
+def train_attmoe_windows(
+    model,
+    windows,
+    targets,
+    epochs=500,
+    lr=5e-4,
+    weight_decay=0.0,
+    aux_loss_coef=0.01,
+    device=None,
+    callback=None,
+    callback_interval=100,
+):
+    """
+    Full-batch training on prepared windows
+
+    Args:
+        model: AttMoE
+        windows: normalized capacity windows of shape (n, 1, feature_size)
+        targets: normalized next capacities of shape (n, 1)
+        epochs, lr, weight_decay, aux_loss_coef, device: as in train_attmoe
+        callback: called as callback(epoch, loss) every callback_interval
+                  epochs with the model in eval mode; returning True stops
+                  training
+        callback_interval: epochs between callback calls
+
+    Returns:
+        List of training losses
+    """
+    device = device or torch.device("cpu")
+    x = torch.as_tensor(windows, dtype=torch.float32).to(device)
+    y = torch.as_tensor(targets, dtype=torch.float32).to(device)
+
+    model.to(device).train()
+    optimizer = torch.optim.Adam(model.parameters(), lr=lr, weight_decay=weight_decay)
+    criterion = nn.MSELoss()
+    history = []
+
+    for epoch in range(epochs):
+        loss = criterion(model(x), y) + aux_loss_coef * model.aux_loss
+        optimizer.zero_grad()
+        loss.backward()
+        optimizer.step()
+        history.append(loss.detach())
+
+        if callback is not None and (epoch + 1) % callback_interval == 0:
+            model.eval()
+            stop = callback(epoch + 1, float(loss))
+            model.train()
+            if stop:
+                break
+
+    model.eval()
+    return [float(loss) for loss in history]
@@ -0,0 +1,207 @@
+"""NumPy-vectorized battery charging environment for the RL charge controller"""
+
+import numpy as np
+
+# Discrete actions map to charge rates like RLChargeController.action_to_charge_rate
+NUM_ACTIONS = 5
+NOMINAL_LIFE_CYCLES = 1000.0  # cycles from full capacity to end of life
+EOL_CAPACITY = 0.8
+
+
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+class VectorBatteryEnv:
+    """
+    Thousands of simulated cells charged in parallel.
+
+    Each step applies one charge rate per cell and advances a lumped model:
+    state of charge follows the current, temperature follows I^2R heating
+    against cooling to ambient, and capacity fades with throughput, C-rate
+    and temperature (Arrhenius-style doubling every 10 degC). A few cells
+    carry a latent fault that adds heat and acoustic signature.
+
+    Observations use the orchestrator's _build_state_vector layout (agent
+    scores derived from the simulated physics), so a controller trained
+    here runs unchanged on live assessments. That layout has no state of
+    charge; episodes end when a cell reaches its target SOC, hits the
+    thermal limit or runs out of steps, and finished cells reset
+    automatically.
+
+    Rewards trade charge speed (SOC gained, a per-step time cost and a
+    completion bonus) against health (capacity fade, heat above 45 degC and
+    a large penalty at the thermal limit).
+    """
+
+    def __init__(
+        self,
+        num_envs=1024,
+        dt_s=60.0,
+        max_steps=240,
+        temp_limit=60.0,
+        fault_probability=0.02,
+        observation_noise=0.02,
+        seed=None,
+    ):
+        """
+        Args:
+            num_envs: cells simulated in parallel
+            dt_s: simulated seconds per step
+            max_steps: steps before an episode is cut off
+            temp_limit: cell temperature (degC) that ends an episode as a failure
+            fault_probability: share of cells with a latent fault
+            observation_noise: std of noise added to the agent scores
+            seed: random seed
+        """
+        self.num_envs = num_envs
+        self.dt_s = dt_s
+        self.dt_h = dt_s / 3600.0
+        self.max_steps = max_steps
+        self.temp_limit = temp_limit
+        self.fault_probability = fault_probability
+        self.observation_noise = observation_noise
+        self.rng = np.random.default_rng(seed)
+
+        # Physics constants
+        self.heat_gain = 0.025  # degC/s at 1C with nominal resistance
+        self.cooling = 1.0 / 600.0  # 1/s (10-minute thermal time constant)
+        self.fault_heat = 0.004  # degC/s
+        self.cycle_fade = (1.0 - EOL_CAPACITY) / NOMINAL_LIFE_CYCLES / 2.0  # per unit SOC moved
+        self.calendar_fade = 2e-6  # per hour at 25 degC and full charge
+
+        # Reward weights
+        self.progress_weight = 10.0
+        self.time_cost = 0.05
+        self.completion_bonus = 1.0
+        self.fade_weight = 2e4
+        self.heat_weight = 0.05
+        self.limit_penalty = 10.0
+
+        shape = (num_envs,)
+        self.soc = np.zeros(shape)
+        self.target_soc = np.zeros(shape)
+        self.temperature = np.zeros(shape)
+        self.ambient = np.zeros(shape)
+        self.capacity = np.zeros(shape)
+        self.resistance = np.zeros(shape)
+        self.fault = np.zeros(shape, dtype=bool)
+        self.steps = np.zeros(shape, dtype=np.int64)
+        self.reset()
+
+    def reset(self):
+        """
+        Start new episodes for every cell
+
+        Returns:
+            Observations of shape (num_envs, 8)
+        """
+        self._reset_cells(np.arange(self.num_envs))
+        return self.observe()
+
+    def _reset_cells(self, index):
+        """Draw fresh cells at the given positions"""
+        count = len(index)
+        rng = self.rng
+
+        self.soc[index] = rng.uniform(0.05, 0.5, count)
+        self.target_soc[index] = rng.uniform(0.8, 1.0, count)
+        self.ambient[index] = rng.uniform(15.0, 35.0, count)
+        self.temperature[index] = self.ambient[index] + rng.uniform(0.0, 3.0, count)
+        self.capacity[index] = rng.uniform(0.82, 1.0, count)
+        self.resistance[index] = 1.0 + 2.0 * (1.0 - self.capacity[index])
+        self.fault[index] = rng.random(count) < self.fault_probability
+        self.steps[index] = 0
+
+    def observe(self, index=None):
+        """Current observations in the _build_state_vector layout (optionally a subset)"""
+        if index is None:
+            index = slice(None)
+        temperature = self.temperature[index]
+        ambient = self.ambient[index]
+        capacity = self.capacity[index]
+        resistance = self.resistance[index]
+        fault = self.fault[index]
+        count = len(temperature)
+        noise = self.observation_noise
+
+        thermal = _sigmoid((temperature - 45.0) / 4.0)
+        acoustic = _sigmoid(3.0 * fault + (temperature - 50.0) / 5.0 - 2.0)
+        thermal = np.clip(thermal + self.rng.normal(0.0, noise, count), 0.0, 1.0)
+        acoustic = np.clip(acoustic + self.rng.normal(0.0, noise, count), 0.0, 1.0)
+
+        rul = np.maximum(
+            NOMINAL_LIFE_CYCLES * (capacity - EOL_CAPACITY) / (1.0 - EOL_CAPACITY), 0.0
+        )
+        z_score = (temperature - ambient) / 5.0
+        anomaly = np.clip(
+            _sigmoid(np.abs(z_score) - 2.0) * 0.5 + 0.5 * (resistance - 1.0) / 2.0, 0.0, 1.0
+        )
+
+        return np.stack([
+            thermal,
+            acoustic,
+            rul / 500.0,
+            anomaly,
+            z_score,
+            rul / 100.0,
+            np.maximum(thermal, 1.0 - thermal),
+            np.maximum(acoustic, 1.0 - acoustic),
+        ], axis=1).astype(np.float32)
+
+    def step(self, actions):
+        """
+        Apply one action per cell
+
+        Args:
+            actions: integer array of shape (num_envs,) in [0, NUM_ACTIONS)
+
+        Returns:
+            (observations, rewards, dones, info). For finished cells the
+            observation is the terminal one and the cell has already been
+            reset; info["reset_observations"] holds the observations to act
+            on next.
+        """
+        rate = (np.asarray(actions) - 2) / 2.0  # C-rate in [-1, 1]
+
+        previous_soc = self.soc
+        self.soc = np.clip(self.soc + rate * self.dt_h / self.capacity, 0.0, 1.0)
+        current = (self.soc - previous_soc) * self.capacity / self.dt_h  # C-rate actually drawn
+
+        heating = self.heat_gain * current ** 2 * self.resistance + self.fault_heat * self.fault
+        self.temperature = self.temperature + self.dt_s * (
+            heating - self.cooling * (self.temperature - self.ambient)
+        )
+
+        acceleration = 2.0 ** ((self.temperature - 25.0) / 10.0)
+        fade = acceleration * (
+            self.cycle_fade * np.abs(self.soc - previous_soc) * (1.0 + np.abs(current))
+            + self.calendar_fade * self.soc * self.dt_h
+        )
+        self.capacity = self.capacity - fade
+        self.resistance = self.resistance + 2.0 * fade
+        self.steps += 1
+
+        charged = self.soc >= self.target_soc
+        overheated = self.temperature >= self.temp_limit
+        timed_out = self.steps >= self.max_steps
+        dones = charged | overheated | timed_out
+
+        rewards = (
+            self.progress_weight * (self.soc - previous_soc)
+            - self.time_cost
+            - self.fade_weight * fade
+            - self.heat_weight * np.maximum(self.temperature - 45.0, 0.0)
+            + self.completion_bonus * charged
+            - self.limit_penalty * overheated
+        )
+
+        observations = self.observe()
+        info = {"charged": charged, "overheated": overheated, "timed_out": timed_out}
+        info["reset_observations"] = observations
+        if dones.any():
+            finished = np.flatnonzero(dones)
+            self._reset_cells(finished)
+            info["reset_observations"] = observations.copy()
+            info["reset_observations"][finished] = self.observe(finished)
+        return observations, rewards.astype(np.float32), dones, info
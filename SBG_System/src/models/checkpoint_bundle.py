@@ -0,0 +1,151 @@
+"""Single-file, memory-mappable tensor bundles (safetensors layout)"""
+
+import json
+import numpy as np
+import torch
+
+BUNDLE_FORMAT = "sbg-checkpoint"
+BUNDLE_VERSION = 1
+
+_DTYPES = {
+    torch.float64: "F64",
+    torch.float32: "F32",
+    torch.float16: "F16",
+    torch.bfloat16: "BF16",
+    torch.int64: "I64",
+    torch.int32: "I32",
+    torch.int16: "I16",
+    torch.int8: "I8",
+    torch.uint8: "U8",
+    torch.bool: "BOOL",
+}
+_TORCH_DTYPES = {code: dtype for dtype, code in _DTYPES.items()}
+
+
+def save_tensors(filepath, tensors, metadata=None):
+    """
+    Write tensors in the safetensors layout
+
+    The file is an 8-byte little-endian header length, a JSON header mapping
+    names to dtype/shape/byte offsets (plus string metadata), and the raw
+    tensor bytes. Tensors are ordered by element size so every one starts
+    aligned for its dtype, which lets load_tensors map them in place.
+
+    Args:
+        filepath: destination path
+        tensors: dictionary name -> tensor
+        metadata: dictionary of string values stored under "__metadata__"
+    """
+    tensors = {
+        name: tensor.detach().cpu().contiguous()
+        for name, tensor in tensors.items()
+    }
+    names = sorted(tensors, key=lambda name: (-tensors[name].element_size(), name))
+
+    header = {"__metadata__": dict(metadata or {})}
+    offset = 0
+    for name in names:
+        tensor = tensors[name]
+        size = tensor.numel() * tensor.element_size()
+        header[name] = {
+            "dtype": _DTYPES[tensor.dtype],
+            "shape": list(tensor.shape),
+            "data_offsets": [offset, offset + size],
+        }
+        offset += size
+
+    header_bytes = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    header_bytes += b" " * (-len(header_bytes) % 8)  # align the data section
+
+    with open(filepath, "wb") as f:
+        f.write(len(header_bytes).to_bytes(8, "little"))
+        f.write(header_bytes)
+        for name in names:
+            if tensors[name].numel():  # empty tensors may not be viewable as bytes
+                f.write(tensors[name].reshape(-1).view(torch.uint8).numpy().tobytes())
+
+
+def load_tensors(filepath, mmap=True):
+    """
+    Read a file written by save_tensors
+
+    Args:
+        filepath: bundle path
+        mmap: map the file copy-on-write instead of reading it; tensors then
+              share the OS page cache with every other process mapping the
+              same file until they are written to
+
+    Returns:
+        (dictionary name -> tensor, metadata dictionary)
+    """
+    with open(filepath, "rb") as f:
+        header_size = int.from_bytes(f.read(8), "little")
+        header = json.loads(f.read(header_size))
+        if not mmap:
+            data = bytearray(f.read())
+
+    metadata = header.pop("__metadata__", {})
+    if mmap:
+        data = np.memmap(filepath, dtype=np.uint8, mode="c", offset=8 + header_size)
+
+    tensors = {}
+    for name, info in header.items():
+        start, end = info["data_offsets"]
+        dtype = _TORCH_DTYPES[info["dtype"]]
+        if end == start:
+            tensors[name] = torch.empty(info["shape"], dtype=dtype)
+            continue
+        count = (end - start) // torch.empty((), dtype=dtype).element_size()
+        tensors[name] = torch.frombuffer(data, dtype=dtype, count=count, offset=start).reshape(
+            info["shape"]
+        )
+    return tensors, metadata
+
+
+def save_bundle(filepath, tensors, contents):
+    """
+    Write a versioned checkpoint bundle
+
+    Args:
+        filepath: destination path
+        tensors: dictionary name -> tensor
+        contents: JSON-serializable description stored in the header (no
+                  NaN or infinities, which standard JSON cannot represent)
+    """
+    save_tensors(
+        filepath,
+        tensors,
+        {
+            "format": BUNDLE_FORMAT,
+            "version": str(BUNDLE_VERSION),
+            "contents": json.dumps(contents, allow_nan=False),
+        },
+    )
+
+
+def load_bundle(filepath, mmap=True):
+    """
+    Read a checkpoint bundle written by save_bundle
+
+    Returns:
+        (dictionary name -> tensor, contents)
+    """
+    tensors, metadata = load_tensors(filepath, mmap=mmap)
+    if metadata.get("format") != BUNDLE_FORMAT:
+        raise ValueError(f"{filepath} is not a {BUNDLE_FORMAT} bundle")
+    version = int(metadata.get("version", 0))
+    if version > BUNDLE_VERSION:
+        raise ValueError(
+            f"{filepath} has bundle version {version}; this release reads up to {BUNDLE_VERSION}"
+        )
+    return tensors, json.loads(metadata["contents"])
+
+
+def split_prefix(tensors, prefix):
+    """Tensors under "prefix." with the prefix removed"""
+    start = len(prefix) + 1
+    return {
+        name[start:]: tensor
+        for name, tensor in tensors.items()
+        if name.startswith(prefix + ".")
+    }
@@ -0,0 +1,151 @@
+"""Knowledge distillation from agent models to compact student variants"""
+
+import numpy as np
+import torch
+import torch.nn.functional as F
+
+
+def distillation_loss(student_outputs, teacher_outputs, task, temperature=4.0):
+    """
+    Loss between student and teacher outputs (no ground-truth labels needed)
+
+    Args:
+        student_outputs: raw student outputs (logits for classification)
+        teacher_outputs: raw teacher outputs for the same batch
+        task: "classification" (softened KL divergence) or "regression" (MSE)
+        temperature: softmax temperature for classification targets
+
+    Returns:
+        Scalar loss tensor
+    """
+    if task == "classification":
+        soft_targets = F.softmax(teacher_outputs / temperature, dim=1)
+        log_probs = F.log_softmax(student_outputs / temperature, dim=1)
+        # T^2 keeps gradient magnitudes comparable across temperatures
+        return F.kl_div(log_probs, soft_targets, reduction="batchmean") * temperature ** 2
+    return F.mse_loss(student_outputs, teacher_outputs)
+
+
+def _as_tensor_list(inputs):
+    """Transfer set as a list of tensors (one per input shape)"""
+    if isinstance(inputs, (list, tuple)):
+        return [torch.as_tensor(np.asarray(x), dtype=torch.float32) for x in inputs]
+    return [torch.as_tensor(np.asarray(inputs), dtype=torch.float32)]
+
+
+def _init_output_bias(student, teacher_outputs):
+    """
+    Start a regression student at the teacher's mean output
+
+    RUL heads end in a ReLU; a fresh student whose output sits below zero for
+    every input gets no gradient at all, so the last layer's bias is moved to
+    the mean target before training.
+    """
+    last_linear = [m for m in student.modules() if isinstance(m, torch.nn.Linear)][-1]
+    with torch.no_grad():
+        last_linear.bias.copy_(teacher_outputs.mean(dim=0).to(last_linear.bias.device))
+
+
+def distill(
+    teacher,
+    student,
+    inputs,
+    task,
+    epochs=20,
+    batch_size=32,
+    lr=0.001,
+    temperature=4.0,
+    device=None,
+):
+    """
+    Train a student to reproduce a teacher's outputs on unlabelled inputs
+
+    Args:
+        teacher: trained float model (kept frozen in eval mode)
+        student: smaller model with the same input/output shapes
+        inputs: transfer set, a model-ready array/tensor or a list of them
+                when inputs come in different shapes
+        task: "classification" or "regression"
+        epochs: passes over the transfer set
+        batch_size: rows per optimization step
+        lr: Adam learning rate
+        temperature: softmax temperature for classification
+        device: torch device (defaults to CPU)
+
+    Returns:
+        List of mean loss per epoch
+    """
+    device = device or torch.device("cpu")
+    teacher.to(device).eval()
+    student.to(device)
+    datasets = _as_tensor_list(inputs)
+
+    # Teacher outputs are fixed, so compute them once per transfer set
+    with torch.no_grad():
+        targets = [
+            torch.cat([teacher(x[i:i + batch_size].to(device)) for i in range(0, len(x), batch_size)])
+            for x in datasets
+        ]
+
+    if task == "regression":
+        _init_output_bias(student, torch.cat(targets))
+
+    optimizer = torch.optim.Adam(student.parameters(), lr=lr)
+    history = []
+
+    for epoch in range(epochs):
+        student.train()
+        batches = [
+            (d, index)
+            for d, x in enumerate(datasets)
+            for index in torch.randperm(len(x)).split(batch_size)
+        ]
+        np.random.shuffle(batches)
+
+        total_loss = torch.zeros((), device=device)
+        for d, index in batches:
+            x = datasets[d][index].to(device)
+            loss = distillation_loss(student(x), targets[d][index], task, temperature)
+            optimizer.zero_grad()
+            loss.backward()
+            optimizer.step()
+            total_loss += loss.detach()
+
+        history.append(float(total_loss) / max(len(batches), 1))
+
+    student.eval()
+    return history
+
+
+def compare_teacher_student(teacher, student, inputs, task):
+    """
+    Fidelity of a student to its teacher on a set of inputs
+
+    Returns:
+        Dictionary with top-1 agreement (classification) and mean/max
+        absolute output difference
+    """
+    teacher.eval()
+    student.eval()
+    teacher_outputs, student_outputs = [], []
+
+    with torch.no_grad():
+        for x in _as_tensor_list(inputs):
+            teacher_outputs.append(teacher(x))
+            student_outputs.append(student(x))
+
+    teacher_outputs = torch.cat(teacher_outputs)
+    student_outputs = torch.cat(student_outputs)
+    if task == "classification":
+        teacher_outputs = F.softmax(teacher_outputs, dim=1)
+        student_outputs = F.softmax(student_outputs, dim=1)
+
+    diff = (teacher_outputs - student_outputs).abs()
+    result = {
+        "mean_abs_delta": float(diff.mean()),
+        "max_abs_delta": float(diff.max()),
+    }
+    if task == "classification":
+        agree = teacher_outputs.argmax(dim=1) == student_outputs.argmax(dim=1)
+        result["agreement"] = float(agree.float().mean())
+    return result
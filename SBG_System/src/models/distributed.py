@@ -0,0 +1,200 @@
+"""Data-parallel CPU training across processes with torch.distributed (gloo)"""
+
+import os
+import pickle
+import queue
+import socket
+import multiprocessing as mp
+import torch
+import torch.distributed as dist
+
+from src.utils import setup_logger
+
+logger = setup_logger("Distributed")
+
+
+def is_distributed():
+    """Whether this process is part of an initialized process group"""
+    return dist.is_available() and dist.is_initialized()
+
+
+def get_rank():
+    """Global rank of this process (0 when not distributed)"""
+    return dist.get_rank() if is_distributed() else 0
+
+
+def get_world_size():
+    """Number of training processes (1 when not distributed)"""
+    return dist.get_world_size() if is_distributed() else 1
+
+
+def is_main_process():
+    """Rank 0 writes checkpoints and logs summaries"""
+    return get_rank() == 0
+
+
+def init_distributed(rank=None, world_size=None, master_addr=None, master_port=None, backend="gloo"):
+    """
+    Join the process group
+
+    Arguments left as None come from the RANK, WORLD_SIZE, MASTER_ADDR and
+    MASTER_PORT environment variables, so processes started by torchrun (on
+    one or several hosts) need no arguments.
+    """
+    if is_distributed():
+        return
+    rank = int(os.environ.get("RANK", 0)) if rank is None else rank
+    world_size = int(os.environ.get("WORLD_SIZE", 1)) if world_size is None else world_size
+    master_addr = master_addr or os.environ.get("MASTER_ADDR", "127.0.0.1")
+    master_port = master_port or int(os.environ.get("MASTER_PORT", 29500))
+    dist.init_process_group(
+        backend,
+        init_method=f"tcp://{master_addr}:{master_port}",
+        rank=rank,
+        world_size=world_size,
+    )
+    logger.info(f"Rank {rank}/{world_size} joined the {backend} process group")
+
+
+def cleanup_distributed():
+    """Leave the process group"""
+    if is_distributed():
+        dist.destroy_process_group()
+
+
+def free_port():
+    """An unused local TCP port for the rendezvous"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def broadcast_parameters(model, src=0):
+    """Copy parameters and buffers (e.g. BatchNorm statistics) from one rank to all"""
+    if not is_distributed():
+        return
+    with torch.no_grad():
+        for tensor in list(model.parameters()) + list(model.buffers()):
+            dist.broadcast(tensor.data, src)
+
+
+def all_reduce_gradients(model):
+    """
+    Average gradients across ranks
+
+    All gradients are flattened into one buffer so each optimizer step costs
+    a single all-reduce. Parameters without a gradient on this rank count as
+    zero, which keeps every rank's collective the same size.
+    """
+    world_size = get_world_size()
+    if world_size == 1:
+        return
+    params = [p for p in model.parameters() if p.requires_grad]
+    for p in params:
+        if p.grad is None:
+            p.grad = torch.zeros_like(p)
+    flat = torch.cat([p.grad.reshape(-1) for p in params])
+    dist.all_reduce(flat)
+    flat /= world_size
+    offset = 0
+    for p in params:
+        count = p.grad.numel()
+        p.grad.copy_(flat[offset:offset + count].view_as(p.grad))
+        offset += count
+
+
+def all_reduce_sum(tensor):
+    """Sum a tensor across ranks (in place; unchanged when not distributed)"""
+    if is_distributed():
+        dist.all_reduce(tensor)
+    return tensor
+
+
+def _rank_main(fn, rank, world_size, node_rank, nproc, master_addr, master_port,
+               backend, threads, args, results):
+    """Process entry point: join the group, run fn, report rank 0's result"""
+    global_rank = node_rank * nproc + rank
+    if threads:
+        torch.set_num_threads(threads)
+    try:
+        init_distributed(global_rank, world_size, master_addr, master_port, backend)
+        result = fn(*args)
+        results.put((global_rank, True, pickle.dumps(result if global_rank == 0 else None)))
+    except Exception as e:
+        results.put((global_rank, False, pickle.dumps(RuntimeError(f"rank {global_rank}: {e!r}"))))
+        raise
+    finally:
+        cleanup_distributed()
+
+
+def launch(fn, nproc, args=(), nnodes=1, node_rank=0, master_addr="127.0.0.1",
+           master_port=None, backend="gloo", threads_per_process=None):
+    """
+    Run fn(*args) in nproc local processes that form one process group
+
+    For multi-host training run launch() on every host with the same nnodes,
+    master_addr and master_port and a distinct node_rank; global ranks are
+    node_rank * nproc + local rank.
+
+    Args:
+        fn: picklable (module-level) function; it runs after init_distributed
+        nproc: processes on this host
+        args: arguments for fn
+        nnodes: hosts taking part
+        node_rank: index of this host (0 hosts rank 0 and the rendezvous)
+        master_addr: address of the node_rank 0 host
+        master_port: rendezvous port (a free local port for single-host runs)
+        backend: torch.distributed backend
+        threads_per_process: torch intra-op threads per process (defaults to
+                             this host's cores divided by nproc)
+
+    Returns:
+        fn's return value on global rank 0 (None on other hosts)
+    """
+    if master_port is None:
+        if nnodes > 1:
+            raise ValueError("master_port is required for multi-host training")
+        master_port = free_port()
+    if threads_per_process is None:
+        threads_per_process = max(1, (os.cpu_count() or 1) // nproc)
+    world_size = nnodes * nproc
+
+    # spawn: children must not inherit torch's thread pools from a fork
+    context = mp.get_context("spawn")
+    results = context.Queue()
+    processes = [
+        context.Process(
+            target=_rank_main,
+            args=(fn, rank, world_size, node_rank, nproc, master_addr, master_port,
+                  backend, threads_per_process, args, results),
+            name=f"sbg-train-{node_rank * nproc + rank}",
+        )
+        for rank in range(nproc)
+    ]
+    for process in processes:
+        process.start()
+    logger.info(f"Launched {nproc} training processes (world size {world_size})")
+
+    outcome, errors, replies = None, [], 0
+    while replies < nproc:
+        try:
+            global_rank, ok, payload = results.get(timeout=1.0)
+        except queue.Empty:
+            if not any(p.is_alive() for p in processes) and results.empty():
+                break  # a process died without replying
+            continue
+        replies += 1
+        value = pickle.loads(payload)
+        if not ok:
+            errors.append(value)
+        elif global_rank == 0:
+            outcome = value
+    for process in processes:
+        process.join()
+
+    if errors:
+        raise errors[0]
+    failed = [p.name for p in processes if p.exitcode != 0]
+    if failed:
+        raise RuntimeError(f"Training processes failed: {', '.join(failed)}")
+    return outcome
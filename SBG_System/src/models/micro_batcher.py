@@ -0,0 +1,153 @@
+"""Micro-batching request coalescer for concurrent inference calls"""
+
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+import numpy as np
+
+_STOP = object()
+
+
+def _split_outputs(outputs, sizes):
+    """Split batched outputs back into per-request chunks"""
+    offsets = np.cumsum([0] + list(sizes))
+    if isinstance(outputs, tuple):
+        return [
+            tuple(part[start:end] for part in outputs)
+            for start, end in zip(offsets[:-1], offsets[1:])
+        ]
+    return [outputs[start:end] for start, end in zip(offsets[:-1], offsets[1:])]
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent inference requests into one forward pass.
+
+    Callers block in submit() while a background thread collects requests
+    until max_batch_size rows are queued or max_latency_ms has elapsed since
+    the first one, runs a single batched call and hands each caller its rows.
+    """
+
+    def __init__(
+        self, run_batch, max_batch_size=32, max_latency_ms=5.0, timeout_s=30.0, name="MicroBatcher"
+    ):
+        """
+        Args:
+            run_batch: callable taking a stacked numpy batch and returning
+                       an array or a tuple of arrays with the same leading axis
+            max_batch_size: maximum rows per forward pass
+            max_latency_ms: maximum time the first request waits for company
+            timeout_s: longest submit() waits for its outputs (None = forever)
+            name: worker thread name
+        """
+        self.run_batch = run_batch
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency_ms / 1000.0
+        self.timeout = timeout_s
+        self.batch_sizes = deque(maxlen=1000)
+
+        self._queue = queue.Queue()
+        self._closed = False
+        self._lock = threading.Lock()  # orders submits against close()
+        self._worker = threading.Thread(target=self._loop, name=name, daemon=True)
+        self._worker.start()
+
+    def submit(self, x):
+        """
+        Queue a batched input and wait for its outputs
+
+        Args:
+            x: numpy array with a leading batch axis
+
+        Returns:
+            The outputs of run_batch for exactly these rows
+
+        Raises:
+            RuntimeError: the batcher is (or gets) closed before the rows run
+            concurrent.futures.TimeoutError: no outputs within timeout_s
+        """
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("MicroBatcher is closed")
+            self._queue.put((np.asarray(x, dtype=np.float32), future))
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            future.cancel()  # the worker skips it if it has not started yet
+            raise
+
+    def close(self):
+        """Stop the worker thread after draining queued requests (idempotent)"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_STOP)
+        self._worker.join()
+
+    def _loop(self):
+        """Collect requests into batches until stopped"""
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                self._fail_queued()
+                return
+
+            pending = [item]
+            rows = len(item[0])
+            deadline = time.perf_counter() + self.max_latency
+            stop = False
+
+            while rows < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                pending.append(item)
+                rows += len(item[0])
+
+            self._process(pending)
+            if stop:
+                self._fail_queued()
+                return
+
+    def _fail_queued(self):
+        """Fail requests still queued behind the stop marker"""
+        while True:
+            try:
+                _, future = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if future.set_running_or_notify_cancel():
+                future.set_exception(RuntimeError("MicroBatcher is closed"))
+
+    def _process(self, pending):
+        """Run one forward pass per input shape and resolve the futures"""
+        groups = {}
+        for x, future in pending:
+            if future.set_running_or_notify_cancel():  # skip timed-out callers
+                groups.setdefault(x.shape[1:], []).append((x, future))
+
+        for items in groups.values():
+            inputs = [x for x, _ in items]
+            try:
+                batch = inputs[0] if len(inputs) == 1 else np.concatenate(inputs)
+                outputs = self.run_batch(batch)
+            except Exception as exc:
+                for _, future in items:
+                    future.set_exception(exc)
+                continue
+
+            self.batch_sizes.append(len(batch))
+            chunks = _split_outputs(outputs, [len(x) for x in inputs])
+            for (_, future), chunk in zip(items, chunks):
+                future.set_result(chunk)
@@ -0,0 +1,57 @@
+"""Opt-in mixed precision (torch.autocast) for agent training and inference"""
+
+import torch
+
+PRECISIONS = ("float32", "bfloat16", "float16")
+
+_DTYPES = {"bfloat16": torch.bfloat16, "float16": torch.float16}
+
+
+def check_precision(precision):
+    """Validate a precision name from the config"""
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unknown precision {precision!r}; use one of {PRECISIONS}")
+    return precision
+
+
+def bf16_supported():
+    """Whether this CPU has native bfloat16 math (AVX512-BF16 or AMX)"""
+    try:
+        return torch.cpu._is_avx512_bf16_supported() or torch.cpu._is_amx_tile_supported()
+    except AttributeError:
+        return False
+
+
+def autocast(precision="float32", device=None):
+    """
+    Autocast context for a forward pass (a no-op for float32)
+
+    Matmuls and convolutions run in the reduced dtype; losses, softmax and
+    normalization stay float32 per torch's autocast policy. The float32
+    master weights and optimizer state are untouched.
+    """
+    device_type = torch.device(device or "cpu").type
+    return torch.autocast(
+        device_type=device_type,
+        dtype=_DTYPES.get(check_precision(precision), torch.bfloat16),
+        enabled=precision != "float32",
+    )
+
+
+def grad_scaler(precision="float32", device=None):
+    """
+    Loss scaler for a training loop
+
+    Only float16 needs one: its 5-bit exponent underflows small gradients.
+    bfloat16 keeps float32's exponent range, so the scaler is disabled (its
+    scale/step/update calls then pass straight through).
+    """
+    device_type = torch.device(device or "cpu").type
+    return torch.amp.GradScaler(device_type, enabled=precision == "float16")
+
+
+def scaled_step(optimizer, scaler, loss):
+    """Backward pass and optimizer step through a (possibly disabled) scaler"""
+    scaler.scale(loss).backward()
+    scaler.step(optimizer)
+    scaler.update()
@@ -0,0 +1,298 @@
+"""Shared inference hot path for agent models"""
+
+import os
+import threading
+import time
+from collections import deque
+import numpy as np
+import torch
+
+from .quantization import quantize_model, _calibration_batches
+from .mixed_precision import autocast, check_precision
+from .micro_batcher import MicroBatcher
+
+_thread_lock = threading.Lock()
+_interop_threads_set = False
+_default_threads = torch.get_num_threads()
+
+_affinity_local = threading.local()
+_process_cores = (
+    frozenset(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else None
+)
+
+
+def set_torch_threads(intra_op_threads=0, inter_op_threads=0):
+    """
+    Apply process-wide PyTorch thread counts (0 keeps the runtime default)
+
+    Meant to be called once at startup (the orchestrator does so before
+    building its first agent); per-agent intra-op counts are applied per
+    calling thread by apply_thread_settings instead. Inter-op threads can
+    only be set once per process, before any parallel work has started;
+    later requests are ignored.
+    """
+    global _interop_threads_set
+
+    with _thread_lock:
+        if intra_op_threads and torch.get_num_threads() != intra_op_threads:
+            torch.set_num_threads(intra_op_threads)
+        if inter_op_threads and not _interop_threads_set:
+            try:
+                torch.set_num_interop_threads(inter_op_threads)
+            except RuntimeError:
+                pass
+            _interop_threads_set = True
+
+
+def apply_thread_settings(intra_op_threads=0, cpu_affinity=None):
+    """
+    Apply an agent's thread settings to the calling thread
+
+    With the OpenMP backend torch.set_num_threads only affects the calling
+    thread, so agents sharing a Flask thread each get their own intra-op
+    count; 0 restores the process default, so an agent without a setting
+    does not inherit the previous agent's count.
+
+    cpu_affinity pins the calling thread (and OpenMP threads it starts) to
+    those cores; calls without it restore the process affinity. Pinning is
+    Linux-only and ignored elsewhere.
+    """
+    threads = intra_op_threads or _default_threads
+    if torch.get_num_threads() != threads:
+        torch.set_num_threads(threads)
+
+    if _process_cores is None:
+        return
+    cores = frozenset(cpu_affinity) if cpu_affinity else None
+    if getattr(_affinity_local, "cores", None) != cores:
+        os.sched_setaffinity(0, cores or _process_cores)
+        _affinity_local.cores = cores
+
+
+class ModelRunner:
+    """
+    Owns the eval-mode inference copy of an agent model.
+
+    Every call goes through torch.inference_mode (or an ONNX Runtime session),
+    reuses per-thread input buffers and records its latency. With
+    max_batch_size > 1, concurrent calls are coalesced by a MicroBatcher.
+    """
+
+    def __init__(
+        self,
+        model,
+        task="regression",
+        device=None,
+        quantization="none",
+        backend="torch",
+        onnx_path=None,
+        calibration_path=None,
+        intra_op_threads=0,
+        inter_op_threads=0,
+        cpu_affinity=None,
+        precision="float32",
+        max_batch_size=1,
+        max_batch_latency_ms=5.0,
+        history_size=1000,
+    ):
+        """
+        Args:
+            model: float PyTorch model (used for training and checkpoints)
+            task: "classification" -> (predictions, probs),
+                  "regression" -> outputs, "anomaly" -> reconstruction error
+            device: torch device of the float model
+            quantization: "none", "dynamic" or "static"
+            backend: "torch" or "onnx"
+            onnx_path: ONNX file used by the onnx backend
+            calibration_path: .npy file of calibration inputs for static
+                              quantization (written by calibrate(), read by build())
+            intra_op_threads: intra-op threads for calls (0 = process default)
+            inter_op_threads: ONNX Runtime inter-op threads (0 = default);
+                              torch's are process-wide, see set_torch_threads
+            cpu_affinity: cores inference threads are pinned to (None = no pinning)
+            precision: "float32", or "bfloat16"/"float16" to autocast the float
+                       model (quantized and ONNX paths are unaffected)
+            max_batch_size: rows per coalesced forward pass (1 disables batching)
+            max_batch_latency_ms: longest a request waits for others to batch with
+            history_size: number of recent call timings kept
+        """
+        self.model = model
+        self.task = task
+        self.device = device or torch.device("cpu")
+        self.quantization = quantization
+        self.backend = backend
+        self.onnx_path = onnx_path
+        self.calibration_path = calibration_path
+        self.intra_op_threads = intra_op_threads
+        self.inter_op_threads = inter_op_threads
+        self.cpu_affinity = list(cpu_affinity) if cpu_affinity else None
+        self.precision = check_precision(precision)
+
+        self.calibration_data = None
+        self.inference_model = model
+        self.timings = deque(maxlen=history_size)
+        self.num_calls = 0
+        self._local = threading.local()
+
+        self.batcher = None
+        if max_batch_size > 1:
+            self.batcher = MicroBatcher(
+                self._run_batch,
+                max_batch_size=max_batch_size,
+                max_latency_ms=max_batch_latency_ms,
+                name=f"MicroBatcher-{type(model).__name__}",
+            )
+
+    @property
+    def inference_device(self):
+        """Device inference inputs must live on"""
+        if self.backend == "onnx" or self.inference_model is not self.model:
+            return torch.device("cpu")
+        return self.device
+
+    def build(self, export=True):
+        """
+        Rebuild the inference model after the float weights change
+
+        Args:
+            export: re-export the ONNX file (otherwise an existing file is reused)
+
+        Returns:
+            Short description of the active inference path
+        """
+        self.model.eval()
+        self._local = threading.local()
+
+        if self.backend == "onnx":
+            from .onnx_export import build_onnx_model
+
+            self.inference_model = build_onnx_model(
+                self.model,
+                self.onnx_path,
+                task=self.task,
+                export=export,
+                intra_op_threads=self.intra_op_threads,
+                inter_op_threads=self.inter_op_threads,
+            )
+            return f"onnxruntime ({self.onnx_path})"
+
+        if self.quantization == "static" and self.calibration_data is None:
+            if self.calibration_path and os.path.exists(self.calibration_path):
+                self.calibration_data = np.load(self.calibration_path)
+            else:
+                self.inference_model = self.model
+                return "uncalibrated (static quantization needs calibrate() before inference)"
+
+        self.inference_model = quantize_model(
+            self.model, self.quantization, self.calibration_data
+        )
+        if self.quantization != "none":
+            return f"int8 {self.quantization}"
+        return "float32"
+
+    def calibrate(self, calibration_data):
+        """
+        Store calibration inputs and rebuild (used by static quantization)
+
+        With a calibration_path the inputs are also saved there, so later
+        builds (after training or loading a checkpoint, or in a new process)
+        quantize without being handed calibration data again.
+        """
+        self.calibration_data = torch.cat(list(_calibration_batches(calibration_data))).numpy()
+        if self.calibration_path:
+            os.makedirs(os.path.dirname(self.calibration_path) or ".", exist_ok=True)
+            np.save(self.calibration_path, self.calibration_data)
+        return self.build(export=False)
+
+    def _input_tensor(self, x):
+        """Convert an input batch to a tensor, reusing a per-thread buffer"""
+        device = self.inference_device
+        array = np.asarray(x)
+
+        if device.type == "cpu" and array.dtype == np.float32 and array.flags.c_contiguous:
+            return torch.from_numpy(array)
+
+        # Keep only the last shape: micro-batches and fleet batches vary in
+        # size, and a buffer per shape ever seen would grow without bound
+        buffer = getattr(self._local, "buffer", None)
+        if buffer is None or buffer.shape != array.shape or buffer.device != device:
+            buffer = self._local.buffer = torch.empty(array.shape, dtype=torch.float32, device=device)
+        buffer.copy_(torch.from_numpy(np.ascontiguousarray(array)), non_blocking=True)
+        return buffer
+
+    def run(self, x):
+        """
+        Run one inference call on a batch
+
+        Args:
+            x: batched model input (numpy array or tensor)
+
+        Returns:
+            numpy outputs: (predictions, probs) for classification, scores for
+            anomaly, raw outputs otherwise
+        """
+        start = time.perf_counter()
+
+        batcher = self.batcher  # close() may clear it concurrently
+        if batcher is not None:
+            if isinstance(x, torch.Tensor):
+                x = x.detach().cpu().numpy()
+            result = batcher.submit(x)
+        else:
+            result = self._run_batch(x)
+
+        self.timings.append(time.perf_counter() - start)
+        self.num_calls += 1
+        return result
+
+    def _run_batch(self, x):
+        """Single forward pass on a batch, returning numpy outputs"""
+        if self.backend == "onnx":
+            if self.task == "anomaly":
+                result = self.inference_model.get_anomaly_score(x)
+            else:
+                result = self.inference_model.predict(x)
+        else:
+            if isinstance(x, torch.Tensor):
+                x = x.detach().cpu().numpy()
+            if self.quantization == "static" and self.calibration_data is None:
+                raise RuntimeError(
+                    "Static quantization is configured but the model has not been calibrated; "
+                    "call quantize() with representative inputs or provide calibration_path"
+                )
+            apply_thread_settings(self.intra_op_threads, self.cpu_affinity)
+            if self.inference_model.training:
+                self.inference_model.eval()
+            precision = self.precision if self.inference_model is self.model else "float32"
+            with torch.inference_mode(), autocast(precision, self.inference_device):
+                tensor = self._input_tensor(x)
+                if self.task == "anomaly":
+                    result = self.inference_model.get_anomaly_score(tensor).float().cpu().numpy()
+                elif self.task == "classification":
+                    predictions, probs = self.inference_model.predict(tensor)
+                    result = (predictions.cpu().numpy(), probs.float().cpu().numpy())
+                else:
+                    result = self.inference_model.predict(tensor).float().cpu().numpy()
+        return result
+
+    def close(self):
+        """Stop the micro-batching thread; later calls run unbatched"""
+        batcher, self.batcher = self.batcher, None
+        if batcher is not None:
+            batcher.close()
+
+    def stats(self):
+        """Latency statistics over the recent call history"""
+        if not self.timings:
+            return {"calls": self.num_calls, "mean_ms": 0.0, "p50_ms": 0.0, "p95_ms": 0.0}
+
+        timings = np.fromiter(self.timings, dtype=np.float64) * 1000.0
+        stats = {
+            "calls": self.num_calls,
+            "mean_ms": float(timings.mean()),
+            "p50_ms": float(np.percentile(timings, 50)),
+            "p95_ms": float(np.percentile(timings, 95)),
+        }
+        if self.batcher is not None and self.batcher.batch_sizes:
+            stats["mean_batch_size"] = float(np.mean(self.batcher.batch_sizes))
+        return stats
@@ -0,0 +1,181 @@
+"""Latency-tiered model variants per modality"""
+
+import torch
+
+from .thermal_cnn import ThermalCNN
+from .acoustic_classifier import AcousticClassifier
+from .rul_lstm import RULLSTM
+from .anomaly_autoencoder import AnomalyAutoencoder
+from .attmoe import AttMoE
+from src.utils.benchmark import measure_latency
+
+# Architecture of each variant; "base" matches the original models
+# (thermal variants take single-channel thermal maps).
+MODEL_ZOO = {
+    "thermal": {
+        "tiny": {"input_channels": 1, "channels": (16, 32), "fc_size": 32},
+        "base": {"input_channels": 1, "channels": (32, 64, 128), "fc_size": 64},
+        "large": {"input_channels": 1, "channels": (64, 128, 256), "fc_size": 128},
+    },
+    "acoustic": {
+        "tiny": {"channels": (16, 32), "dense_sizes": (64,)},
+        "base": {"channels": (32, 64, 128), "dense_sizes": (256, 128)},
+        "large": {"channels": (64, 128, 256), "dense_sizes": (512, 256)},
+    },
+    "rul": {
+        "tiny": {"hidden_size": 32, "num_layers": 1},
+        "base": {"hidden_size": 64, "num_layers": 2},
+        "large": {"hidden_size": 128, "num_layers": 3},
+    },
+    "attmoe": {
+        "tiny": {"hidden_dim": 64, "num_experts": 4, "top_k": 1},
+        "base": {"hidden_dim": 256, "num_experts": 16, "top_k": 2},
+        "large": {"hidden_dim": 512, "num_experts": 32, "top_k": 2},
+    },
+    "anomaly": {
+        "tiny": {"hidden_size": 3, "num_layers": 1},
+        "base": {"hidden_size": 5, "num_layers": 2},
+        "large": {"hidden_size": 5, "num_layers": 3},
+    },
+}
+
+MODEL_CLASSES = {
+    "thermal": ThermalCNN,
+    "acoustic": AcousticClassifier,
+    "rul": RULLSTM,
+    "attmoe": AttMoE,
+    "anomaly": AnomalyAutoencoder,
+}
+
+VARIANT_ORDER = ("tiny", "base", "large")
+
+
+def build_model(modality, variant="base", **overrides):
+    """
+    Construct a model variant
+
+    Args:
+        modality: "thermal", "acoustic", "rul", "attmoe" or "anomaly"
+        variant: "tiny", "base" or "large"
+        **overrides: constructor arguments that take precedence over the variant
+
+    Returns:
+        Float model (untrained)
+    """
+    if variant not in MODEL_ZOO[modality]:
+        raise ValueError(
+            f"Unknown {modality} variant '{variant}'. Expected one of {VARIANT_ORDER}"
+        )
+    kwargs = {**MODEL_ZOO[modality][variant], **overrides}
+    model = MODEL_CLASSES[modality](**kwargs)
+
+    # Recorded in checkpoints so a different variant can be rebuilt on load
+    model.architecture = {"modality": modality, "variant": variant, "overrides": overrides}
+    return model
+
+
+def save_checkpoint(model, filepath):
+    """Save weights together with the architecture that build_model recorded"""
+    architecture = getattr(model, "architecture", None)
+    if architecture is None:
+        torch.save(model.state_dict(), filepath)
+    else:
+        torch.save({"architecture": architecture, "state_dict": model.state_dict()}, filepath)
+
+
+def migrate_thermal_state_dict(state_dict, model):
+    """
+    Fit a legacy 3-channel ThermalCNN state_dict to a single-channel model
+
+    Older checkpoints were trained on thermal maps replicated to three
+    channels. Summing the first conv's weights over the channel axis gives
+    the single-channel model exactly the outputs the legacy model produced
+    for those replicated maps. Other state_dicts are returned unchanged.
+    """
+    key = "conv_block1.0.weight"
+    weight = state_dict.get(key)
+    if (
+        not isinstance(model, ThermalCNN)
+        or weight is None
+        or weight.shape[1] == model.input_channels
+        or model.input_channels != 1
+    ):
+        return state_dict
+    return {**state_dict, key: weight.sum(dim=1, keepdim=True)}
+
+
+def load_checkpoint(filepath, model, map_location=None):
+    """
+    Load a checkpoint written by save_checkpoint (or a plain state_dict)
+
+    When the checkpoint records an architecture, a fresh model of that
+    variant is built instead of loading into the given one, so student or
+    resized checkpoints load into an agent configured for another variant.
+    Plain 3-channel thermal state_dicts are migrated to single-channel
+    models (see migrate_thermal_state_dict).
+
+    Returns:
+        Model holding the loaded weights (possibly a new instance)
+    """
+    checkpoint = torch.load(filepath, map_location=map_location)
+    if "architecture" in checkpoint:
+        architecture = checkpoint["architecture"]
+        model = build_model(
+            architecture["modality"], architecture["variant"], **architecture["overrides"]
+        )
+        if map_location is not None:
+            model.to(map_location)
+        checkpoint = checkpoint["state_dict"]
+    model.load_state_dict(migrate_thermal_state_dict(checkpoint, model))
+    return model
+
+
+def sample_input(modality, model, thermal_size=(8, 8), sequence_length=50):
+    """Batch-of-one input matching a model's expected shape"""
+    if modality == "thermal":
+        return torch.rand(1, model.input_channels, *thermal_size)
+    if modality == "acoustic":
+        return torch.rand(1, *model.input_shape)
+    if modality == "rul":
+        return torch.rand(1, sequence_length, model.input_size)
+    if modality == "attmoe":
+        return torch.rand(1, 1, model.feature_size)
+    return torch.rand(1, model.input_size)
+
+
+def select_variant(modality, latency_budget_ms, iterations=20, **overrides):
+    """
+    Pick the largest variant whose batch-of-one p50 latency fits the budget
+
+    Latency is measured on this host so the choice reflects the actual CPU.
+    Falls back to "tiny" when nothing fits.
+
+    Returns:
+        (variant name, measured p50 latency in ms)
+    """
+    thermal_size = overrides.pop("thermal_size", (8, 8))
+    chosen, chosen_latency = None, None
+
+    for variant in VARIANT_ORDER:
+        model = build_model(modality, variant, **overrides).eval()
+        x = sample_input(modality, model, thermal_size=thermal_size)
+        with torch.inference_mode():
+            latency = measure_latency(model, x, warmup=3, iterations=iterations)["p50_ms"]
+        if chosen is None or latency <= latency_budget_ms:
+            chosen, chosen_latency = variant, latency
+        if latency > latency_budget_ms:
+            break
+
+    return chosen, chosen_latency
+
+
+def resolve_variant(modality, config, **overrides):
+    """
+    Variant named by an agent config ("variant" key, default "base")
+
+    "auto" runs select_variant against the config's latency_budget_ms.
+    """
+    variant = config.get("variant", "base")
+    if variant != "auto":
+        return variant
+    return select_variant(modality, config.get("latency_budget_ms", 5.0), **overrides)[0]
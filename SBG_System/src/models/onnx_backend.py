@@ -0,0 +1,92 @@
+"""ONNX Runtime inference backend (no PyTorch dependency)"""
+
+import os
+from types import SimpleNamespace
+import numpy as np
+import onnxruntime as ort
+
+# Files written by onnx_export.export_orchestrator and their OnnxModel task
+ORCHESTRATOR_MODELS = {
+    "thermal_cnn": "classification",
+    "acoustic_classifier": "classification",
+    "rul_lstm": "regression",
+    "anomaly_autoencoder": "anomaly",
+    "dqn_network": "regression",
+}
+
+
+def _to_numpy(x):
+    """Convert tensors/arrays to a contiguous float32 numpy array"""
+    if hasattr(x, "detach"):
+        x = x.detach().cpu().numpy()
+    return np.ascontiguousarray(x, dtype=np.float32)
+
+
+def _softmax(logits):
+    """Numerically stable softmax over the class axis"""
+    shifted = logits - logits.max(axis=1, keepdims=True)
+    exp = np.exp(shifted)
+    return exp / exp.sum(axis=1, keepdims=True)
+
+
+class OnnxModel:
+    """ONNX Runtime CPU session exposing the same inference API as the PyTorch models"""
+
+    def __init__(self, filepath, task="regression", intra_op_threads=0, inter_op_threads=0):
+        """
+        Args:
+            filepath: path to an exported .onnx model
+            task: "classification" (predict returns predictions, probs),
+                  "regression" (predict returns outputs) or "anomaly"
+            intra_op_threads: ORT intra-op threads (0 = runtime default)
+            inter_op_threads: ORT inter-op threads (0 = runtime default)
+        """
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = intra_op_threads
+        options.inter_op_num_threads = inter_op_threads
+
+        self.filepath = str(filepath)
+        self.task = task
+        self.session = ort.InferenceSession(
+            self.filepath, options, providers=["CPUExecutionProvider"]
+        )
+        self.input_name = self.session.get_inputs()[0].name
+        self.output_name = self.session.get_outputs()[0].name
+
+    def __call__(self, x):
+        """Run the raw model forward pass"""
+        return self.session.run([self.output_name], {self.input_name: _to_numpy(x)})[0]
+
+    def predict(self, x):
+        """Get predictions, mirroring the PyTorch model's predict()"""
+        outputs = self(x)
+        if self.task == "classification":
+            probs = _softmax(outputs)
+            return probs.argmax(axis=1), probs
+        return outputs
+
+    def get_anomaly_score(self, x):
+        """Reconstruction error per sample, mirroring AnomalyAutoencoder"""
+        x = _to_numpy(x)
+        reconstructed = self(x)
+        return np.mean((x - reconstructed) ** 2, axis=1)
+
+
+def load_orchestrator_models(directory, intra_op_threads=0, inter_op_threads=0):
+    """
+    Open the orchestrator models exported by export_orchestrator
+
+    Returns:
+        Namespace with one OnnxModel per exported model
+        (models.thermal_cnn.predict(images), ...)
+    """
+    return SimpleNamespace(**{
+        name: OnnxModel(
+            os.path.join(directory, f"{name}.onnx"),
+            task=task,
+            intra_op_threads=intra_op_threads,
+            inter_op_threads=inter_op_threads,
+        )
+        for name, task in ORCHESTRATOR_MODELS.items()
+    })
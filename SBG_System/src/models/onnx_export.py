@@ -0,0 +1,170 @@
+"""Export Smart Battery Guardian models to ONNX"""
+
+import copy
+import inspect
+import os
+import threading
+import warnings
+from pathlib import Path
+import numpy as np
+import torch
+
+from .thermal_cnn import ThermalCNN
+from .acoustic_classifier import AcousticClassifier
+from .rul_lstm import RULLSTM
+from .anomaly_autoencoder import AnomalyAutoencoder
+from .rl_controller import DQNNetwork
+
+OPSET_VERSION = 17
+
+
+# Trace with more than one row so no batch-dependent shape is frozen as 1
+EXPORT_BATCH_SIZE = 2
+
+# nn.LSTM's shape checks are Python comparisons the tracer cannot record, and
+# the exporter warns about LSTMs traced with batch > 1; neither affects the
+# graph since no initial state is passed (test_onnx_parity runs the exported
+# models at other batch sizes and sequence lengths)
+_IGNORED_EXPORT_WARNINGS = (
+    "Converting a tensor to a Python boolean",
+    "Exporting a model to ONNX with a batch_size other than 1",
+)
+
+
+def _export_spec(model):
+    """Sample input and dynamic axes for each supported model class"""
+    batch = EXPORT_BATCH_SIZE
+    if isinstance(model, ThermalCNN):
+        channels = model.conv_block1[0].in_channels
+        return torch.rand(batch, channels, 8, 8), {0: "batch", 2: "height", 3: "width"}
+    if isinstance(model, AcousticClassifier):
+        return torch.rand(batch, *model.input_shape), {0: "batch"}
+    if isinstance(model, RULLSTM):
+        return torch.rand(batch, 5, model.input_size), {0: "batch", 1: "sequence"}
+    if isinstance(model, AnomalyAutoencoder):
+        return torch.rand(batch, model.input_size), {0: "batch"}
+    if isinstance(model, DQNNetwork):
+        return torch.rand(batch, model.fc[0].in_features), {0: "batch"}
+    raise ValueError(f"No ONNX export spec for {type(model).__name__}")
+
+
+def export_model(model, filepath):
+    """
+    Export a float model to ONNX with a dynamic batch axis
+
+    The model is written to a temporary file next to filepath and renamed
+    into place, so processes exporting the same path concurrently (e.g.
+    inference workers starting up) never read a partially written file.
+
+    Args:
+        model: ThermalCNN, AcousticClassifier, RULLSTM, AnomalyAutoencoder or DQNNetwork
+        filepath: destination .onnx path (parent directories are created)
+
+    Returns:
+        Path of the exported model
+    """
+    sample_input, input_axes = _export_spec(model)
+    model = copy.deepcopy(model).cpu().eval()
+
+    filepath = Path(filepath)
+    filepath.parent.mkdir(parents=True, exist_ok=True)
+
+    kwargs = {}
+    if "dynamo" in inspect.signature(torch.onnx.export).parameters:
+        kwargs["dynamo"] = False
+
+    with warnings.catch_warnings():
+        for message in _IGNORED_EXPORT_WARNINGS:
+            warnings.filterwarnings("ignore", message=message)
+        temp_path = filepath.with_name(f".{filepath.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            torch.onnx.export(
+                model,
+                sample_input,
+                str(temp_path),
+                input_names=["input"],
+                output_names=["output"],
+                dynamic_axes={"input": input_axes, "output": {0: "batch"}},
+                opset_version=OPSET_VERSION,
+                **kwargs,
+            )
+            os.replace(temp_path, filepath)
+        finally:
+            if temp_path.exists():
+                temp_path.unlink()
+    return filepath
+
+
+def build_onnx_model(
+    model,
+    filepath,
+    task="regression",
+    export=True,
+    intra_op_threads=0,
+    inter_op_threads=0,
+):
+    """
+    Export a model (if requested or missing) and open an ONNX Runtime session
+
+    Args:
+        model: float PyTorch model whose weights should be served
+        filepath: .onnx path
+        task: OnnxModel task ("classification", "regression", "anomaly")
+        export: re-export even if the file already exists
+        intra_op_threads: ORT intra-op threads (0 = runtime default)
+        inter_op_threads: ORT inter-op threads (0 = runtime default)
+    """
+    from .onnx_backend import OnnxModel  # onnxruntime is only needed for this backend
+
+    if filepath is None:
+        raise ValueError("onnx_path must be set to use the onnx backend")
+    if export or not os.path.exists(filepath):
+        export_model(model, filepath)
+    return OnnxModel(
+        filepath,
+        task=task,
+        intra_op_threads=intra_op_threads,
+        inter_op_threads=inter_op_threads,
+    )
+
+
+def export_orchestrator(orchestrator, output_dir):
+    """
+    Export all five orchestrator models to a directory
+
+    Returns:
+        Dictionary mapping model name to exported path
+    """
+    output_dir = Path(output_dir)
+    models = {
+        "thermal_cnn": orchestrator.thermal_agent.model,
+        "acoustic_classifier": orchestrator.acoustic_agent.model,
+        "rul_lstm": orchestrator.rul_agent.model,
+        "anomaly_autoencoder": orchestrator.anomaly_agent.model,
+        "dqn_network": orchestrator.rl_controller.q_network,
+    }
+    return {
+        name: export_model(model, output_dir / f"{name}.onnx")
+        for name, model in models.items()
+    }
+
+
+def check_parity(model, onnx_model, inputs, rtol=1e-4, atol=1e-5):
+    """
+    Compare PyTorch and ONNX Runtime outputs on the same inputs
+
+    Returns:
+        Dictionary with max absolute difference and pass/fail flag
+    """
+    was_training = model.training
+    model.eval()
+    inputs = torch.as_tensor(inputs, dtype=torch.float32)
+    with torch.no_grad():
+        expected = model(inputs).cpu().numpy()
+    model.train(was_training)
+
+    actual = onnx_model(inputs.numpy())
+    return {
+        "max_abs_diff": float(np.max(np.abs(expected - actual))),
+        "passed": bool(np.allclose(expected, actual, rtol=rtol, atol=atol)),
+    }
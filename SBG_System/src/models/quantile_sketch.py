@@ -0,0 +1,230 @@
+"""Mergeable streaming quantile sketch (KLL) for score distributions"""
+
+import math
+import random
+from functools import lru_cache
+import numpy as np
+
+_SHRINK = 2.0 / 3.0  # capacity ratio between neighbouring levels
+
+
+@lru_cache(maxsize=None)
+def _capacities(k, num_levels):
+    """Capacity of each level (level 0 first) and their sum"""
+    capacities = tuple(
+        max(int(math.ceil(k * _SHRINK ** (num_levels - level - 1))), 2)
+        for level in range(num_levels)
+    )
+    return capacities, sum(capacities)
+
+
+class KLLSketch:
+    """
+    KLL quantile sketch (Karnin, Lang & Liberty, 2016).
+
+    Values go into level 0; when the sketch is full the lowest level over
+    its capacity is sorted and every other value (random offset) moves up a
+    level with twice the weight. Level capacities shrink by 2/3 per level
+    below the top, so the sketch keeps about 3k values no matter how many
+    it has seen and a quantile's rank error is about 1.7/k.
+
+    Sketches with the same k can be merged, e.g. to get fleet-wide
+    quantiles from sketches kept in separate worker processes without
+    moving any raw scores. Retained values are float32.
+
+    Compaction offsets come from the sketch's own random.Random, so a seeded
+    sketch is reproducible and a restored one continues the same sequence.
+    """
+
+    __slots__ = (
+        "k", "count", "min", "max", "_level0", "_size0", "_upper", "_sizes", "_sorted", "_rng"
+    )
+
+    def __init__(self, k=200, seed=None):
+        """
+        Args:
+            k: accuracy parameter (rank error ~1.7/k, ~3k values retained)
+            seed: seed for the compaction offsets (None = nondeterministic)
+        """
+        if k < 8:
+            raise ValueError("KLLSketch k must be at least 8")
+        self.k = k
+        self._rng = random.Random(seed)
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self._level0 = np.empty(self._max_size(1), dtype=np.float32)
+        self._size0 = 0
+        self._upper = np.empty(0, dtype=np.float32)  # levels 1.. concatenated
+        self._sizes = []  # sizes of levels 1..
+        self._sorted = None
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def num_levels(self):
+        return 1 + len(self._sizes)
+
+    @property
+    def num_retained(self):
+        """Values currently stored"""
+        return self._size0 + len(self._upper)
+
+    def _max_size(self, num_levels):
+        return _capacities(self.k, num_levels)[1]
+
+    def update(self, value):
+        """Add one value"""
+        value = float(value)
+        if self._size0 == len(self._level0):
+            self._compress()
+        self._level0[self._size0] = value
+        self._size0 += 1
+        self.count += 1
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        self._sorted = None
+        if self.num_retained >= self._max_size(self.num_levels):
+            self._compress()
+
+    def update_many(self, values):
+        """Add an array of values"""
+        values = np.asarray(values, dtype=np.float32).reshape(-1)
+        if len(values) == 0:
+            return
+        levels = self._levels()
+        levels[0] = np.concatenate([levels[0], values])
+        self._set_levels(levels)
+        self.count += len(values)
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self._compress()
+
+    def merge(self, other):
+        """Fold another sketch into this one (returns self)"""
+        if other.k != self.k:
+            raise ValueError(f"Cannot merge KLLSketch with k={other.k} into one with k={self.k}")
+        if other.count == 0:
+            return self
+        mine, theirs = self._levels(), other._levels()
+        if len(theirs) > len(mine):
+            mine += [np.empty(0, dtype=np.float32)] * (len(theirs) - len(mine))
+        for h, level in enumerate(theirs):
+            mine[h] = np.concatenate([mine[h], level])
+        self._set_levels(mine)
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+        return self
+
+    def _levels(self):
+        """Retained values per level (level 0 first)"""
+        levels = [self._level0[:self._size0].copy()]
+        offset = 0
+        for size in self._sizes:
+            levels.append(self._upper[offset:offset + size])
+            offset += size
+        return levels
+
+    def _set_levels(self, levels):
+        """Store per-level values (level 0 first)"""
+        capacity = max(self._max_size(len(levels)), len(levels[0]) + 1)
+        if len(self._level0) < capacity:
+            self._level0 = np.empty(capacity, dtype=np.float32)
+        self._size0 = len(levels[0])
+        self._level0[:self._size0] = levels[0]
+        self._sizes = [len(level) for level in levels[1:]]
+        self._upper = (
+            np.concatenate(levels[1:]).astype(np.float32, copy=False)
+            if len(levels) > 1 else np.empty(0, dtype=np.float32)
+        )
+        self._sorted = None
+
+    def _compress(self):
+        """Compact the lowest full levels until the sketch fits again"""
+        levels = self._levels()
+        while sum(len(level) for level in levels) >= self._max_size(len(levels)):
+            capacities = _capacities(self.k, len(levels))[0]
+            for h, capacity in enumerate(capacities):
+                if len(levels[h]) >= capacity:
+                    break
+            if h + 1 == len(levels):
+                levels.append(np.empty(0, dtype=np.float32))
+            values = np.sort(levels[h])
+            keep = len(values) % 2
+            levels[h] = values[:keep]
+            promoted = values[keep + self._rng.getrandbits(1)::2]
+            levels[h + 1] = np.concatenate([levels[h + 1], promoted])
+        self._set_levels(levels)
+
+    def _sorted_view(self):
+        """Retained values in order and their cumulative weights"""
+        if self._sorted is None:
+            levels = self._levels()
+            values = np.concatenate(levels)
+            weights = np.concatenate([
+                np.full(len(level), 1 << h, dtype=np.int64) for h, level in enumerate(levels)
+            ])
+            order = np.argsort(values, kind="stable")
+            self._sorted = (values[order], np.cumsum(weights[order]))
+        return self._sorted
+
+    def quantile(self, q):
+        """
+        Approximate q-quantile (scalar or array of q in [0, 1])
+
+        Returns NaN for an empty sketch; q=0 and q=1 give the exact min/max.
+        """
+        if self.count == 0:
+            return np.full(np.shape(q), np.nan) if np.ndim(q) else math.nan
+        values, cumulative = self._sorted_view()
+        q = np.asarray(q, dtype=np.float64)
+        index = np.minimum(np.searchsorted(cumulative, q * cumulative[-1]), len(values) - 1)
+        result = np.clip(values[index].astype(np.float64), self.min, self.max)
+        result = np.where(q <= 0, self.min, np.where(q >= 1, self.max, result))
+        return float(result) if result.ndim == 0 else result
+
+    def rank(self, value):
+        """Approximate fraction of values <= value"""
+        if self.count == 0:
+            return math.nan
+        values, cumulative = self._sorted_view()
+        index = np.searchsorted(values, value, side="right")
+        return float(cumulative[index - 1] / cumulative[-1]) if index else 0.0
+
+    def state_dict(self):
+        """
+        Picklable snapshot (values as a float32 array plus level sizes)
+
+        Everything but "items" is JSON-serializable: an empty sketch's
+        min/max are None rather than infinities.
+        """
+        levels = self._levels()
+        version, internal, gauss_next = self._rng.getstate()
+        return {
+            "k": self.k,
+            "count": self.count,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+            "items": np.concatenate(levels),
+            "levels": [len(level) for level in levels],
+            "rng_state": [version, list(internal), gauss_next],
+        }
+
+    @classmethod
+    def from_state_dict(cls, state):
+        """Rebuild a sketch from state_dict()"""
+        sketch = cls(int(state["k"]))
+        items = np.asarray(state["items"], dtype=np.float32)
+        bounds = np.cumsum([0] + list(state["levels"]))
+        sketch._set_levels([items[bounds[h]:bounds[h + 1]] for h in range(len(bounds) - 1)])
+        sketch.count = int(state["count"])
+        if state["min"] is not None:
+            sketch.min = float(state["min"])
+            sketch.max = float(state["max"])
+        if state.get("rng_state") is not None:
+            version, internal, gauss_next = state["rng_state"]
+            sketch._rng.setstate((version, tuple(internal), gauss_next))
+        return sketch
@@ -0,0 +1,189 @@
+"""Post-training int8 quantization for CPU inference"""
+
+import copy
+import io
+import torch
+import torch.nn as nn
+import torch.nn.functional as F
+from torch.ao.quantization import (
+    quantize_dynamic,
+    get_default_qconfig,
+    fuse_modules,
+    prepare,
+    convert,
+)
+
+QUANTIZATION_MODES = ("none", "dynamic", "static")
+
+
+def _select_engine():
+    """Pick the best available quantized kernel backend"""
+    engines = torch.backends.quantized.supported_engines
+    for engine in ("x86", "fbgemm", "qnnpack"):
+        if engine in engines:
+            return engine
+    return torch.backends.quantized.engine
+
+
+def _fusable_groups(model):
+    """Find Conv-BN-ReLU and Linear-ReLU runs inside nn.Sequential blocks"""
+    groups = []
+    for name, module in model.named_modules():
+        if not isinstance(module, nn.Sequential):
+            continue
+        children = list(module.children())
+        prefix = f"{name}." if name else ""
+        i = 0
+        while i < len(children):
+            child = children[i]
+            nxt = children[i + 1] if i + 1 < len(children) else None
+            after = children[i + 2] if i + 2 < len(children) else None
+
+            if isinstance(child, (nn.Conv1d, nn.Conv2d)) and isinstance(
+                nxt, (nn.BatchNorm1d, nn.BatchNorm2d)
+            ):
+                if isinstance(after, nn.ReLU):
+                    groups.append([f"{prefix}{j}" for j in (i, i + 1, i + 2)])
+                    i += 3
+                else:
+                    groups.append([f"{prefix}{j}" for j in (i, i + 1)])
+                    i += 2
+                continue
+            if isinstance(child, nn.Linear) and isinstance(nxt, nn.ReLU):
+                groups.append([f"{prefix}{i}", f"{prefix}{i + 1}"])
+                i += 2
+                continue
+            i += 1
+    return groups
+
+
+def _calibration_batches(calibration_data, batch_size=32):
+    """Yield float32 batches from a tensor, array or iterable of batches"""
+    if isinstance(calibration_data, torch.Tensor) or hasattr(calibration_data, "shape"):
+        data = torch.as_tensor(calibration_data, dtype=torch.float32)
+        for start in range(0, len(data), batch_size):
+            yield data[start : start + batch_size]
+        return
+
+    for batch in calibration_data:
+        if isinstance(batch, (list, tuple)):
+            batch = batch[0]
+        yield torch.as_tensor(batch, dtype=torch.float32)
+
+
+def quantize_dynamic_model(model):
+    """
+    Dynamically quantize LSTM and Linear layers to int8
+
+    Weights are quantized ahead of time and activations on the fly, so no
+    calibration data is needed. The returned copy keeps the original class
+    and therefore its predict/get_anomaly_score helpers.
+    """
+    torch.backends.quantized.engine = _select_engine()
+    model = copy.deepcopy(model).cpu().eval()
+    return quantize_dynamic(model, {nn.LSTM, nn.Linear}, dtype=torch.qint8)
+
+
+def quantize_static_model(model, calibration_data, batch_size=32):
+    """
+    Statically quantize a convolutional model to int8
+
+    The model must wrap its forward pass in QuantStub/DeQuantStub. Conv-BN-ReLU
+    runs are fused first, then observers are calibrated on representative
+    inputs before conversion.
+
+    Args:
+        model: float model (ThermalCNN, AcousticClassifier)
+        calibration_data: tensor/array of inputs or iterable of input batches
+        batch_size: batch size used when calibration_data is a single array
+    """
+    if calibration_data is None:
+        raise ValueError("Static quantization requires calibration data")
+
+    engine = _select_engine()
+    torch.backends.quantized.engine = engine
+
+    model = copy.deepcopy(model).cpu().eval()
+    groups = _fusable_groups(model)
+    if groups:
+        fuse_modules(model, groups, inplace=True)
+
+    model.qconfig = get_default_qconfig(engine)
+    prepare(model, inplace=True)
+    with torch.no_grad():
+        for batch in _calibration_batches(calibration_data, batch_size):
+            model(batch)
+    convert(model, inplace=True)
+    return model
+
+
+def quantize_model(model, mode="none", calibration_data=None):
+    """
+    Build an inference copy of a model for the requested quantization mode
+
+    Args:
+        model: float model
+        mode: "none", "dynamic" or "static"
+        calibration_data: inputs used to calibrate static quantization
+
+    Returns:
+        Model to use for inference ("none" returns the model unchanged)
+    """
+    if mode not in QUANTIZATION_MODES:
+        raise ValueError(
+            f"Unknown quantization mode '{mode}'. Expected one of {QUANTIZATION_MODES}"
+        )
+    if mode == "dynamic":
+        return quantize_dynamic_model(model)
+    if mode == "static":
+        if not hasattr(model, "quant"):
+            raise ValueError(
+                f"{type(model).__name__} does not support static quantization; use 'dynamic'"
+            )
+        return quantize_static_model(model, calibration_data)
+    return model
+
+
+def model_size_bytes(model):
+    """Serialized state_dict size, including packed int8 weights"""
+    buffer = io.BytesIO()
+    torch.save(model.state_dict(), buffer)
+    return buffer.getbuffer().nbytes
+
+
+def compare_models(float_model, quantized_model, inputs, task="classification"):
+    """
+    Accuracy delta between a float model and its quantized copy
+
+    Args:
+        float_model: reference model
+        quantized_model: quantized model
+        inputs: batch of evaluation inputs
+        task: "classification" (softmax outputs) or "regression"
+
+    Returns:
+        Dictionary of output-agreement metrics
+    """
+    was_training = float_model.training
+    float_model.eval()
+    inputs = torch.as_tensor(inputs, dtype=torch.float32)
+    with torch.no_grad():
+        ref = float_model(inputs)
+        out = quantized_model(inputs)
+    float_model.train(was_training)
+
+    if task == "classification":
+        ref_probs = F.softmax(ref, dim=1)
+        out_probs = F.softmax(out, dim=1)
+        return {
+            "agreement": (ref_probs.argmax(1) == out_probs.argmax(1)).float().mean().item(),
+            "mean_abs_delta": (ref_probs - out_probs).abs().mean().item(),
+            "max_abs_delta": (ref_probs - out_probs).abs().max().item(),
+        }
+
+    delta = (ref - out).abs()
+    return {
+        "mean_abs_delta": delta.mean().item(),
+        "max_abs_delta": delta.max().item(),
+        "relative_delta": (delta.sum() / (ref.abs().sum() + 1e-8)).item(),
+    }
@@ -0,0 +1,163 @@
+"""Preallocated NumPy experience replay for the RL charge controller"""
+
+import numpy as np
+
+
+class ReplayBuffer:
+    """
+    Fixed-capacity ring buffer of transitions.
+
+    Transitions live in preallocated arrays (one per field), so adding is a
+    row write and sampling a minibatch is one fancy-index per field.
+    """
+
+    def __init__(self, capacity, state_size, seed=None):
+        """
+        Args:
+            capacity: maximum number of transitions (oldest are overwritten)
+            state_size: length of the state vector
+            seed: random seed for sampling
+        """
+        self.capacity = capacity
+        self.states = np.zeros((capacity, state_size), dtype=np.float32)
+        self.actions = np.zeros(capacity, dtype=np.int64)
+        self.rewards = np.zeros(capacity, dtype=np.float32)
+        self.next_states = np.zeros((capacity, state_size), dtype=np.float32)
+        self.dones = np.zeros(capacity, dtype=np.float32)
+        self.position = 0
+        self.size = 0
+        self.rng = np.random.default_rng(seed)
+
+    def __len__(self):
+        return self.size
+
+    def add(self, state, action, reward, next_state, done):
+        """Store one transition"""
+        self.add_batch(
+            np.asarray(state)[np.newaxis],
+            np.asarray([action]),
+            np.asarray([reward]),
+            np.asarray(next_state)[np.newaxis],
+            np.asarray([done]),
+        )
+
+    def add_batch(self, states, actions, rewards, next_states, dones):
+        """Store a batch of transitions (e.g. from vectorized environments)"""
+        count = len(actions)
+        index = (self.position + np.arange(count)) % self.capacity
+        self.states[index] = states
+        self.actions[index] = actions
+        self.rewards[index] = rewards
+        self.next_states[index] = next_states
+        self.dones[index] = dones
+        self.position = int((self.position + count) % self.capacity)
+        self.size = min(self.size + count, self.capacity)
+        return index
+
+    def _gather(self, index, weights):
+        """Minibatch dictionary for the given rows"""
+        return {
+            "states": self.states[index],
+            "actions": self.actions[index],
+            "rewards": self.rewards[index],
+            "next_states": self.next_states[index],
+            "dones": self.dones[index],
+            "indices": index,
+            "weights": weights,
+        }
+
+    def sample(self, batch_size):
+        """
+        Uniform minibatch
+
+        Returns:
+            Dictionary of arrays (states, actions, rewards, next_states,
+            dones), the sampled buffer indices and importance weights (all 1)
+        """
+        index = self.rng.integers(0, self.size, size=batch_size)
+        return self._gather(index, np.ones(batch_size, dtype=np.float32))
+
+    def update_priorities(self, indices, td_errors):
+        """Uniform replay ignores priorities"""
+
+
+class PrioritizedReplayBuffer(ReplayBuffer):
+    """
+    Proportional prioritized replay (Schaul et al., 2016).
+
+    Priorities are kept in an array-backed sum tree; sampling descends the
+    tree for the whole minibatch at once, level by level.
+    """
+
+    def __init__(
+        self, capacity, state_size, alpha=0.6, beta=0.4, beta_increment=1e-3, epsilon=1e-5, seed=None
+    ):
+        """
+        Args:
+            capacity: maximum number of transitions
+            state_size: length of the state vector
+            alpha: how strongly priorities skew sampling (0 = uniform)
+            beta: initial importance-sampling correction (1 = full correction)
+            beta_increment: added to beta after every sample() until it
+                            reaches 1, annealing the correction in as the
+                            learned values converge (0 keeps beta fixed)
+            epsilon: added to |TD error| so no transition gets zero priority
+            seed: random seed for sampling
+        """
+        super(PrioritizedReplayBuffer, self).__init__(capacity, state_size, seed=seed)
+        self.alpha = alpha
+        self.beta = beta
+        self.beta_increment = beta_increment
+        self.epsilon = epsilon
+
+        self.tree_size = 1
+        while self.tree_size < capacity:
+            self.tree_size *= 2
+        self.tree = np.zeros(2 * self.tree_size, dtype=np.float64)
+        self.max_priority = 1.0
+
+    def add_batch(self, states, actions, rewards, next_states, dones):
+        """Store transitions with the highest priority seen so far"""
+        index = super(PrioritizedReplayBuffer, self).add_batch(
+            states, actions, rewards, next_states, dones
+        )
+        self._set_priorities(index, np.full(len(index), self.max_priority))
+        return index
+
+    def _set_priorities(self, index, priorities):
+        """Write leaf priorities and refresh their ancestors' sums"""
+        nodes = np.asarray(index) + self.tree_size
+        self.tree[nodes] = priorities
+        nodes = np.unique(nodes // 2)
+        while nodes[0] >= 1:
+            self.tree[nodes] = self.tree[2 * nodes] + self.tree[2 * nodes + 1]
+            if nodes[0] == 1:
+                break
+            nodes = np.unique(nodes // 2)
+
+    def sample(self, batch_size):
+        """Minibatch drawn proportionally to priority, with IS weights"""
+        total = self.tree[1]
+        # Stratified: one draw per equal-mass segment
+        targets = (np.arange(batch_size) + self.rng.random(batch_size)) * (total / batch_size)
+
+        nodes = np.ones(batch_size, dtype=np.int64)
+        while nodes[0] < self.tree_size:
+            left = 2 * nodes
+            left_sum = self.tree[left]
+            go_right = targets > left_sum
+            targets = np.where(go_right, targets - left_sum, targets)
+            nodes = np.where(go_right, left + 1, left)
+
+        index = np.minimum(nodes - self.tree_size, self.size - 1)
+        probabilities = self.tree[index + self.tree_size] / total
+        weights = (self.size * probabilities) ** -self.beta
+        weights = (weights / weights.max()).astype(np.float32)
+        self.beta = min(1.0, self.beta + self.beta_increment)
+        return self._gather(index, weights)
+
+    def update_priorities(self, indices, td_errors):
+        """Set priorities from the latest TD errors"""
+        priorities = (np.abs(td_errors) + self.epsilon) ** self.alpha
+        self.max_priority = max(self.max_priority, float(priorities.max()))
+        self._set_priorities(indices, priorities)
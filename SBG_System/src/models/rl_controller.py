@@ -1,8 +1,12 @@
 """Reinforcement Learning Controller for Charge/Discharge Optimization"""
 
+import copy
+import time
 import torch
 import torch.nn as nn
 import numpy as np
+from .model_runner import ModelRunner
+from .replay_buffer import ReplayBuffer, PrioritizedReplayBuffer
 
 
 class DQNNetwork(nn.Module):
@@ -31,6 +35,24 @@ class DQNNetwork(nn.Module):
         """Forward pass"""
         return self.fc(state)
 
+    def q_values(self, state):
+        """
+        Q-values without dropout, whatever the train/eval mode
+
+        Training-time action selection uses this so the online network can
+        stay in train mode instead of being switched back and forth.
+        """
+        for layer in self.fc:
+            if not isinstance(layer, nn.Dropout):
+                state = layer(state)
+        return state
+
+    def predict(self, state):
+        """Get Q-values"""
+        with torch.no_grad():
+            q_values = self.forward(state)
+        return q_values
+
     def save(self, filepath):
         """Save model weights"""
         torch.save(self.state_dict(), filepath)
@@ -43,13 +65,44 @@ class DQNNetwork(nn.Module):
 class RLChargeController:
     """Reinforcement Learning controller for charge/discharge optimization"""
 
-    def __init__(self, state_size=8, action_size=5, learning_rate=0.001, gamma=0.99):
+    def __init__(
+        self,
+        state_size=8,
+        action_size=5,
+        learning_rate=0.001,
+        gamma=0.99,
+        quantization="none",
+        buffer_size=10000,
+        batch_size=64,
+        target_update_interval=100,
+        prioritized_replay=False,
+        double_dqn=True,
+        intra_op_threads=0,
+        cpu_affinity=None,
+        precision="float32",
+        q_network=None,
+        target_network=None,
+    ):
         """
         Args:
             state_size: size of state vector (SOC, temp, voltage, etc.)
             action_size: number of charging rate levels
             learning_rate: learning rate for DQN
             gamma: discount factor
+            quantization: "none" or "dynamic" int8 for greedy (non-training) actions
+            buffer_size: replay memory capacity (transitions)
+            batch_size: minibatch size per update (updates start once the
+                        buffer holds this many transitions)
+            target_update_interval: updates between target network syncs
+            prioritized_replay: sample transitions by TD error
+            double_dqn: pick next actions with the online network and value
+                        them with the target network
+            intra_op_threads: intra-op threads for greedy actions (0 = process default)
+            cpu_affinity: cores greedy-action threads are pinned to (None = no pinning)
+            precision: "float32", or "bfloat16"/"float16" to autocast greedy actions
+            q_network: already loaded DQNNetwork to use (e.g. mapped from a
+                       checkpoint bundle) instead of a freshly initialized one
+            target_network: its target network (defaults to a copy of q_network)
         """
         self.state_size = state_size
         self.action_size = action_size  # 0-5 representing charge rates from -100% to +100%
@@ -58,13 +111,38 @@ class RLChargeController:
         self.epsilon_min = 0.01
         self.epsilon_decay = 0.995
 
-        self.q_network = DQNNetwork(state_size, action_size)
-        self.target_network = DQNNetwork(state_size, action_size)
+        # The online network is only used (and always in train mode) for
+        # learning; greedy inference reads an eval-mode snapshot of it
+        self.q_network = q_network if q_network is not None else DQNNetwork(state_size, action_size)
+        if target_network is None:
+            target_network = copy.deepcopy(self.q_network)
+        self.target_network = target_network
+        self.q_network.train()
+        self.target_network.eval()
         self.optimizer = torch.optim.Adam(
             self.q_network.parameters(), lr=learning_rate
         )
         self.loss_fn = nn.MSELoss()
 
+        # Experience replay and scheduled target updates
+        buffer_class = PrioritizedReplayBuffer if prioritized_replay else ReplayBuffer
+        self.memory = buffer_class(buffer_size, state_size)
+        self.batch_size = batch_size
+        self.target_update_interval = target_update_interval
+        self.double_dqn = double_dqn
+        self.num_updates = 0
+
+        # Greedy-policy inference path (int8 when quantization is enabled)
+        # over a snapshot of the online network, replaced on every target sync
+        self.policy_runner = ModelRunner(
+            self._policy_snapshot(),
+            quantization=quantization,
+            intra_op_threads=intra_op_threads,
+            cpu_affinity=cpu_affinity,
+            precision=precision,
+        )
+        self.policy_runner.build()
+
     def get_action(self, state, training=True):
         """Get action based on epsilon-greedy strategy"""
         if training and np.random.random() < self.epsilon:
@@ -72,48 +150,202 @@ class RLChargeController:
             action = np.random.randint(0, self.action_size)
         else:
             # Exploit
-            with torch.no_grad():
-                state_tensor = torch.tensor(state, dtype=torch.float32)
-                q_values = self.q_network(state_tensor)
-                action = torch.argmax(q_values).item()
+            if training:
+                with torch.no_grad():
+                    state_tensor = torch.tensor(state, dtype=torch.float32)
+                    q_values = self.q_network.q_values(state_tensor)
+                    action = torch.argmax(q_values).item()
+            else:
+                q_values = self.policy_runner.run(np.asarray(state)[np.newaxis])[0]
+                action = int(np.argmax(q_values))
 
         return action
 
+    def get_actions(self, states, training=True):
+        """
+        Epsilon-greedy actions for a batch of states (one forward pass)
+
+        Args:
+            states: array of shape (batch, state_size)
+            training: explore with probability epsilon per state
+
+        Returns:
+            Integer array of shape (batch,)
+        """
+        states = np.asarray(states, dtype=np.float32)
+        if training:
+            with torch.no_grad():
+                q_values = self.q_network.q_values(torch.from_numpy(states)).numpy()
+        else:
+            q_values = self.policy_runner.run(states)
+        actions = np.argmax(q_values, axis=1)
+
+        if training:
+            explore = np.random.random(len(actions)) < self.epsilon
+            actions[explore] = np.random.randint(0, self.action_size, int(explore.sum()))
+        return actions
+
     def action_to_charge_rate(self, action):
         """Convert discrete action to continuous charge rate"""
         # Action 0-4 maps to charge rates from -1.0 to +1.0
         charge_rate = (action - 2) / 2.0
         return np.clip(charge_rate, -1.0, 1.0)
 
+    def remember(self, state, action, reward, next_state, done):
+        """Store a transition in replay memory"""
+        self.memory.add(state, action, reward, next_state, done)
+
     def train_step(self, state, action, reward, next_state, done):
-        """Single training step"""
-        state_tensor = torch.tensor(state, dtype=torch.float32)
-        next_state_tensor = torch.tensor(next_state, dtype=torch.float32)
+        """
+        Store a transition and run one minibatch update from replay memory
 
-        # Current Q-value
-        q_current = self.q_network(state_tensor)[action]
+        Returns:
+            Minibatch loss, or None while the buffer holds fewer than
+            batch_size transitions
+        """
+        self.remember(state, action, reward, next_state, done)
+        loss = self.learn() if len(self.memory) >= self.batch_size else None
+
+        # Decay epsilon
+        if self.epsilon > self.epsilon_min:
+            self.epsilon *= self.epsilon_decay
+
+        return loss
+
+    def train_on_env(self, env, num_steps, updates_per_step=1):
+        """
+        Collect experience from a vectorized environment and learn from it
+
+        Every step acts on all of the environment's cells at once, stores
+        their transitions with one add_batch call and then runs
+        updates_per_step minibatch updates. Epsilon decays once per step.
+        Training ends with a target sync, so greedy actions use the trained
+        weights.
+
+        Args:
+            env: vectorized environment (e.g. VectorBatteryEnv) whose step()
+                 returns (observations, rewards, dones, info) with
+                 info["reset_observations"]
+            num_steps: environment steps (each yields env.num_envs transitions)
+            updates_per_step: minibatch updates per environment step
+
+        Returns:
+            Dictionary of transitions, updates, mean reward and loss, the
+            charged/overheated share of finished episodes and throughput
+        """
+        states = env.reset()
+        transitions = updates = episodes = charged = overheated = 0
+        reward_sum = loss_sum = 0.0
+        start = time.perf_counter()
+
+        for _ in range(num_steps):
+            actions = self.get_actions(states, training=True)
+            next_states, rewards, dones, info = env.step(actions)
+            # Time limits end an episode but are not terminal: keep bootstrapping
+            terminal = info["charged"] | info["overheated"]
+            self.memory.add_batch(states, actions, rewards, next_states, terminal)
+            states = info["reset_observations"]
+
+            transitions += len(actions)
+            reward_sum += float(rewards.sum())
+            episodes += int(dones.sum())
+            charged += int(info["charged"].sum())
+            overheated += int(info["overheated"].sum())
+
+            if len(self.memory) >= self.batch_size:
+                for _ in range(updates_per_step):
+                    loss_sum += self.learn()
+                    updates += 1
+
+            if self.epsilon > self.epsilon_min:
+                self.epsilon = max(self.epsilon * self.epsilon_decay, self.epsilon_min)
+
+        self.update_target_network()
+        elapsed = time.perf_counter() - start
+        return {
+            "transitions": transitions,
+            "updates": updates,
+            "episodes": episodes,
+            "mean_reward": reward_sum / max(transitions, 1),
+            "mean_loss": loss_sum / updates if updates else None,
+            "charged_rate": charged / max(episodes, 1),
+            "overheated_rate": overheated / max(episodes, 1),
+            "epsilon": self.epsilon,
+            "seconds": elapsed,
+            "transitions_per_sec": transitions / elapsed if elapsed > 0 else 0.0,
+        }
+
+    def learn(self, batch_size=None):
+        """
+        One Double-DQN update on a replay minibatch
+
+        The target network is synced (and a new greedy-policy snapshot
+        published) every target_update_interval updates.
+
+        Returns:
+            Minibatch loss
+        """
+        batch = self.memory.sample(batch_size or self.batch_size)
+        states = torch.from_numpy(batch["states"])
+        actions = torch.from_numpy(batch["actions"])
+        rewards = torch.from_numpy(batch["rewards"])
+        next_states = torch.from_numpy(batch["next_states"])
+        dones = torch.from_numpy(batch["dones"])
+        weights = torch.from_numpy(batch["weights"])
 
-        # Target Q-value
         with torch.no_grad():
-            q_next = self.target_network(next_state_tensor).max()
-            q_target = reward + (self.gamma * q_next * (1 - int(done)))
+            next_q_target = self.target_network(next_states)
+            if self.double_dqn:
+                next_actions = self.q_network.q_values(next_states).argmax(dim=1, keepdim=True)
+                q_next = next_q_target.gather(1, next_actions).squeeze(1)
+            else:
+                q_next = next_q_target.max(dim=1).values
+            q_target = rewards + self.gamma * q_next * (1.0 - dones)
+
+        q_current = self.q_network(states).gather(1, actions.unsqueeze(1)).squeeze(1)
+        td_errors = q_current - q_target
+        loss = (weights * td_errors.pow(2)).mean()
 
-        # Calculate loss and update
-        loss = self.loss_fn(q_current, torch.tensor(q_target))
         self.optimizer.zero_grad()
         loss.backward()
         self.optimizer.step()
 
-        # Decay epsilon
-        if self.epsilon > self.epsilon_min:
-            self.epsilon *= self.epsilon_decay
+        self.memory.update_priorities(batch["indices"], td_errors.detach().numpy())
+        self.num_updates += 1
+        if self.num_updates % self.target_update_interval == 0:
+            self.update_target_network()
 
         return loss.item()
 
+    def _policy_snapshot(self):
+        """Eval-mode copy of the online network for the greedy policy"""
+        snapshot = copy.deepcopy(self.q_network)
+        snapshot.eval()
+        return snapshot
+
     def update_target_network(self):
-        """Update target network weights"""
+        """
+        Sync the target network and publish a new greedy policy
+
+        The policy runner is built from a fresh snapshot and then swapped in
+        with a single assignment, so threads serving greedy actions keep
+        using the previous runner until it is replaced and never see weights
+        being loaded.
+        """
         self.target_network.load_state_dict(self.q_network.state_dict())
 
+        previous = self.policy_runner
+        runner = ModelRunner(
+            self._policy_snapshot(),
+            quantization=previous.quantization,
+            intra_op_threads=previous.intra_op_threads,
+            cpu_affinity=previous.cpu_affinity,
+            precision=previous.precision,
+        )
+        runner.build()
+        runner.timings, runner.num_calls = previous.timings, previous.num_calls
+        self.policy_runner = runner
+
     def save(self, filepath):
         """Save controller weights"""
         torch.save(self.q_network.state_dict(), filepath)
@@ -121,4 +353,4 @@ class RLChargeController:
     def load(self, filepath):
         """Load controller weights"""
         self.q_network.load(filepath)
-        self.target_network.load_state_dict(self.q_network.state_dict())
+        self.update_target_network()
@@ -0,0 +1,99 @@
+"""O(1) rolling statistics over a fixed-size window of recent values"""
+
+import math
+import numpy as np
+
+# Standard deviations this small relative to the mean are rounding residue
+# (e.g. a window of identical values whose mean is not exactly representable)
+# and are reported as 0, so z-scores over a constant history stay 0
+ZERO_STD_RTOL = 1e-9
+
+
+class RollingWindow:
+    """
+    Ring buffer of the last `size` values with running mean and std.
+
+    Appending is O(1): the mean and the sum of squared deviations are
+    updated with Welford's algorithm while the window fills, and with its
+    sliding-window form (one value in, the oldest out) once it is full.
+    Every `size` replacements both are recomputed from the buffer, so
+    rounding drift never builds up (amortized O(1)) and the results match
+    np.mean / np.std over the same values to floating-point precision.
+    """
+
+    def __init__(self, size):
+        """
+        Args:
+            size: number of most recent values kept
+        """
+        if size < 1:
+            raise ValueError("RollingWindow size must be at least 1")
+        self.size = size
+        self.buffer = np.zeros(size, dtype=np.float64)
+        self.clear()
+
+    def clear(self):
+        """Drop all values"""
+        self.count = 0
+        self.position = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._replaced = 0
+
+    def __len__(self):
+        return self.count
+
+    def append(self, value):
+        """Add a value, evicting the oldest once the window is full"""
+        value = float(value)
+        if self.count < self.size:
+            self.buffer[self.position] = value
+            self.count += 1
+            delta = value - self._mean
+            self._mean += delta / self.count
+            self._m2 += delta * (value - self._mean)
+        else:
+            old = float(self.buffer[self.position])
+            self.buffer[self.position] = value
+            mean = self._mean + (value - old) / self.size
+            self._m2 += (value - old) * (value - mean + old - self._mean)
+            self._mean = mean
+            self._replaced += 1
+            if self._replaced >= self.size:
+                self._refresh()
+        self.position = (self.position + 1) % self.size
+
+    def extend(self, values):
+        """Append values in order"""
+        for value in values:
+            self.append(value)
+
+    def _refresh(self):
+        """Recompute the running moments exactly from the buffer"""
+        values = self.buffer[:self.count]
+        self._mean = float(values.mean())
+        self._m2 = float(((values - self._mean) ** 2).sum())
+        self._replaced = 0
+
+    @property
+    def mean(self):
+        """Mean of the values in the window (0.0 when empty)"""
+        return self._mean
+
+    @property
+    def std(self):
+        """
+        Population standard deviation (like np.std; 0.0 when empty)
+
+        Values within ZERO_STD_RTOL of the mean's magnitude count as 0.0.
+        """
+        if self.count == 0:
+            return 0.0
+        std = math.sqrt(max(self._m2, 0.0) / self.count)
+        return std if std > ZERO_STD_RTOL * abs(self._mean) else 0.0
+
+    def values(self):
+        """Values in the window, oldest first"""
+        if self.count < self.size:
+            return self.buffer[:self.count].copy()
+        return np.roll(self.buffer, -self.position)
@@ -0,0 +1,179 @@
+"""Stateful incremental RUL inference for monitoring streams"""
+
+import time
+from collections import OrderedDict
+import numpy as np
+import torch
+
+
+class StreamingRULPredictor:
+    """
+    Per-battery streaming inference for RULLSTM.
+
+    Each battery keeps its LSTM (h, c) state plus running softmax-attention
+    accumulators (max score, normalizer, weighted hidden sum), so a new cycle
+    costs one LSTM step instead of a pass over the whole sequence. The
+    prediction after N updates equals RULLSTM.forward over those N cycles.
+    """
+
+    def __init__(self, model, max_batteries=100000):
+        """
+        Args:
+            model: float RULLSTM (its weights are shared, not copied)
+            max_batteries: states kept before least-recently-used eviction
+        """
+        self.model = model
+        self.max_batteries = max_batteries
+        self.states = OrderedDict()
+        self.last_seen = {}
+
+    def __len__(self):
+        return len(self.states)
+
+    def __contains__(self, battery_id):
+        return battery_id in self.states
+
+    def _initial_state(self, device):
+        """Zero LSTM state and empty attention accumulators"""
+        num_layers = self.model.num_layers
+        hidden_size = self.model.hidden_size
+        return {
+            "h": torch.zeros(num_layers, hidden_size, device=device),
+            "c": torch.zeros(num_layers, hidden_size, device=device),
+            "max_score": torch.full((1,), -float("inf"), device=device),
+            "normalizer": torch.zeros(1, device=device),
+            "weighted_sum": torch.zeros(hidden_size, device=device),
+            "num_cycles": 0,
+        }
+
+    def update(self, battery_id, features):
+        """
+        Feed one new cycle for one battery
+
+        Args:
+            battery_id: battery identifier
+            features: array of shape (num_features,)
+
+        Returns:
+            Predicted RUL after this cycle
+        """
+        return float(self.update_batch([battery_id], np.asarray(features)[np.newaxis])[0])
+
+    def update_batch(self, battery_ids, features):
+        """
+        Feed one new cycle for several batteries in a single LSTM step
+
+        Args:
+            battery_ids: sequence of unique battery identifiers
+            features: array of shape (len(battery_ids), num_features)
+
+        Returns:
+            numpy array of predicted RUL values
+        """
+        model = self.model
+        device = next(model.parameters()).device
+        if model.training:
+            model.eval()
+
+        with torch.inference_mode():
+            x = torch.as_tensor(np.asarray(features), dtype=torch.float32, device=device)
+            states = [
+                self.states.get(battery_id) or self._initial_state(device)
+                for battery_id in battery_ids
+            ]
+
+            h = torch.stack([s["h"] for s in states], dim=1)
+            c = torch.stack([s["c"] for s in states], dim=1)
+            max_score = torch.stack([s["max_score"] for s in states])
+            normalizer = torch.stack([s["normalizer"] for s in states])
+            weighted_sum = torch.stack([s["weighted_sum"] for s in states])
+
+            # One LSTM step: (batch, 1, features) -> (batch, 1, hidden)
+            out, (h, c) = model.lstm(x.unsqueeze(1), (h, c))
+            out = out[:, 0]
+
+            # Online softmax over the sequence axis (attention without its Softmax)
+            score = model.attention[:-1](out)
+            new_max = torch.maximum(max_score, score)
+            decay = torch.exp(max_score - new_max)
+            weight = torch.exp(score - new_max)
+            normalizer = normalizer * decay + weight
+            weighted_sum = weighted_sum * decay + weight * out
+
+            rul = model.fc(weighted_sum / normalizer)[:, 0]
+
+        now = time.time()
+        for i, (battery_id, state) in enumerate(zip(battery_ids, states)):
+            self.states[battery_id] = {
+                "h": h[:, i].clone(),
+                "c": c[:, i].clone(),
+                "max_score": new_max[i].clone(),
+                "normalizer": normalizer[i].clone(),
+                "weighted_sum": weighted_sum[i].clone(),
+                "num_cycles": state["num_cycles"] + 1,
+            }
+            self.states.move_to_end(battery_id)
+            self.last_seen[battery_id] = now
+
+        while len(self.states) > self.max_batteries:
+            self.evict(next(iter(self.states)))
+
+        return rul.cpu().numpy()
+
+    def num_cycles(self, battery_id):
+        """Number of cycles folded into a battery's state"""
+        state = self.states.get(battery_id)
+        return state["num_cycles"] if state else 0
+
+    def evict(self, battery_id):
+        """Drop a battery's state"""
+        self.states.pop(battery_id, None)
+        self.last_seen.pop(battery_id, None)
+
+    def evict_idle(self, max_idle_seconds):
+        """
+        Drop batteries that have not reported within max_idle_seconds
+
+        Returns:
+            Number of evicted batteries
+        """
+        cutoff = time.time() - max_idle_seconds
+        idle = [b for b, seen in self.last_seen.items() if seen < cutoff]
+        for battery_id in idle:
+            self.evict(battery_id)
+        return len(idle)
+
+    def clear(self):
+        """Drop all states (e.g. after the model weights change)"""
+        self.states.clear()
+        self.last_seen.clear()
+
+    def state_dict(self):
+        """Serializable snapshot of all battery states"""
+        return {
+            "battery_ids": list(self.states.keys()),
+            "states": [
+                {k: v.cpu() if isinstance(v, torch.Tensor) else v for k, v in s.items()}
+                for s in self.states.values()
+            ],
+            "last_seen": dict(self.last_seen),
+        }
+
+    def load_state_dict(self, snapshot):
+        """Restore battery states from state_dict()"""
+        device = next(self.model.parameters()).device
+        self.clear()
+        for battery_id, state in zip(snapshot["battery_ids"], snapshot["states"]):
+            self.states[battery_id] = {
+                k: v.to(device) if isinstance(v, torch.Tensor) else v
+                for k, v in state.items()
+            }
+        self.last_seen.update(snapshot.get("last_seen", {}))
+
+    def save(self, filepath):
+        """Persist battery states"""
+        torch.save(self.state_dict(), filepath)
+
+    def load(self, filepath):
+        """Load persisted battery states"""
+        self.load_state_dict(torch.load(filepath))
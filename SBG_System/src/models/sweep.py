@@ -0,0 +1,474 @@
+"""Parallel hyperparameter sweeps with leave-one-battery-out cross-validation for AttMoE"""
+
+import functools
+import hashlib
+import itertools
+import os
+import statistics
+import time
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+import torch
+
+from .attmoe import AttMoE, build_sequences, train_attmoe_windows
+from src.utils import setup_logger
+
+logger = setup_logger("Sweep")
+
+SEARCHES = ("grid", "random")
+METRICS = ("re", "mae", "rmse")
+
+# AttMoE-CALCE.ipynb's grid (window 64, 4 heads, 500 epochs)
+DEFAULT_SPACE = {
+    "lr": [1e-4, 5e-4, 1e-3, 5e-3, 1e-2],
+    "hidden_dim": [32, 64, 128, 256],
+    "num_experts": [4, 8, 16],
+}
+
+# Fixed AttMoE arguments unless the search space overrides them
+DEFAULT_PARAMS = {
+    "feature_size": 64,
+    "nhead": 4,
+    "dropout_att": 0.0,
+    "top_k": 2,
+    "weight_decay": 0.0,
+}
+
+
+class Uniform:
+    """Continuous search dimension sampled uniformly from [low, high]"""
+
+    def __init__(self, low, high):
+        self.low = low
+        self.high = high
+
+    def sample(self, rng):
+        return float(rng.uniform(self.low, self.high))
+
+
+class LogUniform(Uniform):
+    """Continuous search dimension sampled uniformly in log space (e.g. learning rates)"""
+
+    def sample(self, rng):
+        return float(np.exp(rng.uniform(np.log(self.low), np.log(self.high))))
+
+
+def grid_search(space):
+    """Every combination of the listed values"""
+    names = list(space)
+    return [dict(zip(names, values)) for values in itertools.product(*(space[n] for n in names))]
+
+
+def random_search(space, num_trials, seed=0):
+    """
+    num_trials random configurations
+
+    List dimensions are sampled uniformly from their values; Uniform and
+    LogUniform dimensions are sampled continuously.
+    """
+    rng = np.random.default_rng(seed)
+    trials = []
+    for _ in range(num_trials):
+        params = {}
+        for name, values in space.items():
+            if isinstance(values, Uniform):
+                params[name] = values.sample(rng)
+            else:
+                params[name] = values[rng.integers(len(values))]
+                if isinstance(params[name], np.generic):
+                    params[name] = params[name].item()
+        trials.append(params)
+    return trials
+
+
+def _pad(series):
+    """Ragged 1-D arrays -> (values padded with NaN, lengths)"""
+    lengths = np.array([len(s) for s in series])
+    values = np.full((len(series), max(lengths.max(initial=0), 1)), np.nan)
+    for i, s in enumerate(series):
+        values[i, :len(s)] = s
+    return values, lengths
+
+
+def rul_metrics(y_true, y_pred, threshold):
+    """
+    Relative RUL error, MAE and RMSE for many batteries at once
+
+    Vectorized equivalents of AttMoE-CALCE.ipynb's relative_error and
+    evaluation: RE compares the cycle where the true capacity first stays
+    at or below `threshold` for two cycles with the cycle where the forecast
+    first reaches it (capped at 1).
+
+    Args:
+        y_true: per-battery true capacity arrays (may differ in length)
+        y_pred: per-battery forecasts, same lengths as y_true
+        threshold: end-of-life capacity
+
+    Returns:
+        Dictionary of per-battery arrays: re, mae, rmse
+    """
+    true, lengths = _pad(y_true)
+    pred, _ = _pad(y_pred)
+    columns = np.arange(true.shape[1])
+    pairs = columns[:-1] < (lengths[:, np.newaxis] - 1)  # i < len - 1
+
+    with np.errstate(invalid="ignore"):
+        true_hit = (true[:, :-1] <= threshold) & (true[:, 1:] <= threshold) & pairs
+        pred_hit = (pred[:, :-1] <= threshold) & pairs
+    true_re = np.where(true_hit.any(axis=1), true_hit.argmax(axis=1) - 1, lengths)
+    pred_re = np.where(pred_hit.any(axis=1), pred_hit.argmax(axis=1) - 1, 0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        re = np.abs(true_re - pred_re) / true_re
+    re = np.where((true_re == 0) | (re > 1), 1.0, re)
+
+    errors = np.where(columns < lengths[:, np.newaxis], pred - true, 0.0)
+    count = np.maximum(lengths, 1)
+    return {
+        "re": re,
+        "mae": np.abs(errors).sum(axis=1) / count,
+        "rmse": np.sqrt((errors ** 2).sum(axis=1) / count),
+    }
+
+
+def leave_one_out_folds(capacity_series, window_size, rated_capacity=1.1):
+    """
+    AttMoE-CALCE.ipynb's folds: each battery in turn is the test battery
+
+    The model trains on every window of the other batteries plus the test
+    battery's first window, then forecasts the rest of the test battery from
+    its first window_size + 1 capacities.
+
+    Args:
+        capacity_series: dictionary battery name -> capacity array (Ah)
+        window_size: AttMoE feature_size
+        rated_capacity: normalization constant (Ah)
+
+    Returns:
+        List of fold dictionaries (name, train_x, train_y, history, test)
+    """
+    windows = {
+        name: build_sequences(series, window_size) for name, series in capacity_series.items()
+    }
+    folds = []
+    for name, series in capacity_series.items():
+        series = np.asarray(series, dtype=np.float32)
+        history, test = series[:window_size + 1], series[window_size + 1:]
+        x, y = build_sequences(history, window_size)
+        xs = [x] + [windows[other][0] for other in capacity_series if other != name]
+        ys = [y] + [windows[other][1] for other in capacity_series if other != name]
+        folds.append({
+            "name": name,
+            "train_x": (np.concatenate(xs) / rated_capacity)[:, np.newaxis, :],
+            "train_y": (np.concatenate(ys) / rated_capacity)[:, np.newaxis],
+            "history": history,
+            "test": test,
+        })
+    return folds
+
+
+def cached_folds(capacity_series, window_size, rated_capacity=1.1, cache_dir=None):
+    """
+    Path of an .npz holding the folds, written once per data/window/capacity
+
+    The key hashes the capacity data, so edited data gets new folds.
+    """
+    digest = hashlib.sha1(f"{window_size}:{rated_capacity}".encode())
+    for name in sorted(capacity_series):
+        digest.update(name.encode())
+        digest.update(np.asarray(capacity_series[name], dtype=np.float32).tobytes())
+    cache_dir = cache_dir or os.path.join("models", "sweeps", "folds")
+    path = os.path.join(cache_dir, f"attmoe-w{window_size}-{digest.hexdigest()[:16]}.npz")
+    if os.path.exists(path):
+        return path
+
+    os.makedirs(cache_dir, exist_ok=True)
+    arrays = {}
+    for i, fold in enumerate(leave_one_out_folds(capacity_series, window_size, rated_capacity)):
+        for key, value in fold.items():
+            arrays[f"{i}/{key}"] = np.asarray(value)
+    temp_path = f"{path}.{os.getpid()}.tmp.npz"
+    np.savez(temp_path, **arrays)
+    os.replace(temp_path, path)  # atomic: concurrent sweeps never read a partial file
+    return path
+
+
+@functools.lru_cache(maxsize=8)
+def load_folds(path):
+    """Folds written by cached_folds (memoized per process)"""
+    with np.load(path) as data:
+        count = len({key.split("/")[0] for key in data.files})
+        return [
+            {key: (str(data[f"{i}/{key}"]) if key == "name" else data[f"{i}/{key}"])
+             for key in ("name", "train_x", "train_y", "history", "test")}
+            for i in range(count)
+        ]
+
+
+def rollout(model, history, steps, rated_capacity=1.1):
+    """Forecast `steps` capacities autoregressively from a capacity history"""
+    window = torch.from_numpy(
+        np.asarray(history[-model.feature_size:], dtype=np.float32) / rated_capacity
+    ).reshape(1, 1, -1)
+    predictions = torch.empty(steps)
+    with torch.no_grad():
+        for step in range(steps):
+            next_capacity = model(window).reshape(1, 1, 1)
+            predictions[step] = next_capacity.reshape(())
+            window = torch.cat([window[:, :, 1:], next_capacity], dim=2)
+    return predictions.numpy() * rated_capacity
+
+
+class MedianPruner:
+    """
+    Stop a trial whose running score after a fold is worse than the median
+    of earlier trials after the same fold.
+
+    Scores live in a multiprocessing manager, so trials in different worker
+    processes prune against each other.
+    """
+
+    def __init__(self, manager, min_trials=3):
+        """
+        Args:
+            manager: multiprocessing Manager holding the shared scores
+            min_trials: trials that must report a fold before any is pruned there
+        """
+        self.scores = manager.dict()
+        self.lock = manager.Lock()
+        self.min_trials = min_trials
+
+    def should_prune(self, fold, score):
+        """Record a running score and say whether the trial should stop"""
+        with self.lock:
+            previous = self.scores.get(fold, [])
+            self.scores[fold] = previous + [score]
+        return len(previous) >= self.min_trials and score > statistics.median(previous)
+
+
+def _init_worker(threads):
+    torch.set_num_threads(threads)
+
+
+def run_trial(
+    trial,
+    params,
+    folds_path,
+    rated_capacity=1.1,
+    eol_ratio=0.7,
+    epochs=500,
+    eval_interval=100,
+    metric="re",
+    seeds=(0,),
+    pruner=None,
+):
+    """
+    Cross-validate one configuration
+
+    Each fold trains AttMoE full-batch (train_attmoe) once per seed. Every
+    eval_interval epochs the test battery is forecast and scored; like the
+    notebook, training stops once the loss is below 1e-3 and the score got
+    worse, keeping the previous forecast. After each fold the running mean
+    score goes to the pruner.
+
+    Returns:
+        Result record: trial, status ("complete" or "pruned"), params, mean
+        re/mae/rmse over the finished folds, per-fold scores and seconds
+    """
+    start = time.perf_counter()
+    params = {**DEFAULT_PARAMS, **params}
+    threshold = rated_capacity * eol_ratio
+    folds = load_folds(folds_path)
+    fold_scores = []
+    status = "complete"
+
+    for index, fold in enumerate(folds):
+        seed_scores = []
+        for seed in seeds:
+            torch.manual_seed(seed)
+            np.random.seed(seed)
+            model = AttMoE(
+                feature_size=params["feature_size"],
+                hidden_dim=params["hidden_dim"],
+                nhead=params["nhead"],
+                dropout_att=params["dropout_att"],
+                num_experts=params["num_experts"],
+                top_k=params["top_k"],
+            )
+            forecasts = []
+
+            def evaluate(epoch, loss):
+                forecast = rollout(model, fold["history"], len(fold["test"]), rated_capacity)
+                scores = rul_metrics([fold["test"]], [forecast], threshold)
+                forecasts.append({key: float(value[0]) for key, value in scores.items()})
+                worse = len(forecasts) > 1 and forecasts[-1][metric] > forecasts[-2][metric]
+                if loss < 1e-3 and worse:
+                    forecasts.pop()
+                    return True
+                return False
+
+            train_attmoe_windows(
+                model,
+                fold["train_x"],
+                fold["train_y"],
+                epochs=epochs,
+                lr=params["lr"],
+                weight_decay=params["weight_decay"],
+                callback=evaluate,
+                callback_interval=eval_interval,
+            )
+            if not forecasts:
+                evaluate(epochs, float("inf"))
+            seed_scores.append(forecasts[-1])
+
+        fold_scores.append({
+            key: float(np.mean([s[key] for s in seed_scores])) for key in METRICS
+        })
+        running = float(np.mean([s[metric] for s in fold_scores]))
+        if pruner is not None and index < len(folds) - 1 and pruner.should_prune(index, running):
+            status = "pruned"
+            break
+
+    record = {"trial": trial, "status": status, **params}
+    record.update({key: float(np.mean([s[key] for s in fold_scores])) for key in METRICS})
+    record["score"] = record[metric]
+    record["folds"] = len(fold_scores)
+    record["fold_scores"] = {fold["name"]: s for fold, s in zip(folds, fold_scores)}
+    record["seconds"] = time.perf_counter() - start
+    return record
+
+
+class ResultsTable:
+    """
+    Local CSV table of sweep results, one row per trial
+
+    Rows from every sweep written to the same path accumulate, so reruns
+    and different searches can be compared in one place.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def append(self, records):
+        """Add result records (per-fold scores become <battery>_<metric> columns)"""
+        rows = []
+        for record in records:
+            row = {key: value for key, value in record.items() if key != "fold_scores"}
+            for name, scores in record.get("fold_scores", {}).items():
+                row.update({f"{name}_{key}": value for key, value in scores.items()})
+            rows.append(row)
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        frame = pd.DataFrame(rows)
+        if os.path.exists(self.path):
+            frame = pd.concat([self.load(), frame], ignore_index=True)
+        frame.to_csv(self.path, index=False)
+
+    def load(self):
+        """All recorded trials as a DataFrame"""
+        return pd.read_csv(self.path)
+
+
+def run_sweep(
+    capacity_series,
+    space=None,
+    search="grid",
+    num_trials=20,
+    num_workers=None,
+    threads_per_worker=1,
+    metric="re",
+    seeds=(0,),
+    epochs=500,
+    eval_interval=100,
+    rated_capacity=1.1,
+    eol_ratio=0.7,
+    prune=True,
+    min_trials=3,
+    results_path=None,
+    cache_dir=None,
+    seed=0,
+):
+    """
+    Cross-validate many AttMoE configurations in a process pool
+
+    Args:
+        capacity_series: dictionary battery name -> capacity array (Ah)
+        space: search space (name -> list of values, or Uniform/LogUniform
+               for random search); unspecified AttMoE arguments come from
+               DEFAULT_PARAMS
+        search: "grid" or "random"
+        num_trials: configurations drawn by random search
+        num_workers: worker processes (defaults to CPU count / threads_per_worker)
+        threads_per_worker: torch intra-op threads per worker
+        metric: "re", "mae" or "rmse"; ranks trials and drives pruning
+        seeds: seeds averaged per fold
+        epochs: maximum training epochs per fold
+        eval_interval: epochs between forecasts of the test battery
+        rated_capacity: normalization constant (Ah)
+        eol_ratio: end of life as a fraction of rated_capacity
+        prune: stop trials that fall behind the median after a fold
+        min_trials: trials reporting a fold before pruning applies there
+        results_path: CSV results table to append to
+        cache_dir: where preprocessed folds are cached
+        seed: random search seed
+
+    Returns:
+        Result records, completed trials best first, then pruned ones
+    """
+    if search not in SEARCHES:
+        raise ValueError(f"Unknown search {search!r}; use one of {SEARCHES}")
+    if metric not in METRICS:
+        raise ValueError(f"Unknown metric {metric!r}; use one of {METRICS}")
+    space = space or DEFAULT_SPACE
+    trials = grid_search(space) if search == "grid" else random_search(space, num_trials, seed)
+    num_workers = num_workers or max(1, (os.cpu_count() or 1) // threads_per_worker)
+
+    # Folds are built once per window size, before any worker starts
+    folds_paths = {}
+    for params in trials:
+        window_size = params.get("feature_size", DEFAULT_PARAMS["feature_size"])
+        if window_size not in folds_paths:
+            folds_paths[window_size] = cached_folds(
+                capacity_series, window_size, rated_capacity, cache_dir
+            )
+
+    logger.info(f"{search} search: {len(trials)} trials on {num_workers} workers")
+    context = mp.get_context("spawn")
+    records = []
+    with context.Manager() as manager:
+        pruner = MedianPruner(manager, min_trials) if prune else None
+        with ProcessPoolExecutor(
+            num_workers, mp_context=context, initializer=_init_worker, initargs=(threads_per_worker,)
+        ) as pool:
+            futures = [
+                pool.submit(
+                    run_trial,
+                    trial,
+                    params,
+                    folds_paths[params.get("feature_size", DEFAULT_PARAMS["feature_size"])],
+                    rated_capacity=rated_capacity,
+                    eol_ratio=eol_ratio,
+                    epochs=epochs,
+                    eval_interval=eval_interval,
+                    metric=metric,
+                    seeds=tuple(seeds),
+                    pruner=pruner,
+                )
+                for trial, params in enumerate(trials)
+            ]
+            for future in as_completed(futures):
+                record = future.result()
+                records.append(record)
+                logger.info(
+                    f"Trial {record['trial']} {record['status']}: {metric} {record['score']:.4f} "
+                    f"after {record['folds']} fold(s) ({record['seconds']:.1f}s)"
+                )
+
+    records.sort(key=lambda r: (r["status"] != "complete", r["score"]))
+    if results_path:
+        ResultsTable(results_path).append(records)
+    return records
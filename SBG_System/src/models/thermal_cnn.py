@@ -3,70 +3,77 @@
 import torch
 import torch.nn as nn
 import torch.nn.functional as F
+from torch.ao.quantization import QuantStub, DeQuantStub
 from pathlib import Path
 
 
 class ThermalCNN(nn.Module):
     """Convolutional Neural Network for thermal anomaly detection"""
 
-    def __init__(self, input_channels=3, num_classes=2, dropout_rate=0.3):
+    def __init__(
+        self,
+        input_channels=3,
+        num_classes=2,
+        dropout_rate=0.3,
+        channels=(32, 64, 128),
+        fc_size=64,
+    ):
+        """
+        Args:
+            input_channels: image channels (1 for raw thermal maps)
+            num_classes: binary classification (normal/anomalous)
+            dropout_rate: dropout probability
+            channels: output channels of each conv block (one 2x pooling per block)
+            fc_size: hidden units of the classifier head
+        """
         super(ThermalCNN, self).__init__()
 
-        # Convolutional blocks
-        self.conv_block1 = nn.Sequential(
-            nn.Conv2d(input_channels, 32, kernel_size=3, padding=1),
-            nn.BatchNorm2d(32),
-            nn.ReLU(inplace=True),
-            nn.Conv2d(32, 32, kernel_size=3, padding=1),
-            nn.BatchNorm2d(32),
-            nn.ReLU(inplace=True),
-            nn.MaxPool2d(kernel_size=2, stride=2),
-            nn.Dropout(dropout_rate),
-        )
+        self.input_channels = input_channels
+        self.channels = tuple(channels)
 
-        self.conv_block2 = nn.Sequential(
-            nn.Conv2d(32, 64, kernel_size=3, padding=1),
-            nn.BatchNorm2d(64),
-            nn.ReLU(inplace=True),
-            nn.Conv2d(64, 64, kernel_size=3, padding=1),
-            nn.BatchNorm2d(64),
-            nn.ReLU(inplace=True),
-            nn.MaxPool2d(kernel_size=2, stride=2),
-            nn.Dropout(dropout_rate),
-        )
+        # Identity in float mode; mark int8 boundaries for static quantization
+        self.quant = QuantStub()
+        self.dequant = DeQuantStub()
 
-        self.conv_block3 = nn.Sequential(
-            nn.Conv2d(64, 128, kernel_size=3, padding=1),
-            nn.BatchNorm2d(128),
-            nn.ReLU(inplace=True),
-            nn.Conv2d(128, 128, kernel_size=3, padding=1),
-            nn.BatchNorm2d(128),
-            nn.ReLU(inplace=True),
-            nn.MaxPool2d(kernel_size=2, stride=2),
-            nn.Dropout(dropout_rate),
-        )
+        # Convolutional blocks (conv_block1, conv_block2, ...)
+        self.num_blocks = len(self.channels)
+        in_channels = input_channels
+        for i, out_channels in enumerate(self.channels, start=1):
+            block = nn.Sequential(
+                nn.Conv2d(in_channels, out_channels, kernel_size=3, padding=1),
+                nn.BatchNorm2d(out_channels),
+                nn.ReLU(inplace=True),
+                nn.Conv2d(out_channels, out_channels, kernel_size=3, padding=1),
+                nn.BatchNorm2d(out_channels),
+                nn.ReLU(inplace=True),
+                nn.MaxPool2d(kernel_size=2, stride=2),
+                nn.Dropout(dropout_rate),
+            )
+            setattr(self, f"conv_block{i}", block)
+            in_channels = out_channels
 
         # Global average pooling
         self.global_avg_pool = nn.AdaptiveAvgPool2d((1, 1))
 
         # Fully connected layers
         self.fc = nn.Sequential(
-            nn.Linear(128, 64),
+            nn.Linear(in_channels, fc_size),
             nn.ReLU(inplace=True),
             nn.Dropout(dropout_rate),
-            nn.Linear(64, num_classes),
+            nn.Linear(fc_size, num_classes),
         )
 
         self.num_classes = num_classes
 
     def forward(self, x):
         """Forward pass"""
-        x = self.conv_block1(x)
-        x = self.conv_block2(x)
-        x = self.conv_block3(x)
+        x = self.quant(x)
+        for i in range(1, self.num_blocks + 1):
+            x = getattr(self, f"conv_block{i}")(x)
         x = self.global_avg_pool(x)
-        x = x.view(x.size(0), -1)
+        x = x.reshape(x.size(0), -1)
         x = self.fc(x)
+        x = self.dequant(x)
         return x
 
     def predict(self, x):
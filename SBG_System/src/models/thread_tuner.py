@@ -0,0 +1,85 @@
+"""Startup autotuning of per-model intra-op thread counts"""
+
+import os
+import numpy as np
+import torch
+
+from src.utils.benchmark import measure_latency
+
+OBJECTIVES = ("latency", "throughput")
+
+
+def available_cores():
+    """Number of cores this process may run on"""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def candidate_thread_counts(max_threads=None):
+    """Powers of two up to the available cores, plus the core count itself"""
+    max_threads = max_threads or available_cores()
+    candidates = []
+    count = 1
+    while count < max_threads:
+        candidates.append(count)
+        count *= 2
+    candidates.append(max_threads)
+    return candidates
+
+
+def autotune_runner(
+    runner,
+    sample,
+    objective="latency",
+    candidates=None,
+    batch_size=32,
+    warmup=3,
+    iterations=20,
+):
+    """
+    Benchmark a ModelRunner at each candidate intra-op thread count and keep
+    the best one
+
+    Args:
+        runner: ModelRunner (torch backend)
+        sample: batch-of-one model input
+        objective: "latency" (batch-of-one p50) or "throughput" (samples/s
+                   on batches of batch_size)
+        candidates: intra-op thread counts to try (default: candidate_thread_counts())
+        batch_size: rows per call for the throughput objective
+        warmup: untimed calls per candidate
+        iterations: timed calls per candidate
+
+    Returns:
+        (chosen thread count, list of per-candidate measurement rows)
+    """
+    if objective not in OBJECTIVES:
+        raise ValueError(f"Unknown autotune objective {objective!r}; use one of {OBJECTIVES}")
+
+    sample = np.asarray(sample, dtype=np.float32)
+    if objective == "throughput":
+        sample = np.ascontiguousarray(np.repeat(sample, batch_size, axis=0))
+
+    original = torch.get_num_threads()
+    rows = []
+    try:
+        for threads in candidates or candidate_thread_counts():
+            runner.intra_op_threads = threads
+            stats = measure_latency(
+                runner._run_batch,
+                sample,
+                batch_size=len(sample),
+                warmup=warmup,
+                iterations=iterations,
+            )
+            rows.append({"threads": threads, **stats})
+    finally:
+        torch.set_num_threads(original)
+
+    if objective == "latency":
+        best = min(rows, key=lambda row: row["p50_ms"])
+    else:
+        best = max(rows, key=lambda row: row["throughput"])
+    runner.intra_op_threads = best["threads"]
+    return best["threads"], rows
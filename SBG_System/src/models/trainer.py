@@ -0,0 +1,358 @@
+"""Shared training engine for agent models"""
+
+import copy
+import os
+import time
+import torch
+
+from .distributed import (
+    all_reduce_gradients,
+    all_reduce_sum,
+    broadcast_parameters,
+    get_world_size,
+    is_distributed,
+    is_main_process,
+)
+from .mixed_precision import autocast, grad_scaler
+from .model_zoo import save_checkpoint
+from src.utils import setup_logger
+
+logger = setup_logger("Trainer")
+
+# Share of training time spent waiting for batches above which input is the bottleneck
+INPUT_BOUND_FRACTION = 0.3
+
+LR_SCHEDULES = ("none", "step", "cosine", "plateau")
+
+# config.yaml `training` keys -> Trainer arguments
+_CONFIG_KEYS = {
+    "epochs": "epochs",
+    "learning_rate": "lr",
+    "early_stopping_patience": "early_stopping_patience",
+    "min_delta": "min_delta",
+    "lr_schedule": "lr_schedule",
+    "lr_step_size": "lr_step_size",
+    "lr_gamma": "lr_gamma",
+    "grad_accumulation_steps": "grad_accumulation_steps",
+}
+
+
+def training_options(config, **overrides):
+    """
+    Trainer keyword arguments from a `training` config section
+
+    Overrides that are None (e.g. unset train() arguments) fall back to the
+    config value.
+    """
+    options = {
+        argument: config[key] for key, argument in _CONFIG_KEYS.items() if key in config
+    }
+    options.update({key: value for key, value in overrides.items() if value is not None})
+    return options
+
+
+def _to_device(batch, device):
+    """Move a tensor or a (nested) tuple/list of tensors to a device"""
+    if isinstance(batch, torch.Tensor):
+        return batch.to(device, non_blocking=True)
+    if isinstance(batch, (list, tuple)):
+        return type(batch)(_to_device(item, device) for item in batch)
+    return batch
+
+
+def _batch_size(batch):
+    """Rows in a batch (first tensor's leading dimension)"""
+    while isinstance(batch, (list, tuple)):
+        batch = batch[0]
+    return len(batch)
+
+
+class Trainer:
+    """
+    Epoch loop shared by the agents' train() methods.
+
+    Adds validation, early stopping, best-weight restoring/saving, resumable
+    state, LR schedules, gradient accumulation and mixed precision around a
+    per-batch loss function. Losses are accumulated on-device and read once
+    per epoch, so steps never block on loss.item().
+
+    Inside a torch.distributed process group (see src/models/distributed.py)
+    training is data-parallel: every rank starts from rank 0's weights,
+    gradients are averaged with one all-reduce per optimizer step, losses
+    are summed across ranks so all ranks make the same early-stopping
+    decisions, and only rank 0 writes checkpoints. Loaders should be built
+    with create_dataloader(..., distributed=True) so each rank sees its own
+    shard.
+    """
+
+    def __init__(
+        self,
+        model,
+        loss_fn,
+        lr=0.001,
+        epochs=50,
+        device=None,
+        precision="float32",
+        early_stopping_patience=None,
+        min_delta=0.0,
+        lr_schedule="none",
+        lr_step_size=10,
+        lr_gamma=0.5,
+        grad_accumulation_steps=1,
+        weight_decay=0.0,
+        checkpoint_path=None,
+        best_checkpoint_path=None,
+        resume=False,
+        distributed=None,
+    ):
+        """
+        Args:
+            model: model to train (float32 weights)
+            loss_fn: callable (model, batch) -> scalar loss tensor
+            lr: Adam learning rate
+            epochs: maximum number of epochs
+            device: torch device batches are moved to
+            precision: "float32", "bfloat16" or "float16" autocast
+            early_stopping_patience: epochs without a validation improvement
+                                     before stopping (None/0 disables)
+            min_delta: smallest validation loss decrease counted as improvement
+            lr_schedule: "none", "step", "cosine" or "plateau"
+            lr_step_size: epochs per decay for the step schedule
+            lr_gamma: decay factor for the step/plateau schedules
+            grad_accumulation_steps: batches per optimizer step
+            weight_decay: Adam weight decay
+            checkpoint_path: trainer state written after every epoch
+            best_checkpoint_path: best weights written with model_zoo.save_checkpoint
+            resume: continue from checkpoint_path if it exists
+            distributed: average gradients across the process group (defaults
+                         to whether one is initialized)
+        """
+        if lr_schedule not in LR_SCHEDULES:
+            raise ValueError(f"Unknown lr_schedule {lr_schedule!r}; use one of {LR_SCHEDULES}")
+
+        self.model = model
+        self.loss_fn = loss_fn
+        self.epochs = epochs
+        self.device = device or torch.device("cpu")
+        self.precision = precision
+        self.early_stopping_patience = early_stopping_patience
+        self.min_delta = min_delta
+        self.grad_accumulation_steps = max(1, grad_accumulation_steps)
+        self.checkpoint_path = checkpoint_path
+        self.best_checkpoint_path = best_checkpoint_path
+        self.distributed = is_distributed() if distributed is None else distributed
+        if self.distributed:
+            broadcast_parameters(model)
+
+        self.optimizer = torch.optim.Adam(model.parameters(), lr=lr, weight_decay=weight_decay)
+        self.scaler = grad_scaler(precision, self.device)
+        self.lr_schedule = lr_schedule
+        if lr_schedule == "step":
+            self.scheduler = torch.optim.lr_scheduler.StepLR(
+                self.optimizer, step_size=lr_step_size, gamma=lr_gamma
+            )
+        elif lr_schedule == "cosine":
+            self.scheduler = torch.optim.lr_scheduler.CosineAnnealingLR(self.optimizer, T_max=epochs)
+        elif lr_schedule == "plateau":
+            self.scheduler = torch.optim.lr_scheduler.ReduceLROnPlateau(
+                self.optimizer, factor=lr_gamma, patience=max(1, (early_stopping_patience or 4) // 2)
+            )
+        else:
+            self.scheduler = None
+
+        self.epoch = 0
+        self.best_loss = float("inf")
+        self.best_state = None
+        self.bad_epochs = 0
+        self.history = []
+
+        if resume and checkpoint_path and os.path.exists(checkpoint_path):
+            self.load_state(checkpoint_path)
+
+    def state_dict(self):
+        """Everything needed to resume training"""
+        return {
+            "model": self.model.state_dict(),
+            "optimizer": self.optimizer.state_dict(),
+            "scheduler": self.scheduler.state_dict() if self.scheduler else None,
+            "scaler": self.scaler.state_dict(),
+            "epoch": self.epoch,
+            "best_loss": self.best_loss,
+            "best_state": self.best_state,
+            "bad_epochs": self.bad_epochs,
+            "history": self.history,
+        }
+
+    def save_state(self, filepath):
+        """Write resumable trainer state"""
+        directory = os.path.dirname(filepath)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        torch.save(self.state_dict(), filepath)
+
+    def load_state(self, filepath):
+        """Restore trainer state written by save_state"""
+        state = torch.load(filepath, map_location=self.device)
+        self.model.load_state_dict(state["model"])
+        self.optimizer.load_state_dict(state["optimizer"])
+        if self.scheduler and state["scheduler"]:
+            self.scheduler.load_state_dict(state["scheduler"])
+        self.scaler.load_state_dict(state["scaler"])
+        self.epoch = state["epoch"]
+        self.best_loss = state["best_loss"]
+        self.best_state = state["best_state"]
+        self.bad_epochs = state["bad_epochs"]
+        self.history = state["history"]
+        logger.info(f"Resuming training from epoch {self.epoch} ({filepath})")
+
+    def _train_epoch(self, loader):
+        """One pass over the training data"""
+        self.model.train()
+        sampler = getattr(loader, "sampler", None)
+        if hasattr(sampler, "set_epoch"):
+            sampler.set_epoch(self.epoch)  # reshuffle DistributedSampler shards
+        total_loss = torch.zeros((), device=self.device)
+        samples = 0
+        data_s = compute_s = 0.0
+        steps = self.grad_accumulation_steps
+        self.optimizer.zero_grad()
+
+        fetch_start = time.perf_counter()
+        for index, batch in enumerate(loader):
+            start = time.perf_counter()
+            data_s += start - fetch_start
+
+            batch = _to_device(batch, self.device)
+            with autocast(self.precision, self.device):
+                loss = self.loss_fn(self.model, batch)
+            self.scaler.scale(loss / steps).backward()
+            if (index + 1) % steps == 0:
+                self._optimizer_step()
+
+            count = _batch_size(batch)
+            total_loss += loss.detach().float() * count
+            samples += count
+
+            fetch_start = time.perf_counter()
+            compute_s += fetch_start - start
+
+        if samples and (index + 1) % steps:
+            self._optimizer_step()  # leftover accumulated gradients
+
+        totals = self._reduce(total_loss, samples)
+        return {
+            "train_loss": totals[0].item() / max(totals[1].item(), 1),
+            "samples": int(totals[1].item()),
+            "data_s": data_s,
+            "compute_s": compute_s,
+        }
+
+    def _reduce(self, total_loss, samples):
+        """(loss sum, sample count) summed over ranks"""
+        totals = torch.stack([total_loss.float(), torch.tensor(float(samples), device=self.device)])
+        if self.distributed:
+            all_reduce_sum(totals)
+        return totals
+
+    def _optimizer_step(self):
+        """Apply accumulated gradients"""
+        if self.distributed:
+            all_reduce_gradients(self.model)
+        self.scaler.step(self.optimizer)
+        self.scaler.update()
+        self.optimizer.zero_grad()
+
+    def evaluate(self, loader):
+        """Mean loss over a data loader in eval mode"""
+        self.model.eval()
+        total_loss = torch.zeros((), device=self.device)
+        samples = 0
+        with torch.no_grad(), autocast(self.precision, self.device):
+            for batch in loader:
+                batch = _to_device(batch, self.device)
+                count = _batch_size(batch)
+                total_loss += self.loss_fn(self.model, batch).float() * count
+                samples += count
+        totals = self._reduce(total_loss, samples)
+        return totals[0].item() / max(totals[1].item(), 1)
+
+    def fit(self, train_loader, val_loader=None):
+        """
+        Train until `epochs` or early stopping
+
+        Early stopping and best-weight tracking use the validation loss, or
+        the training loss when there is no validation loader. The best
+        weights are loaded into the model at the end.
+
+        Returns:
+            List of per-epoch records (losses, learning rate, samples/s and
+            seconds spent waiting for data, computing and validating)
+        """
+        stopped_early = False
+
+        while self.epoch < self.epochs:
+            epoch_start = time.perf_counter()
+            record = {"epoch": self.epoch + 1, "lr": self.optimizer.param_groups[0]["lr"]}
+            record.update(self._train_epoch(train_loader))
+            if self.distributed:
+                # Keep rank 0's BatchNorm statistics (gradients are already in sync)
+                broadcast_parameters(self.model)
+
+            val_start = time.perf_counter()
+            record["val_loss"] = self.evaluate(val_loader) if val_loader is not None else None
+            record["val_s"] = time.perf_counter() - val_start
+
+            record["epoch_s"] = time.perf_counter() - epoch_start
+            train_s = record["data_s"] + record["compute_s"]
+            record["samples_per_sec"] = record["samples"] / train_s if train_s > 0 else 0.0
+            record["data_wait_fraction"] = record["data_s"] / train_s if train_s > 0 else 0.0
+
+            monitored = record["val_loss"] if record["val_loss"] is not None else record["train_loss"]
+            if self.scheduler is not None:
+                if self.lr_schedule == "plateau":
+                    self.scheduler.step(monitored)
+                else:
+                    self.scheduler.step()
+
+            improved = monitored < self.best_loss - self.min_delta
+            if improved:
+                self.best_loss = monitored
+                self.best_state = copy.deepcopy(self.model.state_dict())
+                self.bad_epochs = 0
+                if self.best_checkpoint_path and is_main_process():
+                    save_checkpoint(self.model, self.best_checkpoint_path)
+            else:
+                self.bad_epochs += 1
+
+            self.epoch += 1
+            self.history.append(record)
+            if self.checkpoint_path and is_main_process():
+                self.save_state(self.checkpoint_path)
+
+            if is_main_process():
+                val_text = f", Val: {record['val_loss']:.4f}" if record["val_loss"] is not None else ""
+                ranks = f" across {get_world_size()} ranks" if self.distributed else ""
+                logger.info(
+                    f"Epoch [{self.epoch}/{self.epochs}], Loss: {record['train_loss']:.4f}{val_text}, "
+                    f"{record['samples_per_sec']:.0f} samples/s{ranks} "
+                    f"(data {record['data_s']:.2f}s, compute {record['compute_s']:.2f}s, "
+                    f"val {record['val_s']:.2f}s)"
+                )
+                if record["data_wait_fraction"] > INPUT_BOUND_FRACTION and self.epoch == 1:
+                    logger.warning(
+                        f"Input-bound: {record['data_wait_fraction']:.0%} of training time waits "
+                        "for batches; raise data.num_workers / prefetch_factor"
+                    )
+
+            if self.early_stopping_patience and self.bad_epochs >= self.early_stopping_patience:
+                stopped_early = True
+                break
+
+        if self.best_state is not None:
+            self.model.load_state_dict(self.best_state)
+        if stopped_early:
+            logger.info(
+                f"Early stopping after epoch {self.epoch}; best loss {self.best_loss:.4f}"
+            )
+        self.model.eval()
+        return self.history
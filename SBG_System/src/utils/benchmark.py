@@ -0,0 +1,74 @@
+"""Latency and throughput measurement helpers for Smart Battery Guardian models"""
+
+import time
+import numpy as np
+
+
+def measure_latency(fn, *args, batch_size=1, warmup=10, iterations=100):
+    """
+    Time repeated calls of an inference function
+
+    Args:
+        fn: callable to benchmark (e.g. a model's predict method)
+        *args: positional arguments passed to fn on every call
+        batch_size: number of samples processed per call
+        warmup: untimed calls made before measuring
+        iterations: number of timed calls
+
+    Returns:
+        Dictionary with mean/p50/p95 latency in ms and samples per second
+    """
+    for _ in range(warmup):
+        fn(*args)
+
+    timings = np.empty(iterations, dtype=np.float64)
+    for i in range(iterations):
+        start = time.perf_counter()
+        fn(*args)
+        timings[i] = time.perf_counter() - start
+
+    mean_s = float(timings.mean())
+    return {
+        "mean_ms": mean_s * 1000.0,
+        "p50_ms": float(np.percentile(timings, 50)) * 1000.0,
+        "p95_ms": float(np.percentile(timings, 95)) * 1000.0,
+        "throughput": batch_size / mean_s if mean_s > 0 else float("inf"),
+    }
+
+
+def format_report(title, rows, columns):
+    """
+    Render benchmark rows as a fixed-width text table
+
+    Args:
+        title: heading printed above the table
+        rows: list of dicts, one per model/variant
+        columns: list of (key, header) pairs to print
+
+    Returns:
+        Table as a string
+    """
+    widths = [
+        max([len(header)] + [len(_format_cell(row.get(key))) for row in rows])
+        for key, header in columns
+    ]
+    lines = [title, "=" * len(title)]
+    lines.append("  ".join(h.ljust(w) for (_, h), w in zip(columns, widths)).rstrip())
+    lines.append("  ".join("-" * w for w in widths))
+    for row in rows:
+        lines.append(
+            "  ".join(
+                _format_cell(row.get(key)).ljust(w)
+                for (key, _), w in zip(columns, widths)
+            ).rstrip()
+        )
+    return "\n".join(lines)
+
+
+def _format_cell(value):
+    """Format a single table cell"""
+    if value is None:
+        return "-"
+    if isinstance(value, float):
+        return f"{value:.4f}" if abs(value) < 10 else f"{value:.1f}"
+    return str(value)
@@ -31,36 +31,92 @@ class Config:
                 "version": "1.0.0",
                 "device": "cuda" if os.environ.get("CUDA_AVAILABLE") else "cpu",
             },
+            "inference": {
+                "intra_op_threads": 0,
+                "inter_op_threads": 0,
+                "cpu_affinity": [],
+                "autotune": "none",
+                "precision": "float32",
+                "max_batch_size": 1,
+                "max_batch_latency_ms": 5.0,
+                "concurrent_agents": True,
+                "agent_timeout_s": 5.0,
+            },
+            "workers": {
+                "num_workers": 0,
+                "threads_per_worker": 1,
+                "pin_cores": False,
+            },
             "thermal": {
                 "model_type": "cnn",
-                "input_shape": (64, 64, 3),
+                "input_shape": (8, 8, 1),
+                "variant": "base",
+                "latency_budget_ms": 5.0,
                 "num_classes": 2,
                 "threshold": 0.7,
+                "quantization": "none",
+                "backend": "torch",
+                "onnx_path": "models/onnx/thermal_cnn.onnx",
             },
             "acoustic": {
                 "model_type": "spectrogram_classifier",
+                "variant": "base",
+                "latency_budget_ms": 5.0,
                 "sample_rate": 44100,
                 "n_mfcc": 13,
                 "threshold": 0.65,
+                "quantization": "none",
+                "backend": "torch",
+                "onnx_path": "models/onnx/acoustic_classifier.onnx",
             },
             "rul": {
                 "model_type": "lstm",
                 "sequence_length": 50,
                 "num_features": 5,
-                "hidden_units": 64,
+                "variant": "base",
+                "latency_budget_ms": 5.0,
+                "quantization": "none",
+                "backend": "torch",
+                "onnx_path": "models/onnx/rul_lstm.onnx",
+                "stream_max_batteries": 100000,
+                "window_size": 64,
+                "rated_capacity": 1.1,
+                "eol_ratio": 0.7,
+                "capacity_feature": None,
+                "max_forecast_cycles": 1000,
             },
             "anomaly": {
                 "model_type": "autoencoder",
+                "variant": "base",
+                "latency_budget_ms": 5.0,
                 "contamination": 0.1,
                 "threshold": 0.75,
+                "threshold_mode": "gaussian",
+                "sketch_k": 200,
+                "sketch_seed": None,
+                "quantization": "none",
+                "backend": "torch",
+                "onnx_path": "models/onnx/anomaly_autoencoder.onnx",
+                "max_batteries": 100000,
+                "battery_history": 128,
             },
             "control": {
                 "model_type": "dqn",
                 "learning_rate": 0.001,
                 "gamma": 0.99,
+                "quantization": "none",
+                "buffer_size": 10000,
+                "batch_size": 64,
+                "target_update_interval": 100,
+                "prioritized_replay": False,
+                "double_dqn": True,
             },
             "data": {
                 "batch_size": 32,
+                "num_workers": 0,
+                "prefetch_factor": 2,
+                "persistent_workers": True,
+                "pin_memory": False,
                 "validation_split": 0.2,
                 "test_split": 0.1,
             },
@@ -68,6 +124,18 @@ class Config:
                 "epochs": 50,
                 "learning_rate": 0.001,
                 "early_stopping_patience": 5,
+                "min_delta": 0.0,
+                "lr_schedule": "none",
+                "lr_step_size": 10,
+                "lr_gamma": 0.5,
+                "grad_accumulation_steps": 1,
+            },
+            "distributed": {
+                "nproc_per_node": 1,
+                "nnodes": 1,
+                "master_addr": "127.0.0.1",
+                "master_port": 29500,
+                "backend": "gloo",
             },
         }
 
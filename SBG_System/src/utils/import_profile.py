@@ -0,0 +1,89 @@
+"""Import-time profiling (python -X importtime) for Smart Battery Guardian entry points"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+from .benchmark import format_report
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+
+
+def parse_importtime(output):
+    """
+    Parse python -X importtime stderr
+
+    Returns:
+        List of (module, self_us, cumulative_us) in import order
+    """
+    entries = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|")
+        entries.append((module.strip(), int(self_us), int(cumulative_us)))
+    return entries
+
+
+def profile_imports(module, top=15):
+    """
+    Import a module in a fresh interpreter and attribute the time to packages
+
+    Args:
+        module: dotted module name, importable from the project root
+        top: number of packages to report
+
+    Returns:
+        Dictionary with the module's total import time (ms) and the `top`
+        packages by self time
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+    )
+    entries = parse_importtime(result.stderr)
+    if result.returncode != 0:
+        error = result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "unknown error"
+        raise ImportError(f"Importing {module} failed: {error}")
+
+    packages = {}
+    for name, self_us, _ in entries:
+        package = name.split(".")[0]
+        count, total = packages.get(package, (0, 0))
+        packages[package] = (count + 1, total + self_us)
+
+    total_us = next((cum for name, _, cum in reversed(entries) if name == module), 0)
+    rows = [
+        {
+            "package": package,
+            "modules": count,
+            "self_ms": self_us / 1000.0,
+            "share": self_us / total_us if total_us else 0.0,
+        }
+        for package, (count, self_us) in sorted(
+            packages.items(), key=lambda item: item[1][1], reverse=True
+        )[:top]
+    ]
+    return {"module": module, "total_ms": total_us / 1000.0, "packages": rows}
+
+
+def format_import_report(profile):
+    """Render a profile_imports() result as a text table"""
+    return format_report(
+        f"Import time of {profile['module']}: {profile['total_ms']:.1f} ms",
+        profile["packages"],
+        [
+            ("package", "Package"),
+            ("modules", "Modules"),
+            ("self_ms", "Self ms"),
+            ("share", "Share"),
+        ],
+    )
+
+
+if __name__ == "__main__":
+    for name in sys.argv[1:] or ["app"]:
+        print(format_import_report(profile_imports(name)))
+        print()
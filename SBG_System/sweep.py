@@ -0,0 +1,92 @@
+"""
+Smart Battery Guardian - AttMoE Hyperparameter Sweep
+
+Cross-validates AttMoE configurations (leave one battery out, as in
+AttMoE-CALCE.ipynb) across a process pool, prunes configurations that fall
+behind, and appends every trial to a CSV results table.
+
+Capacity data comes from the notebook's CALCE.npy (battery name -> DataFrame
+with a `capacity` column); without it synthetic fade curves are used.
+
+Usage:
+    python sweep.py [--search grid|random] [--trials N] [--workers N]
+                    [--data CALCE.npy] [--epochs N] [--seeds 0 1 2]
+                    [--metric re|mae|rmse] [--no-prune] [--results PATH]
+"""
+
+import argparse
+import os
+import numpy as np
+
+from src.data import SyntheticBatteryDataGenerator
+from src.models.sweep import DEFAULT_SPACE, LogUniform, run_sweep
+from src.utils.benchmark import format_report
+
+# Random search samples the learning rate continuously over the grid's range
+RANDOM_SPACE = {**DEFAULT_SPACE, "lr": LogUniform(1e-4, 1e-2)}
+
+
+def load_capacity_series(path=None):
+    """Battery name -> capacity array from CALCE.npy, or synthetic curves"""
+    if path and os.path.exists(path):
+        batteries = np.load(path, allow_pickle=True).item()
+        return {
+            name: np.asarray(frame["capacity"], dtype=np.float32)
+            for name, frame in batteries.items()
+        }
+    if path:
+        print(f"No capacity data at {path}; using synthetic fade curves")
+    return SyntheticBatteryDataGenerator(seed=0).generate_capacity_curves()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SBG AttMoE hyperparameter sweep")
+    parser.add_argument("--search", default="grid", choices=["grid", "random"])
+    parser.add_argument("--trials", type=int, default=20, help="random search trials")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--threads", type=int, default=1, help="torch threads per worker")
+    parser.add_argument("--data", default="CALCE.npy")
+    parser.add_argument("--epochs", type=int, default=500)
+    parser.add_argument("--eval-interval", type=int, default=100)
+    parser.add_argument("--seeds", type=int, nargs="+", default=[0])
+    parser.add_argument("--metric", default="re", choices=["re", "mae", "rmse"])
+    parser.add_argument("--no-prune", action="store_true")
+    parser.add_argument("--results", default=os.path.join("models", "sweeps", "attmoe.csv"))
+    parser.add_argument("--top", type=int, default=10, help="trials shown in the report")
+    args = parser.parse_args()
+
+    records = run_sweep(
+        load_capacity_series(args.data),
+        space=DEFAULT_SPACE if args.search == "grid" else RANDOM_SPACE,
+        search=args.search,
+        num_trials=args.trials,
+        num_workers=args.workers,
+        threads_per_worker=args.threads,
+        metric=args.metric,
+        seeds=args.seeds,
+        epochs=args.epochs,
+        eval_interval=args.eval_interval,
+        prune=not args.no_prune,
+        results_path=args.results,
+    )
+    pruned = sum(record["status"] == "pruned" for record in records)
+    print(format_report(
+        f"AttMoE sweep ({args.search}, {len(records)} trials, {pruned} pruned, by {args.metric})",
+        records[:args.top],
+        [
+            ("trial", "Trial"),
+            ("lr", "LR"),
+            ("hidden_dim", "Hidden"),
+            ("num_experts", "Experts"),
+            ("status", "Status"),
+            ("re", "RE"),
+            ("mae", "MAE"),
+            ("rmse", "RMSE"),
+            ("seconds", "Seconds"),
+        ],
+    ))
+    print(f"Results appended to {args.results}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+"""Test acoustic agent training on BatteryDataset-style targets"""
+
+import torch
+from torch.utils.data import DataLoader, TensorDataset
+
+from src.agents.acoustic_agent import AcousticFaultAgent
+
+
+def test_acoustic_trains_on_float_labels():
+    """Class labels stored as floats are cast for the cross-entropy loss"""
+    torch.manual_seed(0)
+    agent = AcousticFaultAgent({"variant": "tiny"})
+    features = torch.rand(8, *agent.model.input_shape)
+    labels = torch.tensor([0.0, 1.0] * 4)
+    loader = DataLoader(TensorDataset(features, labels), batch_size=4)
+    history = agent.train(loader, epochs=1)
+    assert history is not None
+
+
+if __name__ == "__main__":
+    test_acoustic_trains_on_float_labels()
+    print("Acoustic training tests passed")
@@ -0,0 +1,79 @@
+"""Test per-battery anomaly baselines with bounded memory"""
+
+import os
+import tempfile
+import numpy as np
+import torch
+
+from src.agents.anomaly_agent import AnomalyDetectionAgent
+from src.models.anomaly_state import BatteryAnomalyState
+from test_rolling_stats import reference_detect
+
+
+def test_per_battery_matches_reference():
+    """Interleaved batteries each get the thresholds of their own score history"""
+    rng = np.random.default_rng(0)
+    state = BatteryAnomalyState(max_batteries=8, history_size=150, threshold_window=100)
+    ids = rng.integers(0, 5, 3000)
+    scores = rng.random(3000) * np.where(ids == 3, 5.0, 1.0)
+    histories = {i: [] for i in range(5)}
+    for start in range(0, len(ids), 64):
+        batch_ids = ids[start:start + 64].tolist()
+        thresholds, z_scores = state.update_batch(batch_ids, scores[start:start + 64])
+        for battery_id, score, threshold, z in zip(
+            batch_ids, scores[start:start + 64], thresholds, z_scores
+        ):
+            expected = reference_detect(histories[battery_id], float(score), 0.75, 150)
+            assert np.isclose(threshold, expected[0], rtol=1e-9, atol=1e-9)
+            assert np.isclose(z, expected[1], rtol=1e-7, atol=1e-7)
+    for battery_id, history in histories.items():
+        np.testing.assert_array_equal(state.scores(battery_id), history)  # kept exactly
+
+
+def test_lru_eviction_and_snapshot():
+    """Slots are reused for new batteries and snapshots restore every baseline"""
+    state = BatteryAnomalyState(max_batteries=3, history_size=100, threshold_window=100)
+    for battery_id in ["a", "b", "c"]:
+        state.update_batch([battery_id] * 120, np.linspace(0, 1, 120))
+    state.update("a", 0.5)
+    state.update("d", 0.5)  # evicts "b", the least recently used
+    assert "b" not in state and len(state) == 3 and state.num_scores("d") == 1
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "anomaly_state.pt")
+        state.save(path)
+        restored = BatteryAnomalyState(max_batteries=3, history_size=100, threshold_window=100)
+        restored.load(path)
+    assert list(restored.slots) == list(state.slots)
+    for battery_id in list(state.slots):
+        np.testing.assert_array_equal(restored.scores(battery_id), state.scores(battery_id))
+        assert restored.update(battery_id, 0.9) == state.update(battery_id, 0.9)
+
+    state.last_seen[state.slots["c"]] -= 3600
+    assert state.evict_idle(60) == 1 and "c" not in state
+
+
+def test_agent_batch_detect_per_battery():
+    """batch_detect with repeated ids equals detect() row by row"""
+    torch.manual_seed(0)
+    config = {"variant": "tiny", "max_batteries": 4, "battery_history": 100}
+    batched = AnomalyDetectionAgent(config)
+    sequential = AnomalyDetectionAgent(config)
+    sequential.set_model(batched.model)
+    rng = np.random.default_rng(2)
+    data = rng.random((300, 10)).astype(np.float32)
+    ids = rng.choice(["x", "y", "z"], 300).tolist()
+
+    results = batched.batch_detect(data, battery_ids=ids)["results"]
+    for row, battery_id, result in zip(data, ids, results):
+        expected = sequential.detect(row, battery_id=battery_id)
+        assert np.isclose(result["anomaly_score"], expected["anomaly_score"], atol=1e-6)
+        assert np.isclose(result["adaptive_threshold"], expected["adaptive_threshold"], atol=1e-6)
+    assert len(batched.score_history) == 0  # the shared history is untouched
+
+
+if __name__ == "__main__":
+    test_per_battery_matches_reference()
+    test_lru_eviction_and_snapshot()
+    test_agent_batch_detect_per_battery()
+    print("Per-battery anomaly state tests passed")
@@ -0,0 +1,79 @@
+"""Test fleet assessment with one forward pass per agent"""
+
+import numpy as np
+import torch
+
+from src.agents import BatteryMonitoringOrchestrator
+
+
+def fleet_batch(num_batteries, seed=0):
+    rng = np.random.default_rng(seed)
+    return {
+        "thermal_images": rng.random((num_batteries, 64, 64)).astype(np.float32),
+        "acoustic_features": rng.random((num_batteries, 13, 173)).astype(np.float32),
+        "rul_sequences": rng.random((num_batteries, 20, 5)).astype(np.float32),
+        "sensor_data": rng.random((num_batteries, 10)).astype(np.float32),
+        "battery_ids": [f"cell-{i}" for i in range(num_batteries)],
+    }
+
+
+def test_fleet_matches_single_assessments():
+    """assess_fleet equals comprehensive_assessment per battery, in 4 + 1 forward passes"""
+    torch.manual_seed(0)
+    orchestrator = BatteryMonitoringOrchestrator()
+    orchestrator.build_agents()
+    batch = fleet_batch(6)
+
+    runners = [
+        orchestrator.thermal_agent.runner,
+        orchestrator.acoustic_agent.runner,
+        orchestrator.rul_agent.runner,
+        orchestrator.anomaly_agent.runner,
+        orchestrator.rl_controller.policy_runner,
+    ]
+    calls_before = [runner.num_calls for runner in runners]
+    fleet = orchestrator.assess_fleet(batch)
+    assert [runner.num_calls for runner in runners] == [calls + 1 for calls in calls_before]
+    assert len(fleet) == 6
+
+    for i, assessment in enumerate(fleet):
+        single = orchestrator.comprehensive_assessment(
+            batch["thermal_images"][i],
+            batch["acoustic_features"][i],
+            batch["rul_sequences"][i],
+            batch["sensor_data"][i],
+            battery_id=f"single-{i}",
+        )
+        assert assessment["battery_id"] == f"cell-{i}"
+        assert np.isclose(assessment["overall_risk_score"], single["overall_risk_score"], atol=1e-5)
+        for key, value in single["risk_scores"].items():
+            assert np.isclose(assessment["risk_scores"][key], value, atol=1e-5)
+        assert assessment["overall_health"] == single["overall_health"]
+        assert assessment["control_recommendation"]["action"] == single["control_recommendation"]["action"]
+        assert [a["source"] for a in assessment["alerts"]] == [a["source"] for a in single["alerts"]]
+    orchestrator.close()
+
+
+def test_fallback_results_are_per_battery():
+    """A failed agent's fallback and the status dict are separate objects per battery"""
+    torch.manual_seed(0)
+    orchestrator = BatteryMonitoringOrchestrator()
+
+    def broken(*args, **kwargs):
+        raise RuntimeError("sensor offline")
+
+    orchestrator.thermal_agent.batch_analyze = broken
+    fleet = orchestrator.assess_fleet(fleet_batch(3))
+    assert [a["agent_status"]["thermal"] for a in fleet] == ["error"] * 3
+
+    fleet[0]["thermal_analysis"]["anomalies"].append("annotated")
+    fleet[0]["agent_status"]["thermal"] = "annotated"
+    assert fleet[1]["thermal_analysis"]["anomalies"] == []
+    assert fleet[2]["agent_status"]["thermal"] == "error"
+    orchestrator.close()
+
+
+if __name__ == "__main__":
+    test_fleet_matches_single_assessments()
+    test_fallback_results_are_per_battery()
+    print("Fleet assessment tests passed")
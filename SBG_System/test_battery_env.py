@@ -0,0 +1,81 @@
+"""Test the vectorized battery environment and batched DQN training on it"""
+
+import numpy as np
+import torch
+
+from src.models.battery_env import NUM_ACTIONS, VectorBatteryEnv
+from src.models.rl_controller import RLChargeController
+
+
+def test_observations_match_state_vector():
+    """Observations are (num_envs, 8) float32 like _build_state_vector"""
+    env = VectorBatteryEnv(num_envs=32, seed=0)
+    obs = env.reset()
+    assert obs.shape == (32, 8) and obs.dtype == np.float32
+    assert np.all((obs[:, [0, 1, 3]] >= 0) & (obs[:, [0, 1, 3]] <= 1))
+
+    next_obs, rewards, dones, info = env.step(np.full(32, 2))
+    assert next_obs.shape == (32, 8)
+    assert rewards.shape == (32,) and rewards.dtype == np.float32
+    assert dones.dtype == bool and info["reset_observations"].shape == (32, 8)
+
+
+def test_charging_raises_soc_and_temperature():
+    """Fast charging fills and heats cells; idling does neither"""
+    env = VectorBatteryEnv(num_envs=64, seed=0, fault_probability=0.0)
+    soc, temperature = env.soc.copy(), env.temperature.copy()
+    env.step(np.full(64, NUM_ACTIONS - 1))
+    assert np.all(env.soc > soc)
+    assert env.temperature.mean() > temperature.mean()
+
+    env = VectorBatteryEnv(num_envs=64, seed=0, fault_probability=0.0)
+    soc = env.soc.copy()
+    env.step(np.full(64, 2))
+    np.testing.assert_allclose(env.soc, soc)
+
+
+def test_finished_cells_reset():
+    """Cells that finish restart at step 0 and report fresh observations"""
+    env = VectorBatteryEnv(num_envs=16, max_steps=3, seed=0)
+    for _ in range(3):
+        obs, _, dones, info = env.step(np.full(16, 2))
+    assert dones.all() and info["timed_out"].all()
+    assert np.all(env.steps == 0)
+    assert not np.array_equal(obs, info["reset_observations"])
+
+
+def test_train_on_env():
+    """Batched collection fills the replay buffer and runs updates"""
+    torch.manual_seed(0)
+    np.random.seed(0)
+    controller = RLChargeController(buffer_size=4096, batch_size=32)
+    env = VectorBatteryEnv(num_envs=128, seed=0)
+    stats = controller.train_on_env(env, num_steps=10)
+
+    assert stats["transitions"] == 1280 and len(controller.memory) == 1280
+    assert stats["updates"] == 10 and stats["mean_loss"] is not None
+    assert controller.epsilon < 1.0
+
+    actions = controller.get_actions(env.reset(), training=False)
+    assert actions.shape == (128,) and actions.max() < NUM_ACTIONS
+
+
+def test_time_limit_is_not_terminal():
+    """Cut-off episodes end (and reset) but are stored as non-terminal"""
+    torch.manual_seed(0)
+    np.random.seed(0)
+    controller = RLChargeController(buffer_size=256, batch_size=256)
+    env = VectorBatteryEnv(num_envs=16, max_steps=3, seed=0)
+    stats = controller.train_on_env(env, num_steps=3)
+
+    assert stats["episodes"] == 16  # every cell timed out and was reset
+    assert not controller.memory.dones[: len(controller.memory)].any()
+
+
+if __name__ == "__main__":
+    test_observations_match_state_vector()
+    test_charging_raises_soc_and_temperature()
+    test_finished_cells_reset()
+    test_train_on_env()
+    test_time_limit_is_not_terminal()
+    print("Battery environment tests passed")
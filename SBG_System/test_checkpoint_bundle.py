@@ -0,0 +1,123 @@
+"""Test the single-file memory-mapped checkpoint bundle"""
+
+import os
+import tempfile
+from unittest import mock
+import numpy as np
+import torch
+
+from src.agents import BatteryMonitoringOrchestrator
+from src.models.checkpoint_bundle import save_tensors, load_tensors
+
+
+def test_tensor_roundtrip():
+    """Every dtype and shape must survive a save/mmap-load roundtrip"""
+    tensors = {
+        "weights": torch.randn(3, 4),
+        "scalar": torch.tensor(7, dtype=torch.int64),
+        "half": torch.randn(5).to(torch.bfloat16),
+        "mask": torch.tensor([True, False, True]),
+        "empty": torch.empty(0, 2),
+    }
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "tensors.safetensors")
+        save_tensors(path, tensors, {"note": "test"})
+        for mmap in (True, False):
+            loaded, metadata = load_tensors(path, mmap=mmap)
+            assert metadata == {"note": "test"}
+            for name, tensor in tensors.items():
+                assert loaded[name].dtype == tensor.dtype, name
+                assert torch.equal(loaded[name], tensor), name
+        del loaded
+
+
+def test_orchestrator_bundle_matches_directory_checkpoint():
+    """A bundle must restore weights, thresholds and anomaly history"""
+    torch.manual_seed(0)
+    np.random.seed(0)
+    source = BatteryMonitoringOrchestrator()
+    source.thermal_agent.threshold = 0.42
+    source.anomaly_agent.score_history = [0.1, 0.2, 0.3]
+
+    rul_sequence = np.random.rand(20, 5).astype(np.float32)
+    sensor_data = np.random.rand(10).astype(np.float32)
+    expected_rul = source.rul_agent.predict(rul_sequence)["predicted_rul"]
+    expected_score = source.anomaly_agent.detect(sensor_data)["anomaly_score"]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "sbg.safetensors")
+        source.save_bundle(path)
+
+        restored = BatteryMonitoringOrchestrator()
+        restored.load_checkpoint(path)
+
+        assert restored.thermal_agent.threshold == 0.42
+        assert restored.anomaly_agent.score_history == source.anomaly_agent.score_history
+        assert restored.rul_agent.predict(rul_sequence)["predicted_rul"] == expected_rul
+        assert restored.anomaly_agent.detect(sensor_data)["anomaly_score"] == expected_score
+        del restored
+
+
+def test_bundle_maps_weights_and_anomaly_statistics():
+    """Loading builds agents around the file's weights and restores fleet and battery stats"""
+    torch.manual_seed(0)
+    np.random.seed(0)
+    source = BatteryMonitoringOrchestrator()
+    for step in range(30):
+        source.anomaly_agent.detect(np.random.rand(10).astype(np.float32), battery_id=f"B{step % 3}")
+    expected_sketch = source.anomaly_agent.sketch_state()
+    expected_states = source.anomaly_agent.battery_states.state_dict()
+
+    def no_random_init(original):
+        def init(tensor, *args, **kwargs):
+            assert tensor.device.type == "meta", "bundle load ran a random initialization"
+            return original(tensor, *args, **kwargs)
+        return init
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "sbg.safetensors")
+        source.save_bundle(path)
+
+        restored = BatteryMonitoringOrchestrator()
+        with mock.patch.object(torch.nn.init, "kaiming_uniform_", no_random_init(torch.nn.init.kaiming_uniform_)), \
+                mock.patch.object(torch.nn.init, "uniform_", no_random_init(torch.nn.init.uniform_)):
+            restored.load_bundle(path)
+
+        controller = restored.rl_controller
+        for name, tensor in source.rl_controller.q_network.state_dict().items():
+            assert torch.equal(controller.q_network.state_dict()[name], tensor), name
+            assert torch.equal(controller.target_network.state_dict()[name], tensor), name
+        online = controller.q_network.fc[0].weight
+        target = controller.target_network.fc[0].weight
+        assert online.untyped_storage().data_ptr() != target.untyped_storage().data_ptr()
+
+        sketch = restored.anomaly_agent.sketch_state()
+        assert sketch["count"] == expected_sketch["count"]
+        assert np.array_equal(sketch["items"], expected_sketch["items"])
+        states = restored.anomaly_agent.battery_states.state_dict()
+        assert states["battery_ids"] == expected_states["battery_ids"]
+        assert torch.equal(states["history"], expected_states["history"])
+        del restored, controller, online, target
+
+
+def test_bundle_with_empty_sketch():
+    """A fresh orchestrator's bundle (empty fleet sketch) round-trips"""
+    torch.manual_seed(0)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "sbg.safetensors")
+        BatteryMonitoringOrchestrator().save_bundle(path)
+        restored = BatteryMonitoringOrchestrator()
+        restored.load_bundle(path, mmap=False)
+
+    sketch = restored.anomaly_agent.fleet_sketch
+    assert len(sketch) == 0 and np.isnan(sketch.quantile(0.5))
+    sketch.update(0.25)
+    assert sketch.quantile(0.0) == sketch.quantile(1.0) == 0.25
+
+
+if __name__ == "__main__":
+    test_tensor_roundtrip()
+    test_orchestrator_bundle_matches_directory_checkpoint()
+    test_bundle_maps_weights_and_anomaly_statistics()
+    test_bundle_with_empty_sketch()
+    print("Checkpoint bundle tests passed")
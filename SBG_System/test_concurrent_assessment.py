@@ -0,0 +1,172 @@
+"""Test concurrent agent execution in comprehensive_assessment"""
+
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+import numpy as np
+import torch
+
+from src.agents import BatteryMonitoringOrchestrator
+from src.models.micro_batcher import MicroBatcher, _STOP
+
+
+def slow(function, seconds):
+    """Wrap an agent method so it sleeps first (sleep releases the GIL like torch ops)"""
+    def wrapper(*args, **kwargs):
+        time.sleep(seconds)
+        return function(*args, **kwargs)
+    return wrapper
+
+
+def inputs():
+    rng = np.random.default_rng(0)
+    return (
+        rng.random((64, 64)).astype(np.float32),
+        rng.random((13, 100)).astype(np.float32),
+        rng.random((20, 5)).astype(np.float32),
+        rng.random(10).astype(np.float32),
+    )
+
+
+def test_agents_overlap_and_fail_independently():
+    """Latency is the slowest agent; timeouts and errors only affect their own agent"""
+    torch.manual_seed(0)
+    orchestrator = BatteryMonitoringOrchestrator({"inference": {"agent_timeout_s": 1.0}})
+    orchestrator.build_agents()
+    orchestrator.comprehensive_assessment(*inputs())  # warm up
+
+    for name in ("thermal_agent", "acoustic_agent", "anomaly_agent"):
+        agent = getattr(orchestrator, name)
+        method = "score" if name == "anomaly_agent" else "analyze"
+        setattr(agent, method, slow(getattr(agent, method), 0.3))
+    orchestrator.rul_agent.predict = slow(orchestrator.rul_agent.predict, 0.3)
+
+    start = time.perf_counter()
+    assessment = orchestrator.comprehensive_assessment(*inputs())
+    assert time.perf_counter() - start < 0.9  # not 4 x 0.3 s
+    assert set(assessment["agent_status"].values()) == {"ok"}
+
+    expected_rul = orchestrator.risk_scores["rul"]
+    orchestrator.rul_agent.predict = slow(orchestrator.rul_agent.predict, 3.0)
+
+    def broken(*args, **kwargs):
+        raise RuntimeError("sensor offline")
+
+    orchestrator.acoustic_agent.analyze = broken
+
+    start = time.perf_counter()
+    assessment = orchestrator.comprehensive_assessment(*inputs())
+    assert time.perf_counter() - start < 2.0
+    assert assessment["agent_status"] == {
+        "thermal": "ok", "acoustic": "error", "rul": "timeout", "anomaly": "ok",
+    }
+    assert np.isclose(assessment["risk_scores"]["rul"], expected_rul)
+    assert "anomaly_score" in assessment["anomaly_detection"]
+    sources = [alert["message"] for alert in assessment["alerts"] if alert["source"] == "System"]
+    assert any("Rul analysis unavailable" in message for message in sources)
+    orchestrator.close(wait=True)
+
+
+def test_timed_out_analysis_leaves_state_alone():
+    """A late anomaly analysis never updates the history; hung threads get a fresh pool"""
+    torch.manual_seed(0)
+    orchestrator = BatteryMonitoringOrchestrator({"inference": {"agent_timeout_s": 0.5}})
+    orchestrator.build_agents()
+    orchestrator.comprehensive_assessment(*inputs(), battery_id="cell-1")
+    anomaly_agent = orchestrator.anomaly_agent
+    history = anomaly_agent.score_history
+    sketch_count = len(anomaly_agent.fleet_sketch)
+
+    anomaly_agent.score = slow(anomaly_agent.score, 1.0)
+    executor = orchestrator._agent_executor()
+    assessment = orchestrator.comprehensive_assessment(*inputs())
+    assert assessment["agent_status"]["anomaly"] == "timeout"
+    assert orchestrator._agent_executor() is not executor
+
+    time.sleep(1.0)  # the abandoned analysis finishes
+    assert anomaly_agent.score_history == history
+    assert len(anomaly_agent.fleet_sketch) == sketch_count
+    orchestrator.close(wait=True)
+
+
+def test_anomaly_state_is_thread_safe():
+    """Concurrent detections from many threads all land in the shared state"""
+    torch.manual_seed(0)
+    anomaly_agent = BatteryMonitoringOrchestrator().anomaly_agent
+    readings = np.random.default_rng(0).random((50, 10)).astype(np.float32)
+
+    def detect_all(battery_id):
+        for reading in readings:
+            anomaly_agent.detect(reading, battery_id=battery_id)
+            anomaly_agent.detect(reading)
+
+    threads = [threading.Thread(target=detect_all, args=(f"cell-{i}",)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(anomaly_agent.fleet_sketch) == 8 * 2 * len(readings)
+    assert len(anomaly_agent.score_history) == 8 * len(readings)
+    states = anomaly_agent.battery_states.state_dict()
+    assert states["count"].tolist() == [len(readings)] * 8
+
+
+def test_close_stops_micro_batchers():
+    """close() stops every built runner's micro-batching thread"""
+    def batcher_threads():
+        return [t for t in threading.enumerate() if t.name.startswith("MicroBatcher-")]
+
+    before = len(batcher_threads())
+    orchestrator = BatteryMonitoringOrchestrator({"inference": {"max_batch_size": 8}})
+    orchestrator.build_agents()
+    assert len(batcher_threads()) == before + 4
+    orchestrator.comprehensive_assessment(*inputs())
+    orchestrator.close(wait=True)
+    assert len(batcher_threads()) == before
+    assert "rul_prediction" in orchestrator.comprehensive_assessment(*inputs())  # unbatched
+    orchestrator.close(wait=True)
+
+
+def test_micro_batcher_never_strands_callers():
+    """Slow, closing and closed batchers fail callers instead of blocking them"""
+    def slow(batch):
+        time.sleep(0.2)
+        return batch
+
+    batcher = MicroBatcher(slow, max_latency_ms=0.0, timeout_s=0.05)
+    try:
+        batcher.submit(np.zeros((1, 2)))
+        assert False, "expected a timeout"
+    except FutureTimeoutError:
+        pass
+    batcher.close()
+    try:
+        batcher.submit(np.zeros((1, 2)))
+        assert False, "expected a closed batcher"
+    except RuntimeError:
+        pass
+
+    # Requests that end up behind the stop marker are failed, not left pending
+    release = threading.Event()
+    batcher = MicroBatcher(lambda batch: release.wait() and batch, max_latency_ms=0.0)
+    caller = threading.Thread(target=batcher.submit, args=(np.zeros((1, 2)),))
+    caller.start()
+    while batcher._queue.qsize():
+        time.sleep(0.001)  # the worker is now blocked in run_batch
+    future = Future()
+    batcher._queue.put(_STOP)
+    batcher._queue.put((np.zeros((1, 2), dtype=np.float32), future))
+    release.set()
+    caller.join()
+    batcher._worker.join(timeout=1.0)
+    assert isinstance(future.exception(timeout=0), RuntimeError)
+
+
+if __name__ == "__main__":
+    test_agents_overlap_and_fail_independently()
+    test_timed_out_analysis_leaves_state_alone()
+    test_anomaly_state_is_thread_safe()
+    test_close_stops_micro_batchers()
+    test_micro_batcher_never_strands_callers()
+    print("Concurrent assessment tests passed")
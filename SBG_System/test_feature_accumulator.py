@@ -0,0 +1,91 @@
+"""Test incremental feature accumulators against the batch extractors"""
+
+import numpy as np
+import pandas as pd
+
+from src.data.feature_accumulator import StreamingFeatureExtractor
+from src.data.real_data_loader import BatteryDataPipeline, BatteryDataPreprocessor
+
+EXACT = [0, 1, 2, 3, 5, 6, 7, 8, 10, 11, 12, 13, 14, 15]  # moments and extremes
+
+
+def telemetry(num_rows, seed=0):
+    """Synthetic V/I/T/R readings with occasional current spikes"""
+    rng = np.random.default_rng(seed)
+    current = rng.normal(1.0, 0.05, num_rows)
+    current[rng.random(num_rows) < 0.02] += 1.5
+    return pd.DataFrame({
+        "V": 3.7 + 0.3 * np.sin(np.arange(num_rows) / 50) + rng.normal(0, 0.01, num_rows),
+        "I": current,
+        "T": 25 + rng.normal(0, 1, num_rows),
+        "Internal_Resistance_Ohm_": 0.1 + rng.normal(0, 0.002, num_rows),
+        "SOC": rng.random(num_rows),
+        "Discharge_CapacityAh": np.linspace(2.0, 1.7, num_rows),
+        "Cycle_Index": np.arange(num_rows) // 100 + 1,
+    })
+
+
+def test_streaming_matches_batch_features():
+    """Sample-by-sample and frame updates reproduce the DataFrame features"""
+    df = telemetry(6000)
+    extractor = StreamingFeatureExtractor(max_batteries=2, seed=0)
+    for row in df.iloc[:1000].to_dict("records"):
+        extractor.update("cell-1", row)
+    for start in range(1000, len(df), 500):
+        extractor.update_frame("cell-1", df.iloc[start:start + 500])
+
+    expected = BatteryDataPreprocessor.extract_anomaly_features(df)
+    features = extractor.anomaly_features("cell-1")
+    np.testing.assert_allclose(features[EXACT], expected[EXACT], rtol=1e-5, atol=1e-6)
+    assert abs(features[4] - expected[4]) < 0.05 * expected[4]  # 5-95 percentile range
+    assert abs(features[9] - expected[9]) < 0.005  # current spike share
+    assert np.all(features[16:] == 0)
+
+    state, fade = extractor.rul_features("cell-1")
+    expected_state, expected_fade = BatteryDataPreprocessor.extract_rul_features(df)
+    assert state.keys() == expected_state.keys()
+    for key in state:
+        assert np.isclose(state[key], expected_state[key], rtol=1e-9), key
+    assert np.isclose(fade, expected_fade)
+
+
+def test_missing_columns_and_eviction():
+    """Absent columns keep the batch layout; old batteries are evicted"""
+    df = telemetry(300)[["V", "T"]]
+    extractor = StreamingFeatureExtractor(max_batteries=2)
+    extractor.update_frame("a", df)
+    expected = BatteryDataPreprocessor.extract_anomaly_features(df)
+    np.testing.assert_allclose(
+        extractor.anomaly_features("a")[[0, 1, 2, 3, 5, 6, 7, 8]],
+        expected[[0, 1, 2, 3, 5, 6, 7, 8]],
+        rtol=1e-5,
+    )
+    assert extractor.rul_features("a")[0]["current"] == 0.0
+
+    extractor.update("b", {"V": 3.6})
+    extractor.update("c", {"V": 3.5})
+    assert "a" not in extractor and len(extractor) == 2
+
+
+def test_pipeline_ingest_accumulates_per_battery():
+    """Chunks of interleaved readings give each battery its whole-history features"""
+    df = pd.concat([
+        telemetry(1200, seed=1).assign(battery_id="a"),
+        telemetry(900, seed=2).assign(battery_id="b"),
+    ]).sample(frac=1.0, random_state=0)
+    pipeline = BatteryDataPipeline("unused")
+    for start in range(0, len(df), 250):
+        data = pipeline.ingest_readings(df.iloc[start:start + 250])
+    assert sorted(data["battery_ids"]) == ["a", "b"]
+    assert all(entry["image"].shape == (8, 8) for entry in data["thermal"])
+
+    for entry in data["anomaly"]:
+        expected = BatteryDataPreprocessor.extract_anomaly_features(df[df["battery_id"] == entry["battery_id"]])
+        np.testing.assert_allclose(entry["features"][EXACT], expected[EXACT], rtol=1e-5, atol=1e-6)
+
+
+if __name__ == "__main__":
+    test_streaming_matches_batch_features()
+    test_missing_columns_and_eviction()
+    test_pipeline_ingest_accumulates_per_battery()
+    print("Feature accumulator tests passed")
@@ -0,0 +1,38 @@
+"""Test that startup paths defer heavy imports and agent construction"""
+
+import subprocess
+import sys
+
+
+def test_orchestrator_import_skips_torch():
+    """Creating an orchestrator must not import torch or build agents"""
+    code = (
+        "import sys\n"
+        "from src.agents import BatteryMonitoringOrchestrator\n"
+        "orchestrator = BatteryMonitoringOrchestrator()\n"
+        "assert orchestrator.built_agents() == [], orchestrator.built_agents()\n"
+        "assert 'torch' not in sys.modules\n"
+        "assert 'librosa' not in sys.modules\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+
+def test_agents_built_once_on_first_use():
+    """Concurrent first accesses must share one agent instance"""
+    from concurrent.futures import ThreadPoolExecutor
+    from src.agents import BatteryMonitoringOrchestrator
+
+    orchestrator = BatteryMonitoringOrchestrator()
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        agents = list(pool.map(lambda _: orchestrator.anomaly_agent, range(8)))
+
+    assert all(agent is agents[0] for agent in agents)
+    assert orchestrator.built_agents() == ["anomaly_agent"]
+    assert set(orchestrator.get_inference_stats()) == {"anomaly"}
+
+
+if __name__ == "__main__":
+    test_orchestrator_import_skips_torch()
+    test_agents_built_once_on_first_use()
+    print("Lazy startup tests passed")
@@ -0,0 +1,57 @@
+"""Test opt-in bfloat16 autocast for agent training and inference"""
+
+import numpy as np
+import torch
+from torch.utils.data import DataLoader, TensorDataset
+
+from src.agents.rul_agent import RULPredictionAgent
+from src.agents.thermal_agent import ThermalAnomalyAgent
+from src.models.mixed_precision import grad_scaler
+
+
+def test_loss_scaling_only_for_float16():
+    """bfloat16 keeps float32's exponent range and needs no loss scaling"""
+    assert not grad_scaler("float32").is_enabled()
+    assert not grad_scaler("bfloat16").is_enabled()
+    assert grad_scaler("float16").is_enabled()
+
+
+def test_bfloat16_rul_training_and_inference():
+    """bf16 training lowers the loss; bf16 inference tracks float32 outputs"""
+    torch.manual_seed(0)
+    agent = RULPredictionAgent({"precision": "bfloat16", "variant": "tiny"})
+    sequences = torch.rand(64, 50, 5)
+    targets = sequences[:, :, 0].mean(dim=1) * 100.0
+    loader = DataLoader(TensorDataset(sequences, targets), batch_size=16)
+    with torch.no_grad():
+        agent.model.fc[-2].bias.fill_(10.0)  # start clear of the output ReLU's dead zone
+
+    with torch.no_grad():
+        before = torch.nn.functional.mse_loss(agent.model(sequences)[:, 0], targets).item()
+    agent.train(loader, None, epochs=20, lr=0.01)
+    with torch.no_grad():
+        after = torch.nn.functional.mse_loss(agent.model(sequences)[:, 0], targets).item()
+    assert after < before
+    assert all(p.dtype == torch.float32 for p in agent.model.parameters())
+
+    sequence = sequences[0].numpy()
+    bf16 = agent.predict(sequence)["predicted_rul"]
+    agent.runner.precision = "float32"
+    fp32 = agent.predict(sequence)["predicted_rul"]
+    assert isinstance(bf16, float)
+    assert abs(bf16 - fp32) <= 0.02 * max(abs(fp32), 1.0)
+
+
+def test_bfloat16_thermal_probabilities_are_float32():
+    """Classifier outputs come back as float32 numpy arrays"""
+    torch.manual_seed(0)
+    agent = ThermalAnomalyAgent({"precision": "bfloat16", "variant": "tiny"})
+    result = agent.analyze(np.random.rand(64, 64).astype(np.float32))
+    assert 0.0 <= result["anomaly_score"] <= 1.0
+
+
+if __name__ == "__main__":
+    test_loss_scaling_only_for_float16()
+    test_bfloat16_rul_training_and_inference()
+    test_bfloat16_thermal_probabilities_are_float32()
+    print("Mixed precision tests passed")
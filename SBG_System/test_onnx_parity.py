@@ -0,0 +1,48 @@
+"""Test PyTorch vs ONNX Runtime parity for all SBG models"""
+
+import os
+import tempfile
+import torch
+
+from src.models import ThermalCNN, AcousticClassifier, RULLSTM, AnomalyAutoencoder
+from src.models.rl_controller import DQNNetwork
+from src.models.onnx_backend import OnnxModel
+from src.models.onnx_export import export_model, check_parity
+
+# Model, batch of inputs (batch size differs from the export sample to exercise dynamic axes)
+parity_cases = {
+    "thermal_cnn": (ThermalCNN, torch.rand(4, 3, 8, 8)),
+    "thermal_cnn_64": (ThermalCNN, torch.rand(2, 3, 64, 64)),
+    "acoustic_classifier": (AcousticClassifier, torch.rand(3, 13, 173)),
+    "rul_lstm": (RULLSTM, torch.rand(3, 50, 5)),
+    "anomaly_autoencoder": (AnomalyAutoencoder, torch.rand(7, 10)),
+    "dqn_network": (DQNNetwork, torch.rand(5, 8)),
+}
+
+
+def test_onnx_parity():
+    """Exported ONNX models must match PyTorch outputs"""
+    torch.manual_seed(0)
+    failures = []
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for name, (model_cls, inputs) in parity_cases.items():
+            model = model_cls().eval()
+            path = export_model(model, os.path.join(tmp_dir, f"{name}.onnx"))
+            onnx_model = OnnxModel(path)
+            # Dynamic axes: the case's batch size, a single row and (RUL) other sequence lengths
+            batches = [inputs, inputs[:1]]
+            if model_cls is RULLSTM:
+                batches += [torch.rand(1, 5, 5), torch.rand(7, 20, 5)]
+            for batch in batches:
+                result = check_parity(model, onnx_model, batch)
+                print(f"   {name} {tuple(batch.shape)}: max |diff| = {result['max_abs_diff']:.2e}")
+                if not result["passed"]:
+                    failures.append(f"{name} {tuple(batch.shape)}")
+
+    assert not failures, f"ONNX parity failed for: {failures}"
+
+
+if __name__ == "__main__":
+    test_onnx_parity()
+    print("✓ ONNX parity test PASSED")
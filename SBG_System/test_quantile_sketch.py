@@ -0,0 +1,91 @@
+"""Test the mergeable KLL quantile sketch and quantile anomaly thresholds"""
+
+import json
+import numpy as np
+import torch
+
+from src.agents.anomaly_agent import AnomalyDetectionAgent
+from src.models.anomaly_state import BatteryAnomalyState
+from src.models.quantile_sketch import KLLSketch
+
+
+def rank_errors(sketch, values, qs):
+    """Absolute rank error of the sketch's quantiles"""
+    return [abs(np.mean(values <= estimate) - q) for estimate, q in zip(sketch.quantile(qs), qs)]
+
+
+def test_sketch_accuracy_and_merge():
+    """Quantiles stay within ~1.7/k rank error in bounded memory, also after merging"""
+    rng = np.random.default_rng(0)
+    values = rng.lognormal(size=100000).astype(np.float32)
+    qs = np.array([0.01, 0.1, 0.5, 0.9, 0.99])
+
+    single = KLLSketch(200, seed=0)
+    for value in values[:20000]:
+        single.update(value)
+    single.update_many(values[20000:])
+    assert len(single) == len(values) and single.num_retained < 3 * 200 + 50
+    assert max(rank_errors(single, values, qs)) < 0.01
+    assert single.quantile(0.0) == values.min() and single.quantile(1.0) == values.max()
+
+    shards = [KLLSketch(200, seed=shard) for shard in range(4)]
+    for shard, part in zip(shards, np.array_split(values, 4)):
+        shard.update_many(part)
+    merged = KLLSketch.from_state_dict(shards[0].state_dict())
+    for shard in shards[1:]:
+        merged.merge(KLLSketch.from_state_dict(shard.state_dict()))
+    assert len(merged) == len(values)
+    assert max(rank_errors(merged, values, qs)) < 0.01
+
+    try:
+        merged.merge(KLLSketch(100))
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("merged sketches with different k")
+
+
+def test_sketch_state_is_reproducible_json():
+    """Seeded sketches repeat themselves, restores continue the sequence, empty states are valid JSON"""
+    values = np.random.default_rng(2).random(5000).astype(np.float32)
+    first, second = KLLSketch(50, seed=7), KLLSketch(50, seed=7)
+    first.update_many(values[:2500])
+    second.update_many(values[:2500])
+    restored = KLLSketch.from_state_dict(second.state_dict())
+    first.update_many(values[2500:])
+    restored.update_many(values[2500:])
+    assert np.array_equal(first.state_dict()["items"], restored.state_dict()["items"])
+
+    empty = KLLSketch(50).state_dict()
+    header = {key: value for key, value in empty.items() if key != "items"}
+    assert json.loads(json.dumps(header, allow_nan=False)) == header
+    assert header["min"] is None and header["max"] is None
+    restored = KLLSketch.from_state_dict({**json.loads(json.dumps(header)), "items": empty["items"]})
+    restored.update(0.5)
+    assert restored.min == restored.max == 0.5
+
+
+def test_quantile_thresholds():
+    """Per-battery thresholds are the window percentile; the agent flags ~contamination"""
+    rng = np.random.default_rng(1)
+    state = BatteryAnomalyState(max_batteries=4, history_size=120, threshold_window=100, quantile=0.9)
+    scores = rng.random(300).astype(np.float32)
+    thresholds, _ = state.update_batch(["a"] * 300, scores, default_threshold=0.5)
+    assert np.all(thresholds[:99] == 0.5)
+    for i in range(99, 300):
+        assert np.isclose(thresholds[i], np.quantile(scores[i - 99:i + 1], 0.9))
+
+    torch.manual_seed(0)
+    agent = AnomalyDetectionAgent({"variant": "tiny", "threshold_mode": "quantile", "contamination": 0.1})
+    data = rng.random((2000, 10)).astype(np.float32)
+    agent.batch_detect(data[:1000], battery_ids=list(range(1000)))  # warms the fleet sketch only
+    results = [agent.detect(row)["is_anomalous"] for row in data[1000:]]
+    assert 0.05 < np.mean(results) < 0.15
+    assert len(KLLSketch.from_state_dict(agent.sketch_state())) == 2000
+
+
+if __name__ == "__main__":
+    test_sketch_accuracy_and_merge()
+    test_sketch_state_is_reproducible_json()
+    test_quantile_thresholds()
+    print("Quantile sketch tests passed")
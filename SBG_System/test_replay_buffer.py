@@ -0,0 +1,85 @@
+"""Test replay memory and minibatch Double-DQN training"""
+
+import numpy as np
+import torch
+
+from src.models.replay_buffer import ReplayBuffer, PrioritizedReplayBuffer
+from src.models.rl_controller import RLChargeController
+
+
+def test_ring_buffer_overwrites_oldest():
+    """Past capacity, new transitions replace the oldest ones"""
+    buffer = ReplayBuffer(capacity=4, state_size=2, seed=0)
+    for i in range(6):
+        buffer.add([i, i], i % 3, float(i), [i + 1, i + 1], False)
+    assert len(buffer) == 4
+    assert sorted(buffer.rewards.tolist()) == [2.0, 3.0, 4.0, 5.0]
+    batch = buffer.sample(8)
+    assert batch["states"].shape == (8, 2) and batch["states"].dtype == np.float32
+    assert np.all(batch["weights"] == 1.0)
+
+
+def test_prioritized_sampling_follows_priorities():
+    """Transitions are drawn in proportion to their priority"""
+    buffer = PrioritizedReplayBuffer(capacity=5, state_size=1, alpha=1.0, epsilon=0.0, seed=0)
+    buffer.add_batch(np.zeros((5, 1)), np.zeros(5), np.arange(5), np.zeros((5, 1)), np.zeros(5))
+    buffer.update_priorities(np.arange(5), np.array([1.0, 1.0, 1.0, 1.0, 6.0]))
+    assert np.isclose(buffer.tree[1], 10.0)
+
+    counts = np.bincount(
+        np.concatenate([buffer.sample(100)["indices"] for _ in range(50)]), minlength=5
+    )
+    assert abs(counts[4] / counts.sum() - 0.6) < 0.05
+    weights = buffer.sample(100)["weights"]
+    assert weights.max() == 1.0 and weights.min() < 1.0
+
+    # Importance-sampling correction anneals towards 1, one step per sample
+    assert np.isclose(buffer.beta, 0.4 + 51 * 1e-3)
+    for _ in range(1000):
+        buffer.sample(1)
+    assert buffer.beta == 1.0
+
+
+def test_minibatch_dqn_learns_best_action():
+    """A one-step task rewarding action 3 is learned from replayed minibatches"""
+    torch.manual_seed(0)
+    np.random.seed(0)
+    controller = RLChargeController(batch_size=32, target_update_interval=10)
+    rng = np.random.default_rng(0)
+
+    losses = []
+    for _ in range(400):
+        state = rng.random(8, dtype=np.float32)
+        action = controller.get_action(state)
+        reward = 1.0 if action == 3 else 0.0
+        losses.append(controller.train_step(state, action, reward, state, True))
+
+    assert losses[0] is None  # buffer still filling
+    assert controller.num_updates == 400 - 31
+    assert controller.get_action(rng.random(8, dtype=np.float32), training=False) == 3
+
+    # The target network is synced automatically every 10 updates
+    while controller.num_updates % 10:
+        controller.learn()
+    for name, target in controller.target_network.state_dict().items():
+        assert torch.equal(target, controller.q_network.state_dict()[name]), name
+
+    # Learning never switches the online network out of train mode, and every
+    # sync publishes a new greedy-policy runner over its own snapshot
+    assert controller.q_network.training and not controller.target_network.training
+    runner = controller.policy_runner
+    assert runner.model is not controller.q_network and runner.model is not controller.target_network
+    for _ in range(10):
+        controller.learn()
+    assert controller.policy_runner is not runner
+    states = rng.random((16, 8), dtype=np.float32)
+    with torch.no_grad():
+        expected = controller.q_network.q_values(torch.from_numpy(states)).argmax(dim=1).numpy()
+    assert np.array_equal(controller.get_actions(states, training=False), expected)
+
+
+if __name__ == "__main__":
+    test_ring_buffer_overwrites_oldest()
+    test_prioritized_sampling_follows_priorities()
+    test_minibatch_dqn_learns_best_action()
+    print("Replay buffer tests passed")
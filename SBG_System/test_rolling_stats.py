@@ -0,0 +1,64 @@
+"""Test O(1) rolling statistics for the anomaly adaptive threshold"""
+
+import numpy as np
+import torch
+
+from src.agents.anomaly_agent import AnomalyDetectionAgent
+from src.models.rolling_stats import RollingWindow
+
+
+def test_rolling_window_matches_numpy():
+    """Running mean/std equal np.mean/np.std over the same window"""
+    rng = np.random.default_rng(0)
+    values = np.concatenate([rng.random(2500), 1e3 + rng.random(500), rng.random(1000)])
+    window = RollingWindow(100)
+    for i, value in enumerate(values):
+        window.append(value)
+        expected = values[max(0, i - 99):i + 1]
+        assert np.isclose(window.mean, np.mean(expected), rtol=1e-12, atol=1e-12)
+        assert np.isclose(window.std, np.std(expected), rtol=1e-9, atol=1e-12)
+    np.testing.assert_array_equal(window.values(), values[-100:])
+
+
+def reference_detect(history, score, threshold, max_history=1000):
+    """Threshold and z-score as computed from a Python list before RollingWindow"""
+    history.append(score)
+    if len(history) > max_history:
+        history.pop(0)
+    if len(history) < 100:
+        adaptive = threshold
+    else:
+        adaptive = min(np.mean(history[-100:]) + 2 * np.std(history[-100:]), 1.0)
+    std = np.std(history)
+    z = 0.0 if len(history) < 2 or std == 0 else (score - np.mean(history)) / std
+    return adaptive, z
+
+
+def test_agent_matches_list_history():
+    """detect() gives the same threshold and z-score as the list-based history"""
+    torch.manual_seed(0)
+    agent = AnomalyDetectionAgent({"variant": "tiny"})
+    agent.max_history = 300
+    rng = np.random.default_rng(1)
+    history = []
+    for _ in range(700):
+        result = agent.detect(rng.random(10).astype(np.float32))
+        adaptive, z = reference_detect(history, result["anomaly_score"], agent.threshold, 300)
+        assert np.isclose(result["adaptive_threshold"], adaptive, rtol=1e-12, atol=1e-12)
+        assert np.isclose(result["z_score"], z, rtol=1e-9, atol=1e-9)
+    assert agent.score_history == history
+
+
+def test_constant_history_has_zero_std():
+    """Rounding residue over identical values is not mistaken for spread"""
+    window = RollingWindow(7)
+    window.extend([0.1] * 50)
+    assert np.std(window.values()) > 0  # the float residue np.std reports
+    assert window.std == 0.0
+
+
+if __name__ == "__main__":
+    test_rolling_window_matches_numpy()
+    test_agent_matches_list_history()
+    test_constant_history_has_zero_std()
+    print("Rolling statistics tests passed")
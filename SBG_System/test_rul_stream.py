@@ -0,0 +1,56 @@
+"""Test streaming RUL inference against full-sequence RULLSTM"""
+
+import os
+import tempfile
+import numpy as np
+import torch
+
+from src.models import RULLSTM
+from src.models.rul_stream import StreamingRULPredictor
+
+
+def test_streaming_matches_full_sequence():
+    """One LSTM step per cycle must reproduce the full forward pass"""
+    torch.manual_seed(0)
+    model = RULLSTM().eval()
+    with torch.no_grad():
+        model.fc[-2].bias.fill_(100.0)  # keep the final ReLU out of its dead zone
+
+    sequences = np.random.rand(4, 30, 5).astype(np.float32)
+    battery_ids = [f"B{i}" for i in range(len(sequences))]
+    stream = StreamingRULPredictor(model)
+
+    for t in range(sequences.shape[1]):
+        streamed = stream.update_batch(battery_ids, sequences[:, t])
+
+    with torch.no_grad():
+        expected = model(torch.tensor(sequences)).numpy()[:, 0]
+
+    assert np.allclose(streamed, expected, rtol=1e-4, atol=1e-4)
+
+
+def test_eviction_and_persistence():
+    """LRU eviction bounds the state count and snapshots round-trip"""
+    model = RULLSTM().eval()
+    stream = StreamingRULPredictor(model, max_batteries=2)
+
+    for battery_id in ["A", "B", "C"]:
+        stream.update(battery_id, np.random.rand(5))
+
+    assert len(stream) == 2 and "A" not in stream
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "stream.pt")
+        stream.save(path)
+        restored = StreamingRULPredictor(model)
+        restored.load(path)
+
+    features = np.random.rand(5)
+    assert np.isclose(stream.update("C", features), restored.update("C", features))
+    assert restored.num_cycles("C") == 2
+
+
+if __name__ == "__main__":
+    test_streaming_matches_full_sequence()
+    test_eviction_and_persistence()
+    print("✓ Streaming RUL tests PASSED")
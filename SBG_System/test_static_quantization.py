@@ -0,0 +1,45 @@
+"""Test that static int8 quantization never silently serves float32"""
+
+import os
+import tempfile
+import numpy as np
+import torch
+
+from src.agents.thermal_agent import ThermalAnomalyAgent
+
+
+def test_static_requires_calibration_and_reuses_it():
+    """Uncalibrated static agents refuse to serve; calibration survives a rebuild"""
+    torch.manual_seed(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        config = {
+            "variant": "tiny",
+            "quantization": "static",
+            "calibration_path": os.path.join(tmp, "thermal.npy"),
+        }
+        agent = ThermalAnomalyAgent(config)
+        image = np.random.rand(8, 8).astype(np.float32)
+        try:
+            agent.analyze(image)
+        except RuntimeError as error:
+            assert "calibrat" in str(error)
+        else:
+            raise AssertionError("uncalibrated static quantization served a float32 model")
+
+        agent.quantize(np.random.rand(16, 1, 8, 8).astype(np.float32))
+        assert os.path.exists(config["calibration_path"])
+        assert agent.runner.inference_model is not agent.model
+
+        checkpoint = os.path.join(tmp, "thermal.pth")
+        agent.save(checkpoint)
+        restarted = ThermalAnomalyAgent(config)
+        assert restarted.runner.inference_model is not restarted.model
+        restarted.load(checkpoint)
+        assert restarted.runner.inference_model is not restarted.model
+        expected = agent.analyze(image)["anomaly_score"]
+        assert np.isclose(restarted.analyze(image)["anomaly_score"], expected, atol=1e-6)
+
+
+if __name__ == "__main__":
+    test_static_requires_calibration_and_reuses_it()
+    print("Static quantization tests passed")
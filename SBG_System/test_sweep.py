@@ -0,0 +1,97 @@
+"""Test the AttMoE hyperparameter sweep runner"""
+
+import os
+import tempfile
+from math import sqrt
+import numpy as np
+
+from src.data import SyntheticBatteryDataGenerator
+from src.models.sweep import (
+    LogUniform,
+    MedianPruner,
+    ResultsTable,
+    grid_search,
+    random_search,
+    rul_metrics,
+    run_sweep,
+)
+
+
+def notebook_relative_error(y_test, y_predict, threshold):
+    """relative_error from AttMoE-CALCE.ipynb"""
+    true_re, pred_re = len(y_test), 0
+    for i in range(len(y_test) - 1):
+        if y_test[i] <= threshold >= y_test[i + 1]:
+            true_re = i - 1
+            break
+    for i in range(len(y_predict) - 1):
+        if y_predict[i] <= threshold:
+            pred_re = i - 1
+            break
+    return abs(true_re - pred_re) / true_re if abs(true_re - pred_re) / true_re <= 1 else 1
+
+
+def test_metrics_match_notebook():
+    """Vectorized RE/MAE/RMSE equal the notebook's per-battery loops"""
+    rng = np.random.default_rng(0)
+    curves = SyntheticBatteryDataGenerator(seed=0).generate_capacity_curves(num_batteries=6)
+    y_true = [curve[rng.integers(100, 200):] for curve in curves.values()]
+    y_pred = [t + rng.normal(0, 0.03, len(t)) - rng.uniform(0, 0.05) for t in y_true]
+    threshold = 1.1 * 0.7
+
+    metrics = rul_metrics(y_true, y_pred, threshold)
+    for i, (t, p) in enumerate(zip(y_true, y_pred)):
+        assert np.isclose(metrics["re"][i], notebook_relative_error(t, p, threshold))
+        assert np.isclose(metrics["mae"][i], np.mean(np.abs(t - p)))
+        assert np.isclose(metrics["rmse"][i], sqrt(np.mean((t - p) ** 2)))
+
+
+def test_search_spaces():
+    """Grid covers every combination; random search samples within bounds"""
+    space = {"lr": [1e-3, 1e-2], "hidden_dim": [8, 16, 32]}
+    assert len(grid_search(space)) == 6
+    trials = random_search({"lr": LogUniform(1e-4, 1e-2), "hidden_dim": [8, 16]}, 20, seed=0)
+    assert len(trials) == 20
+    assert all(1e-4 <= t["lr"] <= 1e-2 and t["hidden_dim"] in (8, 16) for t in trials)
+
+
+def test_median_pruner():
+    """A trial worse than the median of earlier trials at a fold is pruned"""
+    import multiprocessing as mp
+
+    with mp.Manager() as manager:
+        pruner = MedianPruner(manager, min_trials=2)
+        assert not pruner.should_prune(0, 0.2)
+        assert not pruner.should_prune(0, 0.4)
+        assert pruner.should_prune(0, 0.5)
+        assert not pruner.should_prune(0, 0.1)
+
+
+def test_parallel_sweep_writes_results():
+    """Trials run in worker processes and land in the results table"""
+    curves = SyntheticBatteryDataGenerator(seed=0).generate_capacity_curves(
+        num_batteries=3, num_cycles=120
+    )
+    space = {"lr": [5e-3, 1e-2], "hidden_dim": [8], "num_experts": [2], "feature_size": [8]}
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "results.csv")
+        records = run_sweep(
+            curves, space, num_workers=2, epochs=20, eval_interval=10,
+            results_path=path, cache_dir=directory,
+        )
+        assert len(records) == 2 and all(r["status"] == "complete" for r in records)
+        assert records[0]["score"] <= records[1]["score"]
+        assert set(records[0]["fold_scores"]) == set(curves)
+
+        table = ResultsTable(path).load()
+        assert len(table) == 2
+        assert {"lr", "re", "mae", "rmse", "SYN_01_re"} <= set(table.columns)
+        assert len([f for f in os.listdir(directory) if f.endswith(".npz")]) == 1
+
+
+if __name__ == "__main__":
+    test_metrics_match_notebook()
+    test_search_spaces()
+    test_median_pruner()
+    test_parallel_sweep_writes_results()
+    print("Sweep tests passed")
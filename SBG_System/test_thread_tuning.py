@@ -0,0 +1,84 @@
+"""Test per-agent thread settings and the startup thread autotuner"""
+
+import os
+import threading
+import torch
+
+from src.agents import BatteryMonitoringOrchestrator
+from src.models import model_runner
+from src.models.model_runner import ModelRunner, apply_thread_settings
+from src.models.thread_tuner import candidate_thread_counts
+
+
+def test_candidate_thread_counts():
+    """Powers of two up to the core count, ending at the core count"""
+    assert candidate_thread_counts(1) == [1]
+    assert candidate_thread_counts(6) == [1, 2, 4, 6]
+    assert candidate_thread_counts(8) == [1, 2, 4, 8]
+
+
+def test_thread_settings_are_per_calling_thread():
+    """An agent's settings apply to the thread running it, not the process"""
+    main_threads = torch.get_num_threads()
+    seen = {}
+
+    def run():
+        apply_thread_settings(main_threads + 1, cpu_affinity=[min(os.sched_getaffinity(0))])
+        seen["threads"] = torch.get_num_threads()
+        seen["cores"] = os.sched_getaffinity(0)
+        apply_thread_settings(0, cpu_affinity=None)
+        seen["restored"] = os.sched_getaffinity(0)
+        seen["default_threads"] = torch.get_num_threads()
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    thread.join()
+
+    assert seen["threads"] == main_threads + 1
+    assert seen["cores"] == {min(os.sched_getaffinity(0))}
+    assert seen["restored"] == os.sched_getaffinity(0)
+    assert seen["default_threads"] == model_runner._default_threads
+    assert torch.get_num_threads() == main_threads
+
+
+def test_runner_construction_keeps_process_threads():
+    """Building a runner must not change the thread count of other callers"""
+    main_threads = torch.get_num_threads()
+    ModelRunner(torch.nn.Linear(4, 2), intra_op_threads=main_threads + 1)
+    assert torch.get_num_threads() == main_threads
+
+
+def test_autotune_sets_agent_threads():
+    """The autotuner measures every candidate and keeps one per agent"""
+    orchestrator = BatteryMonitoringOrchestrator({"anomaly": {"intra_op_threads": 1}})
+    results = orchestrator.autotune_threads("throughput", candidates=[1, 2], iterations=2)
+
+    assert "anomaly_agent" not in results  # explicitly configured
+    assert orchestrator.anomaly_agent.runner.intra_op_threads == 1
+    for name, (threads, rows) in results.items():
+        assert [row["threads"] for row in rows] == [1, 2]
+        runner = orchestrator.rl_controller.policy_runner if name == "rl_controller" else (
+            getattr(orchestrator, name).runner
+        )
+        assert runner.intra_op_threads == threads
+
+
+def test_control_settings_reach_policy_runner():
+    """The RL controller serves greedy actions with the configured inference settings"""
+    orchestrator = BatteryMonitoringOrchestrator(
+        {"inference": {"cpu_affinity": [0]}, "control": {"intra_op_threads": 1}}
+    )
+    runner = orchestrator.rl_controller.policy_runner
+
+    assert runner.intra_op_threads == 1
+    assert list(runner.cpu_affinity) == [0]
+    assert "rl_controller" not in orchestrator.autotune_threads(candidates=[1], iterations=1)
+
+
+if __name__ == "__main__":
+    test_candidate_thread_counts()
+    test_thread_settings_are_per_calling_thread()
+    test_runner_construction_keeps_process_threads()
+    test_autotune_sets_agent_threads()
+    test_control_settings_reach_policy_runner()
+    print("Thread tuning tests passed")
@@ -0,0 +1,83 @@
+"""Test the shared training engine"""
+
+import os
+import tempfile
+import torch
+from torch.utils.data import DataLoader, TensorDataset
+
+from src.models.trainer import Trainer, training_options
+
+
+def mse_loss(model, batch):
+    x, y = batch
+    return torch.nn.functional.mse_loss(model(x), y)
+
+
+def linear_data(n=64):
+    torch.manual_seed(0)
+    x = torch.randn(n, 4)
+    y = x @ torch.tensor([[1.0], [-2.0], [0.5], [3.0]])
+    return x, y
+
+
+def test_training_options_fall_back_to_config():
+    """Unset train() arguments use the `training` config section"""
+    config = {"epochs": 50, "learning_rate": 0.001, "early_stopping_patience": 5}
+    options = training_options(config, epochs=None, lr=0.01)
+    assert options == {"epochs": 50, "lr": 0.01, "early_stopping_patience": 5}
+
+
+def test_early_stopping_restores_best_weights():
+    """A run that stops improving ends early with its best weights loaded"""
+    x, y = linear_data()
+    loader = DataLoader(TensorDataset(x, y), batch_size=16)
+    torch.manual_seed(0)
+    model = torch.nn.Linear(4, 1)
+    # Large LR oscillates after converging, so validation stops improving
+    trainer = Trainer(model, mse_loss, lr=0.5, epochs=200, early_stopping_patience=3)
+    history = trainer.fit(loader, loader)
+
+    assert len(history) < 200
+    best = min(record["val_loss"] for record in history)
+    assert abs(trainer.evaluate(loader) - best) < 1e-6
+    assert all(record["samples"] == 64 and record["samples_per_sec"] > 0 for record in history)
+
+
+def test_gradient_accumulation_matches_full_batch():
+    """Two accumulated half-batches make the same update as one full batch"""
+    x, y = linear_data(32)
+    models = []
+    for batch_size, steps in ((32, 1), (16, 2)):
+        torch.manual_seed(0)
+        model = torch.nn.Linear(4, 1)
+        loader = DataLoader(TensorDataset(x, y), batch_size=batch_size)
+        Trainer(model, mse_loss, lr=0.01, epochs=3, grad_accumulation_steps=steps).fit(loader)
+        models.append(model)
+    assert torch.allclose(models[0].weight, models[1].weight, atol=1e-6)
+
+
+def test_resume_continues_from_checkpoint():
+    """A resumed run picks up at the saved epoch with its schedule state"""
+    x, y = linear_data()
+    loader = DataLoader(TensorDataset(x, y), batch_size=16)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "trainer.pt")
+        torch.manual_seed(0)
+        first = Trainer(torch.nn.Linear(4, 1), mse_loss, epochs=3, lr_schedule="step",
+                        lr_step_size=1, checkpoint_path=path)
+        first.fit(loader)
+
+        resumed = Trainer(torch.nn.Linear(4, 1), mse_loss, epochs=5, lr_schedule="step",
+                          lr_step_size=1, checkpoint_path=path, resume=True)
+        assert resumed.epoch == 3
+        assert resumed.optimizer.param_groups[0]["lr"] == first.optimizer.param_groups[0]["lr"]
+        history = resumed.fit(loader)
+        assert [record["epoch"] for record in history] == [1, 2, 3, 4, 5]
+
+
+if __name__ == "__main__":
+    test_training_options_fall_back_to_config()
+    test_early_stopping_restores_best_weights()
+    test_gradient_accumulation_matches_full_batch()
+    test_resume_continues_from_checkpoint()
+    print("Trainer tests passed")
@@ -0,0 +1,101 @@
+"""Test the multi-process inference worker pool"""
+
+import subprocess
+import sys
+import numpy as np
+import torch
+
+from src.agents import BatteryMonitoringOrchestrator, InferenceWorkerPool
+
+
+def test_workers_match_in_process_results():
+    """Workers serve the orchestrator's weights and report remote errors"""
+    torch.manual_seed(0)
+    np.random.seed(0)
+    orchestrator = BatteryMonitoringOrchestrator()
+    rul_sequence = np.random.rand(20, 5).astype(np.float32)
+    sensor_data = np.random.rand(10).astype(np.float32)
+    expected_rul = orchestrator.rul_agent.predict(rul_sequence)["predicted_rul"]
+
+    with InferenceWorkerPool.from_orchestrator(orchestrator, num_workers=2) as pool:
+        results = pool.map("rul_agent.predict", [(rul_sequence,)] * 4)
+        assert [r["predicted_rul"] for r in results] == [expected_rul] * 4
+
+        remote = pool.remote()
+        assert "anomaly_score" in remote.anomaly_agent.detect(sensor_data)
+
+        pool.map("anomaly_agent.detect", [(sensor_data,)] * 6)
+        assert len(pool.fleet_anomaly_sketch()) == 7
+
+        # Every call for a battery lands in the worker holding its baseline
+        futures = [
+            pool.submit("anomaly_agent.detect", sensor_data, battery_id=battery_id)
+            for battery_id in ["B1", "B2", "B3"] * 4
+        ]
+        [future.result() for future in futures]
+        states = pool.broadcast("anomaly_agent.battery_states.state_dict")
+        for battery_id in ("B1", "B2", "B3"):
+            owners = [state for state in states if battery_id in state["battery_ids"]]
+            assert len(owners) == 1, battery_id
+            slot = owners[0]["battery_ids"].index(battery_id)
+            assert int(owners[0]["count"][slot]) == 4
+
+        # Fleet batches are split by owning worker and reassembled in order
+        rng = np.random.default_rng(0)
+        batch = {
+            "thermal_images": rng.random((5, 8, 8)).astype(np.float32),
+            "acoustic_features": rng.random((5, 13, 173)).astype(np.float32),
+            "rul_sequences": rng.random((5, 20, 5)).astype(np.float32),
+            "sensor_data": rng.random((5, 10)).astype(np.float32),
+            "battery_ids": ["B1", "B2", "B3", "B4", "B5"],
+        }
+        fleet = pool.assess_fleet(batch)
+        assert [a["battery_id"] for a in fleet] == batch["battery_ids"]
+        states = pool.broadcast("anomaly_agent.battery_states.state_dict")
+        assert sorted(b for state in states for b in state["battery_ids"]) == [f"B{i}" for i in range(1, 6)]
+
+        try:
+            pool.call("rul_agent.missing_method")
+        except AttributeError:
+            pass
+        else:
+            raise AssertionError("remote AttributeError was not raised")
+
+    try:
+        pool.submit("rul_agent.predict", rul_sequence)
+    except RuntimeError:
+        pass
+    else:
+        raise AssertionError("closed pool accepted a request")
+
+
+def test_onnx_workers_skip_torch():
+    """ONNX workers serve the exported models and never import torch"""
+    torch.manual_seed(0)
+    orchestrator = BatteryMonitoringOrchestrator()
+    rul_sequences = np.random.rand(3, 20, 5).astype(np.float32)
+    expected = orchestrator.rul_agent.model.predict(torch.from_numpy(rul_sequences)).numpy()
+
+    with InferenceWorkerPool.from_orchestrator(orchestrator, engine="onnx", num_workers=2) as pool:
+        results = pool.map("rul_lstm.predict", [(rul_sequences,)] * 2)
+        for result in results:
+            np.testing.assert_allclose(result, expected, rtol=1e-4, atol=1e-5)
+
+        # The worker's import path, checked in a fresh interpreter
+        code = (
+            "import sys\n"
+            "import numpy as np\n"
+            "from src.agents import worker_pool\n"
+            "from src.models.onnx_backend import load_orchestrator_models\n"
+            f"models = load_orchestrator_models({pool.bundle_path!r})\n"
+            "models.anomaly_autoencoder.get_anomaly_score(np.random.rand(2, 10))\n"
+            "assert 'torch' not in sys.modules\n"
+        )
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+        assert result.returncode == 0, result.stderr
+
+
+if __name__ == "__main__":
+    test_workers_match_in_process_results()
+    test_onnx_workers_skip_torch()
+    print("Worker pool tests passed")
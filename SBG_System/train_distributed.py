@@ -0,0 +1,199 @@
+"""
+Smart Battery Guardian - Data-Parallel Training
+
+Trains the RUL (RULLSTM) or thermal (ThermalCNN) agent model in several
+processes with torch.distributed over gloo. Each rank trains on its own shard
+of the data and gradients are averaged every step, so all ranks hold the same
+weights; rank 0 writes the same checkpoint as single-process training
+(load it with the agent's load() or place it in an orchestrator checkpoint
+directory).
+
+RUL data comes from the CALCE Train split when --data-dir holds
+calce-dataset.zip, otherwise from the synthetic generator. Thermal data is
+synthetic.
+
+Usage:
+    python train_distributed.py rul|thermal OUTPUT [--nproc N] [--data-dir DIR]
+                                [--samples N] [--epochs N]
+
+    Multi-host: run on every host with the same --nnodes, --master-addr and
+    --master-port and its own --node-rank. Under torchrun (RANK/WORLD_SIZE set)
+    each process trains directly.
+"""
+
+import argparse
+import os
+import numpy as np
+import torch
+
+from src.data import SyntheticBatteryDataGenerator
+from src.data.data_loader import BatteryDataLoader
+from src.models.distributed import get_world_size, init_distributed, is_main_process, launch
+from src.utils import Config
+from src.utils.benchmark import format_report
+
+AGENTS = {"rul": "rul_agent", "thermal": "thermal_agent"}
+
+# Per-cycle features in the synthetic generator's order
+CALCE_CYCLE_COLUMNS = ("Discharge_CapacityAh", "V", "T", "I", "Internal_Resistance_Ohm_")
+
+
+def build_calce_rul_data(data_dir, sequence_length=50, eol_ratio=0.8):
+    """
+    RUL training windows from the CALCE Train split
+
+    Each battery's records are reduced to one feature row per cycle
+    (capacity, voltage, temperature, current, resistance); every window of
+    sequence_length cycles is labelled with the cycles left until capacity
+    falls below eol_ratio of the battery's first cycle.
+
+    Returns:
+        (sequences, rul) arrays, or None without usable data
+    """
+    from src.data.real_data_loader import CALCEDataLoader
+
+    zip_path = os.path.join(data_dir, "calce-dataset.zip")
+    if not os.path.exists(zip_path):
+        return None
+    df = CALCEDataLoader(zip_path).load_all_train_data()
+    columns = [c for c in CALCE_CYCLE_COLUMNS if c in df.columns]
+    if df.empty or "Cycle_Index" not in df.columns or CALCE_CYCLE_COLUMNS[0] not in columns:
+        return None
+
+    sequences, targets = [], []
+    for _, battery in df.groupby("battery_id"):
+        cycles = battery.groupby("Cycle_Index")[columns].mean()
+        cycles[CALCE_CYCLE_COLUMNS[0]] = battery.groupby("Cycle_Index")[CALCE_CYCLE_COLUMNS[0]].max()
+        features = cycles.reindex(columns=list(CALCE_CYCLE_COLUMNS)).fillna(0.0).to_numpy(np.float32)
+        capacity = features[:, 0]
+        below = np.flatnonzero(capacity < eol_ratio * capacity[0])
+        end_of_life = below[0] if len(below) else len(capacity)
+        for end in range(sequence_length, end_of_life + 1):
+            sequences.append(features[end - sequence_length:end])
+            targets.append(float(end_of_life - end))
+
+    if not sequences:
+        return None
+    return np.stack(sequences), np.asarray(targets, dtype=np.float32)
+
+
+def build_training_data(modality, agent, num_samples=1024, data_dir=None):
+    """
+    Model-ready (inputs, targets) for one modality
+
+    Every rank builds the same arrays (seeded generator); the distributed
+    loaders then hand each rank its own shard.
+    """
+    if modality == "rul" and data_dir:
+        data = build_calce_rul_data(data_dir)
+        if data is not None:
+            return data
+        print(f"No CALCE Train data under {data_dir}; using synthetic data")
+
+    generator = SyntheticBatteryDataGenerator(seed=0)
+    if modality == "rul":
+        sequences, rul = generator.generate_rul_sequence_data(num_sequences=num_samples)
+        return sequences.astype(np.float32), rul.astype(np.float32)
+
+    half = num_samples // 2
+    images = np.concatenate([
+        generator.generate_normal_thermal_data(num_samples=half),
+        generator.generate_anomalous_thermal_data(num_samples=num_samples - half),
+    ])
+    inputs = np.stack([agent._prepare_image(image) for image in images])
+    return inputs, np.repeat([0, 1], [half, num_samples - half]).astype(np.int64)
+
+
+def train_worker(modality, output_path, config, num_samples=1024, data_dir=None, epochs=None):
+    """
+    One rank's training run (called by launch() or directly under torchrun)
+
+    Returns:
+        Per-epoch history (identical on every rank)
+    """
+    from src.agents.orchestrator import BatteryMonitoringOrchestrator
+
+    torch.manual_seed(0)  # Trainer still broadcasts rank 0's initial weights
+    agent = getattr(BatteryMonitoringOrchestrator(config), AGENTS[modality])
+    inputs, targets = build_training_data(modality, agent, num_samples, data_dir)
+
+    data_config = config.get("data", {})
+    split = int(len(inputs) * (1.0 - data_config.get("validation_split", 0.2)))
+    order = np.random.default_rng(0).permutation(len(inputs))
+    train_index, val_index = order[:split], order[split:]
+    options = BatteryDataLoader.loader_options(data_config)
+
+    train_loader = BatteryDataLoader.create_dataloader(
+        inputs[train_index], targets[train_index], shuffle=True, distributed=True, **options
+    )
+    val_loader = BatteryDataLoader.create_dataloader(
+        inputs[val_index], targets[val_index], shuffle=False, distributed=True, **options
+    )
+    history = agent.train(train_loader, val_loader, epochs=epochs)
+
+    if is_main_process():
+        directory = os.path.dirname(output_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        agent.save(output_path)
+    return [dict(record, ranks=get_world_size()) for record in history]
+
+
+def main():
+    settings = Config().config
+    defaults = settings.get("distributed", {})
+
+    parser = argparse.ArgumentParser(description="SBG data-parallel training")
+    parser.add_argument("modality", choices=sorted(AGENTS))
+    parser.add_argument("output", help="checkpoint path written by rank 0")
+    parser.add_argument("--nproc", type=int, default=defaults.get("nproc_per_node", 1))
+    parser.add_argument("--nnodes", type=int, default=defaults.get("nnodes", 1))
+    parser.add_argument("--node-rank", type=int, default=0)
+    parser.add_argument("--master-addr", default=defaults.get("master_addr", "127.0.0.1"))
+    parser.add_argument("--master-port", type=int, default=None,
+                        help="rendezvous port (required with --nnodes > 1)")
+    parser.add_argument("--data-dir", default=None, help="directory with calce-dataset.zip")
+    parser.add_argument("--samples", type=int, default=1024, help="synthetic samples")
+    parser.add_argument("--epochs", type=int, default=None)
+    args = parser.parse_args()
+
+    worker_args = (args.modality, args.output, settings, args.samples, args.data_dir, args.epochs)
+    if int(os.environ.get("WORLD_SIZE", 1)) > 1:
+        # Started by torchrun: this process is one rank
+        init_distributed(backend=defaults.get("backend", "gloo"))
+        history = train_worker(*worker_args)
+        if not is_main_process():
+            return
+    else:
+        master_port = args.master_port
+        if master_port is None and args.nnodes > 1:
+            master_port = defaults.get("master_port", 29500)
+        history = launch(
+            train_worker,
+            args.nproc,
+            args=worker_args,
+            nnodes=args.nnodes,
+            node_rank=args.node_rank,
+            master_addr=args.master_addr,
+            master_port=master_port,
+            backend=defaults.get("backend", "gloo"),
+        )
+        if history is None:
+            return  # not the host of rank 0
+
+    print(format_report(
+        f"Data-parallel training report ({args.modality}, {history[-1]['ranks']} ranks)",
+        history,
+        [
+            ("epoch", "Epoch"),
+            ("train_loss", "Train loss"),
+            ("val_loss", "Val loss"),
+            ("samples_per_sec", "Samples/s"),
+            ("epoch_s", "Epoch s"),
+        ],
+    ))
+    print(f"Checkpoint written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()